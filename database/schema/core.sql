@@ -78,6 +78,7 @@ CREATE TABLE IF NOT EXISTS event_nodes (
 CREATE INDEX idx_event_nodes_novel ON event_nodes(novel_id);
 CREATE INDEX idx_event_nodes_arc ON event_nodes(arc_id);
 CREATE INDEX idx_event_nodes_status ON event_nodes(status);
+CREATE INDEX IF NOT EXISTS idx_event_nodes_novel_status ON event_nodes(novel_id, status);
 
 -- 3. 事件线表
 CREATE TABLE IF NOT EXISTS event_arcs (
@@ -329,3 +330,62 @@ CREATE TABLE IF NOT EXISTS auto_saves (
 
 CREATE INDEX idx_auto_saves_user_id ON auto_saves(user_id);
 CREATE INDEX idx_auto_saves_created ON auto_saves(created_at);
+
+-- 14. 导演决策日志 (紧凑记录，聚合见 src/director/decision_log.py)
+CREATE TABLE IF NOT EXISTS director_decisions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,              -- 小说/会话ID
+    turn INTEGER NOT NULL,                 -- 决策回合
+    event_id TEXT,                         -- 选中的事件ID
+    arc_id TEXT,                           -- 选中事件所属事件线
+    total_score REAL,                      -- 总分
+    playability_score REAL,
+    narrative_score REAL,
+    genre_score REAL,
+    audit_passed INTEGER,                  -- NULL=未审计, 0=失败, 1=通过
+    violation_count INTEGER DEFAULT 0,     -- 违规数
+    warnings TEXT,                         -- JSON数组: 警告
+    suggestion_count INTEGER DEFAULT 0,
+    planned_sequence TEXT,                 -- JSON数组: 前瞻规划序列
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_director_decisions_session ON director_decisions(session_id, id);
+
+-- 15. 对话会话 (共享前缀分支，见 src/models/conversation_history.py)
+CREATE TABLE IF NOT EXISTS conversation_sessions (
+    session_id TEXT PRIMARY KEY,
+    novel_id TEXT NOT NULL,
+    active_branch_id TEXT NOT NULL,        -- 当前活跃分支
+    summary TEXT DEFAULT '',
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_conversation_sessions_novel ON conversation_sessions(novel_id, updated_at);
+
+CREATE TABLE IF NOT EXISTS conversation_branches (
+    branch_id TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    branch_name TEXT NOT NULL,
+    parent_message_id TEXT,                -- 从哪条消息分支出来
+    parent_branch_id TEXT,                 -- 共享前缀的父分支
+    fork_offset INTEGER DEFAULT 0,         -- 继承父分支的消息条数
+    created_at TEXT NOT NULL,
+    is_active INTEGER DEFAULT 1
+);
+
+CREATE INDEX IF NOT EXISTS idx_conversation_branches_session ON conversation_branches(session_id);
+
+CREATE TABLE IF NOT EXISTS conversation_messages (
+    message_id TEXT PRIMARY KEY,
+    branch_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,                  -- 在分支自有消息中的序号
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    message_type TEXT,
+    metadata TEXT,                         -- JSON格式
+    timestamp TEXT NOT NULL
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_conversation_messages_branch ON conversation_messages(branch_id, seq);
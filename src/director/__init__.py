@@ -12,7 +12,11 @@ from .consistency_auditor import (
     ViolationSeverity
 )
 from .clue_economy_manager import ClueEconomyManager, ClueHealthMetrics
+from .event_planner import EventPlanner, PlannedTrajectory
+from .decision_log import DecisionLog, DecisionStats
+from .event_pool import SQLiteEventPool
 from .global_director import GlobalDirector, DirectorConfig, DirectorMode, DirectorDecision
+from .batch_director import BatchDirector, BatchRequest
 
 __all__ = [
     # 事件评分
@@ -28,9 +32,20 @@ __all__ = [
     # 线索经济
     "ClueEconomyManager",
     "ClueHealthMetrics",
+    # 前瞻规划
+    "EventPlanner",
+    "PlannedTrajectory",
+    # 决策日志
+    "DecisionLog",
+    "DecisionStats",
+    # 事件池
+    "SQLiteEventPool",
     # 全局导演
     "GlobalDirector",
     "DirectorConfig",
     "DirectorMode",
     "DirectorDecision",
+    # 批量导演
+    "BatchDirector",
+    "BatchRequest",
 ]
@@ -0,0 +1,190 @@
+"""多会话批量导演
+
+一个工作进程在同一个 tick 内为多个会话（小说/玩家）选择事件。
+EventScorer 的评分只依赖事件自身指标与评分配置（模式、类型、权重），
+因此同一事件池在相同评分配置下的排名可以在会话之间共享：
+每个（评分配置, 事件池）只评分、排序一次，各会话只需按自身状态过滤。
+
+按默认配置创建的会话导演共享同一个前瞻规划器（进程池）与决策日志连接，
+会话数增长时不会随之增加进程和数据库连接；用完后调用 close() 释放。
+"""
+
+import sqlite3
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import List, Dict, Optional, Any, Tuple
+
+from ..models.world_state import WorldState
+from ..models.event_node import EventNode
+from .event_scoring import EventScorer, EventScore
+from .event_planner import EventPlanner
+from .decision_log import DecisionLog
+from .global_director import (
+    GlobalDirector, DirectorConfig, DirectorDecision, create_scorer, create_planner
+)
+
+
+@dataclass
+class BatchRequest:
+    """单个会话的选择请求"""
+    session_id: str
+    world_state: WorldState
+    event_pool: List[EventNode]
+
+
+class BatchDirector:
+    """多会话批量导演
+
+    按 session_id 管理 GlobalDirector 实例，并缓存事件池排名。
+    缓存以事件对象身份为键（同时持有事件引用，避免对象 id 复用）；
+    修改事件评分指标后需调用 invalidate_scores()。
+    """
+
+    def __init__(
+        self,
+        config: Optional[DirectorConfig] = None,
+        setting: Optional[Dict[str, Any]] = None,
+        max_cached_pools: int = 64
+    ):
+        """初始化批量导演
+
+        Args:
+            config: 新会话使用的默认导演配置
+            setting: 新会话使用的默认小说设定
+            max_cached_pools: 缓存的事件池排名数上限（LRU）
+        """
+        self.config = config or DirectorConfig()
+        self.setting = setting or {}
+        self.max_cached_pools = max_cached_pools
+
+        self.directors: Dict[str, GlobalDirector] = {}
+        self._planner: Optional[EventPlanner] = None
+        self._decision_conn: Optional[sqlite3.Connection] = None
+        self._rankings: "OrderedDict[Tuple, Tuple[List[EventNode], List[Tuple[EventNode, EventScore]]]]" = OrderedDict()
+
+    # ========================================================================
+    # 会话管理
+    # ========================================================================
+
+    def add_session(self, session_id: str, director: GlobalDirector):
+        """登记已有的会话导演"""
+        self.directors[session_id] = director
+
+    def get_director(self, session_id: str) -> GlobalDirector:
+        """获取会话导演，不存在时按默认配置创建（session_id 替换为会话自身的 ID）"""
+        director = self.directors.get(session_id)
+        if director is None:
+            director = GlobalDirector(
+                config=replace(self.config, session_id=session_id),
+                setting=self.setting,
+                planner=self._shared_planner(),
+                decision_conn=self._shared_decision_conn()
+            )
+            self.directors[session_id] = director
+        return director
+
+    def _shared_planner(self) -> Optional[EventPlanner]:
+        """各会话共享的前瞻规划器（未启用前瞻时为 None）"""
+        if self._planner is None and self.config.enable_lookahead:
+            self._planner = create_planner(self.config, create_scorer(self.config))
+        return self._planner
+
+    def _shared_decision_conn(self) -> Optional[sqlite3.Connection]:
+        """各会话共享的决策日志连接（未配置持久化时为 None）"""
+        if self._decision_conn is None and self.config.decision_log_path:
+            self._decision_conn = DecisionLog.connect(self.config.decision_log_path)
+        return self._decision_conn
+
+    def remove_session(self, session_id: str) -> Optional[GlobalDirector]:
+        """移除会话导演"""
+        return self.directors.pop(session_id, None)
+
+    # ========================================================================
+    # 批量选择
+    # ========================================================================
+
+    def select_next_events(
+        self,
+        requests: List[BatchRequest]
+    ) -> Dict[str, DirectorDecision]:
+        """为一批会话选择下一个事件
+
+        Args:
+            requests: 会话请求列表
+
+        Returns:
+            Dict[str, DirectorDecision]: {session_id: 决策}
+        """
+        decisions = {}
+        for request in requests:
+            director = self.get_director(request.session_id)
+            ranking = self.rank_pool(director.scorer, request.event_pool)
+            decisions[request.session_id] = director.select_next_event(
+                request.world_state,
+                request.event_pool,
+                pool_ranking=ranking
+            )
+        return decisions
+
+    def rank_pool(
+        self,
+        scorer: EventScorer,
+        event_pool: List[EventNode]
+    ) -> List[Tuple[EventNode, EventScore]]:
+        """获取事件池在指定评分配置下的排名（带缓存）
+
+        Args:
+            scorer: 评分器
+            event_pool: 事件池
+
+        Returns:
+            List[Tuple[EventNode, EventScore]]: 按总分降序（稳定排序）
+        """
+        key = (
+            self._scorer_key(scorer),
+            tuple(id(event) for event in event_pool)
+        )
+
+        cached = self._rankings.get(key)
+        if cached is not None:
+            self._rankings.move_to_end(key)
+            return cached[1]
+
+        ranking = scorer.rank_events(event_pool)
+        self._rankings[key] = (list(event_pool), ranking)
+        if len(self._rankings) > self.max_cached_pools:
+            self._rankings.popitem(last=False)
+
+        return ranking
+
+    def invalidate_scores(self):
+        """清空事件池排名缓存"""
+        self._rankings.clear()
+
+    @staticmethod
+    def _scorer_key(scorer: EventScorer) -> Tuple:
+        """评分配置指纹"""
+        return (
+            scorer.mode,
+            scorer.genre,
+            tuple(sorted(scorer.weights.items()))
+        )
+
+    def close(self):
+        """关闭全部会话导演并释放共享的规划器与决策日志连接"""
+        for director in self.directors.values():
+            director.close()
+        self.directors.clear()
+        if self._planner is not None:
+            self._planner.shutdown()
+            self._planner = None
+        if self._decision_conn is not None:
+            self._decision_conn.close()
+            self._decision_conn = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计信息"""
+        return {
+            "sessions": len(self.directors),
+            "cached_pools": len(self._rankings),
+        }
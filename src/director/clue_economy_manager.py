@@ -4,7 +4,8 @@
 管理伏笔（Setup）的 SLA、线索（Clue）的发现和验证、证据链、健康度监控
 """
 
-from typing import List, Dict, Optional, Any
+import heapq
+from typing import List, Dict, Optional, Any, Tuple
 from dataclasses import dataclass, field
 
 from ..models.clue import (
@@ -43,8 +44,20 @@ class ClueEconomyManager:
     2. 跟踪线索（Clue）的发现和验证
     3. 证据链验证
     4. 健康度监控和建议生成
+
+    伏笔按状态分区存放，并在截止时间最小堆中登记状态转移回合
+    （进入紧迫期 / 到期 / 逾期），推进回合只处理到期的堆顶元素；
+    健康度所需的计数直接取自各分区大小，无需全量扫描。
     """
 
+    # 堆中记录的伏笔状态转移类型（同一回合内按此顺序处理）
+    _TRANSITION_URGENT = 0
+    _TRANSITION_DUE = 1
+    _TRANSITION_OVERDUE = 2
+
+    # get_health_metrics / get_suggestions 使用的默认紧迫度阈值
+    DEFAULT_URGENCY_THRESHOLD = 0.7
+
     def __init__(self, registry: Optional[ClueRegistry] = None):
         """初始化管理器
 
@@ -54,6 +67,23 @@ class ClueEconomyManager:
         self.registry = registry or ClueRegistry()
         self.current_turn = 0
 
+        # 伏笔状态分区（dict 保持插入顺序）
+        self._setups_by_status: Dict[SetupStatus, Dict[str, Setup]] = {
+            status: {} for status in SetupStatus
+        }
+        # 处于默认紧迫期的伏笔
+        self._urgent_setups: Dict[str, Setup] = {}
+        # (转移回合, 转移类型, 序号, setup_id) 最小堆
+        self._transition_heap: List[Tuple[int, int, int, str]] = []
+        self._transition_seq = 0
+
+        # 线索状态分区
+        self._clues_by_status: Dict[ClueStatus, Dict[str, Clue]] = {
+            status: {} for status in ClueStatus
+        }
+
+        self._sync_registry()
+
     # ========================================================================
     # 伏笔管理
     # ========================================================================
@@ -89,6 +119,7 @@ class ClueEconomyManager:
         )
 
         self.registry.add_setup(setup)
+        self._index_setup(setup)
         return setup
 
     def pay_off_setup(self, setup_id: str, payoff_event_id: str) -> bool:
@@ -109,15 +140,18 @@ class ClueEconomyManager:
         if setup.status == SetupStatus.PAID_OFF:
             return False  # 已经偿还过
 
+        self._sync_registry()
         setup.payoff_event_id = payoff_event_id
         setup.payoff_turn = self.current_turn
-        setup.status = SetupStatus.PAID_OFF
+        self._move_setup(setup, SetupStatus.PAID_OFF)
+        self._urgent_setups.pop(setup.id, None)
 
         return True
 
     def get_overdue_setups(self) -> List[Setup]:
-        """获取逾期的伏笔"""
-        return self.registry.get_overdue_setups(self.current_turn)
+        """获取逾期的伏笔（按截止回合先后）"""
+        self._sync_registry()
+        return list(self._setups_by_status[SetupStatus.OVERDUE].values())
 
     def get_urgent_setups(self, urgency_threshold: float = 0.7) -> List[Setup]:
         """获取紧迫的伏笔
@@ -128,18 +162,21 @@ class ClueEconomyManager:
         Returns:
             List[Setup]: 紧迫伏笔列表
         """
-        urgent = []
-        for setup in self.registry.setups.values():
-            if setup.status == SetupStatus.PAID_OFF:
-                continue
+        self._sync_registry()
 
-            remaining = setup.remaining_turns(self.current_turn)
-            if remaining <= 0:
-                continue  # 已逾期的在 overdue 里
+        if urgency_threshold == self.DEFAULT_URGENCY_THRESHOLD:
+            urgent = list(self._urgent_setups.values())
+        else:
+            # 非默认阈值：只扫描未逾期的待偿还伏笔
+            urgent = []
+            for setup in self._iter_open_setups():
+                remaining = setup.remaining_turns(self.current_turn)
+                if remaining <= 0:
+                    continue  # 已逾期的在 overdue 里
 
-            urgency = 1.0 - (remaining / setup.sla_deadline)
-            if urgency >= urgency_threshold:
-                urgent.append(setup)
+                urgency = 1.0 - (remaining / setup.sla_deadline)
+                if urgency >= urgency_threshold:
+                    urgent.append(setup)
 
         # 按紧迫度和优先级排序
         urgent.sort(
@@ -153,11 +190,19 @@ class ClueEconomyManager:
 
     def get_pending_setups(self) -> List[Setup]:
         """获取所有待偿还的伏笔"""
+        self._sync_registry()
         return [
-            s for s in self.registry.setups.values()
-            if s.status != SetupStatus.PAID_OFF
+            setup
+            for status, setups in self._setups_by_status.items()
+            if status != SetupStatus.PAID_OFF
+            for setup in setups.values()
         ]
 
+    def _iter_open_setups(self):
+        """遍历未偿还且未逾期的伏笔"""
+        for status in (SetupStatus.PENDING, SetupStatus.HINTED):
+            yield from self._setups_by_status[status].values()
+
     # ========================================================================
     # 线索管理
     # ========================================================================
@@ -192,6 +237,7 @@ class ClueEconomyManager:
         )
 
         self.registry.add_clue(clue)
+        self._clues_by_status[clue.status][clue.id] = clue
         return clue
 
     def discover_clue(self, clue_id: str) -> bool:
@@ -210,7 +256,8 @@ class ClueEconomyManager:
         if clue.status != ClueStatus.HIDDEN:
             return False  # 已经发现过
 
-        clue.status = ClueStatus.DISCOVERED
+        self._sync_registry()
+        self._move_clue(clue, ClueStatus.DISCOVERED)
         from datetime import datetime
         clue.discovered_at = datetime.now()
 
@@ -229,19 +276,27 @@ class ClueEconomyManager:
         if clue_id not in self.registry.clues:
             return False
 
+        self._sync_registry()
         clue = self.registry.clues[clue_id]
-        return clue.verify(evidence)
+        old_status = clue.status
+        verified = clue.verify(evidence)
+        if clue.status != old_status:
+            self._clues_by_status[old_status].pop(clue.id, None)
+            self._clues_by_status[clue.status][clue.id] = clue
+        return verified
 
     def get_discovered_clues(self) -> List[Clue]:
         """获取已发现的线索"""
-        return self.registry.get_discovered_clues()
+        self._sync_registry()
+        return (
+            list(self._clues_by_status[ClueStatus.DISCOVERED].values()) +
+            list(self._clues_by_status[ClueStatus.VERIFIED].values())
+        )
 
     def get_unverified_clues(self) -> List[Clue]:
         """获取已发现但未验证的线索"""
-        return [
-            c for c in self.registry.clues.values()
-            if c.status == ClueStatus.DISCOVERED
-        ]
+        self._sync_registry()
+        return list(self._clues_by_status[ClueStatus.DISCOVERED].values())
 
     # ========================================================================
     # 证据管理
@@ -307,17 +362,19 @@ class ClueEconomyManager:
     def get_health_metrics(self) -> ClueHealthMetrics:
         """获取线索经济健康度指标
 
+        各项计数直接取自状态分区大小，复杂度 O(1)
+
         Returns:
             ClueHealthMetrics: 健康度指标
         """
+        self._sync_registry()
         metrics = ClueHealthMetrics()
 
         # 伏笔统计
-        all_setups = list(self.registry.setups.values())
-        metrics.total_setups = len(all_setups)
-        metrics.paid_setups = sum(1 for s in all_setups if s.status == SetupStatus.PAID_OFF)
-        metrics.overdue_setups = len(self.get_overdue_setups())
-        metrics.urgent_setups = len(self.get_urgent_setups())
+        metrics.total_setups = len(self.registry.setups)
+        metrics.paid_setups = len(self._setups_by_status[SetupStatus.PAID_OFF])
+        metrics.overdue_setups = len(self._setups_by_status[SetupStatus.OVERDUE])
+        metrics.urgent_setups = len(self._urgent_setups)
 
         if metrics.total_setups > 0:
             metrics.payoff_rate = metrics.paid_setups / metrics.total_setups
@@ -327,13 +384,11 @@ class ClueEconomyManager:
             metrics.overdue_rate = 0.0
 
         # 线索统计
-        all_clues = list(self.registry.clues.values())
-        metrics.total_clues = len(all_clues)
-        metrics.discovered_clues = sum(
-            1 for c in all_clues
-            if c.status in [ClueStatus.DISCOVERED, ClueStatus.VERIFIED]
+        metrics.total_clues = len(self.registry.clues)
+        metrics.verified_clues = len(self._clues_by_status[ClueStatus.VERIFIED])
+        metrics.discovered_clues = (
+            len(self._clues_by_status[ClueStatus.DISCOVERED]) + metrics.verified_clues
         )
-        metrics.verified_clues = sum(1 for c in all_clues if c.status == ClueStatus.VERIFIED)
 
         if metrics.total_clues > 0:
             metrics.discovery_rate = metrics.discovered_clues / metrics.total_clues
@@ -420,15 +475,109 @@ class ClueEconomyManager:
     def advance_turn(self, turns: int = 1):
         """推进回合
 
+        只弹出转移回合已到的堆顶元素，复杂度 O(本次状态转移数 · log n)
+
         Args:
             turns: 推进的回合数（默认 1）
         """
         self.current_turn += turns
+        self._sync_registry()
+        self._process_transitions()
+
+    # ========================================================================
+    # 索引维护
+    # ========================================================================
+
+    def _sync_registry(self):
+        """索引直接写入注册表（未经管理器）的伏笔和线索
+
+        仅在注册表大小与索引不一致时才做差集，通常为 O(1)
+        """
+        indexed_setups = sum(len(p) for p in self._setups_by_status.values())
+        if indexed_setups != len(self.registry.setups):
+            indexed = set()
+            for partition in self._setups_by_status.values():
+                indexed.update(partition)
+            for setup_id, setup in self.registry.setups.items():
+                if setup_id not in indexed:
+                    self._index_setup(setup)
+
+        indexed_clues = sum(len(p) for p in self._clues_by_status.values())
+        if indexed_clues != len(self.registry.clues):
+            indexed = set()
+            for partition in self._clues_by_status.values():
+                indexed.update(partition)
+            for clue_id, clue in self.registry.clues.items():
+                if clue_id not in indexed:
+                    self._clues_by_status[clue.status][clue_id] = clue
+
+    def _index_setup(self, setup: Setup):
+        """将伏笔加入状态分区，并登记其未来的状态转移"""
+        self._setups_by_status[setup.status][setup.id] = setup
+        if setup.status == SetupStatus.PAID_OFF:
+            return
+
+        deadline = setup.setup_turn + setup.sla_deadline
+        urgent_turn = self._urgent_turn(setup, deadline)
+        if urgent_turn is not None:
+            self._push_transition(urgent_turn, self._TRANSITION_URGENT, setup.id)
+        self._push_transition(deadline, self._TRANSITION_DUE, setup.id)
+        self._push_transition(deadline + 1, self._TRANSITION_OVERDUE, setup.id)
+
+        self._process_transitions()
+
+    def _urgent_turn(self, setup: Setup, deadline: int) -> Optional[int]:
+        """计算伏笔进入默认紧迫期的回合，永不紧迫时返回 None"""
+        if setup.sla_deadline <= 0:
+            return None
+
+        threshold = self.DEFAULT_URGENCY_THRESHOLD
+        # 满足 1 - remaining / sla >= threshold 的最大剩余回合数
+        remaining = int((1.0 - threshold) * setup.sla_deadline) + 1
+        while remaining > 0 and 1.0 - (remaining / setup.sla_deadline) < threshold:
+            remaining -= 1
+
+        if remaining <= 0:
+            return None
+        return deadline - remaining
+
+    def _push_transition(self, turn: int, kind: int, setup_id: str):
+        heapq.heappush(
+            self._transition_heap,
+            (turn, kind, self._transition_seq, setup_id)
+        )
+        self._transition_seq += 1
+
+    def _process_transitions(self):
+        """处理所有转移回合已到的堆顶元素（已偿还的伏笔惰性丢弃）"""
+        heap = self._transition_heap
+        while heap and heap[0][0] <= self.current_turn:
+            _, kind, _, setup_id = heapq.heappop(heap)
+            setup = self.registry.setups.get(setup_id)
+            if setup is None or setup.status == SetupStatus.PAID_OFF:
+                continue
 
-        # 更新伏笔状态
-        for setup in self.registry.setups.values():
-            if setup.is_overdue(self.current_turn) and setup.status != SetupStatus.PAID_OFF:
-                setup.status = SetupStatus.OVERDUE
+            if kind == self._TRANSITION_URGENT:
+                if setup.status != SetupStatus.OVERDUE:
+                    self._urgent_setups[setup_id] = setup
+            elif kind == self._TRANSITION_DUE:
+                self._urgent_setups.pop(setup_id, None)
+            else:
+                self._move_setup(setup, SetupStatus.OVERDUE)
+
+    def _move_setup(self, setup: Setup, status: SetupStatus):
+        """更新伏笔状态并维护分区"""
+        for partition in self._setups_by_status.values():
+            if partition.pop(setup.id, None) is not None:
+                break
+        setup.status = status
+        self._setups_by_status[status][setup.id] = setup
+
+    def _move_clue(self, clue: Clue, status: ClueStatus):
+        """更新线索状态并维护分区"""
+        self._clues_by_status[clue.status].pop(clue.id, None)
+        clue.status = status
+        self._clues_by_status[status][clue.id] = clue
 
     # ========================================================================
     # 工具方法
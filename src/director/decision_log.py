@@ -0,0 +1,362 @@
+"""导演决策日志
+
+将 DirectorDecision 以紧凑形式（事件、分项评分、审计结果计数、警告）
+写入 SQLite，内存中只保留有限长度的最近记录，
+并维护滚动聚合（分数分布、警告率、各事件线选择次数），
+供 GlobalDirector.get_health_report 直接读取。
+"""
+
+import json
+import sqlite3
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Dict, Optional, Any, Deque, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .global_director import DirectorDecision
+
+
+SCORE_BUCKETS = 10  # 分数直方图桶数（每桶 10 分）
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS director_decisions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    turn INTEGER NOT NULL,
+    event_id TEXT,
+    arc_id TEXT,
+    total_score REAL,
+    playability_score REAL,
+    narrative_score REAL,
+    genre_score REAL,
+    audit_passed INTEGER,
+    violation_count INTEGER DEFAULT 0,
+    warnings TEXT,
+    suggestion_count INTEGER DEFAULT 0,
+    planned_sequence TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_director_decisions_session
+    ON director_decisions(session_id, id);
+"""
+
+
+def _score_bucket(score: float) -> int:
+    """分数所在直方图桶"""
+    return max(0, min(SCORE_BUCKETS - 1, int(score // 10)))
+
+
+@dataclass
+class DecisionStats:
+    """决策滚动聚合"""
+    total: int = 0
+    selected: int = 0
+
+    # 分数分布
+    score_sum: float = 0.0
+    score_sq_sum: float = 0.0
+    score_min: Optional[float] = None
+    score_max: Optional[float] = None
+    score_histogram: List[int] = field(default_factory=lambda: [0] * SCORE_BUCKETS)
+
+    # 警告与审计
+    decisions_with_warnings: int = 0
+    warning_total: int = 0
+    audit_failures: int = 0
+    violation_total: int = 0
+
+    # 各事件线选择次数
+    arc_selections: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, record: Dict[str, Any]):
+        """累加一条紧凑决策记录"""
+        self.total += 1
+
+        score = record.get("total_score")
+        if record.get("event_id") is not None:
+            self.selected += 1
+            arc_id = record.get("arc_id")
+            if arc_id:
+                self.arc_selections[arc_id] = self.arc_selections.get(arc_id, 0) + 1
+
+        if score is not None:
+            self.score_sum += score
+            self.score_sq_sum += score * score
+            self.score_min = score if self.score_min is None else min(self.score_min, score)
+            self.score_max = score if self.score_max is None else max(self.score_max, score)
+            self.score_histogram[_score_bucket(score)] += 1
+
+        warnings = record.get("warnings") or []
+        if warnings:
+            self.decisions_with_warnings += 1
+            self.warning_total += len(warnings)
+
+        if record.get("audit_passed") is False:
+            self.audit_failures += 1
+        self.violation_total += record.get("violation_count", 0)
+
+    @property
+    def scored(self) -> int:
+        """带评分的决策数"""
+        return sum(self.score_histogram)
+
+    @property
+    def score_mean(self) -> float:
+        """平均分"""
+        return self.score_sum / self.scored if self.scored else 0.0
+
+    @property
+    def score_std(self) -> float:
+        """分数标准差"""
+        if not self.scored:
+            return 0.0
+        variance = self.score_sq_sum / self.scored - self.score_mean ** 2
+        return max(0.0, variance) ** 0.5
+
+    @property
+    def warning_rate(self) -> float:
+        """含警告的决策占比"""
+        return self.decisions_with_warnings / self.total if self.total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {
+            "total": self.total,
+            "selected": self.selected,
+            "score": {
+                "mean": round(self.score_mean, 2),
+                "std": round(self.score_std, 2),
+                "min": self.score_min,
+                "max": self.score_max,
+                "histogram": list(self.score_histogram),
+            },
+            "warning_rate": round(self.warning_rate, 4),
+            "warning_total": self.warning_total,
+            "audit_failures": self.audit_failures,
+            "violation_total": self.violation_total,
+            "arc_selections": dict(self.arc_selections),
+        }
+
+
+class DecisionLog:
+    """导演决策日志
+
+    db_path 为 None 时只维护内存聚合与最近记录，不做持久化。
+    重新打开同一数据库时，聚合由 SQL 一次性重建，最近记录从表尾加载。
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        session_id: str = "default",
+        tail_size: int = 100,
+        conn: Optional[sqlite3.Connection] = None
+    ):
+        """初始化决策日志
+
+        Args:
+            db_path: SQLite 数据库路径（可选）
+            session_id: 会话/小说 ID，用于区分同库中的多份日志
+            tail_size: 内存中保留的最近记录数
+            conn: 共享的数据库连接（可选，由 connect() 创建；传入时忽略 db_path，close() 不关闭它）
+        """
+        self.db_path = db_path
+        self.session_id = session_id
+        self.stats = DecisionStats()
+        self.tail: Deque[Dict[str, Any]] = deque(maxlen=tail_size)
+        self.conn: Optional[sqlite3.Connection] = conn
+        self._owns_conn = conn is None
+
+        if self.conn is None and db_path:
+            self.conn = self.connect(db_path)
+        if self.conn is not None:
+            self._load()
+
+    @staticmethod
+    def connect(db_path: str) -> sqlite3.Connection:
+        """打开决策日志数据库并建表（多个会话可共享同一连接）"""
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        conn.executescript(_SCHEMA)
+        conn.commit()
+        return conn
+
+    # ========================================================================
+    # 写入
+    # ========================================================================
+
+    def record(self, decision: "DirectorDecision", turn: int) -> Dict[str, Any]:
+        """记录一条决策
+
+        Args:
+            decision: 导演决策
+            turn: 决策所在回合
+
+        Returns:
+            Dict: 紧凑决策记录
+        """
+        record = self._compact(decision, turn)
+        self.stats.add(record)
+        self.tail.append(record)
+
+        if self.conn is not None:
+            self.conn.execute(
+                """
+                INSERT INTO director_decisions (
+                    session_id, turn, event_id, arc_id,
+                    total_score, playability_score, narrative_score, genre_score,
+                    audit_passed, violation_count, warnings,
+                    suggestion_count, planned_sequence
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    self.session_id, record["turn"], record["event_id"], record["arc_id"],
+                    record["total_score"], record["playability_score"],
+                    record["narrative_score"], record["genre_score"],
+                    None if record["audit_passed"] is None else int(record["audit_passed"]),
+                    record["violation_count"],
+                    json.dumps(record["warnings"], ensure_ascii=False),
+                    record["suggestion_count"],
+                    json.dumps(record["planned_sequence"])
+                )
+            )
+            self.conn.commit()
+
+        return record
+
+    @staticmethod
+    def _compact(decision: "DirectorDecision", turn: int) -> Dict[str, Any]:
+        """提取决策的紧凑表示（不保留审计报告与说明文本）"""
+        event = decision.selected_event
+        score = decision.score
+        audit = decision.audit_report
+
+        return {
+            "turn": turn,
+            "event_id": event.id if event else None,
+            "arc_id": event.arc_id if event else None,
+            "total_score": score.total_score if score else None,
+            "playability_score": score.playability_score if score else None,
+            "narrative_score": score.narrative_score if score else None,
+            "genre_score": score.genre_score if score else None,
+            "audit_passed": audit.passed if audit else None,
+            "violation_count": len(audit.violations) if audit else 0,
+            "warnings": list(decision.warnings),
+            "suggestion_count": len(decision.suggestions),
+            "planned_sequence": list(decision.planned_sequence),
+        }
+
+    # ========================================================================
+    # 读取
+    # ========================================================================
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """获取最近的决策记录（旧 -> 新）"""
+        records = list(self.tail)
+        if limit is not None:
+            records = records[-limit:] if limit > 0 else []
+        return records
+
+    def _load(self):
+        """从数据库重建聚合与最近记录"""
+        cursor = self.conn.cursor()
+
+        cursor.execute(
+            """
+            SELECT
+                COUNT(*) AS total,
+                COUNT(event_id) AS selected,
+                COALESCE(SUM(total_score), 0) AS score_sum,
+                COALESCE(SUM(total_score * total_score), 0) AS score_sq_sum,
+                MIN(total_score) AS score_min,
+                MAX(total_score) AS score_max,
+                COALESCE(SUM(warnings IS NOT NULL AND warnings != '[]'), 0) AS with_warnings,
+                COALESCE(SUM(audit_passed = 0), 0) AS audit_failures,
+                COALESCE(SUM(violation_count), 0) AS violation_total
+            FROM director_decisions
+            WHERE session_id = ?
+            """,
+            (self.session_id,)
+        )
+        row = cursor.fetchone()
+        stats = self.stats
+        stats.total = row["total"]
+        stats.selected = row["selected"]
+        stats.score_sum = row["score_sum"]
+        stats.score_sq_sum = row["score_sq_sum"]
+        stats.score_min = row["score_min"]
+        stats.score_max = row["score_max"]
+        stats.decisions_with_warnings = row["with_warnings"]
+        stats.audit_failures = row["audit_failures"]
+        stats.violation_total = row["violation_total"]
+
+        cursor.execute(
+            """
+            SELECT
+                MAX(0, MIN(?, CAST(total_score / 10 AS INTEGER))) AS bucket,
+                COUNT(*) AS count
+            FROM director_decisions
+            WHERE session_id = ? AND total_score IS NOT NULL
+            GROUP BY bucket
+            """,
+            (SCORE_BUCKETS - 1, self.session_id)
+        )
+        for bucket_row in cursor.fetchall():
+            stats.score_histogram[bucket_row["bucket"]] = bucket_row["count"]
+
+        cursor.execute(
+            """
+            SELECT arc_id, COUNT(*) AS count
+            FROM director_decisions
+            WHERE session_id = ? AND arc_id IS NOT NULL
+            GROUP BY arc_id
+            """,
+            (self.session_id,)
+        )
+        stats.arc_selections = {r["arc_id"]: r["count"] for r in cursor.fetchall()}
+
+        cursor.execute(
+            """
+            SELECT * FROM director_decisions
+            WHERE session_id = ?
+            ORDER BY id DESC
+            LIMIT ?
+            """,
+            (self.session_id, self.tail.maxlen)
+        )
+        rows = cursor.fetchall()
+        for r in reversed(rows):
+            self.tail.append({
+                "turn": r["turn"],
+                "event_id": r["event_id"],
+                "arc_id": r["arc_id"],
+                "total_score": r["total_score"],
+                "playability_score": r["playability_score"],
+                "narrative_score": r["narrative_score"],
+                "genre_score": r["genre_score"],
+                "audit_passed": None if r["audit_passed"] is None else bool(r["audit_passed"]),
+                "violation_count": r["violation_count"],
+                "warnings": json.loads(r["warnings"]) if r["warnings"] else [],
+                "suggestion_count": r["suggestion_count"],
+                "planned_sequence": json.loads(r["planned_sequence"]) if r["planned_sequence"] else [],
+            })
+
+        cursor.execute(
+            """
+            SELECT COALESCE(SUM(json_array_length(warnings)), 0) AS warning_total
+            FROM director_decisions
+            WHERE session_id = ? AND warnings IS NOT NULL
+            """,
+            (self.session_id,)
+        )
+        stats.warning_total = cursor.fetchone()["warning_total"]
+
+    def close(self):
+        """关闭数据库连接（共享连接由创建方关闭）"""
+        if self.conn is not None:
+            if self._owns_conn:
+                self.conn.close()
+            self.conn = None
@@ -0,0 +1,319 @@
+"""前瞻事件规划器
+
+在贪心选择之外提供可选的规划模式：
+对候选事件做多步束搜索（beam search），用轻量克隆的世界状态
+模拟 effects / rewards，并按整条事件序列的折扣得分与节奏平滑度选择首个事件。
+
+每个首步候选的展开相互独立，可分发到进程池并行执行，
+整体受单次决策的时间预算约束，超时的展开回退为首步得分（保守估计），
+排序时完整展开的序列优先于未完成的序列。
+"""
+
+import copy
+import time
+from concurrent.futures import ProcessPoolExecutor, Future, wait
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Any, Set, Tuple
+
+from ..models.world_state import WorldState
+from ..models.event_node import EventNode, EventStatus
+from .event_scoring import EventScorer
+
+
+@dataclass
+class PlannedTrajectory:
+    """规划得到的事件序列"""
+    event_ids: List[str] = field(default_factory=list)
+    value: float = 0.0  # 整条序列的得分
+    complete: bool = True  # 是否在时间预算内完成展开
+
+
+@dataclass
+class _RolloutTask:
+    """单个首步候选的展开任务（需可 pickle，以便发送到子进程）"""
+    root_id: str
+    world_state: WorldState
+    events: List[EventNode]
+    completed_events: List[str]
+    scorer: EventScorer
+    current_turn: int
+    depth: int
+    beam_width: int
+    discount: float
+    pacing_weight: float
+    min_event_score: float
+    deadline: float  # time.time() 绝对时间，跨进程可比
+
+
+def fork_world_state(world_state: WorldState) -> WorldState:
+    """轻量克隆世界状态
+
+    只复制容器本身：flags / resources 会被补丁原地修改，因此逐项复制；
+    角色、地点、势力对象在 apply_effects 中按需写时复制；
+    事件日志在规划中只读，直接共享。
+    """
+    clone = copy.copy(world_state)
+    clone.flags = dict(world_state.flags)
+    clone.resources = {k: copy.copy(v) for k, v in world_state.resources.items()}
+    clone.characters = dict(world_state.characters)
+    clone.locations = dict(world_state.locations)
+    clone.factions = dict(world_state.factions)
+    return clone
+
+
+def apply_effects(world_state: WorldState, patch: Dict[str, Any]):
+    """在克隆状态上应用补丁（被修改的实体先做写时复制）"""
+    for section in ("characters", "locations", "factions"):
+        if section not in patch:
+            continue
+        entities = getattr(world_state, section)
+        for entity_id in patch[section]:
+            if entity_id in entities:
+                entities[entity_id] = copy.copy(entities[entity_id])
+
+    world_state.apply_state_patch(patch)
+
+
+def _simulate_event(world_state: WorldState, event: EventNode) -> WorldState:
+    """模拟事件成功完成后的世界状态"""
+    state = fork_world_state(world_state)
+    if event.effects:
+        apply_effects(state, event.effects)
+    if event.rewards:
+        apply_effects(state, {"resources": event.rewards})
+    return state
+
+
+def _candidates(
+    events: List[EventNode],
+    world_state: WorldState,
+    completed: List[str],
+    completed_set: Set[str]
+) -> List[EventNode]:
+    """与 GlobalDirector._filter_available_events 相同的过滤规则"""
+    return [
+        event for event in events
+        if event.status not in (EventStatus.COMPLETED, EventStatus.FAILED)
+        and event.id not in completed_set
+        and event.is_available(world_state, completed_set)
+    ]
+
+
+def _pacing_penalty(previous: Optional[EventNode], event: EventNode) -> float:
+    """相邻事件张力增量的突变程度"""
+    if previous is None:
+        return 0.0
+    return abs(event.tension_delta - previous.tension_delta)
+
+
+def run_rollout(task: _RolloutTask) -> PlannedTrajectory:
+    """以 task.root_id 为首步做束搜索，返回最优序列
+
+    模块级函数，以便在进程池中执行
+    """
+    events_by_id = {event.id: event for event in task.events}
+    root = events_by_id[task.root_id]
+
+    def step_value(event, state, completed, turn, previous, step):
+        context = {
+            "world_state": state,
+            "current_turn": turn,
+            "completed_events": completed,
+            "active_events": []
+        }
+        score = task.scorer.score_event(event, context).total_score
+        value = score - task.pacing_weight * _pacing_penalty(previous, event)
+        return value * (task.discount ** step)
+
+    completed = list(task.completed_events)
+    root_value = step_value(
+        root, task.world_state, completed, task.current_turn, None, 0
+    )
+    # beam 元素: (累计得分, 事件序列, 状态, 已完成列表)
+    beam: List[Tuple[float, List[EventNode], WorldState, List[str]]] = [(
+        root_value,
+        [root],
+        _simulate_event(task.world_state, root),
+        completed + [root.id]
+    )]
+    best = beam[0]
+
+    for step in range(1, task.depth):
+        expanded = []
+        for value, path, state, done in beam:
+            if time.time() >= task.deadline:
+                return PlannedTrajectory(
+                    event_ids=[e.id for e in best[1]], value=best[0], complete=False
+                )
+
+            done_set = set(done)
+            for event in _candidates(task.events, state, done, done_set):
+                gain = step_value(
+                    event, state, done, task.current_turn + step, path[-1], step
+                )
+                if gain < task.min_event_score * (task.discount ** step):
+                    continue
+                expanded.append((value + gain, path, state, done, event))
+
+        if not expanded:
+            break
+
+        expanded.sort(key=lambda item: item[0], reverse=True)
+        beam = [
+            (value, path + [event], _simulate_event(state, event), done + [event.id])
+            for value, path, state, done, event in expanded[:task.beam_width]
+        ]
+        if beam[0][0] > best[0]:
+            best = beam[0]
+
+    return PlannedTrajectory(event_ids=[e.id for e in best[1]], value=best[0])
+
+
+class EventPlanner:
+    """前瞻事件规划器
+
+    对评分后的首步候选逐一做束搜索，返回按序列得分排序的结果。
+    max_workers > 1 时使用进程池并行展开，否则在当前进程内顺序执行。
+    """
+
+    def __init__(
+        self,
+        scorer: EventScorer,
+        depth: int = 3,
+        beam_width: int = 3,
+        max_roots: int = 5,
+        time_budget: float = 0.5,
+        max_workers: int = 0,
+        discount: float = 0.9,
+        pacing_weight: float = 10.0,
+        min_event_score: float = 0.0
+    ):
+        """初始化规划器
+
+        Args:
+            scorer: 事件评分器
+            depth: 前瞻步数（含首步）
+            beam_width: 每步保留的序列数
+            max_roots: 参与规划的首步候选数
+            time_budget: 单次决策的时间预算（秒）
+            max_workers: 进程池大小，<= 1 表示不使用进程池
+            discount: 后续步骤得分的折扣系数
+            pacing_weight: 张力突变惩罚权重
+            min_event_score: 后续步骤的最低分数阈值
+        """
+        self.scorer = scorer
+        self.depth = depth
+        self.beam_width = beam_width
+        self.max_roots = max_roots
+        self.time_budget = time_budget
+        self.max_workers = max_workers
+        self.discount = discount
+        self.pacing_weight = pacing_weight
+        self.min_event_score = min_event_score
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def plan(
+        self,
+        roots: List[EventNode],
+        world_state: WorldState,
+        events: List[EventNode],
+        completed_events: List[str],
+        current_turn: int = 0
+    ) -> List[PlannedTrajectory]:
+        """规划事件序列
+
+        Args:
+            roots: 首步候选（按单步得分降序）
+            world_state: 当前世界状态（不会被修改）
+            events: 完整事件池
+            completed_events: 已完成事件 ID
+            current_turn: 当前回合
+
+        Returns:
+            List[PlannedTrajectory]: 每个首步候选的最优序列，完整展开的在前，各自按得分降序
+        """
+        deadline = time.time() + self.time_budget
+        tasks = [
+            _RolloutTask(
+                root_id=root.id,
+                world_state=world_state,
+                events=events,
+                completed_events=completed_events,
+                scorer=self.scorer,
+                current_turn=current_turn,
+                depth=self.depth,
+                beam_width=self.beam_width,
+                discount=self.discount,
+                pacing_weight=self.pacing_weight,
+                min_event_score=self.min_event_score,
+                deadline=deadline
+            )
+            for root in roots[:self.max_roots]
+        ]
+
+        if self.max_workers > 1 and len(tasks) > 1:
+            trajectories = self._plan_parallel(tasks, deadline)
+        else:
+            trajectories = self._plan_serial(tasks, deadline)
+
+        # 未完成的估计值与完整序列不可比，完整展开的序列排在前面
+        trajectories.sort(key=lambda t: (t.complete, t.value), reverse=True)
+        return trajectories
+
+    def _plan_serial(
+        self,
+        tasks: List[_RolloutTask],
+        deadline: float
+    ) -> List[PlannedTrajectory]:
+        """在当前进程内顺序展开，超时后剩余候选按首步得分估计"""
+        trajectories = []
+        for task in tasks:
+            if time.time() >= deadline:
+                trajectories.append(self._fallback(task))
+            else:
+                trajectories.append(run_rollout(task))
+        return trajectories
+
+    def _plan_parallel(
+        self,
+        tasks: List[_RolloutTask],
+        deadline: float
+    ) -> List[PlannedTrajectory]:
+        """在进程池中并行展开，未在预算内返回的候选按首步得分估计"""
+        executor = self._get_executor()
+        futures: List[Future] = [executor.submit(run_rollout, task) for task in tasks]
+        wait(futures, timeout=max(0.0, deadline - time.time()))
+
+        trajectories = []
+        for task, future in zip(tasks, futures):
+            if future.done() and not future.cancelled() and future.exception() is None:
+                trajectories.append(future.result())
+            else:
+                future.cancel()
+                trajectories.append(self._fallback(task))
+        return trajectories
+
+    def _fallback(self, task: _RolloutTask) -> PlannedTrajectory:
+        """未完成展开的候选：只计首步得分（不外推后续步骤，也不计节奏惩罚）"""
+        root = next(e for e in task.events if e.id == task.root_id)
+        context = {
+            "world_state": task.world_state,
+            "current_turn": task.current_turn,
+            "completed_events": task.completed_events,
+            "active_events": []
+        }
+        root_score = self.scorer.score_event(root, context).total_score
+        return PlannedTrajectory(event_ids=[root.id], value=root_score, complete=False)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """懒加载进程池（跨决策复用）"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def shutdown(self):
+        """关闭进程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,57 @@
+"""SQLite 事件池
+
+为 GlobalDirector 提供基于 event_nodes 表的候选事件，
+每次决策只水合可能可用的事件行，而不是把整个事件库加载进内存。
+事件状态变化通过 update_status 写回，使后续查询的前置条件连接保持正确。
+"""
+
+from typing import List, Optional
+
+from ..models.event_node import EventNode, EventArc
+from ..utils.database import Database
+
+
+class SQLiteEventPool:
+    """SQLite 事件池
+
+    候选查询在 SQL 中过滤状态、事件线完成度与前置事件；
+    标志位与资源条件仍由 GlobalDirector 在内存中检查。
+    """
+
+    def __init__(self, db: Database, novel_id: str, candidate_limit: Optional[int] = None):
+        """初始化事件池
+
+        Args:
+            db: 数据库
+            novel_id: 小说ID
+            candidate_limit: 每次最多水合的候选数（可选）
+        """
+        self.db = db
+        self.novel_id = novel_id
+        self.candidate_limit = candidate_limit
+
+    def add_events(self, events: List[EventNode]):
+        """写入事件节点"""
+        for event in events:
+            self.db.save_event_node(self.novel_id, event)
+
+    def add_arc(self, arc: EventArc):
+        """写入事件线及其事件节点"""
+        self.db.save_event_arc(self.novel_id, arc)
+        self.add_events(arc.events)
+
+    def get_candidates(self) -> List[EventNode]:
+        """获取候选事件"""
+        return self.db.get_candidate_events(self.novel_id, limit=self.candidate_limit)
+
+    def get_completed_event_ids(self) -> List[str]:
+        """获取已完成的事件ID"""
+        return self.db.get_completed_event_ids(self.novel_id)
+
+    def update_status(self, event: EventNode):
+        """写回事件状态与尝试次数"""
+        self.db.update_event_status(event.id, event.status.value, event.attempts)
+
+    def update_arc(self, arc: EventArc):
+        """写回事件线进度"""
+        self.db.save_event_arc(self.novel_id, arc)
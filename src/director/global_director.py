@@ -8,7 +8,9 @@
 4. 主调度循环
 """
 
-from typing import List, Dict, Optional, Any, Tuple
+import sqlite3
+from collections import deque
+from typing import List, Dict, Optional, Any, Tuple, Deque, Set
 from dataclasses import dataclass, field
 from enum import Enum
 
@@ -19,6 +21,9 @@ from ..models.clue import ClueRegistry
 from .event_scoring import EventScorer, ScoringMode, EventScore
 from .consistency_auditor import ConsistencyAuditor, AuditReport
 from .clue_economy_manager import ClueEconomyManager
+from .event_planner import EventPlanner
+from .decision_log import DecisionLog
+from .event_pool import SQLiteEventPool
 
 
 class DirectorMode(Enum):
@@ -49,6 +54,19 @@ class DirectorConfig:
     max_parallel_events: int = 3  # 同时活跃的事件上限
     min_event_score: float = 40.0  # 最低事件分数阈值
 
+    # 前瞻规划（默认关闭，使用贪心选择）
+    enable_lookahead: bool = False
+    lookahead_depth: int = 3  # 前瞻步数（含首步）
+    lookahead_beam_width: int = 3  # 每步保留的序列数
+    lookahead_max_roots: int = 5  # 参与规划的首步候选数
+    lookahead_time_budget: float = 0.5  # 单次决策时间预算（秒）
+    lookahead_workers: int = 0  # 进程池大小，<= 1 表示在当前进程内执行
+
+    # 决策日志
+    decision_history_size: int = 100  # 内存中保留的最近决策数
+    decision_log_path: Optional[str] = None  # SQLite 路径，None 表示不持久化
+    session_id: str = "default"  # 同一数据库中区分不同小说/会话
+
 
 @dataclass
 class DirectorDecision:
@@ -59,6 +77,39 @@ class DirectorDecision:
     reasoning: str = ""
     warnings: List[str] = field(default_factory=list)
     suggestions: List[str] = field(default_factory=list)
+    planned_sequence: List[str] = field(default_factory=list)  # 前瞻规划的事件序列
+
+
+def scoring_mode_for(mode: DirectorMode) -> ScoringMode:
+    """将 DirectorMode 转换为 ScoringMode"""
+    mode_map = {
+        DirectorMode.PLAYABILITY_FIRST: ScoringMode.PLAYABILITY,
+        DirectorMode.NARRATIVE_FIRST: ScoringMode.NARRATIVE,
+        DirectorMode.BALANCED: ScoringMode.HYBRID
+    }
+    return mode_map.get(mode, ScoringMode.HYBRID)
+
+
+def create_scorer(config: DirectorConfig) -> EventScorer:
+    """按导演配置创建事件评分器"""
+    return EventScorer(
+        mode=scoring_mode_for(config.mode),
+        genre=config.genre,
+        weights=config.scoring_weights
+    )
+
+
+def create_planner(config: DirectorConfig, scorer: EventScorer) -> EventPlanner:
+    """按导演配置创建前瞻规划器"""
+    return EventPlanner(
+        scorer=scorer,
+        depth=config.lookahead_depth,
+        beam_width=config.lookahead_beam_width,
+        max_roots=config.lookahead_max_roots,
+        time_budget=config.lookahead_time_budget,
+        max_workers=config.lookahead_workers,
+        min_event_score=config.min_event_score
+    )
 
 
 class GlobalDirector:
@@ -72,7 +123,9 @@ class GlobalDirector:
         self,
         config: DirectorConfig,
         setting: Dict[str, Any],
-        registry: Optional[ClueRegistry] = None
+        registry: Optional[ClueRegistry] = None,
+        planner: Optional[EventPlanner] = None,
+        decision_conn: Optional[sqlite3.Connection] = None
     ):
         """初始化全局导演
 
@@ -80,30 +133,46 @@ class GlobalDirector:
             config: 导演配置
             setting: 小说设定
             registry: 线索注册表（可选）
+            planner: 共享的前瞻规划器（可选，由调用方负责关闭）
+            decision_conn: 共享的决策日志连接（可选，由调用方负责关闭）
         """
         self.config = config
         self.setting = setting
         self.current_turn = 0
 
         # 初始化子系统
-        self._init_subsystems(registry)
+        self._init_subsystems(registry, planner)
 
         # 事件历史
         self.completed_events: List[str] = []
+        self._completed_event_ids: Set[str] = set()  # 供前置条件 O(1) 判断
         self.active_events: List[EventNode] = []
 
-        # 决策历史
-        self.decision_history: List[DirectorDecision] = []
+        # 已登记的事件线（complete_event 据此增量更新进度）
+        self.arcs: Dict[str, EventArc] = {}
+
+        # 持久化事件池（可选，事件状态变化会写回）
+        self.event_pool: Optional[SQLiteEventPool] = None
 
-    def _init_subsystems(self, registry: Optional[ClueRegistry]):
+        # 决策历史（内存中只保留最近的完整决策，聚合与持久化见 decision_log）
+        self.decision_history: Deque[DirectorDecision] = deque(
+            maxlen=config.decision_history_size
+        )
+        self.decision_log = DecisionLog(
+            db_path=config.decision_log_path,
+            session_id=config.session_id,
+            tail_size=config.decision_history_size,
+            conn=decision_conn
+        )
+
+    def _init_subsystems(
+        self,
+        registry: Optional[ClueRegistry],
+        planner: Optional[EventPlanner] = None
+    ):
         """初始化子系统"""
         # 1. 事件评分器
-        scoring_mode = self._get_scoring_mode()
-        self.scorer = EventScorer(
-            mode=scoring_mode,
-            genre=self.config.genre,
-            weights=self.config.scoring_weights
-        )
+        self.scorer = create_scorer(self.config)
 
         # 2. 一致性审计器
         self.auditor = ConsistencyAuditor(setting=self.setting)
@@ -111,14 +180,15 @@ class GlobalDirector:
         # 3. 线索经济管理器
         self.clue_manager = ClueEconomyManager(registry=registry)
 
+        # 4. 前瞻规划器（可选，外部传入的共享规划器不由本导演关闭）
+        self._owns_planner = planner is None
+        self.planner: Optional[EventPlanner] = planner
+        if planner is None and self.config.enable_lookahead:
+            self.planner = create_planner(self.config, self.scorer)
+
     def _get_scoring_mode(self) -> ScoringMode:
         """将 DirectorMode 转换为 ScoringMode"""
-        mode_map = {
-            DirectorMode.PLAYABILITY_FIRST: ScoringMode.PLAYABILITY,
-            DirectorMode.NARRATIVE_FIRST: ScoringMode.NARRATIVE,
-            DirectorMode.BALANCED: ScoringMode.HYBRID
-        }
-        return mode_map.get(self.config.mode, ScoringMode.HYBRID)
+        return scoring_mode_for(self.config.mode)
 
     # ========================================================================
     # 主调度循环
@@ -127,7 +197,8 @@ class GlobalDirector:
     def select_next_event(
         self,
         world_state: WorldState,
-        available_events: List[EventNode]
+        available_events: List[EventNode],
+        pool_ranking: Optional[List[Tuple[EventNode, EventScore]]] = None
     ) -> DirectorDecision:
         """选择下一个事件
 
@@ -136,6 +207,8 @@ class GlobalDirector:
         Args:
             world_state: 当前世界状态
             available_events: 可用事件列表
+            pool_ranking: 整个事件池预先评分并降序排列的结果（可选，
+                由 BatchDirector 在多个会话间共享；提供时跳过逐事件评分）
 
         Returns:
             DirectorDecision: 导演决策
@@ -154,15 +227,19 @@ class GlobalDirector:
             return decision
 
         # 2. 评分候选事件
-        scored_events = self._score_candidates(candidates, world_state)
+        scored_events = self._score_candidates(candidates, world_state, pool_ranking)
 
         if not scored_events:
             decision.reasoning = "所有事件评分低于阈值"
             decision.warnings.append(f"所有事件分数低于 {self.config.min_event_score}")
             return decision
 
-        # 3. 选择最高分事件
+        # 3. 选择最高分事件（启用前瞻时按整条序列得分选择）
         best_event, best_score = scored_events[0]
+        if self.planner and len(scored_events) > 1:
+            best_event, best_score = self._plan_best_event(
+                scored_events, world_state, available_events, decision
+            )
         decision.selected_event = best_event
         decision.score = best_score
 
@@ -196,9 +273,42 @@ class GlobalDirector:
 
         # 记录决策
         self.decision_history.append(decision)
+        self.decision_log.record(decision, self.current_turn)
 
         return decision
 
+    def attach_event_pool(self, event_pool: SQLiteEventPool):
+        """挂载 SQLite 事件池，之后事件状态变化会写回数据库
+
+        池中已完成的事件并入已完成集合，使新建的导演（重启、多进程）
+        能接着已推进的事件池继续判断前置条件。
+
+        Args:
+            event_pool: 事件池
+        """
+        self.event_pool = event_pool
+        for event_id in event_pool.get_completed_event_ids():
+            if event_id not in self._completed_event_ids:
+                self.completed_events.append(event_id)
+                self._completed_event_ids.add(event_id)
+
+    def select_next_event_from_pool(self, world_state: WorldState) -> DirectorDecision:
+        """从挂载的事件池中选择下一个事件
+
+        只水合 SQL 预过滤后的候选事件，再走标准选择流程
+
+        Args:
+            world_state: 当前世界状态
+
+        Returns:
+            DirectorDecision: 导演决策
+        """
+        if self.event_pool is None:
+            raise ValueError("未挂载事件池，请先调用 attach_event_pool")
+
+        candidates = self.event_pool.get_candidates()
+        return self.select_next_event(world_state, candidates)
+
     def _filter_available_events(
         self,
         events: List[EventNode],
@@ -221,7 +331,7 @@ class GlobalDirector:
                 continue
 
             # 检查是否满足前置条件
-            if event.is_available(world_state, self.completed_events):
+            if event.is_available(world_state, self._completed_event_ids):
                 candidates.append(event)
 
         return candidates
@@ -229,25 +339,34 @@ class GlobalDirector:
     def _score_candidates(
         self,
         candidates: List[EventNode],
-        world_state: WorldState
+        world_state: WorldState,
+        pool_ranking: Optional[List[Tuple[EventNode, EventScore]]] = None
     ) -> List[Tuple[EventNode, EventScore]]:
         """评分候选事件
 
         Args:
             candidates: 候选事件
             world_state: 当前世界状态
+            pool_ranking: 预先计算的事件池排名（可选）
 
         Returns:
             List[Tuple[EventNode, EventScore]]: 评分后的事件列表，按分数降序排序
         """
-        context = {
-            "world_state": world_state,
-            "current_turn": self.current_turn,
-            "completed_events": self.completed_events,
-            "active_events": self.active_events
-        }
-
-        scored = self.scorer.rank_events(candidates, context)
+        if pool_ranking is not None:
+            # 排名是稳定排序结果，按候选过滤后与单独评分的顺序一致
+            candidate_ids = {id(event) for event in candidates}
+            scored = [
+                (event, score) for event, score in pool_ranking
+                if id(event) in candidate_ids
+            ]
+        else:
+            context = {
+                "world_state": world_state,
+                "current_turn": self.current_turn,
+                "completed_events": self.completed_events,
+                "active_events": self.active_events
+            }
+            scored = self.scorer.rank_events(candidates, context)
 
         # 过滤低于阈值的事件
         scored = [
@@ -257,6 +376,40 @@ class GlobalDirector:
 
         return scored
 
+    def _plan_best_event(
+        self,
+        scored_events: List[Tuple[EventNode, EventScore]],
+        world_state: WorldState,
+        available_events: List[EventNode],
+        decision: DirectorDecision
+    ) -> Tuple[EventNode, EventScore]:
+        """用前瞻规划器在评分后的候选中选择首个事件
+
+        Args:
+            scored_events: 评分后的候选（按分数降序）
+            world_state: 当前世界状态
+            available_events: 完整事件池
+            decision: 当前决策（写入规划序列）
+
+        Returns:
+            Tuple[EventNode, EventScore]: 选中的事件及其单步评分
+        """
+        trajectories = self.planner.plan(
+            roots=[event for event, _ in scored_events],
+            world_state=world_state,
+            events=available_events,
+            completed_events=self.completed_events,
+            current_turn=self.current_turn
+        )
+
+        by_id = {event.id: (event, score) for event, score in scored_events}
+        best = trajectories[0]
+        decision.planned_sequence = best.event_ids
+        if not all(t.complete for t in trajectories):
+            decision.warnings.append("前瞻规划超出时间预算，部分候选按首步得分估计")
+
+        return by_id[best.event_ids[0]]
+
     def _generate_decision_reasoning(
         self,
         selected_event: EventNode,
@@ -309,6 +462,8 @@ class GlobalDirector:
         # 标记为进行中
         event.status = EventStatus.IN_PROGRESS
         self.active_events.append(event)
+        if self.event_pool is not None:
+            self.event_pool.update_status(event)
 
         # 应用事件效果
         if event.effects:
@@ -346,6 +501,7 @@ class GlobalDirector:
         # 添加到已完成列表
         if success:
             self.completed_events.append(event.id)
+            self._completed_event_ids.add(event.id)
 
             # 应用奖励
             if event.rewards:
@@ -361,6 +517,17 @@ class GlobalDirector:
             for clue_id in event.clues:
                 self.clue_manager.discover_clue(clue_id)
 
+        # 更新所属事件线的进度
+        arc = self.arcs.get(event.arc_id)
+        if arc is not None:
+            arc.record_event_result(event)
+
+        # 写回事件池
+        if self.event_pool is not None:
+            self.event_pool.update_status(event)
+            if arc is not None:
+                self.event_pool.update_arc(arc)
+
         # 更新世界状态事件日志
         for log_entry in world_state.events_log:
             if log_entry.get("event_id") == event.id:
@@ -374,6 +541,15 @@ class GlobalDirector:
     # 事件线管理
     # ========================================================================
 
+    def register_arcs(self, arcs: List[EventArc]):
+        """登记事件线，使 complete_event 能增量更新其进度
+
+        Args:
+            arcs: 事件线列表
+        """
+        for arc in arcs:
+            self.arcs[arc.id] = arc
+
     def select_event_from_arcs(
         self,
         arcs: List[EventArc],
@@ -388,6 +564,8 @@ class GlobalDirector:
         Returns:
             DirectorDecision: 导演决策
         """
+        self.register_arcs(arcs)
+
         # 收集所有事件线的下一个事件
         candidates = []
 
@@ -395,7 +573,7 @@ class GlobalDirector:
             if arc.completed:
                 continue
 
-            next_event = arc.get_next_event(world_state, self.completed_events)
+            next_event = arc.get_next_event(world_state, self._completed_event_ids)
             if next_event:
                 candidates.append(next_event)
 
@@ -411,6 +589,7 @@ class GlobalDirector:
         Returns:
             Dict[str, float]: {arc_id: progress}
         """
+        self.register_arcs(arcs)
         return {
             arc.id: arc.get_progress()
             for arc in arcs
@@ -444,7 +623,7 @@ class GlobalDirector:
             "genre": self.config.genre,
             "completed_events": len(self.completed_events),
             "active_events": len(self.active_events),
-            "decisions_made": len(self.decision_history)
+            "decisions_made": self.decision_log.stats.total
         }
 
         # 一致性统计
@@ -471,6 +650,28 @@ class GlobalDirector:
             "recommendations": []
         }
 
+        # 检查决策质量（读取滚动聚合，不回放历史）
+        decision_stats = self.decision_log.stats
+        report["decisions"] = decision_stats.to_dict()
+
+        if decision_stats.scored and decision_stats.score_mean < self.config.min_event_score + 10:
+            report["issues"].append(
+                f"已选事件平均分偏低: {decision_stats.score_mean:.1f}/100"
+            )
+            report["recommendations"].append("考虑生成更高质量的候选事件")
+
+        if decision_stats.total >= 10 and decision_stats.warning_rate > 0.5:
+            report["issues"].append(
+                f"{decision_stats.warning_rate * 100:.0f}% 的决策带有警告"
+            )
+
+        if decision_stats.selected >= 10 and len(decision_stats.arc_selections) > 1:
+            arc_id, count = max(decision_stats.arc_selections.items(), key=lambda item: item[1])
+            if count / decision_stats.selected > 0.8:
+                report["recommendations"].append(
+                    f"事件线 {arc_id} 占 {count / decision_stats.selected * 100:.0f}% 的选择，注意支线节奏"
+                )
+
         # 检查线索经济
         if self.config.enable_clue_economy:
             metrics = self.clue_manager.get_health_metrics()
@@ -516,10 +717,20 @@ class GlobalDirector:
                 "genre": self.config.genre,
             },
             "completed_events": self.completed_events,
-            "decision_count": len(self.decision_history)
+            "decision_count": self.decision_log.stats.total
         }
 
         if self.config.enable_clue_economy:
             state["clue_economy"] = self.clue_manager.export_state()
 
         return state
+
+    # ========================================================================
+    # 资源释放
+    # ========================================================================
+
+    def close(self):
+        """释放规划器进程池与决策日志连接（共享的规划器与连接由创建方释放）"""
+        if self.planner is not None and self._owns_planner:
+            self.planner.shutdown()
+        self.decision_log.close()
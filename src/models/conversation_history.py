@@ -8,11 +8,20 @@ Conversation History Management
 3. 支持分支对话管理
 """
 
-from pydantic import BaseModel, Field
-from typing import List, Optional, Literal, Dict, Any
+import json
+import sqlite3
+import time
+import weakref
+from pathlib import Path
+
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import List, Optional, Literal, Dict, Any, Tuple, Iterator
 from datetime import datetime
+from itertools import islice
 from uuid import uuid4
 
+from ..utils.tokens import message_tokens, tokenizer_version, window_start
+
 
 class Message(BaseModel):
     """单条消息"""
@@ -27,20 +36,51 @@ class Message(BaseModel):
     # 消息类型
     message_type: Optional[Literal["text", "choice", "setting_edit", "chapter", "npc_generated"]] = "text"
 
+    # token 计数缓存: (分词器版本, 计数时的内容, 计数)
+    _token_cache: Optional[Tuple[int, str, int]] = PrivateAttr(default=None)
+
+    def token_count(self) -> int:
+        """消息 token 数（含格式开销），按分词器版本与内容缓存"""
+        version = tokenizer_version()
+        cache = self._token_cache
+        if cache is None or cache[0] != version or cache[1] is not self.content:
+            cache = (version, self.content, message_tokens(self.content))
+            self._token_cache = cache
+        return cache[2]
+
 
 class ConversationBranch(BaseModel):
-    """对话分支（支持多条探索路径）"""
+    """对话分支（支持多条探索路径）
+
+    分支以共享前缀方式存储：父分支指针 + 分叉位置 + 本分支自有消息。
+    完整消息序列 = 父分支完整序列的前 fork_offset 条 + messages。
+    父分支只追加消息，因此已被子分支共享的前缀保持不变。
+    """
     branch_id: str = Field(default_factory=lambda: str(uuid4()))
     branch_name: str = "主分支"
     parent_message_id: Optional[str] = None  # 从哪条消息分支出来
 
-    # 消息列表
+    # 共享前缀：父分支 ID 与继承的消息条数
+    parent_branch_id: Optional[str] = None
+    fork_offset: int = 0
+
+    # 本分支自有消息（不含从父分支继承的前缀）
     messages: List[Message] = Field(default_factory=list)
 
     # 分支元信息
     created_at: datetime = Field(default_factory=datetime.now)
     is_active: bool = True
 
+    # 父分支对象（由 ConversationSession 链接）
+    _parent: Optional["ConversationBranch"] = PrivateAttr(default=None)
+
+    # token 前缀和: _token_prefix[i] 为前 i 条自有消息的 token 总数
+    _token_prefix: List[int] = PrivateAttr(default_factory=lambda: [0])
+    _prefix_version: int = PrivateAttr(default=0)
+
+    # 自有消息索引: message_id -> 在 messages 中的位置
+    _message_index: Dict[str, int] = PrivateAttr(default_factory=dict)
+
     def add_message(
         self,
         role: Literal["user", "assistant", "system"],
@@ -58,25 +98,131 @@ class ConversationBranch(BaseModel):
         self.messages.append(message)
         return message
 
+    # ========================================================================
+    # 消息链
+    # ========================================================================
+
+    def message_count(self) -> int:
+        """完整消息序列长度（含继承前缀）"""
+        base = self.fork_offset if self._parent is not None else 0
+        return base + len(self.messages)
+
+    def iter_messages(self) -> Iterator[Message]:
+        """按时间顺序惰性遍历完整消息序列"""
+        for branch, end in reversed(self._segments()):
+            yield from islice(branch.messages, end)
+
+    def get_messages(self) -> List[Message]:
+        """获取完整消息序列"""
+        return list(self.iter_messages())
+
     def get_recent_messages(self, n: int = 10) -> List[Message]:
-        """获取最近N条消息"""
-        return self.messages[-n:]
+        """获取最近N条消息（跨越共享前缀）"""
+        if n <= 0:
+            return []
 
-    def get_context_window(self, max_tokens: int = 4000) -> List[Message]:
-        """获取上下文窗口（按token估算）"""
-        result = []
-        total_tokens = 0
-
-        # 从后往前遍历
-        for message in reversed(self.messages):
-            # 粗略估算：中文1字≈2token，英文1词≈1.3token
-            estimated_tokens = len(message.content) * 2
-            if total_tokens + estimated_tokens > max_tokens:
+        pieces = []
+        for branch, end in self._segments():
+            start = max(0, end - n)
+            pieces.append(branch.messages[start:end])
+            n -= end - start
+            if n == 0:
                 break
-            result.insert(0, message)
-            total_tokens += estimated_tokens
+        return [message for piece in reversed(pieces) for message in piece]
+
+    def find_message(self, message_id: str) -> Optional[int]:
+        """查找消息在完整序列中的位置
+
+        Returns:
+            Optional[int]: 位置（从 0 开始），不存在时返回 None
+        """
+        offset = self.message_count()
+        for branch, end in self._segments():
+            offset -= end
+            index = branch._sync_message_index().get(message_id)
+            if index is not None and index < end:
+                return offset + index
+        return None
+
+    def _segments(self) -> List[Tuple["ConversationBranch", int]]:
+        """完整序列拆分为各分支的自有消息段
+
+        Returns:
+            List[Tuple[ConversationBranch, int]]: (分支, 使用其前 end 条自有消息)，
+            从本分支到根分支（新 -> 旧）
+        """
+        segments = []
+        branch = self
+        limit = None
+        while branch is not None:
+            parent = branch._parent
+            base = branch.fork_offset if parent is not None else 0
+            end = len(branch.messages)
+            if limit is not None:
+                end = max(0, min(end, limit - base))
+                limit = min(limit, base)
+            else:
+                limit = base
+            segments.append((branch, end))
+            branch = parent
+        return segments
+
+    def _sync_message_index(self) -> Dict[str, int]:
+        """同步自有消息索引（消息只追加时增量补齐）"""
+        index = self._message_index
+        if len(index) > len(self.messages):
+            index = {}
+            self._message_index = index
+        for position in range(len(index), len(self.messages)):
+            index[self.messages[position].message_id] = position
+        return index
+
+    # ========================================================================
+    # 上下文窗口
+    # ========================================================================
 
-        return result
+    def get_context_window(self, max_tokens: int = 4000) -> List[Message]:
+        """获取上下文窗口（预算内最近的消息）
+
+        沿共享前缀链从新到旧逐段消耗预算，在放不下的那一段的
+        token 前缀和上二分查找窗口起点，
+        返回满足总 token 数 <= max_tokens 的最长消息后缀。
+        """
+        pieces = []
+        budget = max_tokens
+        for branch, end in self._segments():
+            prefix = branch._sync_token_prefix()
+            if prefix[end] <= budget:
+                pieces.append(branch.messages[:end])
+                budget -= prefix[end]
+                continue
+            start = window_start(prefix, budget, end)
+            pieces.append(branch.messages[start:end])
+            break
+        return [message for piece in reversed(pieces) for message in piece]
+
+    def count_tokens(self) -> int:
+        """完整消息序列的 token 总数"""
+        return sum(
+            branch._sync_token_prefix()[end]
+            for branch, end in self._segments()
+        )
+
+    def _sync_token_prefix(self) -> List[int]:
+        """同步自有消息的 token 前缀和
+
+        消息只追加时增量补齐；消息被截断或分词器更换时整体重建。
+        """
+        prefix = self._token_prefix
+        version = tokenizer_version()
+        if version != self._prefix_version or len(prefix) - 1 > len(self.messages):
+            prefix = [0]
+            self._token_prefix = prefix
+            self._prefix_version = version
+
+        for message in self.messages[len(prefix) - 1:]:
+            prefix.append(prefix[-1] + message.token_count())
+        return prefix
 
 
 class ConversationSession(BaseModel):
@@ -103,6 +249,12 @@ class ConversationSession(BaseModel):
             data["active_branch_id"] = main_branch.branch_id
         super().__init__(**data)
 
+    def model_post_init(self, __context: Any):
+        """链接各分支的父分支对象（从持久化数据恢复时同样适用）"""
+        for branch in self.branches.values():
+            if branch.parent_branch_id:
+                branch._parent = self.branches.get(branch.parent_branch_id)
+
     def get_active_branch(self) -> ConversationBranch:
         """获取当前活跃分支"""
         return self.branches[self.active_branch_id]
@@ -125,19 +277,27 @@ class ConversationSession(BaseModel):
         branch_name: str,
         from_message_id: Optional[str] = None
     ) -> ConversationBranch:
-        """创建新分支"""
+        """创建新分支
+
+        指定父消息时，新分支共享当前活跃分支截至该消息（含）的前缀，
+        不复制消息；父消息不存在时共享活跃分支的全部消息。
+        """
         new_branch = ConversationBranch(
             branch_name=branch_name,
             parent_message_id=from_message_id
         )
 
-        # 如果指定了父消息，复制父消息之前的所有消息
         if from_message_id:
             active_branch = self.get_active_branch()
-            for msg in active_branch.messages:
-                new_branch.messages.append(msg.model_copy(deep=True))
-                if msg.message_id == from_message_id:
-                    break
+            position = active_branch.find_message(from_message_id)
+            if position is None:
+                fork_offset = active_branch.message_count()
+            else:
+                fork_offset = position + 1
+
+            new_branch.parent_branch_id = active_branch.branch_id
+            new_branch.fork_offset = fork_offset
+            new_branch._parent = active_branch
 
         self.branches[new_branch.branch_id] = new_branch
         return new_branch
@@ -154,7 +314,7 @@ class ConversationSession(BaseModel):
             {
                 "branch_id": branch.branch_id,
                 "branch_name": branch.branch_name,
-                "message_count": len(branch.messages),
+                "message_count": branch.message_count(),
                 "created_at": branch.created_at,
                 "is_active": branch.branch_id == self.active_branch_id
             }
@@ -175,15 +335,15 @@ class ConversationSession(BaseModel):
         if not branch:
             return []
 
-        messages = branch.messages
         if limit:
-            messages = messages[-limit:]
+            return branch.get_recent_messages(limit)
 
-        return messages
+        return branch.get_messages()
 
     def export_to_markdown(self, branch_id: Optional[str] = None) -> str:
         """导出对话历史为Markdown格式"""
-        messages = self.get_conversation_history(branch_id)
+        branch = self.branches.get(branch_id) if branch_id else self.get_active_branch()
+        messages = branch.iter_messages() if branch else []
 
         lines = [
             f"# 对话历史 - {self.novel_id}",
@@ -219,27 +379,469 @@ class ConversationSession(BaseModel):
         return "\n".join(lines)
 
 
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversation_sessions (
+    session_id TEXT PRIMARY KEY,
+    novel_id TEXT NOT NULL,
+    active_branch_id TEXT NOT NULL,
+    summary TEXT DEFAULT '',
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_conversation_sessions_novel
+    ON conversation_sessions(novel_id, updated_at);
+
+CREATE TABLE IF NOT EXISTS conversation_branches (
+    branch_id TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    branch_name TEXT NOT NULL,
+    parent_message_id TEXT,
+    parent_branch_id TEXT,
+    fork_offset INTEGER DEFAULT 0,
+    created_at TEXT NOT NULL,
+    is_active INTEGER DEFAULT 1
+);
+
+CREATE INDEX IF NOT EXISTS idx_conversation_branches_session
+    ON conversation_branches(session_id);
+
+CREATE TABLE IF NOT EXISTS conversation_messages (
+    message_id TEXT PRIMARY KEY,
+    branch_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    message_type TEXT,
+    metadata TEXT,
+    timestamp TEXT NOT NULL
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_conversation_messages_branch
+    ON conversation_messages(branch_id, seq);
+"""
+
+
 class ConversationManager(BaseModel):
-    """会话管理器（管理多个小说的会话）"""
+    """会话管理器（管理多个小说的会话）
+
+    db_path 为 None 时所有会话常驻内存。
+    指定 db_path 时会话头、分支与消息写入 SQLite：
+    sessions 只作为最近使用会话的缓存（LRU，上限 max_cached_sessions），
+    未缓存的会话在访问时按需加载，空闲会话落盘后被驱逐。
+    被驱逐但仍被调用方持有的会话以弱引用记录：再次访问时重新纳入缓存（不另建副本），
+    flush() / close() 时同样落盘，因此直接修改已返回的会话对象不会丢失。
+    """
     sessions: Dict[str, ConversationSession] = Field(default_factory=dict)
 
+    # 持久化配置
+    db_path: Optional[str] = None
+    max_cached_sessions: int = 128
+    # 空闲超过该秒数的会话在下一次访问任意会话时落盘并驱逐（None 表示只按容量驱逐）
+    max_idle_seconds: Optional[float] = 1800.0
+
+    _conn: Optional[sqlite3.Connection] = PrivateAttr(default=None)
+    _last_access: Dict[str, float] = PrivateAttr(default_factory=dict)
+    # 各分支已写入数据库的自有消息数
+    _persisted: Dict[str, int] = PrivateAttr(default_factory=dict)
+    # 各会话落盘时的 updated_at
+    _saved_at: Dict[str, datetime] = PrivateAttr(default_factory=dict)
+    # 已驱逐但仍被外部引用的会话
+    _detached: "weakref.WeakValueDictionary[str, ConversationSession]" = PrivateAttr(
+        default_factory=weakref.WeakValueDictionary
+    )
+
+    def model_post_init(self, __context: Any):
+        """打开数据库并建表"""
+        if self.db_path:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    # ========================================================================
+    # 会话访问
+    # ========================================================================
+
     def create_session(self, novel_id: str) -> ConversationSession:
         """为小说创建新会话"""
         session = ConversationSession(novel_id=novel_id)
-        self.sessions[session.session_id] = session
+        self._cache(session)
+        if self._conn is not None:
+            self.save_session(session)
         return session
 
     def get_session(self, session_id: str) -> Optional[ConversationSession]:
-        """获取会话"""
-        return self.sessions.get(session_id)
+        """获取会话（未缓存时从数据库加载）"""
+        session = self.sessions.get(session_id)
+        if session is None and self._conn is not None:
+            session = self._detached.pop(session_id, None)
+            if session is not None:
+                self._sync_saved(session)
+            else:
+                session = self._load_session(session_id)
+        if session is not None:
+            self._cache(session)
+        return session
 
-    def get_sessions_by_novel(self, novel_id: str) -> List[ConversationSession]:
-        """获取某个小说的所有会话"""
+    def add_message(
+        self,
+        session_id: str,
+        role: Literal["user", "assistant", "system"],
+        content: str,
+        message_type: Optional[str] = "text",
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Optional[Message]:
+        """向会话的活跃分支添加消息并持久化"""
+        session = self.get_session(session_id)
+        if session is None:
+            return None
+        message = session.add_message(role, content, message_type, metadata)
+        if self._conn is not None:
+            self.save_session(session)
+        return message
+
+    def list_sessions(self, novel_id: str) -> List[Dict[str, Any]]:
+        """列出某个小说的会话头（不加载消息）
+
+        Returns:
+            List[Dict]: 按更新时间倒序的会话头
+        """
+        if self._conn is None:
+            headers = [
+                {
+                    "session_id": session.session_id,
+                    "novel_id": session.novel_id,
+                    "active_branch_id": session.active_branch_id,
+                    "summary": session.summary,
+                    "created_at": session.created_at,
+                    "updated_at": session.updated_at,
+                }
+                for session in self.sessions.values()
+                if session.novel_id == novel_id
+            ]
+            headers.sort(key=lambda h: h["updated_at"], reverse=True)
+            return headers
+
+        # 缓存中的会话可能有未落盘的更新
+        self.flush()
+        rows = self._conn.execute(
+            """
+            SELECT * FROM conversation_sessions
+            WHERE novel_id = ?
+            ORDER BY updated_at DESC
+            """,
+            (novel_id,)
+        ).fetchall()
         return [
-            session for session in self.sessions.values()
-            if session.novel_id == novel_id
+            {
+                "session_id": row["session_id"],
+                "novel_id": row["novel_id"],
+                "active_branch_id": row["active_branch_id"],
+                "summary": row["summary"],
+                "created_at": datetime.fromisoformat(row["created_at"]),
+                "updated_at": datetime.fromisoformat(row["updated_at"]),
+            }
+            for row in rows
         ]
 
+    def get_sessions_by_novel(self, novel_id: str) -> List[ConversationSession]:
+        """获取某个小说的所有会话
+
+        会话数超过缓存上限时，返回的部分会话会被随即驱逐；
+        它们仍受管理器追踪，之后的修改在再次访问或 flush() 时落盘。
+        """
+        if self._conn is None:
+            return [
+                session for session in self.sessions.values()
+                if session.novel_id == novel_id
+            ]
+
+        sessions = []
+        for header in self.list_sessions(novel_id):
+            session = self.get_session(header["session_id"])
+            if session is not None:
+                sessions.append(session)
+        return sessions
+
     def delete_session(self, session_id: str):
         """删除会话"""
-        self.sessions.pop(session_id, None)
+        session = self.sessions.pop(session_id, None)
+        self._last_access.pop(session_id, None)
+        self._saved_at.pop(session_id, None)
+        detached = self._detached.pop(session_id, None)
+        if session is None:
+            session = detached
+
+        if self._conn is None:
+            return
+
+        branch_ids = [
+            row["branch_id"] for row in self._conn.execute(
+                "SELECT branch_id FROM conversation_branches WHERE session_id = ?",
+                (session_id,)
+            )
+        ]
+        if session is not None:
+            branch_ids.extend(session.branches)
+        for branch_id in set(branch_ids):
+            self._persisted.pop(branch_id, None)
+            self._conn.execute(
+                "DELETE FROM conversation_messages WHERE branch_id = ?", (branch_id,)
+            )
+        self._conn.execute(
+            "DELETE FROM conversation_branches WHERE session_id = ?", (session_id,)
+        )
+        self._conn.execute(
+            "DELETE FROM conversation_sessions WHERE session_id = ?", (session_id,)
+        )
+        self._conn.commit()
+
+    # ========================================================================
+    # 缓存与驱逐
+    # ========================================================================
+
+    def _cache(self, session: ConversationSession):
+        """放入缓存并标记为最近使用，超出上限时驱逐最久未用的会话"""
+        self.sessions.pop(session.session_id, None)
+        self.sessions[session.session_id] = session
+        self._last_access[session.session_id] = time.monotonic()
+
+        if self._conn is None:
+            return
+        while len(self.sessions) > self.max_cached_sessions:
+            oldest_id = next(iter(self.sessions))
+            self.evict(oldest_id)
+        if self.max_idle_seconds is not None:
+            self._evict_accessed_before(
+                time.monotonic() - self.max_idle_seconds, keep=session.session_id
+            )
+
+    def evict(self, session_id: str):
+        """落盘并从缓存中移除会话"""
+        session = self.sessions.get(session_id)
+        if session is None or self._conn is None:
+            return
+        if self.is_dirty(session):
+            self.save_session(session)
+        del self.sessions[session_id]
+        self._forget(session)
+        self._detached[session_id] = session
+
+    def _forget(self, session: ConversationSession):
+        """清除会话的访问时间与落盘记录"""
+        self._last_access.pop(session.session_id, None)
+        self._saved_at.pop(session.session_id, None)
+        for branch_id in session.branches:
+            self._persisted.pop(branch_id, None)
+
+    def evict_idle(self, max_idle_seconds: Optional[float] = None) -> int:
+        """驱逐空闲超过 max_idle_seconds（默认取配置的 max_idle_seconds）的会话
+
+        Returns:
+            int: 被驱逐的会话数
+        """
+        if max_idle_seconds is None:
+            max_idle_seconds = self.max_idle_seconds
+        if self._conn is None or max_idle_seconds is None:
+            return 0
+        return self._evict_accessed_before(time.monotonic() - max_idle_seconds)
+
+    def _evict_accessed_before(self, deadline: float, keep: Optional[str] = None) -> int:
+        """驱逐最后访问早于 deadline 的会话
+
+        sessions 按访问顺序排列（最久未用的在前），遇到第一个未过期的会话即停止。
+        """
+        evicted = 0
+        while self.sessions:
+            session_id = next(iter(self.sessions))
+            if session_id == keep or self._last_access.get(session_id, deadline) >= deadline:
+                break
+            self.evict(session_id)
+            evicted += 1
+        return evicted
+
+    # ========================================================================
+    # 持久化
+    # ========================================================================
+
+    def save_session(self, session: ConversationSession):
+        """写入会话头、分支元信息与新增消息（消息只追加写入）"""
+        if self._conn is None:
+            return
+
+        conn = self._conn
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO conversation_sessions (
+                session_id, novel_id, active_branch_id, summary, created_at, updated_at
+            ) VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                session.session_id, session.novel_id, session.active_branch_id,
+                session.summary, session.created_at.isoformat(),
+                session.updated_at.isoformat()
+            )
+        )
+
+        for branch in session.branches.values():
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO conversation_branches (
+                    branch_id, session_id, branch_name, parent_message_id,
+                    parent_branch_id, fork_offset, created_at, is_active
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    branch.branch_id, session.session_id, branch.branch_name,
+                    branch.parent_message_id, branch.parent_branch_id,
+                    branch.fork_offset, branch.created_at.isoformat(),
+                    int(branch.is_active)
+                )
+            )
+
+            persisted = self._persisted.get(branch.branch_id, 0)
+            if persisted > len(branch.messages):
+                # 自有消息被截断：整体重写
+                conn.execute(
+                    "DELETE FROM conversation_messages WHERE branch_id = ?",
+                    (branch.branch_id,)
+                )
+                persisted = 0
+
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO conversation_messages (
+                    message_id, branch_id, seq, role, content,
+                    message_type, metadata, timestamp
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        message.message_id, branch.branch_id, seq, message.role,
+                        message.content, message.message_type,
+                        json.dumps(message.metadata, ensure_ascii=False, default=str),
+                        message.timestamp.isoformat()
+                    )
+                    for seq, message in enumerate(
+                        branch.messages[persisted:], start=persisted
+                    )
+                ]
+            )
+            self._persisted[branch.branch_id] = len(branch.messages)
+
+        conn.commit()
+        self._saved_at[session.session_id] = session.updated_at
+
+    def is_dirty(self, session: ConversationSession) -> bool:
+        """会话自上次落盘后是否有变化（会话头更新、新分支或新消息）"""
+        if self._saved_at.get(session.session_id) != session.updated_at:
+            return True
+        return any(
+            self._persisted.get(branch.branch_id) != len(branch.messages)
+            for branch in session.branches.values()
+        )
+
+    def flush(self):
+        """将缓存中以及已驱逐但仍被引用的会话中有变化的落盘"""
+        for session in self.sessions.values():
+            if self.is_dirty(session):
+                self.save_session(session)
+
+        if self._conn is None:
+            return
+        for session in list(self._detached.values()):
+            self._sync_saved(session)
+            if self.is_dirty(session):
+                self.save_session(session)
+            self._forget(session)
+
+    def _sync_saved(self, session: ConversationSession):
+        """按数据库中的记录恢复已驱逐会话的落盘状态（供 is_dirty 判断）"""
+        header = self._conn.execute(
+            "SELECT updated_at FROM conversation_sessions WHERE session_id = ?",
+            (session.session_id,)
+        ).fetchone()
+        if header is not None:
+            self._saved_at[session.session_id] = datetime.fromisoformat(header["updated_at"])
+
+        counts = {
+            row["branch_id"]: row["count"]
+            for row in self._conn.execute(
+                """
+                SELECT m.branch_id AS branch_id, COUNT(*) AS count
+                FROM conversation_messages m
+                JOIN conversation_branches b ON b.branch_id = m.branch_id
+                WHERE b.session_id = ?
+                GROUP BY m.branch_id
+                """,
+                (session.session_id,)
+            )
+        }
+        for branch_id in session.branches:
+            self._persisted[branch_id] = counts.get(branch_id, 0)
+
+    def _load_session(self, session_id: str) -> Optional[ConversationSession]:
+        """从数据库加载完整会话"""
+        conn = self._conn
+        header = conn.execute(
+            "SELECT * FROM conversation_sessions WHERE session_id = ?",
+            (session_id,)
+        ).fetchone()
+        if header is None:
+            return None
+
+        branches = {}
+        for row in conn.execute(
+            "SELECT * FROM conversation_branches WHERE session_id = ?",
+            (session_id,)
+        ).fetchall():
+            messages = [
+                Message(
+                    message_id=m["message_id"],
+                    role=m["role"],
+                    content=m["content"],
+                    message_type=m["message_type"],
+                    metadata=json.loads(m["metadata"]) if m["metadata"] else {},
+                    timestamp=datetime.fromisoformat(m["timestamp"])
+                )
+                for m in conn.execute(
+                    """
+                    SELECT * FROM conversation_messages
+                    WHERE branch_id = ?
+                    ORDER BY seq
+                    """,
+                    (row["branch_id"],)
+                )
+            ]
+            branches[row["branch_id"]] = ConversationBranch(
+                branch_id=row["branch_id"],
+                branch_name=row["branch_name"],
+                parent_message_id=row["parent_message_id"],
+                parent_branch_id=row["parent_branch_id"],
+                fork_offset=row["fork_offset"],
+                messages=messages,
+                created_at=datetime.fromisoformat(row["created_at"]),
+                is_active=bool(row["is_active"])
+            )
+            self._persisted[row["branch_id"]] = len(messages)
+
+        session = ConversationSession(
+            session_id=header["session_id"],
+            novel_id=header["novel_id"],
+            branches=branches,
+            active_branch_id=header["active_branch_id"],
+            summary=header["summary"] or "",
+            created_at=datetime.fromisoformat(header["created_at"]),
+            updated_at=datetime.fromisoformat(header["updated_at"])
+        )
+        self._saved_at[session_id] = session.updated_at
+        return session
+
+    def close(self):
+        """落盘并关闭数据库连接"""
+        if self._conn is not None:
+            self.flush()
+            self._conn.close()
+            self._conn = None
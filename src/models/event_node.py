@@ -1,7 +1,7 @@
 """事件节点与事件线数据模型"""
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Set, Collection
 from enum import Enum
 
 
@@ -70,7 +70,7 @@ class EventNode:
     description: str = ""
     tags: List[str] = field(default_factory=list)
 
-    def is_available(self, world_state, completed_events: List[str]) -> bool:
+    def is_available(self, world_state, completed_events: Collection[str]) -> bool:
         """检查事件是否可用"""
         # 检查前置事件
         for prereq in self.prerequisites:
@@ -94,7 +94,13 @@ class EventNode:
 
 @dataclass
 class EventArc:
-    """事件线（一条故事线）"""
+    """事件线（一条故事线）
+
+    current_event_idx 指向第一个仍为 PENDING 的事件，完成计数随
+    record_event_result 增量更新，使下一事件查询与进度查询为 O(1)。
+    事件状态应通过 GlobalDirector.complete_event（或 record_event_result）推进；
+    直接改写 events 中的状态后需调用 reindex()。
+    """
     id: str
     title: str
     description: str
@@ -113,9 +119,72 @@ class EventArc:
     # 预计章节
     estimated_chapters: str = ""
 
-    def get_next_event(self, world_state, completed_events: List[str]) -> Optional[EventNode]:
-        """获取下一个可用事件"""
-        for event in self.events:
+    def __post_init__(self):
+        self.reindex()
+
+    def reindex(self):
+        """从事件状态全量重建计数与游标"""
+        self._event_positions: Dict[str, int] = {}
+        self._completed_ids: Set[str] = set()
+        self._indexed_count = 0
+        self.current_event_idx = 0
+        self._sync_events()
+        self._advance_cursor()
+
+    def _sync_events(self):
+        """索引追加到 events 末尾的新事件（列表缩短时全量重建）"""
+        if len(self.events) < self._indexed_count:
+            self.reindex()
+            return
+
+        for idx in range(self._indexed_count, len(self.events)):
+            event = self.events[idx]
+            self._event_positions[event.id] = idx
+            if event.status == EventStatus.COMPLETED:
+                self._completed_ids.add(event.id)
+        self._indexed_count = len(self.events)
+
+    def _advance_cursor(self):
+        """将游标移过已不再待执行的事件"""
+        while (
+            self.current_event_idx < len(self.events)
+            and self.events[self.current_event_idx].status != EventStatus.PENDING
+        ):
+            self.current_event_idx += 1
+
+    @property
+    def completed_count(self) -> int:
+        """已完成的事件数"""
+        self._sync_events()
+        return len(self._completed_ids)
+
+    def record_event_result(self, event: EventNode):
+        """在事件状态变化后更新计数与游标
+
+        Args:
+            event: 状态已更新的事件
+        """
+        self._sync_events()
+        if event.id not in self._event_positions:
+            return
+
+        if event.status == EventStatus.COMPLETED:
+            self._completed_ids.add(event.id)
+        else:
+            self._completed_ids.discard(event.id)
+
+        self._advance_cursor()
+        self.completed = bool(self.events) and len(self._completed_ids) == len(self.events)
+
+    def get_next_event(self, world_state, completed_events: Collection[str]) -> Optional[EventNode]:
+        """获取下一个可用事件
+
+        从游标处开始查找；线性事件线中游标处的事件即为答案
+        """
+        self._sync_events()
+        self._advance_cursor()
+        for idx in range(self.current_event_idx, len(self.events)):
+            event = self.events[idx]
             if event.status == EventStatus.PENDING and event.is_available(world_state, completed_events):
                 return event
         return None
@@ -124,5 +193,4 @@ class EventArc:
         """获取事件线进度(0.0-1.0)"""
         if not self.events:
             return 0.0
-        completed = sum(1 for e in self.events if e.status == EventStatus.COMPLETED)
-        return completed / len(self.events)
+        return self.completed_count / len(self.events)
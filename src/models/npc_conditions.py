@@ -0,0 +1,216 @@
+"""
+NPC生成条件
+NPC Spawn Conditions
+
+NPCSeed.spawn_conditions 的小型条件语言，每条条件编译一次为谓词，
+并记录它读取的世界状态键，供 NPCPool 按键订阅、只重算输入变化的种子。
+
+语法（列表中的多条条件为“且”关系）:
+- 比较:   player.location == 城门 / turn >= 10 / flags.alarm != "off"
+- 包含:   player.inventory contains 钥匙 / weather in [雨, 雪]
+- 真值:   flags.met_mentor / 主角到达XX地点
+- 取反:   !flags.alarm / not flags.alarm
+- 或:     flags.a || flags.b
+
+键为点分路径，逐级按字典键或属性查找；顶层不存在的键再到 flags 中查找，
+因此自然语言条件（如 "主角到达XX地点"）可直接作为标志位使用。
+字面量支持带引号字符串、数字、true/false/null、[a, b] 列表，其余按字符串处理。
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, FrozenSet, Iterable, List, Mapping
+
+Predicate = Callable[[Any], bool]
+
+_MISSING = object()
+
+_COMPARISON = re.compile(
+    r"^\s*(?P<path>[^\W\d]\w*(?:\.\w+)*)\s*"
+    r"(?P<op>==|!=|>=|<=|>|<|\bcontains\b|\bin\b)\s*"
+    r"(?P<value>.+?)\s*$"
+)
+_TRUTH = re.compile(r"^\s*(?P<neg>!|not\s+)?\s*(?P<path>[^\W\d]\w*(?:\.\w+)*)\s*$")
+
+
+@dataclass(frozen=True)
+class CompiledCondition:
+    """编译后的条件"""
+    source: str
+    predicate: Predicate
+    keys: FrozenSet[str]  # 读取的世界状态键（点分路径）
+
+    def evaluate(self, world_state: Any) -> bool:
+        """在世界状态上求值（比较失败视为不满足）"""
+        try:
+            return bool(self.predicate(world_state))
+        except TypeError:
+            return False
+
+
+# ============================================================================
+# 键查找
+# ============================================================================
+
+def _lookup(obj: Any, segment: str) -> Any:
+    """按字典键或属性取下一级"""
+    if isinstance(obj, Mapping):
+        return obj.get(segment, _MISSING)
+    return getattr(obj, segment, _MISSING)
+
+
+def resolve_key(world_state: Any, path: str) -> Any:
+    """解析点分路径，不存在时返回 None"""
+    segments = path.split(".")
+    value = _lookup(world_state, segments[0])
+    if value is _MISSING:
+        flags = _lookup(world_state, "flags")
+        value = _MISSING if flags is _MISSING else _lookup(flags, segments[0])
+
+    for segment in segments[1:]:
+        if value is _MISSING or value is None:
+            break
+        value = _lookup(value, segment)
+
+    return None if value is _MISSING else value
+
+
+def key_root(path: str) -> str:
+    """路径的顶层键"""
+    return path.split(".", 1)[0]
+
+
+def subscription_roots(path: str) -> FrozenSet[str]:
+    """路径值可能随之变化的顶层键
+
+    顶层不存在的键会回退到 flags 中查找，因此 flags 之外的路径同时订阅 flags。
+    """
+    root = key_root(path)
+    return frozenset({root}) if root == "flags" else frozenset({root, "flags"})
+
+
+# ============================================================================
+# 编译
+# ============================================================================
+
+def _parse_literal(text: str) -> Any:
+    """解析字面量"""
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        return text[1:-1]
+    if text.startswith("[") and text.endswith("]"):
+        inner = text[1:-1].strip()
+        return [_parse_literal(item) for item in inner.split(",")] if inner else []
+
+    lowered = text.lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    if lowered in ("null", "none"):
+        return None
+
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def _compile_clause(text: str) -> CompiledCondition:
+    """编译单个子句（比较 / 真值 / 取反）"""
+    match = _COMPARISON.match(text)
+    if match:
+        path, op, value = match.group("path"), match.group("op"), _parse_literal(match.group("value"))
+
+        if op == "==":
+            predicate = lambda ws: resolve_key(ws, path) == value
+        elif op == "!=":
+            predicate = lambda ws: resolve_key(ws, path) != value
+        elif op == ">=":
+            predicate = lambda ws: resolve_key(ws, path) >= value
+        elif op == "<=":
+            predicate = lambda ws: resolve_key(ws, path) <= value
+        elif op == ">":
+            predicate = lambda ws: resolve_key(ws, path) > value
+        elif op == "<":
+            predicate = lambda ws: resolve_key(ws, path) < value
+        elif op == "contains":
+            predicate = lambda ws: value in (resolve_key(ws, path) or ())
+        else:  # in
+            options = value if isinstance(value, list) else [value]
+            predicate = lambda ws: resolve_key(ws, path) in options
+
+        return CompiledCondition(text, predicate, frozenset({path}))
+
+    match = _TRUTH.match(text)
+    if match:
+        path = match.group("path")
+        if match.group("neg"):
+            predicate = lambda ws: not resolve_key(ws, path)
+        else:
+            predicate = lambda ws: bool(resolve_key(ws, path))
+        return CompiledCondition(text, predicate, frozenset({path}))
+
+    # 无法解析：整条文本作为标志位
+    key = text.strip()
+    return CompiledCondition(
+        text,
+        lambda ws: bool(resolve_key(ws, key)),
+        frozenset({key})
+    )
+
+
+def _split_or(text: str) -> List[str]:
+    """按 || 拆分子句（引号内的 || 属于字面量，不拆分）"""
+    parts = []
+    start = 0
+    quote = None
+    index = 0
+    while index < len(text):
+        char = text[index]
+        if quote is not None:
+            if char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif text.startswith("||", index):
+            parts.append(text[start:index])
+            start = index + 2
+            index += 1
+        index += 1
+    parts.append(text[start:])
+    return parts
+
+
+@lru_cache(maxsize=1024)
+def compile_condition(text: str) -> CompiledCondition:
+    """编译一条条件（结果按文本缓存）"""
+    clauses = [_compile_clause(part) for part in _split_or(text)]
+    if len(clauses) == 1:
+        return CompiledCondition(text, clauses[0].predicate, clauses[0].keys)
+
+    # 每个子句单独求值：某个子句比较失败只视为该子句不满足
+    return CompiledCondition(
+        text,
+        lambda ws: any(clause.evaluate(ws) for clause in clauses),
+        frozenset().union(*(clause.keys for clause in clauses))
+    )
+
+
+def compile_conditions(conditions: Iterable[str]) -> CompiledCondition:
+    """编译条件列表（全部满足才成立，空列表恒成立）"""
+    compiled: List[CompiledCondition] = [compile_condition(c) for c in conditions]
+    if len(compiled) == 1:
+        return compiled[0]
+
+    def predicate(world_state: Any) -> bool:
+        return all(condition.evaluate(world_state) for condition in compiled)
+
+    return CompiledCondition(
+        " && ".join(c.source for c in compiled),
+        predicate,
+        frozenset().union(*(c.keys for c in compiled))
+    )
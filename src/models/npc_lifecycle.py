@@ -10,10 +10,24 @@ NPC Lifecycle Management
 - 根据剧情进度动态创建和更新NPC
 """
 
-from pydantic import BaseModel, Field
-from typing import Dict, List, Optional, Literal, Any
+from pydantic import BaseModel, Field, PrivateAttr, computed_field
+from typing import Dict, List, Optional, Literal, Any, Set, Iterable, AsyncIterator, Tuple
+from collections import OrderedDict
 from datetime import datetime
 from uuid import uuid4
+import asyncio
+import copy
+import hashlib
+import json
+
+from .npc_conditions import (
+    CompiledCondition, compile_conditions, resolve_key, key_root, subscription_roots
+)
+
+
+# 变化时需要同步 NPCPool 索引的字段
+_INDEXED_SEED_FIELDS = frozenset({"status", "spawn_conditions"})
+_INDEXED_NPC_FIELDS = frozenset({"current_location", "faction", "lifecycle_stage"})
 
 
 class NPCSeed(BaseModel):
@@ -24,8 +38,8 @@ class NPCSeed(BaseModel):
     archetype: str  # 原型：mentor/companion/opponent/neutral/merchant/quest_giver
     role_in_story: str  # 在故事中的角色：例如"神秘导师"、"竞争对手"
 
-    # 触发条件（什么情况下需要实例化）
-    spawn_conditions: List[str] = Field(default_factory=list)  # 例如 ["主角到达XX地点", "完成XX任务"]
+    # 触发条件（什么情况下需要实例化，语法见 npc_conditions）
+    spawn_conditions: List[str] = Field(default_factory=list)  # 例如 ["player.location == 城门", "flags.完成XX任务"]
 
     # 生成约束
     generation_constraints: Dict[str, Any] = Field(default_factory=dict)
@@ -41,6 +55,17 @@ class NPCSeed(BaseModel):
     status: Literal["dormant", "ready", "instantiated"] = "dormant"
     instantiated_npc_id: Optional[str] = None
 
+    # 所属NPC池（状态变化时通知池更新计数）
+    _pool: Optional["NPCPool"] = PrivateAttr(default=None)
+
+    def __setattr__(self, name: str, value: Any):
+        if name in _INDEXED_SEED_FIELDS and self._pool is not None:
+            old = getattr(self, name)
+            super().__setattr__(name, value)
+            self._pool._on_seed_changed(self, name, old, value)
+        else:
+            super().__setattr__(name, value)
+
 
 class NPCInstance(BaseModel):
     """NPC实例（已实例化的NPC）"""
@@ -91,6 +116,17 @@ class NPCInstance(BaseModel):
     retired_at: Optional[datetime] = None
     retirement_reason: Optional[str] = None
 
+    # 所属NPC池（位置、势力、生命周期变化时通知池更新索引）
+    _pool: Optional["NPCPool"] = PrivateAttr(default=None)
+
+    def __setattr__(self, name: str, value: Any):
+        if name in _INDEXED_NPC_FIELDS and self._pool is not None:
+            old = getattr(self, name)
+            super().__setattr__(name, value)
+            self._pool._on_npc_changed(self, name, old, value)
+        else:
+            super().__setattr__(name, value)
+
     def engage(self, interaction_summary: str):
         """与主角互动"""
         self.interaction_count += 1
@@ -126,7 +162,13 @@ class NPCInstance(BaseModel):
 
 
 class NPCPool(BaseModel):
-    """NPC池（管理所有NPC种子和实例）"""
+    """NPC池（管理所有NPC种子和实例）
+
+    维护活跃NPC集合、按地点/势力的索引与种子状态计数。
+    种子与实例持有池的引用，修改 status / current_location / faction /
+    lifecycle_stage 时自动更新索引；直接向 seeds / instances 增删条目时，
+    在下一次查询前按数量变化重建索引。
+    """
 
     # 种子池
     seeds: Dict[str, NPCSeed] = Field(default_factory=dict)
@@ -134,8 +176,163 @@ class NPCPool(BaseModel):
     # 实例池
     instances: Dict[str, NPCInstance] = Field(default_factory=dict)
 
-    # 活跃NPC（未退出的）
-    active_npc_ids: List[str] = Field(default_factory=list)
+    # 活跃NPC（未退出的），以字典保持加入顺序: npc_id -> None
+    _active: Dict[str, None] = PrivateAttr(default_factory=dict)
+
+    # 活跃NPC索引: 地点/势力 -> {npc_id: NPCInstance}（保持加入顺序）
+    _by_location: Dict[str, Dict[str, NPCInstance]] = PrivateAttr(default_factory=dict)
+    _by_faction: Dict[str, Dict[str, NPCInstance]] = PrivateAttr(default_factory=dict)
+
+    # 种子状态计数
+    _seed_status_counts: Dict[str, int] = PrivateAttr(default_factory=dict)
+
+    # 生成条件: 编译结果、键订阅、上次观察到的键值、待求值种子
+    _compiled: Dict[str, CompiledCondition] = PrivateAttr(default_factory=dict)
+    _subscribers: Dict[str, Set[str]] = PrivateAttr(default_factory=dict)
+    _keys_by_root: Dict[str, Set[str]] = PrivateAttr(default_factory=dict)
+    _last_values: Dict[str, Any] = PrivateAttr(default_factory=dict)
+    _pending_seeds: Set[str] = PrivateAttr(default_factory=set)
+
+    # 已索引的种子/实例数（用于检测直接增删）
+    _indexed_seeds: int = PrivateAttr(default=0)
+    _indexed_instances: int = PrivateAttr(default=0)
+
+    def model_post_init(self, __context: Any):
+        """建立索引（从持久化数据恢复时同样适用）"""
+        self.reindex()
+
+    @computed_field
+    @property
+    def active_npc_ids(self) -> List[str]:
+        """活跃NPC ID（按加入顺序，由实例派生；序列化为列表，恢复时忽略输入并重建）"""
+        self._sync_index()
+        return list(self._active)
+
+    # ========================================================================
+    # 索引维护
+    # ========================================================================
+
+    def reindex(self):
+        """从种子与实例全量重建索引"""
+        self._by_location = {}
+        self._by_faction = {}
+        self._seed_status_counts = {}
+        self._active = {}
+        self._compiled = {}
+        self._subscribers = {}
+        self._keys_by_root = {}
+        self._last_values = {}
+        self._pending_seeds = set()
+
+        for seed in self.seeds.values():
+            seed._pool = self
+            self._seed_status_counts[seed.status] = self._seed_status_counts.get(seed.status, 0) + 1
+            self._subscribe_seed(seed)
+
+        for npc in self.instances.values():
+            npc._pool = self
+            if npc.lifecycle_stage != "retired":
+                self._index_npc(npc)
+
+        self._indexed_seeds = len(self.seeds)
+        self._indexed_instances = len(self.instances)
+
+    def _sync_index(self):
+        """seeds / instances 被直接增删时重建索引"""
+        if (self._indexed_seeds != len(self.seeds)
+                or self._indexed_instances != len(self.instances)):
+            self.reindex()
+
+    def _index_npc(self, npc: NPCInstance):
+        """加入活跃集合与地点/势力索引"""
+        self._active[npc.npc_id] = None
+        if npc.current_location is not None:
+            self._by_location.setdefault(npc.current_location, {})[npc.npc_id] = npc
+        if npc.faction is not None:
+            self._by_faction.setdefault(npc.faction, {})[npc.npc_id] = npc
+
+    def _unindex_npc(self, npc: NPCInstance):
+        """移出活跃集合与地点/势力索引"""
+        self._active.pop(npc.npc_id, None)
+        self._remove_from(self._by_location, npc.current_location, npc.npc_id)
+        self._remove_from(self._by_faction, npc.faction, npc.npc_id)
+
+    @staticmethod
+    def _remove_from(index: Dict[str, Dict[str, NPCInstance]], key: Optional[str], npc_id: str):
+        """从索引桶中移除，桶为空时删除"""
+        if key is None or key not in index:
+            return
+        bucket = index[key]
+        bucket.pop(npc_id, None)
+        if not bucket:
+            del index[key]
+
+    def _subscribe_seed(self, seed: NPCSeed):
+        """编译种子的生成条件并订阅其读取的键"""
+        self._unsubscribe_seed(seed.seed_id)
+        compiled = compile_conditions(seed.spawn_conditions)
+        self._compiled[seed.seed_id] = compiled
+        for key in compiled.keys:
+            self._subscribers.setdefault(key, set()).add(seed.seed_id)
+            for root in subscription_roots(key):
+                self._keys_by_root.setdefault(root, set()).add(key)
+        if seed.status == "dormant":
+            self._pending_seeds.add(seed.seed_id)
+
+    def _unsubscribe_seed(self, seed_id: str):
+        """取消种子的键订阅"""
+        compiled = self._compiled.pop(seed_id, None)
+        if compiled is None:
+            return
+        for key in compiled.keys:
+            subscribers = self._subscribers.get(key)
+            if subscribers is None:
+                continue
+            subscribers.discard(seed_id)
+            if not subscribers:
+                del self._subscribers[key]
+                self._last_values.pop(key, None)
+                for root in subscription_roots(key):
+                    root_keys = self._keys_by_root.get(root)
+                    if root_keys is not None:
+                        root_keys.discard(key)
+                        if not root_keys:
+                            del self._keys_by_root[root]
+
+    def _on_seed_changed(self, seed: NPCSeed, field: str, old: Any, new: Any):
+        """种子状态或生成条件变化"""
+        if self.seeds.get(seed.seed_id) is not seed:
+            return
+
+        if field == "spawn_conditions":
+            self._subscribe_seed(seed)
+            return
+
+        counts = self._seed_status_counts
+        counts[old] = counts.get(old, 0) - 1
+        counts[new] = counts.get(new, 0) + 1
+        if new == "dormant":
+            self._pending_seeds.add(seed.seed_id)
+
+    def _on_npc_changed(self, npc: NPCInstance, field: str, old: Any, new: Any):
+        """NPC位置、势力或生命周期变化"""
+        if self.instances.get(npc.npc_id) is not npc:
+            return
+
+        if field == "lifecycle_stage":
+            if new == "retired" and old != "retired":
+                self._unindex_npc(npc)
+            elif old == "retired" and new != "retired":
+                self._index_npc(npc)
+            return
+
+        if npc.npc_id not in self._active:
+            return
+
+        index = self._by_location if field == "current_location" else self._by_faction
+        self._remove_from(index, old, npc.npc_id)
+        if new is not None:
+            index.setdefault(new, {})[npc.npc_id] = npc
 
     def add_seed(
         self,
@@ -155,31 +352,60 @@ class NPCPool(BaseModel):
             generation_constraints=generation_constraints or {},
             priority=priority
         )
+        self._sync_index()
         self.seeds[seed.seed_id] = seed
+        seed._pool = self
+        self._seed_status_counts[seed.status] = self._seed_status_counts.get(seed.status, 0) + 1
+        self._subscribe_seed(seed)
+        self._indexed_seeds += 1
         return seed
 
-    def check_spawn_conditions(self, world_state: Dict[str, Any]) -> List[NPCSeed]:
-        """检查哪些种子的生成条件已满足"""
-        ready_seeds = []
-
-        for seed in self.seeds.values():
-            if seed.status != "dormant":
+    def check_spawn_conditions(
+        self,
+        world_state: Any,
+        changed_keys: Optional[Iterable[str]] = None
+    ) -> List[NPCSeed]:
+        """检查哪些种子的生成条件已满足
+
+        只重算新加入（或重新休眠）的种子，以及读取的键发生变化的种子。
+
+        Args:
+            world_state: 世界状态（字典或 WorldState）
+            changed_keys: 本回合变化的键（可选）。提供时只检查这些键
+                （按顶层键匹配订阅）；否则与上次观察到的订阅键值逐一比较
+
+        Returns:
+            List[NPCSeed]: 本次新变为 ready 的种子，按优先级降序
+        """
+        self._sync_index()
+
+        if changed_keys is None:
+            keys = self._subscribers.keys()
+        else:
+            keys = set()
+            for changed in changed_keys:
+                keys.update(self._keys_by_root.get(key_root(changed), ()))
+
+        candidates = self._pending_seeds
+        self._pending_seeds = set()
+        for key in keys:
+            value = resolve_key(world_state, key)
+            if key in self._last_values and self._last_values[key] == value:
                 continue
+            self._last_values[key] = copy.deepcopy(value) if isinstance(value, (dict, list, set)) else value
+            candidates.update(self._subscribers[key])
 
-            # 简单检查：所有条件都满足
-            # TODO: 实现更复杂的条件评估逻辑
-            conditions_met = True
-            for condition in seed.spawn_conditions:
-                # 这里需要实现条件评估器
-                # 暂时标记为ready，实际需要根据world_state检查
-                pass
-
-            if conditions_met:
+        ready_seeds = []
+        for seed_id in candidates:
+            seed = self.seeds.get(seed_id)
+            if seed is None or seed.status != "dormant":
+                continue
+            if self._compiled[seed_id].evaluate(world_state):
                 seed.status = "ready"
                 ready_seeds.append(seed)
 
-        # 按优先级排序
-        ready_seeds.sort(key=lambda s: s.priority, reverse=True)
+        # 按优先级排序（同优先级按种子ID，保证结果稳定）
+        ready_seeds.sort(key=lambda s: (-s.priority, s.seed_id))
         return ready_seeds
 
     def instantiate_npc(
@@ -204,8 +430,11 @@ class NPCPool(BaseModel):
         )
 
         # 保存实例
+        self._sync_index()
         self.instances[instance.npc_id] = instance
-        self.active_npc_ids.append(instance.npc_id)
+        instance._pool = self
+        self._index_npc(instance)
+        self._indexed_instances += 1
 
         # 更新种子状态
         seed.status = "instantiated"
@@ -218,63 +447,225 @@ class NPCPool(BaseModel):
         return self.instances.get(npc_id)
 
     def get_active_npcs(self) -> List[NPCInstance]:
-        """获取所有活跃NPC"""
+        """获取所有活跃NPC（按加入活跃集合的顺序）"""
+        self._sync_index()
         return [
             self.instances[npc_id]
-            for npc_id in self.active_npc_ids
+            for npc_id in self._active
             if npc_id in self.instances
         ]
 
     def get_npcs_at_location(self, location: str) -> List[NPCInstance]:
         """获取某地点的所有NPC"""
-        return [
-            npc for npc in self.get_active_npcs()
-            if npc.current_location == location
-        ]
+        self._sync_index()
+        return list(self._by_location.get(location, {}).values())
 
     def get_npcs_by_faction(self, faction: str) -> List[NPCInstance]:
         """获取某势力的所有NPC"""
-        return [
-            npc for npc in self.get_active_npcs()
-            if npc.faction == faction
-        ]
+        self._sync_index()
+        return list(self._by_faction.get(faction, {}).values())
+
+    def move_npc(self, npc_id: str, location: Optional[str]):
+        """移动NPC到新地点"""
+        npc = self.instances.get(npc_id)
+        if npc is not None:
+            npc.current_location = location
 
     def retire_npc(self, npc_id: str, reason: str):
         """让NPC退出"""
+        self._sync_index()
         if npc_id in self.instances:
-            npc = self.instances[npc_id]
-            npc.retire(reason)
-
-            # 从活跃列表移除
-            if npc_id in self.active_npc_ids:
-                self.active_npc_ids.remove(npc_id)
+            # retire() 修改 lifecycle_stage，自动移出活跃集合与索引
+            self.instances[npc_id].retire(reason)
 
     def get_pool_stats(self) -> Dict[str, Any]:
         """获取NPC池统计"""
+        self._sync_index()
         return {
             "total_seeds": len(self.seeds),
-            "dormant_seeds": len([s for s in self.seeds.values() if s.status == "dormant"]),
-            "ready_seeds": len([s for s in self.seeds.values() if s.status == "ready"]),
+            "dormant_seeds": self._seed_status_counts.get("dormant", 0),
+            "ready_seeds": self._seed_status_counts.get("ready", 0),
             "total_instances": len(self.instances),
-            "active_npcs": len(self.active_npc_ids),
-            "retired_npcs": len([n for n in self.instances.values() if n.lifecycle_stage == "retired"])
+            "active_npcs": len(self._active),
+            "retired_npcs": len(self.instances) - len(self._active)
         }
 
 
 class NPCGenerator:
-    """NPC生成器（使用LLM生成NPC详细信息）"""
+    """NPC生成器（使用LLM生成NPC详细信息）
+
+    生成结果按内容寻址缓存：键为种子内容（原型、故事角色、描述、生成约束）
+    与世界背景指纹的哈希，相同种子在同一世界中只调用一次LLM。
+    降级结果不缓存。
+    """
 
-    def __init__(self, llm_client):
+    def __init__(self, llm_client, max_concurrency: int = 4, cache_size: int = 256):
+        """初始化生成器
+
+        Args:
+            llm_client: LLM客户端（需提供 async generate_structured）
+            max_concurrency: 批量生成时的最大并发LLM调用数
+            cache_size: 缓存的生成结果数上限（LRU）
+        """
         self.llm_client = llm_client
+        self.max_concurrency = max_concurrency
+        self.cache_size = cache_size
+
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._in_flight: Dict[str, "asyncio.Future"] = {}
+
+    # ========================================================================
+    # 缓存
+    # ========================================================================
+
+    @staticmethod
+    def world_fingerprint(world_context: Dict[str, Any]) -> str:
+        """世界背景指纹"""
+        payload = json.dumps(world_context, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def cache_key(cls, seed: NPCSeed, world_context: Dict[str, Any]) -> str:
+        """种子与世界背景的内容地址"""
+        payload = json.dumps(
+            {
+                "archetype": seed.archetype,
+                "role_in_story": seed.role_in_story,
+                "seed_description": seed.seed_description,
+                "constraints": seed.generation_constraints,
+                "world": cls.world_fingerprint(world_context),
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _cache_put(self, key: str, data: Dict[str, Any]):
+        """写入缓存，超出上限时淘汰最久未用的结果"""
+        self._cache[key] = data
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def clear_cache(self):
+        """清空生成结果缓存"""
+        self._cache.clear()
+
+    # ========================================================================
+    # 生成
+    # ========================================================================
 
     async def generate_npc_from_seed(
         self,
         seed: NPCSeed,
         world_context: Dict[str, Any]
     ) -> Dict[str, Any]:
-        """从种子生成完整的NPC数据"""
+        """从种子生成完整的NPC数据（命中缓存时不调用LLM）"""
+        key = self.cache_key(seed, world_context)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return copy.deepcopy(cached)
+
+        # 相同种子正在生成时等待同一结果
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            return copy.deepcopy(await asyncio.shield(pending))
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            try:
+                data = await self._call_llm(seed, world_context)
+                self._cache_put(key, data)
+            except Exception:
+                # 降级：生成基本NPC
+                data = self._fallback_npc(seed)
+            future.set_result(data)
+        except BaseException:
+            # 被取消：等待同一结果的调用随之取消
+            future.cancel()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+        return copy.deepcopy(data)
+
+    async def generate_npcs(
+        self,
+        seeds: List[NPCSeed],
+        world_context: Dict[str, Any],
+        max_concurrency: Optional[int] = None
+    ) -> AsyncIterator[Tuple[NPCSeed, Dict[str, Any]]]:
+        """批量生成NPC数据，按完成顺序流式返回
+
+        LLM调用并发数受 max_concurrency 限制，相同种子只生成一次。
+
+        Args:
+            seeds: 种子列表
+            world_context: 世界背景
+            max_concurrency: 最大并发数（默认使用构造时的配置）
+
+        Yields:
+            Tuple[NPCSeed, Dict]: (种子, 生成的NPC数据)
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+        async def generate(seed: NPCSeed) -> Tuple[NPCSeed, Dict[str, Any]]:
+            async with semaphore:
+                return seed, await self.generate_npc_from_seed(seed, world_context)
+
+        tasks = [asyncio.ensure_future(generate(seed)) for seed in seeds]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def spawn_npcs(
+        self,
+        pool: NPCPool,
+        seeds: List[NPCSeed],
+        world_context: Dict[str, Any],
+        max_concurrency: Optional[int] = None
+    ) -> AsyncIterator[NPCInstance]:
+        """批量生成并实例化NPC，按完成顺序流式返回实例"""
+        async for seed, data in self.generate_npcs(seeds, world_context, max_concurrency):
+            yield pool.instantiate_npc(seed, data)
+
+    async def _call_llm(
+        self,
+        seed: NPCSeed,
+        world_context: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """调用LLM生成NPC数据"""
+        return await self.llm_client.generate_structured(
+            prompt=self._build_prompt(seed, world_context),
+            response_schema={
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "role": {"type": "string"},
+                    "description": {"type": "string"},
+                    "personality": {"type": "array", "items": {"type": "string"}},
+                    "background": {"type": "string"},
+                    "attributes": {"type": "object"},
+                    "goals": {"type": "array", "items": {"type": "string"}},
+                    "motivations": {"type": "array", "items": {"type": "string"}},
+                    "faction": {"type": "string"},
+                    "location": {"type": "string"}
+                },
+                "required": ["name", "role", "description", "personality", "background"]
+            }
+        )
 
-        prompt = f"""你是一个小说NPC生成器。根据以下信息生成一个详细的NPC角色：
+    @staticmethod
+    def _build_prompt(seed: NPCSeed, world_context: Dict[str, Any]) -> str:
+        """构建生成提示词"""
+        return f"""你是一个小说NPC生成器。根据以下信息生成一个详细的NPC角色：
 
 ## NPC原型
 - 角色类型: {seed.archetype}
@@ -306,41 +697,18 @@ class NPCGenerator:
 - 不要与主角冲突或重复
 """
 
-        try:
-            # 使用LLM生成
-            response = await self.llm_client.generate_structured(
-                prompt=prompt,
-                response_schema={
-                    "type": "object",
-                    "properties": {
-                        "name": {"type": "string"},
-                        "role": {"type": "string"},
-                        "description": {"type": "string"},
-                        "personality": {"type": "array", "items": {"type": "string"}},
-                        "background": {"type": "string"},
-                        "attributes": {"type": "object"},
-                        "goals": {"type": "array", "items": {"type": "string"}},
-                        "motivations": {"type": "array", "items": {"type": "string"}},
-                        "faction": {"type": "string"},
-                        "location": {"type": "string"}
-                    },
-                    "required": ["name", "role", "description", "personality", "background"]
-                }
-            )
-
-            return response
-
-        except Exception as e:
-            # 降级：生成基本NPC
-            return {
-                "name": f"{seed.role_in_story}（未命名）",
-                "role": seed.role_in_story,
-                "description": seed.seed_description or "一个神秘的角色",
-                "personality": ["神秘"],
-                "background": "背景未知",
-                "attributes": {},
-                "goals": [],
-                "motivations": [],
-                "faction": seed.generation_constraints.get("faction"),
-                "location": None
-            }
+    @staticmethod
+    def _fallback_npc(seed: NPCSeed) -> Dict[str, Any]:
+        """LLM不可用时的基本NPC"""
+        return {
+            "name": f"{seed.role_in_story}（未命名）",
+            "role": seed.role_in_story,
+            "description": seed.seed_description or "一个神秘的角色",
+            "personality": ["神秘"],
+            "background": "背景未知",
+            "attributes": {},
+            "goals": [],
+            "motivations": [],
+            "faction": seed.generation_constraints.get("faction"),
+            "location": None
+        }
@@ -8,6 +8,7 @@ from pathlib import Path
 from datetime import datetime
 
 from ..models import WorldState, EventNode, EventArc, Clue, Evidence, Setup
+from ..models.event_node import EventStatus
 
 
 class Database:
@@ -35,6 +36,7 @@ class Database:
 
         self.db_path = db_path
         self.conn = None
+        self._event_pool_indexed = False
 
     def connect(self):
         """连接数据库"""
@@ -282,6 +284,139 @@ class Database:
             )
         self.conn.commit()
 
+    def get_completed_event_ids(self, novel_id: str) -> List[str]:
+        """获取已完成的事件ID（按写入顺序）"""
+        if not self.conn:
+            self.connect()
+
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT id FROM event_nodes WHERE novel_id = ? AND status = 'completed' ORDER BY rowid",
+            (novel_id,)
+        )
+
+        return [row["id"] for row in cursor.fetchall()]
+
+    def get_candidate_events(self, novel_id: str, limit: int = None) -> List[EventNode]:
+        """获取候选事件（只加载可能可用的事件）
+
+        在 SQL 中完成静态过滤：状态为 pending、所属事件线未完成、
+        所有前置事件均已完成（json_each 展开前置列表后与已完成事件连接）。
+        标志位与资源条件依赖内存中的世界状态，由调用方继续检查。
+
+        Args:
+            novel_id: 小说ID
+            limit: 最多返回的事件数（可选）
+
+        Returns:
+            List[EventNode]: 水合后的候选事件
+        """
+        if not self.conn:
+            self.connect()
+
+        self.ensure_event_pool_indexes()
+
+        sql = """
+            SELECT e.* FROM event_nodes e
+            LEFT JOIN event_arcs a ON a.id = e.arc_id
+            WHERE e.novel_id = ?
+              AND e.status = 'pending'
+              AND COALESCE(a.completed, 0) = 0
+              AND NOT EXISTS (
+                  SELECT 1 FROM json_each(COALESCE(e.prerequisites, '[]')) p
+                  LEFT JOIN event_nodes d
+                    ON d.id = p.value AND d.status = 'completed'
+                  WHERE d.id IS NULL
+              )
+            ORDER BY e.arc_id, e.id
+        """
+        params: List[Any] = [novel_id]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        cursor = self.conn.cursor()
+        cursor.execute(sql, params)
+
+        return [self._row_to_event_node(row) for row in cursor.fetchall()]
+
+    def ensure_event_pool_indexes(self):
+        """确保候选事件查询所需的复合索引存在"""
+        if self._event_pool_indexed:
+            return
+
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_event_nodes_novel_status "
+            "ON event_nodes(novel_id, status)"
+        )
+        self.conn.commit()
+        self._event_pool_indexed = True
+
+    def _row_to_event_node(self, row: sqlite3.Row) -> EventNode:
+        """将 event_nodes 行转换为 EventNode"""
+        def load(value, default):
+            return json.loads(value) if value else default
+
+        return EventNode(
+            id=row["id"],
+            arc_id=row["arc_id"],
+            title=row["title"],
+            goal=row["goal"],
+            prerequisites=load(row["prerequisites"], []),
+            required_flags=load(row["required_flags"], {}),
+            required_resources=load(row["required_resources"], {}),
+            effects=load(row["effects"], {}),
+            rewards=load(row["rewards"], {}),
+            tension_delta=row["tension_delta"],
+            puzzle_density=row["puzzle_density"],
+            skill_checks_variety=row["skill_checks_variety"],
+            failure_grace=row["failure_grace"],
+            hint_latency=row["hint_latency"],
+            exploit_resistance=row["exploit_resistance"],
+            reward_loop=row["reward_loop"],
+            arc_progress=row["arc_progress"],
+            theme_echo=row["theme_echo"],
+            conflict_gradient=row["conflict_gradient"],
+            payoff_debt=row["payoff_debt"],
+            scene_specificity=row["scene_specificity"],
+            pacing_smoothness=row["pacing_smoothness"],
+            upgrade_frequency=row["upgrade_frequency"],
+            resource_gain=row["resource_gain"],
+            combat_variety=row["combat_variety"],
+            reversal_satisfaction=row["reversal_satisfaction"],
+            faction_expansion=row["faction_expansion"],
+            setups=load(row["setups"], []),
+            clues=load(row["clues"], []),
+            payoffs=load(row["payoffs"], []),
+            status=EventStatus(row["status"]),
+            attempts=row["attempts"],
+            description=row["description"] or "",
+            tags=load(row["tags"], [])
+        )
+
+    # ==================== 事件线 ====================
+
+    def save_event_arc(self, novel_id: str, arc: EventArc):
+        """保存事件线（不含事件节点，节点见 save_event_node）"""
+        if not self.conn:
+            self.connect()
+
+        cursor = self.conn.cursor()
+        cursor.execute(
+            """
+            INSERT OR REPLACE INTO event_arcs (
+                id, novel_id, title, description, type,
+                current_event_idx, completed, themes, estimated_chapters
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                arc.id, novel_id, arc.title, arc.description, arc.type,
+                arc.current_event_idx, 1 if arc.completed else 0,
+                json.dumps(arc.themes, ensure_ascii=False), arc.estimated_chapters
+            )
+        )
+        self.conn.commit()
+
     # ==================== 章节内容 ====================
 
     def save_chapter(
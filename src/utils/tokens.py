@@ -0,0 +1,132 @@
+"""Token 计数工具
+
+提供可插拔的分词器，用于对话上下文窗口与 DM 提示词的预算控制：
+- 已安装 tiktoken 时使用 cl100k_base 编码精确计数
+- 否则按字符类别估算（中日韩字符 ≈ 1.5 token，其余 ≈ 4 字符/token）
+
+更换分词器（set_tokenizer）会递增版本号，缓存了计数的对象据此失效。
+"""
+
+import bisect
+import math
+import re
+from typing import Callable, List, Optional, Sequence
+
+Tokenizer = Callable[[str], int]
+
+try:
+    import tiktoken
+
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+    TIKTOKEN_AVAILABLE = True
+except Exception:
+    _ENCODING = None
+    TIKTOKEN_AVAILABLE = False
+
+
+# 每条聊天消息的格式开销（角色标记、分隔符）
+MESSAGE_OVERHEAD = 4
+
+_CJK_PATTERN = re.compile(
+    r"[\u3000-\u303f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff"
+    r"\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]"
+)
+
+
+def heuristic_tokens(text: str) -> int:
+    """按字符类别估算 token 数"""
+    if not text:
+        return 0
+    cjk = len(_CJK_PATTERN.findall(text))
+    other = len(text) - cjk
+    return math.ceil(cjk * 1.5 + other / 4)
+
+
+def tiktoken_tokens(text: str) -> int:
+    """使用 tiktoken 精确计数"""
+    if not text:
+        return 0
+    return len(_ENCODING.encode(text, disallowed_special=()))
+
+
+_tokenizer: Tokenizer = tiktoken_tokens if TIKTOKEN_AVAILABLE else heuristic_tokens
+_version = 0
+
+
+def set_tokenizer(tokenizer: Tokenizer):
+    """设置全局分词器
+
+    Args:
+        tokenizer: 输入文本、返回 token 数的函数
+    """
+    global _tokenizer, _version
+    _tokenizer = tokenizer
+    _version += 1
+
+
+def get_tokenizer() -> Tokenizer:
+    """获取当前全局分词器"""
+    return _tokenizer
+
+
+def tokenizer_version() -> int:
+    """当前分词器版本（每次 set_tokenizer 递增）"""
+    return _version
+
+
+def count_tokens(text: str, tokenizer: Optional[Tokenizer] = None) -> int:
+    """计算文本 token 数"""
+    return (tokenizer or _tokenizer)(text or "")
+
+
+def message_tokens(content: str, tokenizer: Optional[Tokenizer] = None) -> int:
+    """计算一条聊天消息的 token 数（含格式开销）"""
+    return count_tokens(content, tokenizer) + MESSAGE_OVERHEAD
+
+
+def window_start(
+    prefix: Sequence[int],
+    max_tokens: int,
+    end: Optional[int] = None
+) -> int:
+    """在前缀和上二分查找上下文窗口的起点
+
+    Args:
+        prefix: 前缀和，prefix[i] 为前 i 条消息的 token 总数（长度 n + 1）
+        max_tokens: token 预算
+        end: 窗口终点（不含），默认为 n
+
+    Returns:
+        int: 最小的起点 s，使 prefix[end] - prefix[s] <= max_tokens
+    """
+    if end is None:
+        end = len(prefix) - 1
+    return bisect.bisect_left(prefix, prefix[end] - max_tokens, 0, end)
+
+
+def fit_recent(
+    messages: Sequence[dict],
+    max_tokens: int,
+    tokenizer: Optional[Tokenizer] = None
+) -> List[dict]:
+    """保留预算内最近的聊天消息（{"role", "content"} 字典）
+
+    从最新消息向前累加，遇到第一条放不下的消息即停止。
+
+    Args:
+        messages: 按时间顺序排列的消息
+        max_tokens: token 预算
+        tokenizer: 分词器（可选，默认全局分词器）
+
+    Returns:
+        List[dict]: 预算内的最近消息（保持时间顺序）
+    """
+    used = 0
+    start = len(messages)
+    while start > 0:
+        cost = message_tokens(messages[start - 1].get("content", ""), tokenizer)
+        if used + cost > max_tokens:
+            break
+        used += cost
+        start -= 1
+    return list(messages[start:])
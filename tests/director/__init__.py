@@ -0,0 +1,5 @@
+"""
+全局导演测试套件
+
+测试线索经济、事件调度等导演子系统。
+"""
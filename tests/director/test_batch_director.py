@@ -0,0 +1,98 @@
+"""
+测试 BatchDirector 多会话批量导演
+
+测试共享事件池排名与逐会话选择结果一致。
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.director.batch_director import BatchDirector, BatchRequest
+from src.director.global_director import GlobalDirector, DirectorConfig
+from src.models.event_node import EventNode
+from src.models.world_state import WorldState
+
+
+def make_pool():
+    """构造事件池：部分事件需要标志位"""
+    return [
+        EventNode(id="explore", arc_id="main", title="探索", goal="", puzzle_density=0.5),
+        EventNode(id="duel", arc_id="main", title="决斗", goal="",
+                  required_flags={"met_rival": True}, puzzle_density=1, skill_checks_variety=1),
+        EventNode(id="rest", arc_id="side", title="休整", goal="", failure_grace=1),
+    ]
+
+
+class TestBatchDirector:
+    """测试批量导演"""
+
+    def test_matches_individual_selection(self):
+        """测试批量选择与单独调用结果一致"""
+        config = DirectorConfig(min_event_score=0.0, enable_consistency_audit=False)
+        pool = make_pool()
+        worlds = {
+            "s1": WorldState(timestamp=0),
+            "s2": WorldState(timestamp=0, flags={"met_rival": True}),
+        }
+
+        batch = BatchDirector(config=config)
+        decisions = batch.select_next_events([
+            BatchRequest(session_id=sid, world_state=world, event_pool=pool)
+            for sid, world in worlds.items()
+        ])
+
+        for sid, world in worlds.items():
+            expected = GlobalDirector(config, setting={}).select_next_event(world, pool)
+            assert decisions[sid].selected_event is expected.selected_event
+            assert decisions[sid].reasoning == expected.reasoning
+
+        assert decisions["s2"].selected_event.id == "duel"
+
+    def test_pool_ranking_is_shared(self):
+        """测试相同评分配置下事件池只评分一次"""
+        batch = BatchDirector(config=DirectorConfig(min_event_score=0.0))
+        pool = make_pool()
+
+        first = batch.rank_pool(batch.get_director("a").scorer, pool)
+        second = batch.rank_pool(batch.get_director("b").scorer, pool)
+        assert first is second
+        assert batch.get_stats() == {"sessions": 2, "cached_pools": 1}
+
+        batch.invalidate_scores()
+        assert batch.rank_pool(batch.get_director("a").scorer, pool) is not first
+
+    def test_cache_is_bounded(self):
+        """测试排名缓存有上限"""
+        batch = BatchDirector(max_cached_pools=2)
+        scorer = batch.get_director("a").scorer
+        for _ in range(5):
+            batch.rank_pool(scorer, make_pool())
+
+        assert batch.get_stats()["cached_pools"] == 2
+
+    def test_sessions_share_resources(self, tmp_path):
+        """测试各会话使用自身 session_id，并共享规划器与决策日志连接"""
+        config = DirectorConfig(
+            enable_lookahead=True,
+            decision_log_path=str(tmp_path / "decisions.db")
+        )
+        batch = BatchDirector(config=config)
+        a = batch.get_director("a")
+        b = batch.get_director("b")
+
+        assert (a.config.session_id, b.config.session_id) == ("a", "b")
+        assert (a.decision_log.session_id, b.decision_log.session_id) == ("a", "b")
+        assert config.session_id == "default"
+        assert a.planner is b.planner is not None
+        assert a.decision_log.conn is b.decision_log.conn is not None
+
+        a.close()
+        assert batch.get_director("b").planner is b.planner
+        assert b.decision_log.conn.execute("SELECT 1").fetchone()[0] == 1
+
+        batch.close()
+        assert batch.directors == {}
@@ -0,0 +1,122 @@
+"""
+测试 ClueEconomyManager 线索经济管理器
+
+测试截止时间堆、状态分区与健康度计数的增量维护。
+"""
+
+import sys
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.director.clue_economy_manager import ClueEconomyManager
+from src.models.clue import ClueRegistry, Setup, SetupStatus, ClueStatus
+
+
+class TestSetupDeadlines:
+    """测试伏笔截止时间跟踪"""
+
+    def test_setup_becomes_overdue_after_deadline(self):
+        """测试伏笔在 SLA 之后才逾期"""
+        manager = ClueEconomyManager()
+        setup = manager.create_setup("神秘信件", "event_1", sla_deadline=5)
+
+        manager.advance_turn(5)
+        assert manager.get_overdue_setups() == []
+        assert setup.status == SetupStatus.PENDING
+
+        manager.advance_turn()
+        assert manager.get_overdue_setups() == [setup]
+        assert setup.status == SetupStatus.OVERDUE
+
+    def test_urgent_window(self):
+        """测试紧迫期在到期回合结束"""
+        manager = ClueEconomyManager()
+        setup = manager.create_setup("失踪的舰长", "event_1", sla_deadline=10)
+
+        manager.advance_turn(6)
+        assert manager.get_urgent_setups() == []
+
+        manager.advance_turn()
+        assert manager.get_urgent_setups() == [setup]
+
+        manager.advance_turn(3)
+        assert manager.get_urgent_setups() == []
+        assert manager.get_overdue_setups() == []
+
+    def test_pay_off_clears_urgent_and_overdue(self):
+        """测试偿还伏笔后不再计入紧迫或逾期"""
+        manager = ClueEconomyManager()
+        urgent = manager.create_setup("A", "event_1", sla_deadline=10)
+        overdue = manager.create_setup("B", "event_1", sla_deadline=2)
+        manager.advance_turn(8)
+
+        assert manager.pay_off_setup(urgent.id, "event_2")
+        assert manager.pay_off_setup(overdue.id, "event_2")
+        assert not manager.pay_off_setup(overdue.id, "event_3")
+
+        manager.advance_turn(20)
+        assert manager.get_urgent_setups() == []
+        assert manager.get_overdue_setups() == []
+        assert manager.get_pending_setups() == []
+
+    def test_custom_threshold(self):
+        """测试非默认阈值仍按紧迫度计算"""
+        manager = ClueEconomyManager()
+        setup = manager.create_setup("A", "event_1", sla_deadline=10)
+        manager.advance_turn(5)
+
+        assert manager.get_urgent_setups() == []
+        assert manager.get_urgent_setups(urgency_threshold=0.5) == [setup]
+
+
+class TestHealthCounters:
+    """测试健康度计数"""
+
+    def test_metrics_follow_transitions(self):
+        """测试计数随状态转移更新"""
+        manager = ClueEconomyManager()
+        paid = manager.create_setup("A", "event_1", sla_deadline=3)
+        manager.create_setup("B", "event_1", sla_deadline=3)
+        clue = manager.register_clue("血迹", "physical")
+        manager.register_clue("证词", "witness")
+
+        manager.pay_off_setup(paid.id, "event_2")
+        manager.discover_clue(clue.id)
+        manager.verify_clue(clue.id, [])
+        manager.advance_turn(4)
+
+        metrics = manager.get_health_metrics()
+        assert metrics.total_setups == 2
+        assert metrics.paid_setups == 1
+        assert metrics.overdue_setups == 1
+        assert metrics.payoff_rate == pytest.approx(0.5)
+        assert metrics.overdue_rate == pytest.approx(0.5)
+        assert metrics.discovered_clues == 1
+        assert metrics.verified_clues == 1
+        assert metrics.discovery_rate == pytest.approx(0.5)
+        assert clue.status == ClueStatus.VERIFIED
+        assert manager.get_unverified_clues() == []
+
+    def test_existing_registry_is_indexed(self):
+        """测试传入已有注册表时建立索引"""
+        registry = ClueRegistry()
+        registry.add_setup(Setup(
+            id="setup_0", description="旧伏笔", setup_event_id="event_0",
+            sla_deadline=3, setup_turn=0
+        ))
+        manager = ClueEconomyManager(registry=registry)
+        manager.advance_turn(4)
+
+        # 直接写入注册表的伏笔也会被跟踪
+        registry.add_setup(Setup(
+            id="setup_1", description="新伏笔", setup_event_id="event_1",
+            sla_deadline=1, setup_turn=0
+        ))
+
+        overdue_ids = {s.id for s in manager.get_overdue_setups()}
+        assert overdue_ids == {"setup_0", "setup_1"}
+        assert manager.get_health_metrics().overdue_setups == 2
@@ -0,0 +1,99 @@
+"""
+测试 DecisionLog 导演决策日志
+
+测试紧凑持久化、有界内存记录与滚动聚合的重建。
+"""
+
+import sys
+import tempfile
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.director.decision_log import DecisionLog
+from src.director.global_director import GlobalDirector, DirectorConfig, DirectorDecision
+from src.director.event_scoring import EventScore
+from src.models.event_node import EventNode
+from src.models.world_state import WorldState
+
+
+def make_decision(event_id, arc_id, score, warnings=None):
+    """构造一条决策"""
+    return DirectorDecision(
+        selected_event=EventNode(id=event_id, arc_id=arc_id, title=event_id, goal=""),
+        score=EventScore(
+            event_id=event_id,
+            total_score=score,
+            playability_score=score,
+            narrative_score=score,
+            genre_score=score,
+            sub_scores={}
+        ),
+        warnings=warnings or []
+    )
+
+
+class TestDecisionLog:
+    """测试决策日志"""
+
+    def test_stats_and_bounded_tail(self):
+        """测试聚合统计与有界记录"""
+        log = DecisionLog(tail_size=2)
+        log.record(make_decision("e1", "main", 45.0), turn=0)
+        log.record(make_decision("e2", "main", 55.0, ["注意"]), turn=1)
+        log.record(make_decision("e3", "side", 65.0), turn=2)
+
+        assert [r["event_id"] for r in log.recent()] == ["e2", "e3"]
+        assert log.stats.total == 3
+        assert log.stats.score_mean == pytest.approx(55.0)
+        assert log.stats.score_histogram[4:7] == [1, 1, 1]
+        assert log.stats.warning_rate == pytest.approx(1 / 3)
+        assert log.stats.arc_selections == {"main": 2, "side": 1}
+
+    def test_reload_rebuilds_aggregates(self):
+        """测试重新打开数据库后聚合一致"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = str(Path(tmpdir) / "director.db")
+
+            log = DecisionLog(db_path=db_path, session_id="novel_1", tail_size=2)
+            log.record(make_decision("e1", "main", 45.0), turn=0)
+            log.record(make_decision("e2", "main", 55.0, ["注意", "警告"]), turn=1)
+            log.record(make_decision("e3", "side", 99.5), turn=2)
+            expected = log.stats.to_dict()
+            log.close()
+
+            # 其他会话的记录不影响本会话
+            other = DecisionLog(db_path=db_path, session_id="novel_2")
+            other.record(make_decision("x", "main", 10.0), turn=0)
+            other.close()
+
+            reloaded = DecisionLog(db_path=db_path, session_id="novel_1", tail_size=2)
+            assert reloaded.stats.to_dict() == expected
+            assert [r["event_id"] for r in reloaded.recent()] == ["e2", "e3"]
+            assert reloaded.recent()[0]["warnings"] == ["注意", "警告"]
+            reloaded.close()
+
+
+class TestDirectorIntegration:
+    """测试导演使用决策日志"""
+
+    def test_history_is_bounded(self):
+        """测试决策历史有界且健康报告读取聚合"""
+        config = DirectorConfig(
+            decision_history_size=3,
+            min_event_score=0.0,
+            enable_consistency_audit=False
+        )
+        director = GlobalDirector(config, setting={})
+        world = WorldState(timestamp=0)
+
+        for i in range(5):
+            event = EventNode(id=f"e{i}", arc_id="main", title=f"E{i}", goal="")
+            director.select_next_event(world, [event])
+
+        assert len(director.decision_history) == 3
+        assert director.get_status()["decisions_made"] == 5
+        assert director.get_health_report()["decisions"]["arc_selections"] == {"main": 5}
@@ -0,0 +1,94 @@
+"""
+测试 EventArc 增量进度
+
+测试完成计数、下一事件游标与导演的事件线调度。
+"""
+
+import sys
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.director.global_director import GlobalDirector, DirectorConfig
+from src.models.event_node import EventNode, EventArc, EventStatus
+from src.models.world_state import WorldState
+
+
+def make_arc(arc_id, count):
+    """构造线性事件线：每个事件依赖前一个"""
+    events = []
+    for i in range(count):
+        prereqs = [f"{arc_id}:E{i - 1}"] if i > 0 else []
+        events.append(EventNode(
+            id=f"{arc_id}:E{i}", arc_id=arc_id, title=f"{arc_id} {i}", goal="",
+            prerequisites=prereqs
+        ))
+    return EventArc(id=arc_id, title=arc_id, description="", type="main", events=events)
+
+
+class TestEventArc:
+    """测试事件线计数与游标"""
+
+    def test_initial_state_from_statuses(self):
+        """测试构造时按事件状态初始化"""
+        arc = make_arc("A", 4)
+        arc.events[0].status = EventStatus.COMPLETED
+        arc.events[1].status = EventStatus.COMPLETED
+        arc.reindex()
+
+        assert arc.completed_count == 2
+        assert arc.current_event_idx == 2
+        assert arc.get_progress() == pytest.approx(0.5)
+
+    def test_record_event_result_advances_cursor(self):
+        """测试记录结果后游标前移"""
+        arc = make_arc("A", 3)
+        world = WorldState(timestamp=0)
+
+        first = arc.get_next_event(world, set())
+        first.status = EventStatus.COMPLETED
+        arc.record_event_result(first)
+
+        assert arc.current_event_idx == 1
+        assert arc.get_next_event(world, {first.id}) is arc.events[1]
+
+        failed = arc.events[1]
+        failed.status = EventStatus.FAILED
+        arc.record_event_result(failed)
+        assert arc.current_event_idx == 2
+        assert arc.completed_count == 1
+        assert not arc.completed
+
+    def test_appended_events_are_indexed(self):
+        """测试追加到事件列表的新事件"""
+        arc = make_arc("A", 1)
+        arc.events[0].status = EventStatus.COMPLETED
+        arc.record_event_result(arc.events[0])
+        assert arc.completed
+
+        arc.events.append(EventNode(id="A:extra", arc_id="A", title="extra", goal=""))
+        assert arc.get_progress() == pytest.approx(0.5)
+        assert arc.get_next_event(WorldState(timestamp=0), set()).id == "A:extra"
+
+
+class TestDirectorArcs:
+    """测试导演事件线调度"""
+
+    def test_complete_event_updates_arc(self):
+        """测试 complete_event 更新所属事件线"""
+        config = DirectorConfig(min_event_score=0.0, enable_consistency_audit=False)
+        director = GlobalDirector(config, setting={})
+        world = WorldState(timestamp=0)
+        arcs = [make_arc(f"ARC-{i}", 3) for i in range(50)]
+
+        for _ in range(3 * len(arcs)):
+            decision = director.select_event_from_arcs(arcs, world)
+            director.execute_event(decision.selected_event, world)
+            director.complete_event(decision.selected_event, world)
+
+        assert all(arc.completed for arc in arcs)
+        assert set(director.get_arc_progress(arcs).values()) == {1.0}
+        assert director.select_event_from_arcs(arcs, world).selected_event is None
@@ -0,0 +1,138 @@
+"""
+测试 EventPlanner 前瞻事件规划
+
+测试束搜索选择、世界状态隔离与进程池并行展开。
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.director.event_planner import (
+    EventPlanner, PlannedTrajectory, _RolloutTask, fork_world_state, apply_effects
+)
+from src.director.event_scoring import EventScorer
+from src.director.global_director import GlobalDirector, DirectorConfig
+from src.models.event_node import EventNode
+from src.models.world_state import WorldState, Character
+
+
+def make_events():
+    """贪心会选 a（单步较高），规划应选 b（解锁得分更高的 c、d）"""
+    medium = dict(puzzle_density=1, skill_checks_variety=1, arc_progress=1)
+    strong = dict(medium, theme_echo=1, conflict_gradient=1)
+    return [
+        EventNode(id="a", arc_id="main", title="A", goal="", **medium),
+        EventNode(id="b", arc_id="main", title="B", goal="", effects={"flags": {"gate_open": True}}),
+        EventNode(id="c", arc_id="main", title="C", goal="", required_flags={"gate_open": True}, **strong),
+        EventNode(id="d", arc_id="main", title="D", goal="", required_flags={"gate_open": True}, **strong),
+    ]
+
+
+class TestWorldStateFork:
+    """测试轻量克隆"""
+
+    def test_fork_does_not_touch_original(self):
+        """测试在克隆上应用补丁不影响原状态"""
+        world = WorldState(timestamp=0)
+        world.characters["hero"] = Character(id="hero", name="林风", role="protagonist", description="")
+
+        clone = fork_world_state(world)
+        apply_effects(clone, {
+            "flags": {"gate_open": True},
+            "resources": {"灵石": 10},
+            "characters": {"hero": {"status": "injured"}},
+        })
+
+        assert clone.flags == {"gate_open": True}
+        assert clone.characters["hero"].status == "injured"
+        assert world.flags == {}
+        assert world.resources == {}
+        assert world.characters["hero"].status == "normal"
+
+
+class TestEventPlanner:
+    """测试前瞻规划"""
+
+    def test_plan_prefers_enabling_event(self):
+        """测试规划器优先选择能解锁后续事件的首步"""
+        events = make_events()
+        planner = EventPlanner(scorer=EventScorer(), depth=3, time_budget=5.0)
+
+        trajectories = planner.plan(events[:2], WorldState(timestamp=0), events, [])
+
+        assert trajectories[0].event_ids[0] == "b"
+        assert set(trajectories[0].event_ids[1:]) == {"c", "d"}
+        assert all(t.complete for t in trajectories)
+
+    def test_zero_budget_falls_back(self):
+        """测试时间预算耗尽时按首步得分估计"""
+        events = make_events()
+        planner = EventPlanner(scorer=EventScorer(), depth=3, time_budget=0.0)
+
+        trajectories = planner.plan(events[:2], WorldState(timestamp=0), events, [])
+
+        assert trajectories[0].event_ids == ["a"]
+        assert not trajectories[0].complete
+
+    def test_complete_trajectories_rank_first(self, monkeypatch):
+        """测试超时候选的估计值不会压过完整展开的序列"""
+        events = make_events()
+        planner = EventPlanner(scorer=EventScorer(), depth=3, time_budget=5.0)
+
+        def rollout(task: _RolloutTask) -> PlannedTrajectory:
+            if task.root_id == "a":
+                return PlannedTrajectory(event_ids=["a"], value=1000.0, complete=False)
+            return PlannedTrajectory(event_ids=["b", "c"], value=1.0)
+
+        monkeypatch.setattr("src.director.event_planner.run_rollout", rollout)
+        trajectories = planner.plan(events[:2], WorldState(timestamp=0), events, [])
+
+        assert [t.event_ids[0] for t in trajectories] == ["b", "a"]
+
+    def test_director_close_shuts_down_planner(self):
+        """测试关闭导演时关闭规划器进程池"""
+        config = DirectorConfig(
+            enable_lookahead=True,
+            lookahead_time_budget=30.0,
+            lookahead_workers=2,
+            min_event_score=0.0,
+            enable_consistency_audit=False
+        )
+        director = GlobalDirector(config, setting={})
+        director.select_next_event(WorldState(timestamp=0), make_events())
+        assert director.planner._executor is not None
+
+        director.close()
+        assert director.planner._executor is None
+
+    def test_director_lookahead_mode(self):
+        """测试导演启用前瞻模式"""
+        config = DirectorConfig(
+            enable_lookahead=True,
+            lookahead_time_budget=5.0,
+            min_event_score=0.0,
+            enable_consistency_audit=False
+        )
+        director = GlobalDirector(config, setting={})
+        world = WorldState(timestamp=0)
+
+        decision = director.select_next_event(world, make_events())
+
+        assert decision.selected_event.id == "b"
+        assert decision.planned_sequence[0] == "b"
+        assert world.flags == {}
+
+    def test_parallel_rollouts(self):
+        """测试进程池并行展开与顺序展开结果一致"""
+        events = make_events()
+        planner = EventPlanner(scorer=EventScorer(), depth=3, time_budget=30.0, max_workers=2)
+        try:
+            trajectories = planner.plan(events[:2], WorldState(timestamp=0), events, [])
+        finally:
+            planner.shutdown()
+
+        assert trajectories[0].event_ids[0] == "b"
@@ -0,0 +1,119 @@
+"""
+测试 SQLiteEventPool 事件池
+
+测试候选事件的 SQL 预过滤、水合与状态写回。
+"""
+
+import sys
+import tempfile
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.director.event_pool import SQLiteEventPool
+from src.director.global_director import GlobalDirector, DirectorConfig
+from src.models.event_node import EventNode, EventArc, EventStatus
+from src.models.world_state import WorldState
+from src.utils.database import Database
+
+
+@pytest.fixture
+def db():
+    """创建带 core schema 的临时数据库"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database = Database(str(Path(tmpdir) / "novel.db"))
+        database.init_schema(str(project_root / "database/schema/core.sql"))
+        yield database
+        database.close()
+
+
+def make_arc(arc_id, count):
+    """构造线性事件线"""
+    events = [
+        EventNode(
+            id=f"{arc_id}:E{i}", arc_id=arc_id, title=f"{arc_id} {i}", goal="目标",
+            prerequisites=[f"{arc_id}:E{i - 1}"] if i > 0 else [],
+            effects={"flags": {f"{arc_id}_{i}": True}},
+            tags=["mystery"]
+        )
+        for i in range(count)
+    ]
+    return EventArc(id=arc_id, title=arc_id, description="", type="main", events=events)
+
+
+class TestSQLiteEventPool:
+    """测试事件池"""
+
+    def test_candidates_respect_prerequisites(self, db):
+        """测试只返回前置事件已完成的待执行事件"""
+        pool = SQLiteEventPool(db, "novel_1")
+        pool.add_arc(make_arc("A", 3))
+        pool.add_arc(make_arc("B", 2))
+
+        assert [e.id for e in pool.get_candidates()] == ["A:E0", "B:E0"]
+
+        first = pool.get_candidates()[0]
+        first.status = EventStatus.COMPLETED
+        pool.update_status(first)
+
+        assert [e.id for e in pool.get_candidates()] == ["A:E1", "B:E0"]
+
+    def test_hydration_round_trip(self, db):
+        """测试水合后的事件与写入时一致"""
+        pool = SQLiteEventPool(db, "novel_1")
+        arc = make_arc("A", 1)
+        pool.add_arc(arc)
+
+        assert pool.get_candidates() == arc.events
+
+    def test_completed_arc_excluded(self, db):
+        """测试已完成事件线的事件不再作为候选"""
+        pool = SQLiteEventPool(db, "novel_1")
+        arc = make_arc("A", 2)
+        pool.add_arc(arc)
+        arc.completed = True
+        pool.update_arc(arc)
+
+        assert pool.get_candidates() == []
+
+    def test_director_runs_from_pool(self, db):
+        """测试导演从事件池驱动整条事件线"""
+        pool = SQLiteEventPool(db, "novel_1")
+        pool.add_arc(make_arc("A", 3))
+
+        director = GlobalDirector(
+            DirectorConfig(min_event_score=0.0, enable_consistency_audit=False),
+            setting={}
+        )
+        director.attach_event_pool(pool)
+        world = WorldState(timestamp=0)
+
+        for _ in range(3):
+            decision = director.select_next_event_from_pool(world)
+            director.execute_event(decision.selected_event, world)
+            director.complete_event(decision.selected_event, world)
+
+        assert director.completed_events == ["A:E0", "A:E1", "A:E2"]
+        assert director.select_next_event_from_pool(world).selected_event is None
+
+    def test_new_director_resumes_advanced_pool(self, db):
+        """测试新建的导演挂载已推进的事件池后继续推进"""
+        pool = SQLiteEventPool(db, "novel_1")
+        pool.add_arc(make_arc("A", 3))
+        config = DirectorConfig(min_event_score=0.0, enable_consistency_audit=False)
+        world = WorldState(timestamp=0)
+
+        first = GlobalDirector(config, setting={})
+        first.attach_event_pool(pool)
+        decision = first.select_next_event_from_pool(world)
+        first.execute_event(decision.selected_event, world)
+        first.complete_event(decision.selected_event, world)
+
+        second = GlobalDirector(config, setting={})
+        second.attach_event_pool(pool)
+
+        assert second.completed_events == ["A:E0"]
+        assert second.select_next_event_from_pool(world).selected_event.id == "A:E1"
@@ -0,0 +1,97 @@
+"""异步数据库访问单元测试
+
+测试同步调用转交数据库线程池执行、代理方法包装与单连接对象的串行执行。
+"""
+
+import asyncio
+import threading
+from pathlib import Path
+
+from src.utils.database import Database
+from web.backend.database.async_db import AsyncDatabase, AsyncDBProxy, run_in_db
+
+
+class Recorder:
+    """记录调用线程的同步对象"""
+
+    name = "recorder"
+
+    def __init__(self):
+        self.threads = []
+
+    def work(self, value, scale=1):
+        self.threads.append(threading.current_thread().name)
+        return value * scale
+
+    def fail(self):
+        raise ValueError("boom")
+
+
+def test_run_in_db_uses_worker_thread():
+    """同步函数在数据库线程中执行，关键字参数原样传递"""
+    recorder = Recorder()
+
+    async def main():
+        return await run_in_db(recorder.work, 3, scale=2)
+
+    assert asyncio.run(main()) == 6
+    assert recorder.threads[0].startswith("db")
+
+
+def test_proxy_wraps_methods():
+    """代理的方法返回协程，普通属性直接读取，异常原样抛出"""
+    recorder = Recorder()
+    proxy = AsyncDBProxy(recorder)
+
+    async def main():
+        result = await proxy.work(5)
+        try:
+            await proxy.fail()
+        except ValueError as exc:
+            return result, str(exc)
+
+    assert asyncio.run(main()) == (5, "boom")
+    assert proxy.name == "recorder"
+    assert proxy.sync is recorder
+
+
+def test_loop_not_blocked():
+    """数据库调用执行期间事件循环仍可调度其他任务"""
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    async def main():
+        task = asyncio.ensure_future(run_in_db(blocking))
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        # 事件循环未被阻塞，此处可以继续运行
+        release.set()
+        return await task
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_async_database_single_connection(tmp_path):
+    """Database 的连接在专用线程中创建，后续调用都在该线程执行"""
+    schema = Path(__file__).parent.parent.parent / "database" / "schema" / "core.sql"
+    database = Database(db_path=str(tmp_path / "novel.db"))
+    adb = AsyncDatabase(database)
+
+    async def main():
+        await adb.connect()
+        await adb.init_schema(str(schema))
+        await adb.create_novel(
+            novel_id="n1", title="测试", novel_type="scifi", setting_json={}
+        )
+        novel = await adb.get_novel("n1")
+        await adb.close()
+        return novel
+
+    # sqlite3 连接跨线程使用会抛出 ProgrammingError
+    assert asyncio.run(main())["title"] == "测试"
+    assert database.conn is None
@@ -0,0 +1,105 @@
+"""自动保存队列单元测试
+
+测试同一用户的状态合并、按回合数与空闲时间触发写入、批量写入与失败重试。
+"""
+
+import asyncio
+
+import pytest
+
+from web.backend.services.auto_save import AutoSaveQueue
+
+
+class FakeSaveService:
+    """记录批量写入的存档服务"""
+
+    def __init__(self):
+        self.batches = []
+        self.fail = False
+
+    def auto_save_many(self, entries):
+        if self.fail:
+            raise RuntimeError("disk full")
+        self.batches.append(entries)
+        return list(range(len(entries)))
+
+
+@pytest.fixture
+def service():
+    return FakeSaveService()
+
+
+def test_flush_writes_latest_state_per_user(service):
+    """多次提交只写入每个用户最新的状态，且在一个批次中"""
+    queue = AutoSaveQueue(service, interval_turns=10)
+    for turn in range(3):
+        queue.submit("u1", {"turn": turn}, turn_number=turn)
+    queue.submit("u2", {"turn": 7}, turn_number=7)
+
+    assert asyncio.run(queue.flush()) == 2
+    assert service.batches == [[("u1", {"turn": 2}, 2), ("u2", {"turn": 7}, 7)]]
+    assert queue.pending_count() == 0
+
+
+def test_due_by_turns_or_idle(service):
+    """累计回合数达到间隔或空闲超时后到期"""
+    queue = AutoSaveQueue(service, interval_turns=2, idle_delay=60)
+    queue.submit("u1", {"turn": 1}, turn_number=1)
+    assert asyncio.run(queue.flush_due()) == 0
+
+    queue.submit("u1", {"turn": 2}, turn_number=2)
+    assert asyncio.run(queue.flush_due()) == 1
+
+    idle = AutoSaveQueue(service, interval_turns=10, idle_delay=0)
+    idle.submit("u2", {"turn": 1}, turn_number=1)
+    assert asyncio.run(idle.flush_due()) == 1
+
+
+def test_model_state_serialized_on_write(service):
+    """GameState 等模型在写入时才转换为 dict"""
+
+    class Model:
+        dumped = False
+
+        def model_dump(self):
+            Model.dumped = True
+            return {"hp": 1}
+
+    queue = AutoSaveQueue(service)
+    queue.submit("u1", Model(), turn_number=1)
+    assert not Model.dumped
+
+    asyncio.run(queue.flush())
+    assert service.batches == [[("u1", {"hp": 1}, 1)]]
+
+
+def test_failed_write_is_requeued(service):
+    """写入失败时保留状态，已有更新的提交时不覆盖"""
+    queue = AutoSaveQueue(service)
+    queue.submit("u1", {"turn": 1}, turn_number=1)
+    service.fail = True
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(queue.flush())
+    assert queue.pending_count() == 1
+
+    service.fail = False
+    assert asyncio.run(queue.flush()) == 1
+    assert service.batches == [[("u1", {"turn": 1}, 1)]]
+
+
+def test_background_writer_and_stop(service):
+    """后台任务在空闲后写入，stop() 写入剩余状态"""
+    queue = AutoSaveQueue(service, interval_turns=100, idle_delay=0.05)
+
+    async def main():
+        queue.start()
+        queue.submit("u1", {"turn": 1}, turn_number=1)
+        await asyncio.sleep(0.2)
+        written = len(service.batches)
+        queue.submit("u1", {"turn": 2}, turn_number=2)
+        await queue.stop()
+        return written
+
+    assert asyncio.run(main()) == 1
+    assert service.batches == [[("u1", {"turn": 1}, 1)], [("u1", {"turn": 2}, 2)]]
@@ -0,0 +1,144 @@
+"""SQLite 连接管理器单元测试
+
+测试连接复用、PRAGMA 设置、事务边界与文件替换检测。
+"""
+
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from web.backend.database.connection import ConnectionManager
+
+
+@pytest.fixture
+def manager():
+    manager = ConnectionManager()
+    yield manager
+    manager.close_all()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "game.db")
+
+
+def test_pragmas_applied(manager, db_path):
+    """新建连接时设置 WAL 等 PRAGMA"""
+    conn = manager.connect(db_path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+    conn.close()
+
+
+def test_connection_reused_within_thread(manager, db_path):
+    """同一线程内 close() 后连接被复用"""
+    first = manager.connect(db_path)
+    raw = first._conn
+    first.close()
+
+    second = manager.connect(db_path)
+    assert second._conn is raw
+    second.close()
+    assert manager.get_stats() == {"created": 1, "reused": 1, "open": 1}
+
+
+def test_nested_connections_are_distinct(manager, db_path):
+    """同时持有的连接互不共享"""
+    outer = manager.connect(db_path)
+    inner = manager.connect(db_path)
+    assert outer._conn is not inner._conn
+    inner.close()
+    outer.close()
+
+
+def test_uncommitted_changes_rolled_back_on_close(manager, db_path):
+    """归还时回滚未提交的事务，并重置行工厂"""
+    with manager.connect(db_path) as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+
+    conn = manager.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("INSERT INTO t VALUES (1)")
+    conn.close()
+
+    conn = manager.connect(db_path)
+    assert conn.row_factory is None
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    conn.close()
+
+
+def test_context_manager_commits_and_rolls_back(manager, db_path):
+    """with 块正常结束提交，异常时回滚"""
+    with manager.connect(db_path) as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+
+    with pytest.raises(RuntimeError):
+        with manager.connect(db_path) as conn:
+            conn.execute("INSERT INTO t VALUES (2)")
+            raise RuntimeError("boom")
+
+    with manager.connect(db_path) as conn:
+        assert conn.execute("SELECT x FROM t").fetchall() == [(1,)]
+
+
+def test_released_connection_rejects_use(manager, db_path):
+    """归还后的连接不再委托给底层连接（可能已被下一次 connect() 取走）"""
+    first = manager.connect(db_path)
+    first.close()
+    second = manager.connect(db_path)
+    second.execute("CREATE TABLE t (v INTEGER)")
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        first.execute("INSERT INTO t VALUES (1)")
+    with pytest.raises(sqlite3.ProgrammingError):
+        first.row_factory = sqlite3.Row
+    with pytest.raises(sqlite3.ProgrammingError):
+        with first:
+            pass
+
+    with second:
+        second.execute("INSERT INTO t VALUES (2)")
+        second.close()
+    third = manager.connect(db_path)
+    assert third.execute("SELECT v FROM t").fetchall() == []
+    third.close()
+
+
+def test_replaced_file_not_reused(manager, db_path):
+    """数据库文件被删除重建后不复用旧连接"""
+    with manager.connect(db_path) as conn:
+        conn.execute("CREATE TABLE old (x INTEGER)")
+
+    manager.close_all()
+    os.remove(db_path)
+    sqlite3.connect(db_path).close()
+
+    with manager.connect(db_path) as conn:
+        tables = conn.execute("SELECT name FROM sqlite_master").fetchall()
+    assert tables == []
+
+
+def test_threads_use_separate_connections(manager, db_path):
+    """不同线程使用各自的连接"""
+    with manager.connect(db_path) as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+
+    seen = []
+
+    def worker(value):
+        with manager.connect(db_path) as conn:
+            conn.execute("INSERT INTO t VALUES (?)", (value,))
+            seen.append(id(conn._conn))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with manager.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 4
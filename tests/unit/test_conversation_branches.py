@@ -0,0 +1,111 @@
+"""
+测试共享前缀的对话分支
+
+测试分叉不复制消息、跨分支链的消息遍历、最近消息、上下文窗口与持久化恢复。
+"""
+
+import sys
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.models.conversation_history import ConversationSession
+
+
+def contents(messages):
+    return [message.content for message in messages]
+
+
+@pytest.fixture
+def session():
+    """主分支 m0..m4，从 m2 分叉出 alt（追加 a0, a1），再从 a0 分叉出 deep（追加 d0）"""
+    session = ConversationSession(novel_id="novel")
+    main = session.get_active_branch()
+    ids = [session.add_message("user", f"m{i}").message_id for i in range(5)]
+
+    alt = session.create_branch("alt", from_message_id=ids[2])
+    session.switch_branch(alt.branch_id)
+    a0 = session.add_message("assistant", "a0")
+    session.add_message("user", "a1")
+
+    deep = session.create_branch("deep", from_message_id=a0.message_id)
+    session.switch_branch(deep.branch_id)
+    session.add_message("assistant", "d0")
+
+    # 父分支继续追加不影响已分叉的子分支
+    main.add_message("user", "m5")
+    return session, main, alt, deep
+
+
+class TestSharedPrefixBranches:
+    """测试共享前缀分支"""
+
+    def test_fork_shares_messages(self, session):
+        """分叉只记录父分支与位置，不复制消息"""
+        _, main, alt, deep = session
+        assert alt.messages and contents(alt.messages) == ["a0", "a1"]
+        assert alt.parent_branch_id == main.branch_id
+        assert alt.fork_offset == 3
+        assert deep.fork_offset == 4
+        assert alt.get_messages()[0] is main.messages[0]
+
+    def test_iter_messages_walks_chain(self, session):
+        """完整序列 = 父分支前缀 + 自有消息"""
+        _, main, alt, deep = session
+        assert contents(main.iter_messages()) == ["m0", "m1", "m2", "m3", "m4", "m5"]
+        assert contents(alt.iter_messages()) == ["m0", "m1", "m2", "a0", "a1"]
+        assert contents(deep.iter_messages()) == ["m0", "m1", "m2", "a0", "d0"]
+        assert deep.message_count() == 5
+
+    def test_recent_messages_across_chain(self, session):
+        """最近消息可跨越多层前缀"""
+        _, _, _, deep = session
+        assert contents(deep.get_recent_messages(3)) == ["m2", "a0", "d0"]
+        assert contents(deep.get_recent_messages(100)) == ["m0", "m1", "m2", "a0", "d0"]
+        assert deep.get_recent_messages(0) == []
+
+    def test_context_window_across_chain(self, session):
+        """上下文窗口与完整序列上的逐条累加结果一致"""
+        _, _, _, deep = session
+        full = deep.get_messages()
+        for budget in range(0, 60, 3):
+            expected = []
+            total = 0
+            for message in reversed(full):
+                if total + message.token_count() > budget:
+                    break
+                expected.insert(0, message)
+                total += message.token_count()
+            assert deep.get_context_window(budget) == expected
+        assert deep.count_tokens() == sum(m.token_count() for m in full)
+
+    def test_history_and_export(self, session):
+        """会话历史、摘要与 Markdown 导出覆盖继承前缀"""
+        conversation, _, alt, deep = session
+        assert contents(conversation.get_conversation_history(limit=2)) == ["a0", "d0"]
+        assert contents(conversation.get_conversation_history(alt.branch_id)) == [
+            "m0", "m1", "m2", "a0", "a1"
+        ]
+
+        lines = conversation.export_to_markdown().splitlines()
+        assert "m0" in lines and "d0" in lines and "a1" not in lines
+
+        counts = {s["branch_name"]: s["message_count"] for s in conversation.get_all_branches_summary()}
+        assert counts == {"主分支": 6, "alt": 5, "deep": 5}
+
+    def test_unknown_fork_message_shares_everything(self):
+        """父消息不存在时共享活跃分支全部消息"""
+        conversation = ConversationSession(novel_id="novel")
+        conversation.add_message("user", "hello")
+        branch = conversation.create_branch("copy", from_message_id="missing")
+        assert contents(branch.iter_messages()) == ["hello"]
+
+    def test_roundtrip_relinks_parents(self, session):
+        """序列化后恢复时重新链接父分支"""
+        conversation, _, _, deep = session
+        restored = ConversationSession.model_validate(conversation.model_dump())
+        restored_deep = restored.branches[deep.branch_id]
+        assert contents(restored_deep.iter_messages()) == contents(deep.iter_messages())
@@ -0,0 +1,164 @@
+"""
+测试持久化会话管理器
+
+测试 SQLite 落盘、按需加载、LRU/空闲驱逐与按小说的索引查询。
+"""
+
+import sys
+import pytest
+from pathlib import Path
+from types import SimpleNamespace
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.models import conversation_history
+from src.models.conversation_history import ConversationManager
+
+
+def contents(messages):
+    return [message.content for message in messages]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "conversations.db")
+
+
+class TestInMemoryManager:
+    """测试未配置数据库时的行为"""
+
+    def test_sessions_stay_in_memory(self):
+        """不配置 db_path 时不驱逐会话"""
+        manager = ConversationManager(max_cached_sessions=1)
+        first = manager.create_session("novel")
+        manager.create_session("novel")
+
+        assert manager.get_session(first.session_id) is first
+        assert len(manager.get_sessions_by_novel("novel")) == 2
+        assert manager.evict_idle(0) == 0
+
+
+class TestPersistentManager:
+    """测试 SQLite 持久化"""
+
+    def test_roundtrip_with_branches(self, db_path):
+        """会话、分支与消息在重新打开后完整恢复"""
+        manager = ConversationManager(db_path=db_path)
+        session = manager.create_session("novel")
+        first = manager.add_message(session.session_id, "user", "hello", metadata={"k": 1})
+        manager.add_message(session.session_id, "assistant", "world")
+
+        branch = session.create_branch("alt", from_message_id=first.message_id)
+        session.switch_branch(branch.branch_id)
+        manager.add_message(session.session_id, "assistant", "other")
+        manager.close()
+
+        reopened = ConversationManager(db_path=db_path)
+        restored = reopened.get_session(session.session_id)
+        assert restored.active_branch_id == branch.branch_id
+        assert contents(restored.get_conversation_history()) == ["hello", "other"]
+        main = restored.branches[session.get_all_branches_summary()[0]["branch_id"]]
+        assert contents(main.iter_messages()) == ["hello", "world"]
+        assert main.messages[0].metadata == {"k": 1}
+        reopened.close()
+
+    def test_lru_eviction_and_lazy_load(self, db_path):
+        """超出缓存上限时驱逐最久未用的会话，访问时重新加载"""
+        manager = ConversationManager(db_path=db_path, max_cached_sessions=2)
+        ids = []
+        for i in range(3):
+            session = manager.create_session("novel")
+            session.add_message("user", f"msg {i}")
+            ids.append(session.session_id)
+
+        assert ids[0] not in manager.sessions
+        assert len(manager.sessions) == 2
+
+        restored = manager.get_session(ids[0])
+        assert contents(restored.get_conversation_history()) == ["msg 0"]
+        assert ids[1] not in manager.sessions
+        manager.close()
+
+    def test_evict_idle(self, db_path):
+        """空闲会话落盘后被驱逐"""
+        manager = ConversationManager(db_path=db_path)
+        session = manager.create_session("novel")
+        session.add_message("user", "unsaved")
+
+        assert manager.evict_idle(0) == 1
+        assert manager.sessions == {}
+        restored = manager.get_session(session.session_id)
+        assert contents(restored.get_conversation_history()) == ["unsaved"]
+        manager.close()
+
+    def test_idle_sessions_evicted_on_access(self, db_path, monkeypatch):
+        """访问会话时驱逐空闲超时的会话，未超时的保留"""
+        clock = [0.0]
+        monkeypatch.setattr(conversation_history, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+        manager = ConversationManager(db_path=db_path, max_idle_seconds=60)
+        old = manager.create_session("novel")
+        old.add_message("user", "unsaved")
+        clock[0] = 30
+        recent = manager.create_session("novel")
+
+        clock[0] = 70
+        current = manager.create_session("novel")
+        assert set(manager.sessions) == {recent.session_id, current.session_id}
+        restored = manager.get_session(old.session_id)
+        assert contents(restored.get_conversation_history()) == ["unsaved"]
+
+        clock[0] = 200
+        manager.get_session(current.session_id)
+        assert set(manager.sessions) == {current.session_id}
+        manager.close()
+
+    def test_list_sessions_by_novel(self, db_path):
+        """按小说列出会话头，不加载已驱逐的会话"""
+        manager = ConversationManager(db_path=db_path, max_cached_sessions=1)
+        a = manager.create_session("novel-a")
+        manager.create_session("novel-b")
+        c = manager.create_session("novel-a")
+
+        headers = manager.list_sessions("novel-a")
+        assert {h["session_id"] for h in headers} == {a.session_id, c.session_id}
+        assert a.session_id not in manager.sessions
+
+        sessions = manager.get_sessions_by_novel("novel-a")
+        assert {s.session_id for s in sessions} == {a.session_id, c.session_id}
+        manager.close()
+
+    def test_sessions_by_novel_survive_eviction(self, db_path):
+        """超出缓存上限返回的会话被驱逐后，直接修改仍会落盘，再次访问得到同一对象"""
+        manager = ConversationManager(db_path=db_path, max_cached_sessions=1)
+        ids = [manager.create_session("novel").session_id for _ in range(3)]
+
+        sessions = manager.get_sessions_by_novel("novel")
+        assert len(manager.sessions) == 1
+        for session in sessions:
+            session.add_message("user", f"late {session.session_id}")
+
+        first = sessions[0]
+        assert first.session_id not in manager.sessions
+        assert manager.get_session(first.session_id) is first
+        manager.add_message(first.session_id, "assistant", "reply")
+        manager.close()
+
+        reopened = ConversationManager(db_path=db_path)
+        for session_id in ids:
+            history = contents(reopened.get_session(session_id).get_conversation_history())
+            assert history[0] == f"late {session_id}"
+        assert contents(reopened.get_session(first.session_id).get_conversation_history())[-1] == "reply"
+        reopened.close()
+
+    def test_delete_session(self, db_path):
+        """删除会话同时删除数据库记录"""
+        manager = ConversationManager(db_path=db_path)
+        session = manager.create_session("novel")
+        manager.add_message(session.session_id, "user", "bye")
+        manager.delete_session(session.session_id)
+
+        assert manager.get_session(session.session_id) is None
+        assert manager.list_sessions("novel") == []
+        manager.close()
@@ -63,3 +63,50 @@ def test_get_game_state_not_found(tmp_path):
     finally:
         client.close()
         game_api.game_state_manager = original_manager
+
+
+class FakeEngine:
+    """Turn engine that only changes the player's HP."""
+
+    async def process_turn(self, request):
+        from game.game_engine import GameTurnResponse
+
+        request.currentState.player.hp -= 1
+        return GameTurnResponse(narration="ok")
+
+
+def test_turn_reuses_live_state(tmp_path):
+    from game.game_tools import GameMap, GameState, MapNode, PlayerState, WorldState
+    from game.state_tracking import LiveModelCache
+
+    client, original_manager = create_test_client(tmp_path)
+    original_engine, original_live = game_api.game_engine, game_api.live_states
+    game_api.game_engine = FakeEngine()
+    game_api.live_states = live = LiveModelCache(GameState)
+
+    try:
+        state = GameState(
+            session_id="s1",
+            player=PlayerState(),
+            world=WorldState(),
+            map=GameMap(nodes=[MapNode(id=f"n{i}", name="node", shortDesc="") for i in range(50)]),
+        ).model_dump(mode="json")
+
+        first = client.post("/api/game/turn", json={"playerInput": "look", "currentState": state})
+        assert first.status_code == 200
+        live_state = live._entries["s1"].state
+        map_fragment = live_state.section_json("map")
+
+        second = client.post(
+            "/api/game/turn",
+            json={"playerInput": "look", "currentState": first.json()["updatedState"]},
+        )
+        assert second.status_code == 200
+        assert second.json()["updatedState"]["player"]["hp"] == 98
+        assert live.get_stats() == {"sessions": 1, "hits": 1, "misses": 1}
+        assert live._entries["s1"].state is live_state
+        assert live_state.section_json("map") is map_fragment
+    finally:
+        client.close()
+        game_api.game_state_manager = original_manager
+        game_api.game_engine, game_api.live_states = original_engine, original_live
@@ -0,0 +1,122 @@
+"""会话状态缓存单元测试
+
+测试 LRU 容量淘汰、TTL 过期、脏会话的合并写回与关闭时写回。
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加后端目录到路径（game_state_db 使用后端的顶层包导入）
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "web" / "backend"))
+
+from database.game_state_db import GameStateCache, GameStateManager
+
+
+class CountingManager(GameStateManager):
+    """记录批量写入次数的数据库管理器"""
+
+    def __init__(self, db_path):
+        super().__init__(db_path)
+        self.batches = []
+
+    def save_session_states(self, states):
+        self.batches.append(sorted(states))
+        return super().save_session_states(states)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return CountingManager(str(tmp_path / "game.db"))
+
+
+def test_save_is_write_behind(manager):
+    """save_state 只写内存，flush 合并写回最后一次状态"""
+    cache = GameStateCache(manager)
+    for turn in range(5):
+        cache.save_state("s1", {"turn": turn})
+    cache.save_state("s2", {"turn": 0})
+
+    assert manager.get_session_state("s1") is None
+    assert cache.is_dirty("s1")
+
+    assert cache.flush() == 2
+    assert manager.batches == [["s1", "s2"]]
+    assert manager.get_session_state("s1") == {"turn": 4}
+    assert not cache.is_dirty()
+    assert cache.flush() == 0
+
+
+def test_lru_eviction_keeps_dirty_state(manager):
+    """超过容量时淘汰最久未访问的会话，未写回的状态仍可读到"""
+    cache = GameStateCache(manager, max_sessions=2)
+    cache.save_state("a", {"v": 1})
+    cache.save_state("b", {"v": 2})
+    cache.get_state("a")
+    cache.save_state("c", {"v": 3})
+
+    stats = cache.get_stats()
+    assert stats["cached"] == 2
+    assert stats["pending"] == 1
+    assert cache.get_state("b") == {"v": 2}
+
+    cache.flush()
+    assert manager.get_session_state("b") == {"v": 2}
+
+
+def test_miss_loads_from_database(manager):
+    """内存未命中时从数据库加载"""
+    manager.save_session_state("s1", {"hp": 10})
+    cache = GameStateCache(manager)
+
+    assert cache.get_state("s1") == {"hp": 10}
+    assert not cache.is_dirty("s1")
+    assert cache.get_state("missing") is None
+
+
+def test_ttl_expiry(manager):
+    """空闲超过 ttl 的会话被淘汰，脏状态先写回"""
+    cache = GameStateCache(manager, ttl=0)
+    cache.save_state("s1", {"hp": 1})
+
+    assert cache.evict_expired() == 1
+    assert cache.get_stats()["cached"] == 0
+
+    cache.flush()
+    assert manager.get_session_state("s1") == {"hp": 1}
+
+
+def test_stop_flushes_everything(manager):
+    """后台任务定期写回，stop() 写回剩余脏会话"""
+    cache = GameStateCache(manager, flush_interval=0.01)
+
+    async def main():
+        cache.start_flusher()
+        cache.save_state("s1", {"turn": 1})
+        await asyncio.sleep(0.1)
+        cache.save_state("s1", {"turn": 2})
+        await cache.stop()
+
+    asyncio.run(main())
+    assert manager.get_session_state("s1") == {"turn": 2}
+    assert not cache.is_dirty()
+
+
+def test_flush_writes_snapshot_from_save(manager):
+    """写回的是 save_state 时的快照，之后对缓存状态的原地修改不影响本次写回"""
+    cache = GameStateCache(manager)
+    cache.save_state("s1", {"inventory": [{"id": "rope", "quantity": 2}]})
+
+    state = cache.get_state("s1")
+    state["inventory"][0]["quantity"] -= 1
+    state["inventory"].append({"id": "torch", "quantity": 1})
+
+    cache.flush()
+    assert manager.get_session_state("s1") == {"inventory": [{"id": "rope", "quantity": 2}]}
+
+    cache.save_state("s1", state)
+    cache.flush()
+    assert manager.get_session_state("s1")["inventory"][0]["quantity"] == 1
@@ -0,0 +1,58 @@
+"""JSON 编解码单元测试
+
+测试紧凑输出、非 ASCII 字符、排序键、bytes / str 往返以及 Pydantic 模型等扩展类型。
+"""
+
+from datetime import datetime
+
+import pytest
+from pydantic import BaseModel
+
+from web.backend.database import json_codec
+
+
+class Item(BaseModel):
+    name: str
+    count: int = 1
+
+
+class FakeArray:
+    """模拟 NumPy 数组（提供 tolist）"""
+
+    def tolist(self):
+        return [1, 2, 3]
+
+
+def test_round_trip_bytes_and_str():
+    """dumps 返回 UTF-8 bytes，dumps_str 返回 str，loads 两者皆可"""
+    data = {"名称": "灯塔", "items": [1, 2.5, None, True]}
+
+    raw = json_codec.dumps(data)
+    assert isinstance(raw, bytes)
+    assert "灯塔".encode("utf-8") in raw
+    assert json_codec.loads(raw) == data
+
+    text = json_codec.dumps_str(data)
+    assert isinstance(text, str)
+    assert json_codec.loads(text) == data
+
+
+def test_sort_keys_is_canonical():
+    """排序输出与插入顺序无关且为紧凑格式"""
+    assert json_codec.dumps({"b": 1, "a": {"d": 2, "c": 3}}, sort_keys=True) == (
+        b'{"a":{"c":3,"d":2},"b":1}'
+    )
+
+
+def test_extended_types():
+    """Pydantic 模型、类数组对象与 datetime 直接序列化"""
+    assert json_codec.loads(json_codec.dumps(Item(name="剑"))) == {"name": "剑", "count": 1}
+    assert json_codec.loads(json_codec.dumps_str([Item(name="盾")])) == [{"name": "盾", "count": 1}]
+
+    encoded = json_codec.dumps(
+        {"vector": FakeArray(), "at": datetime(2026, 1, 2, 3, 4, 5)}, sort_keys=True
+    )
+    assert json_codec.loads(encoded) == {"at": "2026-01-02T03:04:05", "vector": [1, 2, 3]}
+
+    with pytest.raises(TypeError):
+        json_codec.dumps(object())
@@ -0,0 +1,39 @@
+"""JSON Patch 工具单元测试"""
+
+import copy
+import json
+
+import pytest
+
+from web.backend.database.json_patch import apply_patch, make_patch
+
+CASES = [
+    ({"a": 1}, {"a": 1}),
+    ({"a": 1}, {"a": 2, "b": [1]}),
+    ({"a": {"x": 1, "y": 2}}, {"a": {"x": 1}}),
+    ({"logs": ["a", "b"]}, {"logs": ["a", "b", "c", "d"]}),
+    ({"logs": ["a", "b", "c"]}, {"logs": ["b", "c"]}),
+    ({"npcs": [{"hp": 1}, {"hp": 2}]}, {"npcs": [{"hp": 1}, {"hp": 5}]}),
+    ({"a/b": 1, "c~d": 2}, {"a/b": 3}),
+    ({"v": 1}, {"v": 1.0, "w": None}),
+    ([1, 2], {"root": True}),
+]
+
+
+@pytest.mark.parametrize("old,new", CASES)
+def test_roundtrip(old, new):
+    """应用补丁后与新文档一致，补丁可 JSON 序列化"""
+    ops = json.loads(json.dumps(make_patch(old, new)))
+    assert apply_patch(copy.deepcopy(old), ops) == new
+
+
+def test_equal_documents_produce_no_ops():
+    """相同文档不产生操作"""
+    state = {"player": {"hp": 10}, "logs": list(range(100))}
+    assert make_patch(state, copy.deepcopy(state)) == []
+
+
+def test_append_only_list_uses_append():
+    """列表末尾追加只生成追加操作"""
+    ops = make_patch({"logs": list(range(1000))}, {"logs": list(range(1001))})
+    assert ops == [{"op": "add", "path": "/logs/-", "value": 1000}]
@@ -0,0 +1,127 @@
+"""
+测试 NPC 批量生成
+
+测试有界并发、内容寻址缓存、流式返回与降级。
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.models.npc_lifecycle import NPCGenerator, NPCPool, NPCSeed
+
+
+class FakeLLM:
+    """按提示词中的故事角色决定延迟的假 LLM"""
+
+    def __init__(self, delays=None, fail=()):
+        self.delays = delays or {}
+        self.fail = set(fail)
+        self.calls = 0
+        self.running = 0
+        self.max_running = 0
+
+    async def generate_structured(self, prompt, response_schema):
+        self.calls += 1
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            role = prompt.split("故事角色: ", 1)[1].split("\n", 1)[0]
+            await asyncio.sleep(self.delays.get(role, 0.05))
+            if role in self.fail:
+                raise RuntimeError("LLM 不可用")
+            return {"name": f"{role}-NPC", "role": role, "description": "", "personality": [], "background": ""}
+        finally:
+            self.running -= 1
+
+
+def seed(role, **kwargs):
+    return NPCSeed(archetype="neutral", role_in_story=role, **kwargs)
+
+
+WORLD = {"setting_text": "雾城"}
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+class TestNPCGenerator:
+    """测试 NPC 生成器"""
+
+    def test_batch_runs_concurrently(self):
+        """批量生成耗时接近最慢的单次调用"""
+        llm = FakeLLM(delays={f"角色{i}": 0.1 for i in range(10)})
+        generator = NPCGenerator(llm, max_concurrency=10)
+
+        started = time.perf_counter()
+        results = asyncio.run(collect(generator.generate_npcs([seed(f"角色{i}") for i in range(10)], WORLD)))
+        elapsed = time.perf_counter() - started
+
+        assert len(results) == 10
+        assert elapsed < 0.5
+        assert llm.max_running == 10
+
+    def test_concurrency_is_bounded(self):
+        """并发调用数不超过上限"""
+        llm = FakeLLM()
+        generator = NPCGenerator(llm, max_concurrency=2)
+        asyncio.run(collect(generator.generate_npcs([seed(f"角色{i}") for i in range(6)], WORLD)))
+        assert llm.max_running == 2
+        assert llm.calls == 6
+
+    def test_streams_in_completion_order(self):
+        """结果按完成顺序返回"""
+        llm = FakeLLM(delays={"慢": 0.2, "快": 0.01})
+        generator = NPCGenerator(llm)
+        results = asyncio.run(collect(generator.generate_npcs([seed("慢"), seed("快")], WORLD)))
+        assert [s.role_in_story for s, _ in results] == ["快", "慢"]
+
+    def test_identical_seeds_cached(self):
+        """相同种子与世界只调用一次 LLM，世界变化后重新生成"""
+        llm = FakeLLM()
+        generator = NPCGenerator(llm)
+
+        async def run():
+            seeds = [seed("守卫", generation_constraints={"faction": "城卫"}) for _ in range(3)]
+            first = await collect(generator.generate_npcs(seeds, WORLD))
+            again = await generator.generate_npc_from_seed(seeds[0], WORLD)
+            other = await generator.generate_npc_from_seed(seeds[0], {"setting_text": "沙海"})
+            return first, again, other
+
+        first, again, other = asyncio.run(run())
+        assert llm.calls == 2
+        assert all(data == again for _, data in first)
+        first[0][1]["name"] = "被修改"
+        assert again["name"] == "守卫-NPC"
+
+    def test_fallback_not_cached(self):
+        """LLM 失败时降级且不缓存"""
+        llm = FakeLLM(fail={"刺客"})
+        generator = NPCGenerator(llm)
+
+        async def run():
+            first = await generator.generate_npc_from_seed(seed("刺客"), WORLD)
+            second = await generator.generate_npc_from_seed(seed("刺客"), WORLD)
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert first["name"] == "刺客（未命名）"
+        assert second == first
+        assert llm.calls == 2
+
+    def test_spawn_npcs_instantiates(self):
+        """spawn_npcs 实例化并登记到NPC池"""
+        pool = NPCPool()
+        seeds = [pool.add_seed("neutral", f"商人{i}", []) for i in range(3)]
+        generator = NPCGenerator(FakeLLM())
+
+        instances = asyncio.run(collect(generator.spawn_npcs(pool, seeds, WORLD)))
+        assert len(instances) == 3
+        assert pool.get_pool_stats()["active_npcs"] == 3
+        assert all(s.status == "instantiated" for s in seeds)
@@ -0,0 +1,124 @@
+"""
+测试 NPC 池索引
+
+测试活跃集合、地点/势力索引随移动、转投与退出更新，以及状态计数。
+"""
+
+import sys
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.models.npc_lifecycle import NPCPool, NPCInstance
+
+
+def names(npcs):
+    return sorted(npc.name for npc in npcs)
+
+
+@pytest.fixture
+def pool():
+    pool = NPCPool()
+    for i, (location, faction) in enumerate([
+        ("城门", "守卫"), ("城门", "商会"), ("酒馆", "商会"), ("酒馆", None)
+    ]):
+        seed = pool.add_seed("neutral", f"角色{i}", [])
+        pool.instantiate_npc(seed, {"name": f"npc{i}", "location": location, "faction": faction})
+    return pool
+
+
+def scan(pool, field, value):
+    """全量扫描的参考实现"""
+    return [
+        npc for npc in pool.instances.values()
+        if npc.lifecycle_stage != "retired" and getattr(npc, field) == value
+    ]
+
+
+class TestNPCPoolIndexes:
+    """测试 NPC 池索引"""
+
+    def test_location_and_faction_queries(self, pool):
+        """索引查询与全量扫描一致"""
+        assert names(pool.get_npcs_at_location("城门")) == ["npc0", "npc1"]
+        assert names(pool.get_npcs_by_faction("商会")) == ["npc1", "npc2"]
+        assert pool.get_npcs_at_location("不存在") == []
+
+    def test_move_and_change_faction(self, pool):
+        """移动与转投势力后索引更新"""
+        npc0 = next(n for n in pool.instances.values() if n.name == "npc0")
+        pool.move_npc(npc0.npc_id, "酒馆")
+        npc0.faction = "商会"
+
+        assert names(pool.get_npcs_at_location("城门")) == ["npc1"]
+        assert names(pool.get_npcs_at_location("酒馆")) == ["npc0", "npc2", "npc3"]
+        assert pool.get_npcs_by_faction("守卫") == []
+        assert names(pool.get_npcs_by_faction("商会")) == ["npc0", "npc1", "npc2"]
+
+    def test_retire_removes_from_indexes(self, pool):
+        """退出的NPC离开活跃集合与索引，恢复后重新加入"""
+        npc1 = next(n for n in pool.instances.values() if n.name == "npc1")
+        pool.retire_npc(npc1.npc_id, "离开")
+
+        assert npc1.npc_id not in pool.active_npc_ids
+        assert names(pool.get_npcs_at_location("城门")) == ["npc0"]
+        assert names(pool.get_npcs_by_faction("商会")) == ["npc2"]
+
+        npc1.lifecycle_stage = "adapted"
+        assert names(pool.get_npcs_at_location("城门")) == ["npc0", "npc1"]
+
+    def test_active_npcs_keep_insertion_order(self, pool):
+        """活跃NPC按加入顺序返回，退出后恢复的NPC排在末尾"""
+        assert [n.name for n in pool.get_active_npcs()] == ["npc0", "npc1", "npc2", "npc3"]
+
+        npc1 = next(n for n in pool.instances.values() if n.name == "npc1")
+        pool.retire_npc(npc1.npc_id, "离开")
+        npc1.lifecycle_stage = "adapted"
+        pool.get_npcs_at_location("城门")
+
+        assert [n.name for n in pool.get_active_npcs()] == ["npc0", "npc2", "npc3", "npc1"]
+
+    def test_pool_stats_counters(self, pool):
+        """状态计数随种子与NPC变化更新"""
+        pool.add_seed("mentor", "导师", [])
+        ready = pool.add_seed("mentor", "导师2", [])
+        ready.status = "ready"
+        pool.retire_npc(next(iter(pool.active_npc_ids)), "离开")
+
+        assert pool.get_pool_stats() == {
+            "total_seeds": 6,
+            "dormant_seeds": 1,
+            "ready_seeds": 1,
+            "total_instances": 4,
+            "active_npcs": 3,
+            "retired_npcs": 1
+        }
+
+    def test_direct_insertion_is_indexed(self, pool):
+        """直接写入 instances 的NPC在下一次查询前被索引"""
+        npc = NPCInstance(name="外来者", role="旅人", archetype="neutral",
+                          description="", current_location="城门")
+        pool.instances[npc.npc_id] = npc
+
+        assert names(pool.get_npcs_at_location("城门")) == ["npc0", "npc1", "外来者"]
+        npc.current_location = "酒馆"
+        assert scan(pool, "current_location", "城门") == pool.get_npcs_at_location("城门")
+
+    def test_roundtrip_rebuilds_indexes(self, pool):
+        """序列化恢复后重建索引"""
+        restored = NPCPool.model_validate(pool.model_dump())
+        assert names(restored.get_npcs_at_location("酒馆")) == ["npc2", "npc3"]
+        assert restored.get_pool_stats() == pool.get_pool_stats()
+
+    def test_active_ids_serialize_as_list(self, pool):
+        """活跃NPC ID 序列化为列表，恢复时忽略输入（含旧格式）并由实例重建"""
+        dumped = pool.model_dump()
+        assert isinstance(dumped["active_npc_ids"], list)
+        assert dumped["active_npc_ids"] == [n.npc_id for n in pool.get_active_npcs()]
+
+        dumped["active_npc_ids"] = ["stale"]
+        restored = NPCPool.model_validate(dumped)
+        assert restored.active_npc_ids == pool.active_npc_ids
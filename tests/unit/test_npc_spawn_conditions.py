@@ -0,0 +1,153 @@
+"""
+测试 NPC 生成条件
+
+测试条件语言的编译与求值，以及 NPCPool 按键订阅的增量检查。
+"""
+
+import sys
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.models.npc_conditions import CompiledCondition, compile_condition, compile_conditions
+from src.models.npc_lifecycle import NPCPool
+from src.models.world_state import WorldState
+
+
+WORLD = {
+    "turn": 12,
+    "player": {"location": "城门", "inventory": ["钥匙", "火把"]},
+    "weather": "雨",
+    "flags": {"met_mentor": True, "主角到达XX地点": True, "alarm": False},
+}
+
+
+class TestConditionLanguage:
+    """测试条件语言"""
+
+    @pytest.mark.parametrize("text,expected", [
+        ("player.location == 城门", True),
+        ("player.location != '城门'", False),
+        ("turn >= 10", True),
+        ("turn < 10", False),
+        ("player.inventory contains 钥匙", True),
+        ("weather in [雨, 雪]", True),
+        ("flags.met_mentor", True),
+        ("met_mentor", True),
+        ("主角到达XX地点", True),
+        ("!flags.alarm", True),
+        ("not met_mentor", False),
+        ("flags.alarm || turn > 5", True),
+        ("missing.path > 3", False),
+        ("missing.path > 3 || met_mentor", True),
+        ("met_mentor || missing.path > 3", True),
+        ("player.location == 'a||b' || turn > 5", True),
+        ("完成 某个 任务", False),
+    ])
+    def test_evaluate(self, text, expected):
+        """各类子句求值"""
+        assert compile_condition(text).evaluate(WORLD) is expected
+
+    def test_keys(self):
+        """记录条件读取的键"""
+        compiled = compile_conditions(["player.location == 城门", "flags.a || turn > 3"])
+        assert compiled.keys == {"player.location", "flags.a", "turn"}
+        assert compile_conditions([]).evaluate({}) is True
+
+    def test_quoted_or_is_literal(self):
+        """引号内的 || 属于字面量"""
+        compiled = compile_condition('player.name == "a||b"')
+        assert compiled.keys == {"player.name"}
+        assert compiled.evaluate({"player": {"name": "a||b"}}) is True
+        assert compiled.evaluate({"player": {"name": "a"}}) is False
+
+    def test_world_state_object(self):
+        """支持 WorldState 对象（属性与 flags 回退）"""
+        world = WorldState(timestamp=0, turn=3, flags={"gate_open": True})
+        assert compile_condition("gate_open").evaluate(world)
+        assert compile_condition("turn == 3").evaluate(world)
+
+
+class TestIncrementalSpawn:
+    """测试增量生成检查"""
+
+    def make_pool(self):
+        pool = NPCPool()
+        gate = pool.add_seed("mentor", "守门人", ["player.location == 城门"], priority=3)
+        night = pool.add_seed("opponent", "夜行者", ["turn >= 10", "!flags.alarm"], priority=8)
+        return pool, gate, night
+
+    def test_no_mass_spawn(self):
+        """条件不满足的种子保持休眠"""
+        pool, gate, night = self.make_pool()
+        ready = pool.check_spawn_conditions({"turn": 1, "player": {"location": "村庄"}})
+        assert ready == []
+        assert gate.status == "dormant" and night.status == "dormant"
+
+    def test_only_changed_inputs_reevaluated(self):
+        """只重算读取的键发生变化的种子"""
+        pool, gate, night = self.make_pool()
+        world = {"turn": 1, "player": {"location": "村庄"}, "flags": {}}
+        pool.check_spawn_conditions(world)
+
+        evaluated = []
+        for seed_id, compiled in list(pool._compiled.items()):
+            pool._compiled[seed_id] = CompiledCondition(
+                compiled.source,
+                lambda ws, sid=seed_id, fn=compiled.predicate: evaluated.append(sid) or fn(ws),
+                compiled.keys
+            )
+
+        assert pool.check_spawn_conditions(world) == []
+        assert evaluated == []
+
+        world["player"]["location"] = "城门"
+        assert pool.check_spawn_conditions(world) == [gate]
+        assert evaluated == [gate.seed_id]
+
+        world["turn"] = 11
+        assert pool.check_spawn_conditions(world, changed_keys=["turn"]) == [night]
+        assert evaluated == [gate.seed_id, night.seed_id]
+
+    def test_priority_order(self):
+        """同时满足时按优先级排序"""
+        pool, gate, night = self.make_pool()
+        ready = pool.check_spawn_conditions({"turn": 10, "player": {"location": "城门"}})
+        assert ready == [night, gate]
+
+    def test_changed_keys_filter(self):
+        """提供 changed_keys 时不检查其他键"""
+        pool, gate, night = self.make_pool()
+        world = {"turn": 1, "player": {"location": "村庄"}}
+        pool.check_spawn_conditions(world)
+
+        world["player"] = {"location": "城门"}
+        assert pool.check_spawn_conditions(world, changed_keys=["turn"]) == []
+        assert pool.check_spawn_conditions(world, changed_keys=["player"]) == [gate]
+
+    @pytest.mark.parametrize("changed", ["flags", "flags.主角到达城门"])
+    def test_changed_keys_bare_flag(self, changed):
+        """裸标志位条件（回退到 flags 查找）随 flags 的变化重算"""
+        pool = NPCPool()
+        guard = pool.add_seed("ally", "城门守卫", ["主角到达城门"])
+        world = {"turn": 1, "flags": {}}
+        assert pool.check_spawn_conditions(world) == []
+
+        world["flags"]["主角到达城门"] = True
+        assert pool.check_spawn_conditions(world, changed_keys=["turn"]) == []
+        assert pool.check_spawn_conditions(world, changed_keys=[changed]) == [guard]
+
+    def test_dormant_again_is_rechecked(self):
+        """重新休眠或修改条件的种子会被再次检查"""
+        pool, gate, night = self.make_pool()
+        world = {"turn": 1, "player": {"location": "城门"}}
+        assert pool.check_spawn_conditions(world) == [gate]
+
+        gate.status = "dormant"
+        assert pool.check_spawn_conditions(world) == [gate]
+
+        night.spawn_conditions = ["turn >= 1"]
+        assert pool.check_spawn_conditions(world) == [night]
@@ -0,0 +1,129 @@
+"""会话状态增量持久化单元测试
+
+测试 JSON Patch 增量写入、按条数/字节数压缩、基准 + 增量重建与多管理器并发写入。
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加后端目录到路径（game_state_db 使用后端的顶层包导入）
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "web" / "backend"))
+
+from database.connection import connect
+from database.game_state_db import GameStateManager
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "game.db")
+
+
+def delta_count(db_path, session_id):
+    with connect(db_path) as conn:
+        return conn.execute(
+            "SELECT COUNT(*) FROM session_state_deltas WHERE session_id = ?", (session_id,)
+        ).fetchone()[0]
+
+
+def big_state(turn):
+    return {
+        "turn_number": turn,
+        "player": {"hp": 100 - turn},
+        "logs": [f"第{i}回合" for i in range(turn)],
+        "map": {f"tile{i}": "草地" for i in range(200)},
+    }
+
+
+def test_saves_append_deltas(db_path):
+    """首次保存写基准，之后只追加增量，读取时重建完整状态"""
+    manager = GameStateManager(db_path)
+    for turn in range(1, 6):
+        assert manager.save_session_state("s1", big_state(turn))
+
+    assert delta_count(db_path, "s1") == 4
+    assert GameStateManager(db_path).get_session_state("s1") == big_state(5)
+
+
+def test_unchanged_state_writes_nothing(db_path):
+    """状态未变化时不写增量"""
+    manager = GameStateManager(db_path)
+    manager.save_session_state("s1", big_state(1))
+    manager.save_session_state("s1", big_state(1))
+    assert delta_count(db_path, "s1") == 0
+
+
+def test_compaction_by_count_and_bytes(db_path):
+    """增量条数或字节数超过阈值时写入新基准"""
+    manager = GameStateManager(db_path, max_state_deltas=3)
+    for turn in range(1, 6):
+        manager.save_session_state("s1", big_state(turn))
+    # 基准(1) + 3 条增量，第 5 次压缩
+    assert delta_count(db_path, "s1") == 0
+    assert manager.get_session_state("s1") == big_state(5)
+
+    manager = GameStateManager(db_path, max_state_delta_bytes=10)
+    manager.save_session_state("s2", big_state(1))
+    manager.save_session_state("s2", big_state(2))
+    assert delta_count(db_path, "s2") == 0
+
+
+def test_delta_size_counts_utf8_bytes(db_path):
+    """增量大小按 UTF-8 字节数计算（中文约为字符数的 3 倍）"""
+    manager = GameStateManager(db_path)
+    manager.save_session_state("probe", {"note": "龙" * 20})
+    manager.save_session_state("probe", {"note": "凤" * 20})
+    with connect(db_path) as conn:
+        (patch,) = conn.execute(
+            "SELECT patch FROM session_state_deltas WHERE session_id = 'probe'"
+        ).fetchone()
+    assert len(patch.encode("utf-8")) > len(patch)
+
+    manager = GameStateManager(db_path, max_state_delta_bytes=len(patch))
+    manager.save_session_state("s1", {"note": "龙" * 20})
+    manager.save_session_state("s1", {"note": "凤" * 20})
+    assert delta_count(db_path, "s1") == 0
+
+    manager = GameStateManager(db_path, max_state_delta_bytes=len(patch.encode("utf-8")) + 1)
+    assert manager.get_session_state("probe") == {"note": "凤" * 20}
+    manager.save_session_state("probe", {"note": "龙" * 20})
+    assert delta_count(db_path, "probe") == 0
+
+
+def test_in_place_mutation_is_detected(db_path):
+    """调用方原地修改同一个字典后再次保存，增量仍然正确"""
+    manager = GameStateManager(db_path)
+    state = big_state(1)
+    manager.save_session_state("s1", state)
+    state["logs"].append("新的一回合")
+    state["player"]["hp"] = 1
+    manager.save_session_state("s1", state)
+
+    assert delta_count(db_path, "s1") == 1
+    assert GameStateManager(db_path).get_session_state("s1") == state
+
+
+def test_concurrent_managers_stay_consistent(db_path):
+    """另一个管理器写入后，版本号不一致时改写完整基准"""
+    first = GameStateManager(db_path)
+    second = GameStateManager(db_path)
+
+    first.save_session_state("s1", big_state(1))
+    second.save_session_state("s1", big_state(2))
+    first.save_session_state("s1", big_state(3))
+    second.save_session_state("s1", big_state(4))
+
+    assert GameStateManager(db_path).get_session_state("s1") == big_state(4)
+
+
+def test_delete_removes_deltas(db_path):
+    """删除会话同时删除增量"""
+    manager = GameStateManager(db_path)
+    manager.save_session_state("s1", big_state(1))
+    manager.save_session_state("s1", big_state(2))
+    manager.delete_session_state("s1")
+
+    assert delta_count(db_path, "s1") == 0
+    assert manager.get_session_state("s1") is None
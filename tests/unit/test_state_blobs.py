@@ -0,0 +1,193 @@
+"""状态 Blob 存储单元测试
+
+测试存档 / 快照 / 自动保存共用按内容寻址的压缩 Blob、旧记录兼容与垃圾回收。
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+from web.backend.database.connection import connect
+from web.backend.database.state_blobs import (
+    decode_state,
+    encode_state,
+    get_state,
+    register_baseline,
+)
+from web.backend.services.save_service import SaveService
+
+# 与 GameStateManager 建表语句一致（不含 state_hash，验证迁移）
+LEGACY_SCHEMA = """
+CREATE TABLE game_saves (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL DEFAULT 'default_user',
+    slot_id INTEGER NOT NULL,
+    save_name TEXT NOT NULL,
+    game_state TEXT NOT NULL,
+    metadata TEXT,
+    screenshot_url TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(user_id, slot_id)
+);
+CREATE TABLE save_snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    save_id INTEGER NOT NULL,
+    turn_number INTEGER NOT NULL,
+    snapshot_data TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE auto_saves (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    game_state TEXT NOT NULL,
+    turn_number INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+STATE = {
+    "player": {"hp": 80, "location": "城门"},
+    "world": {"time": 3},
+    "log": ["进入城门"] * 200,
+}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "saves.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.close()
+    return path
+
+
+def blob_count(db_path):
+    with connect(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM state_blobs").fetchone()[0]
+
+
+def test_encode_is_canonical_and_compressed():
+    """键顺序不影响哈希，压缩后明显变小且可还原"""
+    reordered = {"log": STATE["log"], "world": STATE["world"], "player": STATE["player"]}
+    encoded = encode_state(STATE)
+
+    assert encode_state(reordered).state_hash == encoded.state_hash
+    assert len(encoded.data) < encoded.size / 10
+    assert decode_state(encoded.data) == STATE
+
+
+def test_identical_states_stored_once(db_path):
+    """存档、快照与自动保存引用同一个 Blob"""
+    service = SaveService(db_path)
+    save_id = service.save_game("u1", 1, "存档一", STATE)
+    service.save_game("u1", 2, "存档二", STATE)
+    service.auto_save("u1", STATE, turn_number=3)
+
+    assert blob_count(db_path) == 1
+    assert service.load_game(save_id)["game_state"] == STATE
+    assert service.get_latest_auto_save("u1")["game_state"] == STATE
+
+    snapshot_id = service.get_snapshots(save_id)[0]["snapshot_id"]
+    assert service.load_snapshot(snapshot_id) == STATE
+
+    with connect(db_path) as conn:
+        assert conn.execute("SELECT game_state FROM game_saves").fetchall() == [("",), ("",)]
+
+
+def test_legacy_rows_still_load(db_path):
+    """state_hash 为空的旧记录从 JSON 列读取"""
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "INSERT INTO game_saves (user_id, slot_id, save_name, game_state) VALUES (?, ?, ?, ?)",
+        ("u1", 1, "旧存档", json.dumps(STATE, ensure_ascii=False)),
+    )
+    conn.commit()
+    conn.close()
+
+    service = SaveService(db_path)
+    save_id = service.get_saves("u1")[0]["save_id"]
+    assert service.load_game(save_id)["game_state"] == STATE
+
+
+def test_garbage_collection(db_path):
+    """删除最后一个引用后回收 Blob"""
+    service = SaveService(db_path)
+    save_id = service.save_game("u1", 1, "存档", STATE, auto_save=True)
+    for turn in range(3):
+        service.auto_save("u1", {**STATE, "turn": turn}, turn_number=turn)
+    assert blob_count(db_path) == 4
+
+    service.cleanup_old_auto_saves("u1", keep_count=1)
+    assert blob_count(db_path) == 2
+
+    service.delete_save(save_id)
+    assert blob_count(db_path) == 1
+
+
+def world_state(world_id="w1", version="v1"):
+    """世界包初始状态（大地图 + 任务）"""
+    return {
+        "player": {"hp": 100, "location": "起点"},
+        "map": {"nodes": [{"id": f"n{i}", "name": f"地点{i}"} for i in range(300)]},
+        "quests": [{"id": f"q{i}", "status": "inactive"} for i in range(50)],
+        "log": [],
+        "metadata": {"worldPackId": world_id, "worldPackVersion": version},
+    }
+
+
+def test_world_saves_store_overlay(db_path):
+    """世界包游戏只保存相对基准的覆盖，读取时合并"""
+    service = SaveService(db_path)
+    with connect(db_path) as conn:
+        base_hash = register_baseline(conn, "w1", "v1", world_state())
+        base_size = conn.execute(
+            "SELECT size FROM state_blobs WHERE hash = ?", (base_hash,)
+        ).fetchone()[0]
+
+    state = world_state()
+    state["player"]["hp"] = 42
+    state["quests"][3]["status"] = "active"
+    state["log"].append("出发")
+    save_id = service.save_game("u1", 1, "存档", state)
+
+    with connect(db_path) as conn:
+        row = conn.execute(
+            "SELECT state_hash, base_hash FROM game_saves WHERE id = ?", (save_id,)
+        ).fetchone()
+        overlay_size = conn.execute(
+            "SELECT size FROM state_blobs WHERE hash = ?", (row[0],)
+        ).fetchone()[0]
+
+    assert row[1] == base_hash
+    assert overlay_size * 10 < base_size
+    assert service.load_game(save_id)["game_state"] == state
+
+    snapshot_id = service.get_snapshots(save_id)[0]["snapshot_id"]
+    assert service.load_snapshot(snapshot_id) == state
+
+
+def test_unregistered_world_saves_full_state(db_path):
+    """未登记基准的世界包版本保存完整状态"""
+    service = SaveService(db_path)
+    state = world_state(version="unknown")
+    save_id = service.save_game("u1", 1, "存档", state)
+
+    with connect(db_path) as conn:
+        assert conn.execute("SELECT base_hash FROM game_saves").fetchone()[0] is None
+    assert service.load_game(save_id)["game_state"] == state
+
+
+def test_baseline_survives_garbage_collection(db_path):
+    """登记的基准不会因存档删除而被回收"""
+    service = SaveService(db_path)
+    with connect(db_path) as conn:
+        base_hash = register_baseline(conn, "w1", "v1", world_state())
+        assert register_baseline(conn, "w1", "v1", world_state()) == base_hash
+
+    save_id = service.save_game("u1", 1, "存档", world_state())
+    service.delete_save(save_id)
+
+    with connect(db_path) as conn:
+        assert get_state(conn, base_hash) == world_state()
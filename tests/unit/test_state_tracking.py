@@ -0,0 +1,222 @@
+"""GameState 分区序列化缓存单元测试
+
+测试分区脏标记、缓存片段拼接结果与 model_dump_json() 一致，以及复制后的追踪。
+"""
+
+import copy
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "web" / "backend"))
+
+from game.state_tracking import LiveModelCache
+from game.game_tools import (
+    GameLogEntry,
+    GameMap,
+    GameState,
+    InventoryItem,
+    MapNode,
+    PlayerState,
+    Quest,
+    QuestObjective,
+    WorldState,
+)
+
+
+@pytest.fixture
+def state():
+    state = GameState(
+        player=PlayerState(
+            inventory=[InventoryItem(id="torch", name="火把", description="照明")]
+        ),
+        world=WorldState(flags={"gate": {"opened": False}}),
+        quests=[
+            Quest(
+                id="q1",
+                title="寻找钥匙",
+                description="找到城门钥匙",
+                objectives=[QuestObjective(id="o1", description="搜索守卫室")],
+            )
+        ],
+        map=GameMap(nodes=[MapNode(id="start", name="城门", shortDesc="高大的城门")]),
+        metadata={"worldPackId": "w1"},
+    )
+    state.to_json_bytes()
+    return state
+
+
+def assert_consistent(state):
+    assert state.to_json_bytes() == state.model_dump_json().encode()
+
+
+def test_fresh_state_serializes_all_sections():
+    """新建的状态全部分区为脏，拼接结果与 model_dump_json 一致"""
+    state = GameState(player=PlayerState(), world=WorldState(), map=GameMap())
+    assert all(state.is_dirty(name) for name in state.sections)
+    assert_consistent(state)
+    assert not any(state.is_dirty(name) for name in state.sections)
+
+
+def test_unchanged_sections_reuse_cached_fragments(state):
+    """只有修改过的分区重新序列化"""
+    cached = {name: state.section_json(name) for name in state.sections}
+
+    state.player.hp = 42
+    state.turn_number = 7
+
+    assert [name for name in state.sections if state.is_dirty(name)] == ["player"]
+    assert_consistent(state)
+    for name in state.sections:
+        if name != "player":
+            assert state.section_json(name) is cached[name]
+
+
+@pytest.mark.parametrize(
+    "mutate, section",
+    [
+        (lambda s: s.player.inventory.append(InventoryItem(id="rope", name="绳索", description="")), "player"),
+        (lambda s: setattr(s.player.inventory[0], "quantity", 3), "player"),
+        (lambda s: s.player.traits.extend(["勇敢"]), "player"),
+        (lambda s: s.world.flags["gate"].update(opened=True), "world"),
+        (lambda s: s.world.discoveredLocations.append("城门"), "world"),
+        (lambda s: setattr(s.quests[0].objectives[0], "completed", True), "quests"),
+        (lambda s: s.quests.pop(), "quests"),
+        (lambda s: setattr(s.map, "currentNodeId", "start"), "map"),
+        (lambda s: s.map.nodes.append(MapNode(id="inn", name="旅店", shortDesc="")), "map"),
+        (lambda s: s.log.append(GameLogEntry(turn=1, actor="player", text="开门", timestamp=1)), "log"),
+        (lambda s: s.metadata.setdefault("worldPackVersion", "1.0.0"), "metadata"),
+    ],
+)
+def test_in_place_mutations_mark_section(state, mutate, section):
+    """嵌套模型赋值与列表 / 字典原地修改标记所属分区"""
+    mutate(state)
+    assert [name for name in state.sections if state.is_dirty(name)] == [section]
+    assert_consistent(state)
+
+
+def test_replaced_section_is_tracked(state):
+    """整体替换的分区重新绑定，之后的原地修改同样被追踪"""
+    state.world = WorldState(time=5)
+    assert_consistent(state)
+
+    state.world.flags["night"] = True
+    assert state.is_dirty("world")
+    assert_consistent(state)
+
+
+def test_assigned_list_is_copied(state):
+    """赋值的普通列表被复制，后续修改需通过状态进行"""
+    entries = [GameLogEntry(turn=1, actor="player", text="开门", timestamp=1)]
+    state.log = entries
+    assert state.log is not entries
+    state.to_json_bytes()
+
+    entries.append(GameLogEntry(turn=2, actor="system", text="门开了", timestamp=2))
+    assert len(state.log) == 1
+
+    state.log.append(entries[1])
+    assert state.is_dirty("log")
+    assert_consistent(state)
+
+
+def test_mark_dirty_for_untracked_changes(state):
+    """绕过追踪的修改需手动标记"""
+    state.player.__dict__["hp"] = 1
+    assert not state.is_dirty("player")
+
+    state.mark_dirty("player")
+    assert_consistent(state)
+
+
+def test_deep_copy_tracks_independently(state):
+    """深复制的状态重新绑定分区，修改互不影响"""
+    copied = state.model_copy(deep=True)
+    copied.player.inventory[0].quantity = 9
+
+    assert not state.is_dirty("player")
+    assert_consistent(state)
+    assert_consistent(copied)
+
+    cloned = copy.deepcopy(state)
+    cloned.log.append(GameLogEntry(turn=2, actor="system", text="夜幕降临", timestamp=2))
+    assert not state.is_dirty("log")
+    assert_consistent(cloned)
+
+
+def test_shallow_copy_does_not_use_cache(state):
+    """浅复制共享分区对象，复制品每次重新序列化"""
+    copied = state.model_copy()
+    copied.world.time = 99
+
+    assert_consistent(state)
+    assert_consistent(copied)
+
+
+def test_equality_ignores_cache(state):
+    """缓存状态不影响模型比较"""
+    restored = GameState.model_validate_json(state.to_json_bytes())
+    assert restored == state
+
+
+def echo(state):
+    """客户端回传的状态（响应 JSON 解析后的 dict）"""
+    return json.loads(state.to_json_bytes())
+
+
+def test_live_cache_reuses_unchanged_sections(state):
+    """回传未改动的状态时沿用常驻模型，未修改的分区直接使用缓存片段"""
+    live = LiveModelCache(GameState)
+    state.session_id = "s1"
+    live.release(state)
+    cached = {name: state.section_json(name) for name in state.sections}
+
+    acquired = live.acquire(echo(state))
+    assert acquired is state
+    assert not any(acquired.is_dirty(name) for name in acquired.sections)
+
+    acquired.player.hp = 7
+    assert_consistent(acquired)
+    live.release(acquired)
+    for name in state.sections:
+        if name != "player":
+            assert state.section_json(name) is cached[name]
+    assert live.get_stats() == {"sessions": 1, "hits": 1, "misses": 0}
+
+
+def test_live_cache_revalidates_client_changes(state):
+    """客户端改动的字段重新校验，只有这些分区标记为脏"""
+    live = LiveModelCache(GameState)
+    state.session_id = "s1"
+    live.release(state)
+
+    data = echo(state)
+    data["world"]["flags"]["gate"]["opened"] = True
+    data["turn_number"] = 9
+    acquired = live.acquire(data)
+
+    assert acquired is state
+    assert [name for name in acquired.sections if acquired.is_dirty(name)] == ["world"]
+    assert acquired.turn_number == 9
+    assert acquired.world.flags["gate"]["opened"] is True
+    assert acquired.to_json_bytes() == json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def test_live_cache_misses(state):
+    """未登记、已被取走或回传不完整时完整构建"""
+    live = LiveModelCache(GameState)
+    state.session_id = "s1"
+    data = echo(state)
+    assert live.acquire(data) is not state
+
+    live.release(state)
+    assert live.acquire(data) is state
+    assert live.acquire(data) is not state
+
+    live.release(state)
+    del data["log"]
+    assert live.acquire(data) is not state
+    assert live.get_stats()["misses"] == 3
@@ -0,0 +1,139 @@
+"""存储维护任务单元测试
+
+测试快照的指数保留策略、按用户清理自动保存、Blob 回收与增量 VACUUM / ANALYZE。
+"""
+
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from web.backend.database.connection import connect
+from web.backend.services.save_service import SaveService
+from web.backend.services.storage_maintenance import (
+    RetentionPolicy,
+    StorageMaintenanceWorker,
+    select_snapshots_to_prune,
+)
+
+SCHEMA = """
+CREATE TABLE save_snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    save_id INTEGER NOT NULL,
+    turn_number INTEGER NOT NULL,
+    snapshot_data TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE auto_saves (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    game_state TEXT NOT NULL,
+    turn_number INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+STATE = {"player": {"hp": 80, "location": "城门"}, "world": {"time": 3}}
+NOW = datetime(2026, 3, 1, 12, 0, 0)
+
+
+def ts(**delta):
+    return (NOW - timedelta(**delta)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "saves.db")
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    conn.executescript(SCHEMA)
+    conn.close()
+    return path
+
+
+def test_retention_keeps_recent_then_thins():
+    """近期全部保留，之后每小时 / 每天 / 每周只保留最新一个"""
+    snapshots = [
+        (1, ts(minutes=5)),
+        (2, ts(minutes=30)),
+        (3, ts(hours=2, minutes=10)),
+        (4, ts(hours=2, minutes=40)),  # 与 3 同一小时
+        (5, ts(days=3, hours=1)),
+        (6, ts(days=3, hours=2)),  # 与 5 同一天
+        (7, ts(days=60)),
+        (8, ts(days=60, hours=1)),  # 与 7 同一周
+        (9, ts(days=90)),
+    ]
+
+    prune = select_snapshots_to_prune(snapshots, NOW, RetentionPolicy())
+    assert sorted(prune) == [4, 6, 8]
+
+
+def test_prune_autosaves_per_user(db_path):
+    """每个用户只保留最近的自动保存，多余的 Blob 被回收"""
+    service = SaveService(db_path)
+    for turn in range(4):
+        service.auto_save("u1", {**STATE, "turn": turn}, turn_number=turn)
+    service.auto_save("u2", STATE, turn_number=1)
+
+    worker = StorageMaintenanceWorker(db_path, autosave_keep_count=2)
+    report = worker.run_cycle(now=NOW)
+
+    assert report.autosaves_pruned == 2
+    assert report.blobs_collected == 2
+    with connect(db_path) as conn:
+        rows = conn.execute(
+            "SELECT user_id, turn_number FROM auto_saves ORDER BY user_id, turn_number"
+        ).fetchall()
+    assert rows == [("u1", 2), ("u1", 3), ("u2", 1)]
+
+
+def test_thin_snapshots(db_path):
+    """稀疏化每个存档的旧快照"""
+    with connect(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO save_snapshots (save_id, turn_number, snapshot_data, created_at) "
+            "VALUES (?, ?, '{}', ?)",
+            [
+                (1, 1, ts(days=3, hours=1)),
+                (1, 2, ts(days=3, hours=2)),
+                (1, 3, ts(minutes=1)),
+                (2, 1, ts(days=3, hours=1)),
+            ],
+        )
+
+    report = StorageMaintenanceWorker(db_path).run_cycle(now=NOW)
+
+    assert report.snapshots_pruned == 1
+    with connect(db_path) as conn:
+        turns = conn.execute(
+            "SELECT save_id, turn_number FROM save_snapshots ORDER BY save_id, turn_number"
+        ).fetchall()
+    assert turns == [(1, 1), (1, 3), (2, 1)]
+
+
+def test_vacuum_and_analyze(db_path):
+    """增量 VACUUM 释放空闲页，ANALYZE 跨轮次轮转所有表"""
+    service = SaveService(db_path)
+    for turn in range(20):
+        service.auto_save("u1", {"turn": turn, "noise": os.urandom(8000).hex()}, turn_number=turn)
+
+    worker = StorageMaintenanceWorker(db_path, autosave_keep_count=1, time_budget=0)
+    report = worker.run_cycle(now=NOW)
+
+    assert report.pages_vacuumed > 0
+    with connect(db_path) as conn:
+        assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+        tables = {
+            row[0]
+            for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+            )
+        }
+
+    # 时间预算为 0 时每轮只分析一张表，下一轮从下一张继续
+    analyzed = list(report.tables_analyzed)
+    while len(analyzed) < len(tables):
+        analyzed += worker.run_cycle(now=NOW).tables_analyzed
+    assert set(analyzed) == tables
@@ -0,0 +1,95 @@
+"""世界数据批量写入单元测试
+
+测试 create_regions / create_locations / create_pois / save_detail_layers 的批量写入，
+以及工作单元的一次性提交与异常回滚。
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加后端目录到路径（world_db 使用后端的顶层包导入）
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "web" / "backend"))
+
+from database.world_db import WorldDatabase, WorldUnitOfWork
+from models.world_models import POI, DetailLayer, Faction, Location, Region
+
+
+@pytest.fixture
+def world_db(tmp_path):
+    return WorldDatabase(str(tmp_path / "world.db"))
+
+
+def regions(count):
+    return [Region(id=f"r{i}", world_id="w1", name=f"区域{i}", biome="荒原") for i in range(count)]
+
+
+def locations(region_id, count):
+    return [
+        Location(
+            id=f"{region_id}-l{i}",
+            region_id=region_id,
+            name=f"地点{i}",
+            type="wilderness",
+            geometry=["山丘"],
+        )
+        for i in range(count)
+    ]
+
+
+def test_bulk_create(world_db):
+    """批量接口写入全部实体，读取结果与逐条写入一致"""
+    assert world_db.create_regions(regions(3)) == 3
+    assert world_db.create_locations(locations("r0", 20)) == 20
+    assert world_db.create_pois(
+        [POI(id=f"p{i}", location_id="r0-l0", name=f"物件{i}", type="object") for i in range(5)]
+    ) == 5
+    layers = [
+        DetailLayer(
+            id=f"d-{layer_type}", target_type="location", target_id="r0-l0",
+            layer_type=layer_type, content={"text": layer_type},
+        )
+        for layer_type in ("geometry", "sensory")
+    ]
+    assert world_db.save_detail_layers(layers) == 2
+
+    assert len(world_db.get_regions_by_world("w1")) == 3
+    assert world_db.get_location("r0-l7").geometry == ["山丘"]
+    assert len(world_db.get_pois_by_location("r0-l0")) == 5
+    assert len(world_db.get_detail_layers("location", "r0-l0")) == 2
+
+
+def test_unit_of_work_commits_once(world_db):
+    """工作单元退出时按依赖顺序一次写入"""
+    with world_db.unit_of_work() as uow:
+        uow.add(Faction(id="f1", world_id="w1", name="守夜人", purpose="守护"))
+        uow.add(*regions(2))
+        for region_id in ("r0", "r1"):
+            uow.add(*locations(region_id, 50))
+        assert world_db.get_regions_by_world("w1") == []
+
+    assert len(world_db.get_regions_by_world("w1")) == 2
+    assert len(world_db.get_locations_by_region("r1")) == 50
+    assert [f.name for f in world_db.get_factions_by_world("w1")] == ["守夜人"]
+
+
+def test_unit_of_work_discards_on_error(world_db):
+    """块内异常时不写入任何实体；重复主键使整个事务回滚"""
+    with pytest.raises(RuntimeError):
+        with world_db.unit_of_work() as uow:
+            uow.add(*regions(2))
+            raise RuntimeError("生成失败")
+    assert world_db.get_regions_by_world("w1") == []
+
+    world_db.create_region(regions(1)[0])
+    with pytest.raises(sqlite3.IntegrityError):
+        with world_db.unit_of_work() as uow:
+            uow.add(*locations("r0", 3))
+            uow.add(*regions(2))  # r0 已存在
+    assert world_db.get_locations_by_region("r0") == []
+
+    with pytest.raises(TypeError):
+        WorldUnitOfWork().add(object())
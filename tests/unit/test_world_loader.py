@@ -0,0 +1,131 @@
+"""WorldPack 加载器单元测试
+
+测试世界包初始状态的基准登记、由基准直接构建 GameState 的快速路径与抽样比对。
+"""
+
+import gzip
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "web" / "backend"))
+
+from database import json_codec
+from database.connection import connect
+from database.state_blobs import get_world_baseline, pack_version
+from models.world_pack import NPC, Coord, Location, Quest, WorldMeta, WorldPack
+from services.world_loader import WorldLoader
+
+WORLD_ID = "w1"
+
+
+@pytest.fixture
+def pack():
+    return WorldPack(
+        meta=WorldMeta(id=WORLD_ID, title="北境", seed=7, created_at=datetime(2026, 3, 1, 12, 0)),
+        locations=[
+            Location(id="gate", name="城门", biome="city", coord=Coord(x=0, y=0), npcs=["guard"]),
+            Location(id="woods", name="松林", biome="forest", coord=Coord(x=2, y=1)),
+        ],
+        npcs=[NPC(id="guard", name="守卫", role="guard", persona="寡言", home_location_id="gate")],
+        quests=[Quest(id="q1", title="巡逻", line="main", summary="沿城墙巡逻")],
+    )
+
+
+@pytest.fixture
+def db_path(tmp_path, pack):
+    path = str(tmp_path / "worlds.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE worlds (id TEXT PRIMARY KEY, json_gz BLOB NOT NULL)")
+    conn.execute(
+        "INSERT INTO worlds (id, json_gz) VALUES (?, ?)",
+        (WORLD_ID, gzip.compress(json_codec.dumps(pack))),
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _version(loader):
+    return pack_version(loader._load_pack_json(WORLD_ID))
+
+
+def test_first_load_registers_baseline(db_path):
+    """首次加载完整转换世界包并登记基准"""
+    loader = WorldLoader(db_path)
+    state = loader.load_and_convert(WORLD_ID)
+
+    assert state.metadata["worldPackVersion"] == _version(loader)
+    with connect(db_path) as conn:
+        assert get_world_baseline(conn, WORLD_ID, _version(loader)) == state.model_dump()
+
+
+def test_registered_baseline_skips_conversion(db_path, monkeypatch):
+    """基准已登记时直接由基准构建，不再解析世界包"""
+    loader = WorldLoader(db_path)
+    first = loader.load_and_convert(WORLD_ID)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("不应重新转换世界包")
+
+    monkeypatch.setattr(WorldPack, "model_validate_json", fail)
+    monkeypatch.setattr(WorldLoader, "world_pack_to_game_state", fail)
+
+    second = loader.load_and_convert(WORLD_ID)
+    assert second == first
+    assert second is not first
+
+
+def test_loaded_state_does_not_share_baseline(db_path):
+    """修改加载的状态不影响缓存的基准"""
+    loader = WorldLoader(db_path)
+    loader.load_and_convert(WORLD_ID)
+
+    state = loader.load_and_convert(WORLD_ID)
+    state.player.hp = 1
+    state.map.nodes[0].metadata["visited"] = True
+    state.metadata["playTime"] = 60
+
+    with connect(db_path) as conn:
+        baseline = get_world_baseline(conn, WORLD_ID, _version(loader))
+    assert baseline["player"]["hp"] == 100
+    assert "visited" not in baseline["map"]["nodes"][0]["metadata"]
+    assert baseline["metadata"]["playTime"] == 0
+
+
+def test_schema_version_mismatch_reconverts(db_path, monkeypatch):
+    """基准的 schema 版本与当前模型不一致时重新转换"""
+    loader = WorldLoader(db_path)
+    loader.load_and_convert(WORLD_ID)
+
+    with connect(db_path) as conn:
+        baseline = get_world_baseline(conn, WORLD_ID, _version(loader))
+    monkeypatch.setitem(baseline, "version", "0.9.0")
+
+    calls = []
+    convert = WorldLoader.world_pack_to_game_state
+
+    def counting(self, *args, **kwargs):
+        calls.append(1)
+        return convert(self, *args, **kwargs)
+
+    monkeypatch.setattr(WorldLoader, "world_pack_to_game_state", counting)
+    state = loader.load_and_convert(WORLD_ID)
+
+    assert calls == [1]
+    assert state.version == "1.0.0"
+
+
+def test_sampled_verification_reconverts(db_path, caplog):
+    """抽样命中时完整转换并与基准比对，一致时不告警"""
+    WorldLoader(db_path).load_and_convert(WORLD_ID)
+
+    loader = WorldLoader(db_path, verify_sample_rate=1.0)
+    state = loader.load_and_convert(WORLD_ID)
+
+    assert state.player.location == "gate"
+    assert "不一致" not in caplog.text
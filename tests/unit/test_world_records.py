@@ -0,0 +1,82 @@
+"""世界数据投影查询与按需解码单元测试
+
+测试区域 / 地点 / POI 的摘要查询，以及 JSON 列在首次访问时才解码。
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加后端目录到路径（world_db 使用后端的顶层包导入）
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root / "web" / "backend"))
+
+from database.world_db import WorldDatabase
+from models.world_models import POI, Location, Region
+
+
+@pytest.fixture
+def world_db(tmp_path):
+    db = WorldDatabase(str(tmp_path / "world.db"))
+    db.create_region(
+        Region(id="r1", world_id="w1", name="冻海海岸", biome="海岸", resources=["鱼"])
+    )
+    for i in range(3):
+        db.create_location(
+            Location(
+                id=f"l{i}",
+                region_id="r1",
+                name=f"地点{i}",
+                type="settlement",
+                geometry=["码头"] * 50,
+                sensory=["海风"],
+            )
+        )
+    db.create_poi(
+        POI(id="p1", location_id="l0", name="旧灯塔", type="object", risks=["坍塌"])
+    )
+    return db
+
+
+def test_summaries_only_select_listing_columns(world_db):
+    """摘要查询返回列表所需字段"""
+    regions = world_db.get_region_summaries("w1")
+    assert [(r.id, r.name, r.biome) for r in regions] == [("r1", "冻海海岸", "海岸")]
+
+    locations = world_db.get_location_summaries("r1")
+    assert [l.name for l in locations] == ["地点0", "地点1", "地点2"]
+    assert not hasattr(locations[0], "geometry")
+
+    assert [l.id for l in world_db.get_location_summaries_by_world("w1")] == ["l0", "l1", "l2"]
+
+    pois = world_db.get_poi_summaries("l0")
+    assert [(p.name, p.interacted) for p in pois] == [("旧灯塔", False)]
+
+
+def test_lazy_location_decodes_on_access(world_db):
+    """JSON 列首次访问时解码，to_model() 与完整查询一致"""
+    lazy = world_db.get_lazy_locations_by_region("r1")[0]
+
+    assert lazy.name == "地点0"
+    assert not lazy.is_decoded("geometry")
+
+    assert lazy.sensory == ["海风"]
+    assert lazy.is_decoded("sensory")
+    assert not lazy.is_decoded("geometry")
+
+    assert lazy.to_model() == world_db.get_location("l0")
+    with pytest.raises(AttributeError):
+        lazy.missing_field
+
+
+def test_lazy_region_and_poi(world_db):
+    """区域与 POI 的按需解码记录"""
+    region = world_db.get_lazy_regions_by_world("w1")[0]
+    assert region.resources == ["鱼"]
+    assert region.canon_locked is False
+    assert region.to_model() == world_db.get_region("r1")
+
+    poi = world_db.get_lazy_pois_by_location("l0")[0]
+    assert poi.risks == ["坍塌"]
+    assert poi.to_model() == world_db.get_pois_by_location("l0")[0]
@@ -0,0 +1,128 @@
+"""
+测试 token 计数与对话上下文窗口
+
+测试可插拔分词器、消息计数缓存、分支前缀和与二分窗口选择。
+"""
+
+import sys
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils import tokens
+from src.utils.tokens import (
+    MESSAGE_OVERHEAD,
+    heuristic_tokens,
+    count_tokens,
+    fit_recent,
+    window_start,
+)
+from src.models.conversation_history import ConversationBranch
+
+
+@pytest.fixture
+def char_tokenizer():
+    """每个字符计 1 token 的分词器，测试结束后恢复原分词器"""
+    original = tokens.get_tokenizer()
+    calls = []
+
+    def tokenizer(text):
+        calls.append(text)
+        return len(text)
+
+    tokens.set_tokenizer(tokenizer)
+    yield calls
+    tokens.set_tokenizer(original)
+
+
+def brute_force_window(branch, max_tokens):
+    """逐条向前累加的参考实现"""
+    result = []
+    total = 0
+    for message in reversed(branch.messages):
+        cost = len(message.content) + MESSAGE_OVERHEAD
+        if total + cost > max_tokens:
+            break
+        result.insert(0, message)
+        total += cost
+    return result
+
+
+class TestTokenCounting:
+    """测试 token 计数"""
+
+    def test_heuristic_cjk_and_ascii(self):
+        """中文按 1.5 token/字，其他字符按 4 字符/token"""
+        assert heuristic_tokens("") == 0
+        assert heuristic_tokens("你好") == 3
+        assert heuristic_tokens("abcdefgh") == 2
+        assert heuristic_tokens("你好abcd") == 4
+
+    def test_pluggable_tokenizer(self, char_tokenizer):
+        """set_tokenizer 替换全局分词器并递增版本"""
+        assert count_tokens("hello") == 5
+        assert count_tokens("hello", tokenizer=lambda text: 1) == 1
+
+        version = tokens.tokenizer_version()
+        tokens.set_tokenizer(lambda text: 0)
+        assert tokens.tokenizer_version() == version + 1
+
+    def test_window_start(self):
+        """二分查找最长的预算内后缀"""
+        prefix = [0, 5, 10, 15, 20]
+        assert window_start(prefix, 20) == 0
+        assert window_start(prefix, 12) == 2
+        assert window_start(prefix, 4) == 4
+
+    def test_fit_recent(self, char_tokenizer):
+        """保留预算内最近的聊天消息"""
+        messages = [{"role": "user", "content": "x" * 6} for _ in range(5)]
+        assert len(fit_recent(messages, 30)) == 3
+        assert fit_recent(messages, 5) == []
+
+
+class TestContextWindow:
+    """测试分支上下文窗口"""
+
+    def test_matches_reference(self, char_tokenizer):
+        """二分窗口与逐条累加结果一致"""
+        branch = ConversationBranch()
+        for i in range(40):
+            branch.add_message("user" if i % 2 else "assistant", "x" * (i % 7 + 1))
+
+        for budget in (0, 3, 10, 37, 100, 1000):
+            assert branch.get_context_window(budget) == brute_force_window(branch, budget)
+
+    def test_message_count_is_cached(self, char_tokenizer):
+        """每条消息只计数一次，追加消息时增量更新前缀和"""
+        branch = ConversationBranch()
+        branch.add_message("user", "first")
+        branch.get_context_window(100)
+        branch.add_message("assistant", "second")
+        branch.get_context_window(100)
+        branch.get_context_window(100)
+
+        assert char_tokenizer == ["first", "second"]
+        assert branch.count_tokens() == 11 + 2 * MESSAGE_OVERHEAD
+
+    def test_tokenizer_change_rebuilds(self, char_tokenizer):
+        """更换分词器后重新计数"""
+        branch = ConversationBranch()
+        branch.add_message("user", "abc")
+        assert branch.count_tokens() == 3 + MESSAGE_OVERHEAD
+
+        tokens.set_tokenizer(lambda text: 100)
+        assert branch.count_tokens() == 100 + MESSAGE_OVERHEAD
+
+    def test_truncated_branch_rebuilds(self, char_tokenizer):
+        """消息被截断后前缀和重建"""
+        branch = ConversationBranch()
+        for _ in range(5):
+            branch.add_message("user", "abcd")
+        branch.count_tokens()
+
+        del branch.messages[2:]
+        assert branch.count_tokens() == 2 * (4 + MESSAGE_OVERHEAD)
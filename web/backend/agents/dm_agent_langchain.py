@@ -19,6 +19,7 @@ from utils.logger import get_logger
 from services.world_indexer import create_world_indexer
 from config.settings import settings as _settings
 from config.settings import settings
+from src.utils.tokens import fit_recent, message_tokens
 logger = get_logger(__name__)
 
 from .game_tools_langchain import ALL_GAME_TOOLS, set_current_session_id
@@ -257,16 +258,22 @@ class DMAgentLangChain:
         Returns:
             消息历史列表 [{"role": "user"|"assistant", "content": str}]
         """
-        messages = []
+        # 世界检索片段（可选）与当前行动先占用预算，剩余预算留给历史日志
+        kb = self._retrieve_snippets(current_player_action, game_state)
+        current_message = {
+            "role": "user",
+            "content": f"玩家行动: {current_player_action}\n\n请作为DM处理这个行动，使用工具更新游戏状态，并生成精彩的场景描述。",
+        }
+        budget = settings.dm_history_token_budget - message_tokens(current_message["content"])
+        if kb:
+            budget -= message_tokens(kb)
 
         # 🔥 修复：从 game_state.log 读取历史对话（不是 logs）
         # log 格式: List[GameLogEntry] = [{"actor": str, "text": str, "timestamp": int}]
         log_entries = game_state.get("log", [])
 
-        # 只取最近10条日志（避免上下文过长）
-        recent_logs = log_entries[-10:] if len(log_entries) > 10 else log_entries
-
-        for log_entry in recent_logs:
+        history = []
+        for log_entry in log_entries:
             # 兼容两种格式：dict 和 object
             if isinstance(log_entry, dict):
                 actor = log_entry.get("actor", "unknown")
@@ -277,22 +284,19 @@ class DMAgentLangChain:
                 text = getattr(log_entry, "text", "")
 
             if actor == "player":
-                messages.append({"role": "user", "content": f"玩家行动: {text}"})
+                history.append({"role": "user", "content": f"玩家行动: {text}"})
             elif actor == "system" or actor == "dm":
-                messages.append({"role": "assistant", "content": text})
+                history.append({"role": "assistant", "content": text})
+
+        # 只保留 token 预算内最近的历史（避免上下文过长）
+        messages = fit_recent(history, budget)
 
         # 在加入当前行动前，注入世界检索片段（可选）
-        kb = self._retrieve_snippets(current_player_action, game_state)
         if kb:
             messages.append({"role": "system", "content": kb})
 
         # 添加当前玩家行动
-        messages.append(
-            {
-                "role": "user",
-                "content": f"玩家行动: {current_player_action}\n\n请作为DM处理这个行动，使用工具更新游戏状态，并生成精彩的场景描述。",
-            }
-        )
+        messages.append(current_message)
 
         return messages
 
@@ -28,6 +28,7 @@ except Exception:
 
 from config.settings import settings
 from utils.logger import get_logger
+from src.utils.tokens import fit_recent
 
 # 复用现有工具与状态上下文
 from agents.game_tools_langchain import ALL_GAME_TOOLS, set_state
@@ -161,7 +162,8 @@ class DMGraphAgent:
         策略：
         - 日志条数超过 14 条
         - 且距离上次摘要 >= 3 回合
-        则对“最旧的 N-8 条”生成摘要，写入 metadata.log_summary，并仅保留最近 8 条至 state.log。
+        则对 token 预算（dm_history_token_budget）之外的较早日志生成摘要，写入 metadata.log_summary，
+        state.log 只保留预算内的最近日志。
         """
         try:
             logs = state_obj.log or []
@@ -173,12 +175,6 @@ class DMGraphAgent:
             if turn_no - last_sum_turn < 3:
                 return
 
-            # 切分：旧日志 = 除去最后 8 条
-            keep_recent = 8
-            old_logs = logs[:-keep_recent]
-            recent_logs = logs[-keep_recent:]
-
-            # 构建待摘要文本
             def fmt(entry):
                 try:
                     return f"[{entry.actor}] {entry.text}"
@@ -188,6 +184,15 @@ class DMGraphAgent:
                     text = getattr(entry, "text", None) or entry.get("text", "")
                     return f"[{actor}] {text}"
 
+            # 切分：预算内的最近日志保留，其余作为旧日志摘要
+            keep_recent = len(fit_recent(
+                [{"content": fmt(e)} for e in logs], settings.dm_history_token_budget
+            ))
+            if keep_recent >= len(logs):
+                return
+            old_logs = logs[:len(logs) - keep_recent]
+            recent_logs = logs[len(logs) - keep_recent:]
+
             old_text = "\n".join(fmt(e) for e in old_logs)[-6000:]
 
             # 调用同一模型做简要摘要（成本可控，且减少后续回合 token）
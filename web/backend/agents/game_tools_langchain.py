@@ -75,7 +75,11 @@ def init_state_manager(db_path: str):
     """
     global state_cache
     db_manager = GameStateManager(db_path)
-    state_cache = GameStateCache(db_manager)
+    state_cache = GameStateCache(
+        db_manager,
+        max_sessions=settings.max_game_sessions,
+        ttl=settings.session_timeout,
+    )
 
 
 def _create_default_state() -> Dict[str, Any]:
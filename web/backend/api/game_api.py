@@ -4,14 +4,19 @@
 
 import asyncio
 import json
+import uuid
 from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from game.game_engine import GameEngine, GameTurnRequest, GameTurnResponse
 from game.game_tools import GameState
+from game.state_tracking import LiveModelCache
+from ..database import json_codec
+from ..database.async_db import run_in_db
 from ..database.game_state_db import GameStateManager
 from pydantic import BaseModel
+from services.auto_save import AutoSaveQueue
 from services.save_service import SaveService
 from utils.logger import get_logger
 
@@ -27,10 +32,16 @@ save_service: Optional[SaveService] = None
 # 全局游戏状态管理器实例
 game_state_manager: Optional[GameStateManager] = None
 
+# 全局自动保存队列
+auto_save_queue: Optional[AutoSaveQueue] = None
+
+# 跨回合常驻的 GameState（按 session_id），客户端回传的未改动分区沿用已缓存的序列化片段
+live_states = LiveModelCache(GameState)
+
 
 def init_game_engine(llm_client, db_path: str = None):
     """初始化游戏引擎和存档服务"""
-    global game_engine, save_service, game_state_manager
+    global game_engine, save_service, game_state_manager, auto_save_queue, live_states
     game_engine = GameEngine(llm_client, db_path=db_path)
 
     # 初始化状态/存档服务
@@ -49,7 +60,28 @@ def init_game_engine(llm_client, db_path: str = None):
             # 不中断启动，但记录日志
             logger.warning("⚠️  初始化游戏状态缓存失败: %s", exc)
 
+        from config.settings import settings
+
         save_service = SaveService(db_path)
+        auto_save_queue = AutoSaveQueue(
+            save_service,
+            interval_turns=settings.auto_save_interval,
+            idle_delay=settings.auto_save_idle_delay,
+        )
+        live_states = LiveModelCache(GameState, max_entries=settings.max_game_sessions)
+
+
+def _submit_auto_save(state: GameState, user_id: str = "default_user"):
+    """登记回合结束时的状态，由自动保存队列在后台合并写入
+
+    登记的是序列化后的 JSON（与响应共用缓存片段）：GameState 之后会被下一回合继续修改。
+    """
+    if not auto_save_queue:
+        return
+    try:
+        auto_save_queue.submit(user_id, state.to_json_bytes(), turn_number=state.world.time)
+    except Exception as e:
+        logger.error(f"[WARNING] 登记自动保存失败: {e}")
 
 
 # ==================== 请求/响应模型 ====================
@@ -96,14 +128,15 @@ async def init_game(request: InitGameRequest):
         if request.worldId:
             from pathlib import Path
 
+            from config.settings import settings
             from services.world_loader import WorldLoader
 
             # 获取数据库路径
             project_root = Path(__file__).parent.parent.parent.parent
             db_path = project_root / "data" / "sqlite" / "novel.db"
 
-            loader = WorldLoader(str(db_path))
-            state = loader.load_and_convert(request.worldId)
+            loader = WorldLoader(str(db_path), verify_sample_rate=settings.world_load_verify_rate)
+            state = await run_in_db(loader.load_and_convert, request.worldId)
 
             if not state:
                 raise HTTPException(status_code=404, detail=f"世界包 {request.worldId} 不存在")
@@ -123,6 +156,8 @@ async def init_game(request: InitGameRequest):
             }
 
             narration = tone_narrations.get(world_tone, tone_narrations["epic"])
+            if state.session_id is None:
+                state.session_id = f"game_{uuid.uuid4().hex[:16]}"
 
             suggestions = [
                 "环顾四周",
@@ -142,18 +177,28 @@ async def init_game(request: InitGameRequest):
                 "查看任务"
             ]
 
-        return {
-            "success": True,
-            "state": state.model_dump(),
-            "narration": narration,
-            "suggestions": suggestions
-        }
+        response = _state_response(
+            {"success": True, "narration": narration, "suggestions": suggestions},
+            "state",
+            state,
+        )
+        live_states.release(state)
+        return response
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"初始化游戏失败: {str(e)}")
 
 
+def _state_response(payload: Dict[str, Any], state_key: str, state: GameState) -> Response:
+    """JSON 响应，游戏状态直接拼接缓存的序列化片段（未修改的分区不重新序列化）"""
+    body = json_codec.dumps(payload)
+    return Response(
+        content=body[:-1] + b',"' + state_key.encode() + b'":' + state.to_json_bytes() + b"}",
+        media_type="application/json",
+    )
+
+
 @router.post("/turn")
 async def process_turn(request: GameTurnRequestModel):
     """处理游戏回合（非流式）"""
@@ -165,9 +210,9 @@ async def process_turn(request: GameTurnRequestModel):
         logger.debug(f"[DEBUG] 收到请求: playerInput={request.playerInput}")
         logger.debug(f"[DEBUG] currentState keys: {request.currentState.keys() if isinstance(request.currentState, dict) else 'not dict'}")
 
-        # 将dict转换为GameState
+        # 将dict转换为GameState（沿用该会话常驻的 GameState，只校验客户端改动过的字段）
         try:
-            state = GameState(**request.currentState)
+            state = live_states.acquire(request.currentState)
             logger.debug(f"[DEBUG] GameState created successfully")
         except Exception as e:
             logger.error(f"[ERROR] 创建GameState失败: {e}")
@@ -184,29 +229,23 @@ async def process_turn(request: GameTurnRequestModel):
         response = await game_engine.process_turn(turn_request)
         logger.debug(f"[DEBUG] Turn processed successfully")
 
-        # 自动保存游戏状态到数据库（写入 auto_saves 表，避免槽位约束冲突）
-        if save_service:
-            try:
-                turn_no = state.world.time if hasattr(state, "world") else request.currentState.get("world", {}).get("time", 0)
-                auto_save_id = save_service.auto_save(
-                    user_id="default_user",
-                    game_state=state.model_dump(),
-                    turn_number=turn_no,
-                )
-                logger.debug(f"[DEBUG] 💾 自动保存成功: auto_save_id={auto_save_id}")
-            except Exception as e:
-                logger.error(f"[WARNING] 自动保存失败: {e}")
-                # 不阻断游戏流程
+        result = _state_response(
+            {
+                "success": True,
+                "narration": response.narration,
+                "actions": response.actions,
+                "hints": response.hints,
+                "suggestions": response.suggestions,
+                "metadata": response.metadata,
+            },
+            "updatedState",
+            state,
+        )
 
-        return {
-            "success": True,
-            "narration": response.narration,
-            "actions": response.actions,
-            "hints": response.hints,
-            "suggestions": response.suggestions,
-            "metadata": response.metadata,
-            "updatedState": state.model_dump()
-        }
+        # 自动保存（只登记状态，写库在后台合并执行，不阻塞回合）
+        _submit_auto_save(state)
+        live_states.release(state)
+        return result
 
     except Exception as e:
         logger.error(f"[ERROR] 处理回合失败: {e}")
@@ -223,8 +262,8 @@ async def process_turn_stream(request: GameTurnRequestModel):
 
     async def generate():
         try:
-            # 将dict转换为GameState
-            state = GameState(**request.currentState)
+            # 将dict转换为GameState（沿用该会话常驻的 GameState）
+            state = live_states.acquire(request.currentState)
 
             turn_request = GameTurnRequest(
                 playerInput=request.playerInput,
@@ -245,8 +284,12 @@ async def process_turn_stream(request: GameTurnRequestModel):
                 logger.warning("⚠️  上下文中没有 GameState，使用原始状态")
                 final_state = state
 
+            _submit_auto_save(final_state)
+
             # 发送最终状态
-            yield f"data: {json.dumps({'type': 'state', 'state': final_state.model_dump()}, ensure_ascii=False)}\n\n"
+            state_json = final_state.to_json_bytes().decode("utf-8")
+            live_states.release(final_state)
+            yield f'data: {{"type":"state","state":{state_json}}}\n\n'
 
         except Exception as e:
             error_data = {
@@ -278,12 +321,12 @@ async def get_game_state(game_id: str):
             from agents import game_tools_langchain
 
             if game_tools_langchain.state_cache is not None:
-                state = game_tools_langchain.state_cache.get_state(game_id)
+                state = await run_in_db(game_tools_langchain.state_cache.get_state, game_id)
         except Exception as cache_error:
             logger.warning("⚠️  从状态缓存获取游戏状态失败: %s", cache_error)
 
         if state is None:
-            state = game_state_manager.get_session_state(game_id)
+            state = await run_in_db(game_state_manager.get_session_state, game_id)
 
         if state is None:
             raise HTTPException(status_code=404, detail=f"游戏状态 {game_id} 不存在")
@@ -308,7 +351,7 @@ async def save_game_state(game_id: str, state: Dict[str, Any]):
         raise HTTPException(status_code=500, detail="游戏状态管理器未初始化")
 
     try:
-        saved = game_state_manager.save_session_state(game_id, state)
+        saved = await run_in_db(game_state_manager.save_session_state, game_id, state)
         if not saved:
             raise HTTPException(status_code=500, detail="保存游戏状态失败")
 
@@ -316,7 +359,7 @@ async def save_game_state(game_id: str, state: Dict[str, Any]):
             from agents import game_tools_langchain
 
             if game_tools_langchain.state_cache is not None:
-                game_tools_langchain.state_cache.save_state(game_id, state)
+                await run_in_db(game_tools_langchain.state_cache.save_state, game_id, state)
         except Exception as cache_error:
             logger.warning("⚠️  更新状态缓存失败: %s", cache_error)
 
@@ -364,7 +407,12 @@ async def save_game(request: SaveGameRequest):
         raise HTTPException(status_code=500, detail="存档服务未初始化")
 
     try:
-        save_id = save_service.save_game(
+        # 先写入待保存的自动保存，使其不晚于手动存档
+        if auto_save_queue:
+            await auto_save_queue.flush()
+
+        save_id = await run_in_db(
+            save_service.save_game,
             user_id=request.user_id,
             slot_id=request.slot_id,
             save_name=request.save_name,
@@ -414,7 +462,7 @@ async def get_saves(user_id: str = "default_user"):
         raise HTTPException(status_code=500, detail="存档服务未初始化")
 
     try:
-        saves = save_service.get_saves(user_id)
+        saves = await run_in_db(save_service.get_saves, user_id)
 
         return {
             "success": True,
@@ -444,7 +492,7 @@ async def load_game(save_id: int):
         raise HTTPException(status_code=500, detail="存档服务未初始化")
 
     try:
-        save_data = save_service.load_game(save_id)
+        save_data = await run_in_db(save_service.load_game, save_id)
 
         if not save_data:
             raise HTTPException(status_code=404, detail=f"存档 {save_id} 不存在")
@@ -477,7 +525,7 @@ async def delete_save(save_id: int):
         raise HTTPException(status_code=500, detail="存档服务未初始化")
 
     try:
-        deleted = save_service.delete_save(save_id)
+        deleted = await run_in_db(save_service.delete_save, save_id)
 
         if not deleted:
             raise HTTPException(status_code=404, detail=f"存档 {save_id} 不存在")
@@ -517,7 +565,7 @@ async def get_snapshots(save_id: int):
         raise HTTPException(status_code=500, detail="存档服务未初始化")
 
     try:
-        snapshots = save_service.get_snapshots(save_id)
+        snapshots = await run_in_db(save_service.get_snapshots, save_id)
 
         return {
             "success": True,
@@ -548,7 +596,10 @@ async def get_latest_auto_save(user_id: str = "default_user"):
         raise HTTPException(status_code=500, detail="存档服务未初始化")
 
     try:
-        auto_save = save_service.get_latest_auto_save(user_id)
+        if auto_save_queue:
+            await auto_save_queue.flush()
+
+        auto_save = await run_in_db(save_service.get_latest_auto_save, user_id)
 
         if not auto_save:
             # 没有自动保存记录时返回success: false，不抛出404
@@ -4,14 +4,15 @@
 """
 
 import gzip
-import json
-import sqlite3
 from pathlib import Path
 from typing import Optional, Dict, List
 
 from fastapi import APIRouter, BackgroundTasks, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 from pydantic import BaseModel
+from database.async_db import run_in_db
+from database import json_codec
+from database.connection import connect
 from services.world_generation_job import create_world_generation_job
 from services.world_indexer import create_world_indexer
 from services.world_validator import WorldValidator
@@ -90,30 +91,33 @@ async def generate_world(request: WorldGenerationRequest, background_tasks: Back
     )
 
     # 预写入一条排队中的任务状态，避免前端首次轮询 404
-    try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO world_generation_jobs (id, world_id, phase, progress, error, updated_at)
-            VALUES (?, ?, 'QUEUED', 0.0, NULL, CURRENT_TIMESTAMP)
-            ON CONFLICT(id) DO UPDATE SET
-                phase = 'QUEUED',
-                progress = 0.0,
-                error = NULL,
-                updated_at = CURRENT_TIMESTAMP
-            """,
-            (job.job_id, job.world_id),
-        )
-        conn.commit()
-    except Exception:
-        # 不中断生成流程，错误会在启动阶段日志体现
-        pass
-    finally:
+    def _enqueue():
         try:
-            conn.close()
+            conn = connect(db_path)
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                INSERT INTO world_generation_jobs (id, world_id, phase, progress, error, updated_at)
+                VALUES (?, ?, 'QUEUED', 0.0, NULL, CURRENT_TIMESTAMP)
+                ON CONFLICT(id) DO UPDATE SET
+                    phase = 'QUEUED',
+                    progress = 0.0,
+                    error = NULL,
+                    updated_at = CURRENT_TIMESTAMP
+                """,
+                (job.job_id, job.world_id),
+            )
+            conn.commit()
         except Exception:
+            # 不中断生成流程，错误会在启动阶段日志体现
             pass
+        finally:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    await run_in_db(_enqueue)
 
     # 在后台执行
     background_tasks.add_task(job.run)
@@ -124,131 +128,138 @@ async def generate_world(request: WorldGenerationRequest, background_tasks: Back
 @router.get("/{world_id}/status")
 async def get_generation_status(world_id: str):
     """查询世界生成状态"""
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
 
-    try:
-        cursor.execute(
-            """
-            SELECT phase, progress, error, updated_at
-            FROM world_generation_jobs
-            WHERE world_id = ?
-            ORDER BY updated_at DESC
-            LIMIT 1
-        """,
-            (world_id,),
-        )
+    def _query():
+        db_path = get_db_path()
+        conn = connect(db_path)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(
+                """
+                SELECT phase, progress, error, updated_at
+                FROM world_generation_jobs
+                WHERE world_id = ?
+                ORDER BY updated_at DESC
+                LIMIT 1
+            """,
+                (world_id,),
+            )
 
-        row = cursor.fetchone()
+            row = cursor.fetchone()
 
-        if not row:
-            raise HTTPException(status_code=404, detail="任务不存在")
+            if not row:
+                raise HTTPException(status_code=404, detail="任务不存在")
 
-        phase, progress, error, updated_at = row
+            phase, progress, error, updated_at = row
 
-        return {
-            "world_id": world_id,
-            "phase": phase,
-            "progress": progress,
-            "error": error,
-            "updated_at": updated_at,
-        }
+            return {
+                "world_id": world_id,
+                "phase": phase,
+                "progress": progress,
+                "error": error,
+                "updated_at": updated_at,
+            }
 
-    finally:
-        conn.close()
+        finally:
+            conn.close()
+
+    return await run_in_db(_query)
 
 
 @router.get("/{world_id}")
 async def get_world(world_id: str):
     """获取世界包（解压）"""
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
 
-    try:
-        cursor.execute(
-            """
-            SELECT json_gz FROM worlds WHERE id = ?
-        """,
-            (world_id,),
-        )
+    def _query():
+        db_path = get_db_path()
+        conn = connect(db_path)
+        cursor = conn.cursor()
 
-        row = cursor.fetchone()
+        try:
+            cursor.execute(
+                """
+                SELECT json_gz FROM worlds WHERE id = ?
+            """,
+                (world_id,),
+            )
 
-        if not row:
-            raise HTTPException(status_code=404, detail="世界不存在")
+            row = cursor.fetchone()
 
-        json_gz = row[0]
+            if not row:
+                raise HTTPException(status_code=404, detail="世界不存在")
 
-        # 解压
-        json_str = gzip.decompress(json_gz).decode("utf-8")
+            json_gz = row[0]
 
-        # 返回 JSON
-        return JSONResponse(content=json.loads(json_str))
+            # 解压后直接返回 JSON（无需解析再序列化）
+            return Response(content=gzip.decompress(json_gz), media_type="application/json")
 
-    finally:
-        conn.close()
+        finally:
+            conn.close()
+
+    return await run_in_db(_query)
 
 
 @router.patch("/{world_id}/lore")
 async def update_world_lore(world_id: str, request: UpdateLoreRequest):
     """增量更新世界的 Lore 键值对（支持新增/修改/删除）。"""
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
 
-    try:
-        cursor.execute("SELECT json_gz FROM worlds WHERE id = ?", (world_id,))
-        row = cursor.fetchone()
-        if not row:
-            raise HTTPException(status_code=404, detail="世界不存在")
-
-        json_gz = row[0]
-        json_str = gzip.decompress(json_gz).decode("utf-8")
-        data = json.loads(json_str)
-
-        lore = data.get("lore") or {}
-        if not isinstance(lore, dict):
-            lore = {}
-
-        # 应用更新
-        if request.entries:
-            for k, v in request.entries.items():
-                if not isinstance(k, str) or not isinstance(v, str):
-                    raise HTTPException(status_code=400, detail="entries 必须是字符串键值对")
-                lore[k] = v
-
-        if request.delete_keys:
-            for k in request.delete_keys:
-                if k in lore:
-                    del lore[k]
-
-        data["lore"] = lore
-
-        # 回写
-        new_json = json.dumps(data, ensure_ascii=False).encode("utf-8")
-        new_gz = gzip.compress(new_json)
-
-        cursor.execute(
-            """
-            UPDATE worlds
-            SET json_gz = ?,
-                updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-            """,
-            (new_gz, world_id),
-        )
-        conn.commit()
+    def _update():
+        db_path = get_db_path()
+        conn = connect(db_path)
+        cursor = conn.cursor()
 
-        return {"success": True, "lore": lore}
+        try:
+            cursor.execute("SELECT json_gz FROM worlds WHERE id = ?", (world_id,))
+            row = cursor.fetchone()
+            if not row:
+                raise HTTPException(status_code=404, detail="世界不存在")
+
+            json_gz = row[0]
+            data = json_codec.loads(gzip.decompress(json_gz))
+
+            lore = data.get("lore") or {}
+            if not isinstance(lore, dict):
+                lore = {}
+
+            # 应用更新
+            if request.entries:
+                for k, v in request.entries.items():
+                    if not isinstance(k, str) or not isinstance(v, str):
+                        raise HTTPException(status_code=400, detail="entries 必须是字符串键值对")
+                    lore[k] = v
+
+            if request.delete_keys:
+                for k in request.delete_keys:
+                    if k in lore:
+                        del lore[k]
+
+            data["lore"] = lore
+
+            # 回写
+            new_gz = gzip.compress(json_codec.dumps(data))
+
+            cursor.execute(
+                """
+                UPDATE worlds
+                SET json_gz = ?,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+                """,
+                (new_gz, world_id),
+            )
+            conn.commit()
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"更新 Lore 失败: {str(e)}")
-    finally:
-        conn.close()
+            return {"success": True, "lore": lore}
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"更新 Lore 失败: {str(e)}")
+        finally:
+            conn.close()
+
+    return await run_in_db(_update)
 
 
 @router.patch("/{world_id}/meta")
@@ -257,56 +268,58 @@ async def update_world_meta(world_id: str, request: UpdateWorldMetaRequest):
 
     同步维护 worlds 表的 title 字段与 updated_at。
     """
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
 
-    try:
-        cursor.execute("SELECT json_gz FROM worlds WHERE id = ?", (world_id,))
-        row = cursor.fetchone()
-        if not row:
-            raise HTTPException(status_code=404, detail="世界不存在")
-
-        json_gz = row[0]
-        json_str = gzip.decompress(json_gz).decode("utf-8")
-        data = json.loads(json_str)
-
-        # 更新字段（仅当提供时）
-        meta = data.get("meta") or {}
-        updated_title = meta.get("title")
-        if request.title is not None:
-            meta["title"] = request.title
-            updated_title = request.title
-        if request.tone is not None:
-            meta["tone"] = request.tone
-        if request.difficulty is not None:
-            meta["difficulty"] = request.difficulty
-        data["meta"] = meta
-
-        # 回写压缩 JSON
-        new_json = json.dumps(data, ensure_ascii=False).encode("utf-8")
-        new_gz = gzip.compress(new_json)
-
-        cursor.execute(
-            """
-            UPDATE worlds
-            SET json_gz = ?,
-                title = COALESCE(?, title),
-                updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-            """,
-            (new_gz, updated_title, world_id),
-        )
-        conn.commit()
+    def _update():
+        db_path = get_db_path()
+        conn = connect(db_path)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute("SELECT json_gz FROM worlds WHERE id = ?", (world_id,))
+            row = cursor.fetchone()
+            if not row:
+                raise HTTPException(status_code=404, detail="世界不存在")
+
+            json_gz = row[0]
+            data = json_codec.loads(gzip.decompress(json_gz))
+
+            # 更新字段（仅当提供时）
+            meta = data.get("meta") or {}
+            updated_title = meta.get("title")
+            if request.title is not None:
+                meta["title"] = request.title
+                updated_title = request.title
+            if request.tone is not None:
+                meta["tone"] = request.tone
+            if request.difficulty is not None:
+                meta["difficulty"] = request.difficulty
+            data["meta"] = meta
+
+            # 回写压缩 JSON
+            new_gz = gzip.compress(json_codec.dumps(data))
+
+            cursor.execute(
+                """
+                UPDATE worlds
+                SET json_gz = ?,
+                    title = COALESCE(?, title),
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+                """,
+                (new_gz, updated_title, world_id),
+            )
+            conn.commit()
 
-        return {"success": True, "meta": meta}
+            return {"success": True, "meta": meta}
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"更新世界失败: {str(e)}")
-    finally:
-        conn.close()
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"更新世界失败: {str(e)}")
+        finally:
+            conn.close()
+
+    return await run_in_db(_update)
 
 
 @router.post("/{world_id}/validate")
@@ -315,22 +328,24 @@ async def validate_world(world_id: str):
     db_path = get_db_path()
 
     # 获取世界
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    def _load():
+        conn = connect(db_path)
+        cursor = conn.cursor()
 
-    try:
-        cursor.execute("SELECT json_gz FROM worlds WHERE id = ?", (world_id,))
-        row = cursor.fetchone()
+        try:
+            cursor.execute("SELECT json_gz FROM worlds WHERE id = ?", (world_id,))
+            row = cursor.fetchone()
 
-        if not row:
-            raise HTTPException(status_code=404, detail="世界不存在")
+            if not row:
+                raise HTTPException(status_code=404, detail="世界不存在")
 
-        json_gz = row[0]
-        json_str = gzip.decompress(json_gz).decode("utf-8")
-        world_pack = WorldPack.model_validate_json(json_str)
+            json_gz = row[0]
+            return WorldPack.model_validate_json(gzip.decompress(json_gz))
+
+        finally:
+            conn.close()
 
-    finally:
-        conn.close()
+    world_pack = await run_in_db(_load)
 
     # 校验
     validator = WorldValidator()
@@ -355,134 +370,150 @@ async def validate_world(world_id: str):
 @router.post("/{world_id}/snapshot")
 async def create_snapshot(world_id: str, request: SnapshotRequest):
     """创建世界快照"""
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
 
-    try:
-        # 获取世界数据
-        cursor.execute("SELECT json_gz FROM worlds WHERE id = ?", (world_id,))
-        row = cursor.fetchone()
+    def _insert():
+        db_path = get_db_path()
+        conn = connect(db_path)
+        cursor = conn.cursor()
 
-        if not row:
-            raise HTTPException(status_code=404, detail="世界不存在")
+        try:
+            # 获取世界数据
+            cursor.execute("SELECT json_gz FROM worlds WHERE id = ?", (world_id,))
+            row = cursor.fetchone()
 
-        json_gz = row[0]
+            if not row:
+                raise HTTPException(status_code=404, detail="世界不存在")
 
-        # 创建快照
-        cursor.execute(
-            """
-            INSERT INTO world_snapshots (world_id, tag, json_gz)
-            VALUES (?, ?, ?)
-        """,
-            (world_id, request.tag, json_gz),
-        )
+            json_gz = row[0]
+
+            # 创建快照
+            cursor.execute(
+                """
+                INSERT INTO world_snapshots (world_id, tag, json_gz)
+                VALUES (?, ?, ?)
+            """,
+                (world_id, request.tag, json_gz),
+            )
 
-        snapshot_id = cursor.lastrowid
-        conn.commit()
+            snapshot_id = cursor.lastrowid
+            conn.commit()
 
-        return {"snapshot_id": snapshot_id, "world_id": world_id, "tag": request.tag}
+            return {"snapshot_id": snapshot_id, "world_id": world_id, "tag": request.tag}
 
-    finally:
-        conn.close()
+        finally:
+            conn.close()
+
+    return await run_in_db(_insert)
 
 
 @router.get("/{world_id}/snapshots")
 async def list_snapshots(world_id: str):
     """列出世界快照"""
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
 
-    try:
-        cursor.execute(
-            """
-            SELECT id, tag, created_at
-            FROM world_snapshots
-            WHERE world_id = ?
-            ORDER BY created_at DESC
-        """,
-            (world_id,),
-        )
+    def _query():
+        db_path = get_db_path()
+        conn = connect(db_path)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(
+                """
+                SELECT id, tag, created_at
+                FROM world_snapshots
+                WHERE world_id = ?
+                ORDER BY created_at DESC
+            """,
+                (world_id,),
+            )
 
-        snapshots = []
-        for row in cursor.fetchall():
-            snapshot_id, tag, created_at = row
-            snapshots.append({"id": snapshot_id, "tag": tag, "created_at": created_at})
+            snapshots = []
+            for row in cursor.fetchall():
+                snapshot_id, tag, created_at = row
+                snapshots.append({"id": snapshot_id, "tag": tag, "created_at": created_at})
 
-        return {"snapshots": snapshots}
+            return {"snapshots": snapshots}
 
-    finally:
-        conn.close()
+        finally:
+            conn.close()
+
+    return await run_in_db(_query)
 
 
 @router.post("/{world_id}/publish")
 async def publish_world(world_id: str):
     """发布世界为默认世界"""
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
 
-    try:
-        # 更新世界状态
-        cursor.execute(
-            """
-            UPDATE worlds SET status = 'published' WHERE id = ?
-        """,
-            (world_id,),
-        )
+    def _update():
+        db_path = get_db_path()
+        conn = connect(db_path)
+        cursor = conn.cursor()
 
-        # 设置为默认世界
-        cursor.execute(
-            """
-            INSERT INTO system_config (key, value)
-            VALUES ('default_world_id', ?)
-            ON CONFLICT(key) DO UPDATE SET value = excluded.value
-        """,
-            (world_id,),
-        )
+        try:
+            # 更新世界状态
+            cursor.execute(
+                """
+                UPDATE worlds SET status = 'published' WHERE id = ?
+            """,
+                (world_id,),
+            )
 
-        conn.commit()
+            # 设置为默认世界
+            cursor.execute(
+                """
+                INSERT INTO system_config (key, value)
+                VALUES ('default_world_id', ?)
+                ON CONFLICT(key) DO UPDATE SET value = excluded.value
+            """,
+                (world_id,),
+            )
+
+            conn.commit()
 
-        return {"status": "published", "world_id": world_id}
+            return {"status": "published", "world_id": world_id}
 
-    finally:
-        conn.close()
+        finally:
+            conn.close()
+
+    return await run_in_db(_update)
 
 
 @router.get("/")
 async def list_worlds():
     """列出所有世界"""
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
 
-    try:
-        cursor.execute(
+    def _query():
+        db_path = get_db_path()
+        conn = connect(db_path)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(
+                """
+                SELECT id, title, seed, status, created_at
+                FROM worlds
+                ORDER BY created_at DESC
             """
-            SELECT id, title, seed, status, created_at
-            FROM worlds
-            ORDER BY created_at DESC
-        """
-        )
-
-        worlds = []
-        for row in cursor.fetchall():
-            world_id, title, seed, status, created_at = row
-            worlds.append(
-                {
-                    "id": world_id,
-                    "title": title,
-                    "seed": seed,
-                    "status": status,
-                    "created_at": created_at,
-                }
             )
 
-        return {"worlds": worlds}
+            worlds = []
+            for row in cursor.fetchall():
+                world_id, title, seed, status, created_at = row
+                worlds.append(
+                    {
+                        "id": world_id,
+                        "title": title,
+                        "seed": seed,
+                        "status": status,
+                        "created_at": created_at,
+                    }
+                )
+
+            return {"worlds": worlds}
+
+        finally:
+            conn.close()
 
-    finally:
-        conn.close()
+    return await run_in_db(_query)
 
 
 @router.get("/{world_id}/search")
@@ -490,8 +521,8 @@ async def search_world(world_id: str, query: str, kind: Optional[str] = None, to
     """语义搜索世界知识库"""
     db_path = get_db_path()
 
-    indexer = create_world_indexer(db_path)
-    results = indexer.search(world_id, query, kind, top_k)
+    indexer = await run_in_db(create_world_indexer, db_path)
+    results = await run_in_db(indexer.search, world_id, query, kind, top_k)
 
     return {"results": results}
 
@@ -501,8 +532,8 @@ async def get_world_stats(world_id: str):
     """获取世界统计信息"""
     db_path = get_db_path()
 
-    indexer = create_world_indexer(db_path)
-    stats = indexer.get_stats(world_id)
+    indexer = await run_in_db(create_world_indexer, db_path)
+    stats = await run_in_db(indexer.get_stats, world_id)
 
     return stats
 
@@ -510,26 +541,30 @@ async def get_world_stats(world_id: str):
 @router.delete("/{world_id}")
 async def delete_world(world_id: str):
     """删除指定世界及其关联数据（快照、生成任务、向量索引）。"""
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
 
-    try:
-        # 确认存在
-        cursor.execute("SELECT 1 FROM worlds WHERE id = ?", (world_id,))
-        if not cursor.fetchone():
-            raise HTTPException(status_code=404, detail="世界不存在")
-
-        # 事务删除
-        cursor.execute("DELETE FROM world_kb WHERE world_id = ?", (world_id,))
-        cursor.execute("DELETE FROM world_snapshots WHERE world_id = ?", (world_id,))
-        cursor.execute("DELETE FROM world_generation_jobs WHERE world_id = ?", (world_id,))
-        cursor.execute("DELETE FROM worlds WHERE id = ?", (world_id,))
-        conn.commit()
-
-        return {"success": True, "message": "世界已删除"}
-    finally:
-        conn.close()
+    def _delete():
+        db_path = get_db_path()
+        conn = connect(db_path)
+        cursor = conn.cursor()
+
+        try:
+            # 确认存在
+            cursor.execute("SELECT 1 FROM worlds WHERE id = ?", (world_id,))
+            if not cursor.fetchone():
+                raise HTTPException(status_code=404, detail="世界不存在")
+
+            # 事务删除
+            cursor.execute("DELETE FROM world_kb WHERE world_id = ?", (world_id,))
+            cursor.execute("DELETE FROM world_snapshots WHERE world_id = ?", (world_id,))
+            cursor.execute("DELETE FROM world_generation_jobs WHERE world_id = ?", (world_id,))
+            cursor.execute("DELETE FROM worlds WHERE id = ?", (world_id,))
+            conn.commit()
+
+            return {"success": True, "message": "世界已删除"}
+        finally:
+            conn.close()
+
+    return await run_in_db(_delete)
 
 
 # ============ 节奏预设 API ============
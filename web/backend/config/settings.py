@@ -117,6 +117,10 @@ class Settings(BaseSettings):
     max_game_sessions: int = 100  # 最大并发游戏会话数
     session_timeout: int = 3600  # 会话超时时间（秒）
     auto_save_interval: int = 5  # 自动保存间隔（回合数）
+    auto_save_idle_delay: float = 10.0  # 玩家空闲多少秒后写入未保存的回合
+    auto_save_keep_count: int = 5  # 每个用户保留的自动保存数
+    storage_maintenance_interval: int = 3600  # 存储维护周期（秒，0 为关闭）
+    world_load_verify_rate: float = 0.0  # 从基准加载世界包时抽样完整转换比对的比例（0 为关闭）
 
     # ==================== 世界生成配置 ====================
     world_generation_model: Optional[str] = None  # 如果不设置则使用 default_model
@@ -131,6 +135,7 @@ class Settings(BaseSettings):
 
     # ==================== Agent 运行时 ====================
     dm_agent_backend: str = "langchain"  # langchain 或 langgraph（可通过 .env 覆盖）
+    dm_history_token_budget: int = 6000  # DM 消息历史（日志 + 检索片段 + 当前行动）的 token 预算
 
     # ==================== 可选供应商/代理配置 ====================
     anthropic_base_url: Optional[str] = None
@@ -0,0 +1,131 @@
+"""
+异步数据库访问 - 在专用线程池中执行阻塞的 sqlite3 调用
+
+FastAPI 的 async 路由直接调用 sqlite3 会阻塞事件循环，
+本模块把同步的数据访问对象（GameStateManager / SaveService / WorldDatabase /
+Database）的调用转交给数据库线程池执行，路由只需 await：
+
+    state = await run_in_db(game_state_manager.get_session_state, game_id)
+
+    async_db = AsyncDBProxy(world_db)
+    world = await async_db.get_world(world_id)
+
+线程池中的线程各自从连接池（connection.py）复用连接。
+持有单个连接的对象（src.utils.database.Database）使用 AsyncDatabase，
+其调用在独占的单线程执行器中串行执行。
+"""
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# 数据库线程池大小
+DB_EXECUTOR_WORKERS = 8
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """获取共享的数据库线程池（首次使用时创建）"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=DB_EXECUTOR_WORKERS,
+            thread_name_prefix="db"
+        )
+    return _executor
+
+
+def shutdown_db_executor(wait: bool = True):
+    """关闭共享的数据库线程池（进程退出时调用）"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=wait)
+        _executor = None
+
+
+async def run_in_db(
+    fn: Callable[..., T],
+    *args: Any,
+    executor: Optional[Executor] = None,
+    **kwargs: Any
+) -> T:
+    """在数据库线程池中执行同步函数并等待结果
+
+    Args:
+        fn: 同步函数
+        *args: 位置参数
+        executor: 执行器（可选，默认共享的数据库线程池）
+        **kwargs: 关键字参数
+
+    Returns:
+        fn 的返回值（异常原样抛出）
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, fn, *args, **kwargs)
+    return await loop.run_in_executor(executor or get_db_executor(), call)
+
+
+class AsyncDBProxy:
+    """同步数据访问对象的异步代理
+
+    方法调用返回协程（在执行器中运行），其余属性直接读取。
+    """
+
+    __slots__ = ("_target", "_executor")
+
+    def __init__(self, target: Any, executor: Optional[Executor] = None):
+        """
+        Args:
+            target: 同步数据访问对象
+            executor: 执行器（可选，默认共享的数据库线程池）
+        """
+        self._target = target
+        self._executor = executor
+
+    @property
+    def sync(self) -> Any:
+        """被代理的同步对象"""
+        return self._target
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return await run_in_db(attr, *args, executor=self._executor, **kwargs)
+
+        return call
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._target!r})"
+
+
+class AsyncDatabase(AsyncDBProxy):
+    """src.utils.database.Database 的异步代理
+
+    Database 持有单个 sqlite3 连接（只能在创建它的线程中使用），
+    因此 connect() 及之后的所有调用都在同一个专用线程中串行执行。
+    """
+
+    __slots__ = ()
+
+    def __init__(self, database: Any):
+        super().__init__(
+            database,
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-novel")
+        )
+
+    async def close(self):
+        """关闭数据库连接并释放专用线程"""
+        try:
+            await run_in_db(self._target.close, executor=self._executor)
+        finally:
+            self._executor.shutdown(wait=False)
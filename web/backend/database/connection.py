@@ -0,0 +1,239 @@
+"""
+SQLite 连接管理 - 进程内共享的连接池
+
+每个线程按数据库路径复用连接，新建连接时一次性设置：
+- journal_mode=WAL（读写互不阻塞）
+- synchronous=NORMAL（WAL 下安全且大幅减少 fsync）
+- auto_vacuum=INCREMENTAL（新建数据库，配合存储维护任务的增量 VACUUM）
+- busy_timeout / mmap_size / cache_size
+并放大 sqlite3 的预编译语句缓存（cached_statements），
+使重复执行的 SQL 跳过解析与编译。
+
+用法与 sqlite3.connect 相同：
+    conn = connect(db_path)
+    ...
+    conn.close()          # 归还连接池（未提交的事务回滚）
+
+    with connect(db_path) as conn:
+        ...               # 正常结束提交，异常回滚，随后归还连接池
+"""
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# 连接级 PRAGMA（新建连接时执行一次）
+DEFAULT_PRAGMAS: Dict[str, Any] = {
+    # 须在建表前设置：仅对新建的数据库生效，空闲页由存储维护任务增量回收
+    "auto_vacuum": "INCREMENTAL",
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,  # 毫秒
+    "mmap_size": 268435456,  # 256MB
+    "cache_size": -16000,  # 负数单位为 KB，即 16MB
+}
+
+# 每个连接缓存的预编译语句数（sqlite3 默认 128）
+CACHED_STATEMENTS = 256
+
+# 每个线程、每个数据库保留的空闲连接数
+MAX_IDLE_PER_THREAD = 4
+
+
+class PooledConnection:
+    """连接池中的连接
+
+    除 close() 与上下文管理外，其余属性与方法直接委托给 sqlite3.Connection。
+    归还后底层连接可能已被同一线程的下一次 connect() 取走，
+    因此归还后的任何访问都抛出 sqlite3.ProgrammingError（与已关闭的 sqlite3.Connection 一致）。
+    """
+
+    __slots__ = ("_conn", "_manager", "_key", "_released")
+
+    def __init__(self, conn: sqlite3.Connection, manager: "ConnectionManager", key: Optional[str]):
+        object.__setattr__(self, "_conn", conn)
+        object.__setattr__(self, "_manager", manager)
+        object.__setattr__(self, "_key", key)
+        object.__setattr__(self, "_released", False)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._released:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return self._conn
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._connection(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._connection(), name, value)
+
+    def __enter__(self) -> "PooledConnection":
+        self._connection()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if self._released:
+            # 块内已 close()：连接可能已属于其他调用方，不再提交或回滚
+            return False
+        try:
+            if exc_type is None:
+                self._conn.commit()
+            else:
+                self._conn.rollback()
+        finally:
+            self.close()
+        return False
+
+    def close(self):
+        """归还连接池（重复调用无副作用）"""
+        if self._released:
+            return
+        object.__setattr__(self, "_released", True)
+        self._manager._release(self._key, self._conn)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionManager:
+    """SQLite 连接管理器（按线程、按数据库路径缓存连接）"""
+
+    def __init__(
+        self,
+        pragmas: Optional[Dict[str, Any]] = None,
+        cached_statements: int = CACHED_STATEMENTS,
+        max_idle: int = MAX_IDLE_PER_THREAD
+    ):
+        """
+        Args:
+            pragmas: 新建连接时执行的 PRAGMA
+            cached_statements: 每个连接的预编译语句缓存大小
+            max_idle: 每个线程、每个数据库保留的空闲连接数
+        """
+        self.pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        self.cached_statements = cached_statements
+        self.max_idle = max_idle
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._open_connections: Set[sqlite3.Connection] = set()
+        self._created = 0
+        self._reused = 0
+
+    def connect(self, db_path: Any) -> PooledConnection:
+        """获取连接（优先复用当前线程的空闲连接）"""
+        key = self._pool_key(db_path)
+        if key is None:
+            # 内存数据库每个连接互相独立，不复用
+            return PooledConnection(self._open(db_path), self, None)
+
+        idle = self._idle().get(key)
+        while idle:
+            conn, file_id = idle.pop()
+            if file_id == self._file_id(key):
+                self._reused += 1
+                return PooledConnection(conn, self, key)
+            # 数据库文件已被删除或替换
+            self._close(conn)
+
+        return PooledConnection(self._open(key), self, key)
+
+    def _open(self, db_path: Any) -> sqlite3.Connection:
+        """新建连接并设置 PRAGMA"""
+        conn = sqlite3.connect(
+            db_path,
+            cached_statements=self.cached_statements,
+            check_same_thread=False
+        )
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+
+        with self._lock:
+            self._open_connections.add(conn)
+            self._created += 1
+        return conn
+
+    def _release(self, key: Optional[str], conn: sqlite3.Connection):
+        """归还连接：回滚未提交的事务并重置行工厂"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = None
+        except sqlite3.ProgrammingError:
+            # 连接已被关闭
+            return
+
+        idle = self._idle().setdefault(key, []) if key is not None else None
+        if idle is not None and len(idle) < self.max_idle:
+            idle.append((conn, self._file_id(key)))
+        else:
+            self._close(conn)
+
+    def _close(self, conn: sqlite3.Connection):
+        """真正关闭连接"""
+        with self._lock:
+            self._open_connections.discard(conn)
+        conn.close()
+
+    def _idle(self) -> Dict[str, List[Tuple[sqlite3.Connection, Optional[Tuple[int, int]]]]]:
+        """当前线程的空闲连接"""
+        idle = getattr(self._local, "idle", None)
+        if idle is None:
+            idle = {}
+            self._local.idle = idle
+        return idle
+
+    @staticmethod
+    def _file_id(path: str) -> Optional[Tuple[int, int]]:
+        """数据库文件标识（设备号, inode），文件不存在时返回 None"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_dev, stat.st_ino)
+
+    @staticmethod
+    def _pool_key(db_path: Any) -> Optional[str]:
+        """连接池键（内存数据库返回 None）"""
+        path = str(db_path)
+        if path == ":memory:" or path.startswith("file::memory:"):
+            return None
+        return str(Path(path).resolve())
+
+    def close_all(self):
+        """关闭所有连接（进程退出或测试清理时调用）"""
+        with self._lock:
+            connections = list(self._open_connections)
+            self._open_connections = set()
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._local = threading.local()
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取统计信息"""
+        return {
+            "created": self._created,
+            "reused": self._reused,
+            "open": len(self._open_connections),
+        }
+
+
+_manager = ConnectionManager()
+
+
+def get_connection_manager() -> ConnectionManager:
+    """获取进程内共享的连接管理器"""
+    return _manager
+
+
+def connect(db_path: Any) -> PooledConnection:
+    """从共享连接池获取连接（替代 sqlite3.connect）"""
+    return _manager.connect(db_path)
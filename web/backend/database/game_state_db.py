@@ -3,31 +3,65 @@
 基于 docs/TECHNICAL_IMPLEMENTATION_PLAN.md 的设计
 """
 
-import json
-import sqlite3
+import asyncio
+import copy
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from utils.logger import get_logger
 
+from . import json_codec
+from .async_db import run_in_db
+from .connection import connect
+from .json_patch import apply_patch, make_patch
+from .state_blobs import (
+    collect_garbage,
+    ensure_state_blob_schema,
+    load_state,
+    put_game_state,
+)
+
 logger = get_logger(__name__)
 
+# 会话状态压缩阈值：增量条数 / 增量总字节数
+MAX_STATE_DELTAS = 50
+MAX_STATE_DELTA_BYTES = 256 * 1024
+
 
 class GameStateManager:
     """游戏状态管理器 - 处理数据库访问和存档管理"""
 
-    def __init__(self, db_path: str):
+    def __init__(
+        self,
+        db_path: str,
+        max_state_deltas: int = MAX_STATE_DELTAS,
+        max_state_delta_bytes: int = MAX_STATE_DELTA_BYTES,
+        max_tracked_sessions: int = 256,
+    ):
         """
         Args:
             db_path: 数据库文件路径
+            max_state_deltas: 会话状态压缩前允许的增量条数
+            max_state_delta_bytes: 会话状态压缩前允许的增量总字节数
+            max_tracked_sessions: 内存中记住持久化版本的会话数上限
         """
         self.db_path = db_path
+        self.max_state_deltas = max_state_deltas
+        self.max_state_delta_bytes = max_state_delta_bytes
+        self.max_tracked_sessions = max_tracked_sessions
+
+        # {session_id: (最近持久化的文档, 版本号, 增量条数, 增量字节数)}
+        self._persisted: "OrderedDict[str, Tuple[Dict[str, Any], int, int, int]]" = OrderedDict()
+        self._state_lock = threading.RLock()
         self._ensure_tables()
 
     def _ensure_tables(self):
         """确保数据库表存在"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
@@ -82,11 +116,32 @@ class GameStateManager:
                 CREATE TABLE IF NOT EXISTS session_states (
                     session_id TEXT PRIMARY KEY,
                     game_state TEXT NOT NULL,
+                    revision INTEGER NOT NULL DEFAULT 0,
                     last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """
             )
 
+            # 旧库补充版本号列
+            columns = {row[1] for row in cursor.execute("PRAGMA table_info(session_states)")}
+            if "revision" not in columns:
+                cursor.execute(
+                    "ALTER TABLE session_states ADD COLUMN revision INTEGER NOT NULL DEFAULT 0"
+                )
+
+            # 会话状态增量表（JSON Patch）
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS session_state_deltas (
+                    session_id TEXT NOT NULL,
+                    revision INTEGER NOT NULL,
+                    patch TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (session_id, revision)
+                )
+            """
+            )
+
             # 创建索引
             cursor.execute(
                 "CREATE INDEX IF NOT EXISTS idx_game_saves_user_id ON game_saves(user_id)"
@@ -98,6 +153,9 @@ class GameStateManager:
                 "CREATE INDEX IF NOT EXISTS idx_auto_saves_user_id ON auto_saves(user_id)"
             )
 
+            # 存档 / 快照 / 自动保存引用的状态 Blob
+            ensure_state_blob_schema(conn)
+
             conn.commit()
             logger.info("✅ 游戏状态数据库表初始化成功")
 
@@ -109,60 +167,177 @@ class GameStateManager:
             conn.close()
 
     # ==================== 会话状态管理 ====================
+    #
+    # session_states 存放基准文档与最新版本号（revision），
+    # 之后的每次保存只把与上次持久化版本的 JSON Patch 追加到 session_state_deltas；
+    # 增量条数或字节数超过阈值时写入新的基准并清空增量（压缩）。
+    # 每个管理器记住各会话最近持久化的文档与版本号，版本号与数据库不一致时
+    # （例如另一个管理器写过）直接写入完整基准。
 
     def get_session_state(self, session_id: str) -> Optional[Dict[str, Any]]:
-        """从数据库获取会话状态"""
-        conn = sqlite3.connect(self.db_path)
+        """从数据库获取会话状态（基准 + 增量）"""
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
+            # 基准与增量在同一个读事务中读取，避免中途被另一连接的压缩替换
+            conn.execute("BEGIN")
             cursor.execute(
                 """
-                SELECT game_state FROM session_states WHERE session_id = ?
+                SELECT game_state, revision FROM session_states WHERE session_id = ?
             """,
                 (session_id,),
             )
-
             row = cursor.fetchone()
+            patches = []
             if row:
-                return json.loads(row[0])
-            return None
+                cursor.execute(
+                    """
+                    SELECT patch, length(CAST(patch AS BLOB)) FROM session_state_deltas
+                    WHERE session_id = ?
+                    ORDER BY revision
+                """,
+                    (session_id,),
+                )
+                patches = cursor.fetchall()
+            conn.commit()
+
+            if not row:
+                return None
+
+            state = json_codec.loads(row[0])
+            revision = row[1]
+            delta_count = 0
+            delta_bytes = 0
+            for patch, size in patches:
+                state = apply_patch(state, json_codec.loads(patch))
+                delta_count += 1
+                delta_bytes += size
+
+            self._remember(session_id, copy.deepcopy(state), revision, delta_count, delta_bytes)
+            return state
 
         finally:
             conn.close()
 
     def save_session_state(self, session_id: str, game_state: Dict[str, Any]) -> bool:
-        """保存会话状态到数据库"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
+        """保存会话状态到数据库（增量写入）"""
         try:
-            cursor.execute(
-                """
-                INSERT OR REPLACE INTO session_states (session_id, game_state, last_updated)
-                VALUES (?, ?, CURRENT_TIMESTAMP)
-            """,
-                (session_id, json.dumps(game_state, ensure_ascii=False)),
-            )
-
-            conn.commit()
+            self.save_session_states({session_id: game_state})
             return True
-
         except Exception as e:
             logger.error(f"❌ 保存会话状态失败: {e}")
-            conn.rollback()
             return False
-        finally:
-            conn.close()
+
+    def save_session_states(self, states: Dict[str, Dict[str, Any]]) -> int:
+        """在一个事务中批量保存会话状态
+
+        Args:
+            states: {session_id: game_state}
+
+        Returns:
+            int: 保存的会话数
+        """
+        if not states:
+            return 0
+
+        with self._state_lock:
+            with connect(self.db_path) as conn:
+                # 立即获取写锁，使版本检查与写入原子化
+                conn.execute("BEGIN IMMEDIATE")
+                updates = [
+                    self._persist_state(conn, session_id, game_state)
+                    for session_id, game_state in states.items()
+                ]
+
+            # 事务提交后才更新内存中的持久化版本
+            for update in updates:
+                if update is None:
+                    continue
+                session_id, document, ops, revision, delta_count, delta_bytes = update
+                if ops is not None:
+                    # 补丁经过一次 JSON 往返，应用到基准上不会与调用方共享对象
+                    document = apply_patch(document, ops)
+                self._remember(session_id, document, revision, delta_count, delta_bytes)
+
+        return len(states)
+
+    def _persist_state(self, conn, session_id: str, game_state: Dict[str, Any]):
+        """写入一个会话的增量或新基准
+
+        Returns:
+            (session_id, 文档, 待应用的补丁, 版本号, 增量条数, 增量字节数)，无变化时为 None
+        """
+        row = conn.execute(
+            "SELECT revision FROM session_states WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        current = row[0] if row else None
+        tracked = self._persisted.get(session_id)
+
+        if tracked is not None and current is not None and tracked[1] == current:
+            baseline, revision, delta_count, delta_bytes = tracked
+            ops = make_patch(baseline, game_state)
+            if not ops:
+                return None
+
+            patch_bytes = json_codec.dumps(ops)
+            patch = patch_bytes.decode("utf-8")
+            if (
+                delta_count < self.max_state_deltas
+                and delta_bytes + len(patch_bytes) <= self.max_state_delta_bytes
+            ):
+                conn.execute(
+                    """
+                    INSERT INTO session_state_deltas (session_id, revision, patch)
+                    VALUES (?, ?, ?)
+                """,
+                    (session_id, revision + 1, patch),
+                )
+                conn.execute(
+                    """
+                    UPDATE session_states
+                    SET revision = ?, last_updated = CURRENT_TIMESTAMP
+                    WHERE session_id = ?
+                """,
+                    (revision + 1, session_id),
+                )
+                return (
+                    session_id, baseline, json_codec.loads(patch),
+                    revision + 1, delta_count + 1, delta_bytes + len(patch_bytes),
+                )
+
+        # 写入新基准（首次保存、版本不一致或增量超过阈值）
+        revision = (current or 0) + 1
+        document = json_codec.dumps_str(game_state)
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO session_states (session_id, game_state, revision, last_updated)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+        """,
+            (session_id, document, revision),
+        )
+        conn.execute("DELETE FROM session_state_deltas WHERE session_id = ?", (session_id,))
+        return (session_id, json_codec.loads(document), None, revision, 0, 0)
+
+    def _remember(self, session_id: str, state: Dict[str, Any], revision: int, delta_count: int, delta_bytes: int):
+        """记录会话最近持久化的文档与版本号（LRU）"""
+        with self._state_lock:
+            self._persisted[session_id] = (state, revision, delta_count, delta_bytes)
+            self._persisted.move_to_end(session_id)
+            while len(self._persisted) > self.max_tracked_sessions:
+                self._persisted.popitem(last=False)
 
     def delete_session_state(self, session_id: str) -> bool:
         """删除会话状态"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
+            cursor.execute("DELETE FROM session_state_deltas WHERE session_id = ?", (session_id,))
             cursor.execute("DELETE FROM session_states WHERE session_id = ?", (session_id,))
             conn.commit()
+            with self._state_lock:
+                self._persisted.pop(session_id, None)
             return True
         finally:
             conn.close()
@@ -190,7 +365,7 @@ class GameStateManager:
         Returns:
             存档ID
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
@@ -207,49 +382,51 @@ class GameStateManager:
                 ),
             }
 
+            # 序列化一次，存档 / 快照 / 自动保存共用同一个 Blob
+            state_hash, base_hash = put_game_state(conn, game_state)
+            metadata_json = json_codec.dumps_str(metadata)
+
             # 插入或更新存档
             cursor.execute(
                 """
-                INSERT INTO game_saves (user_id, slot_id, save_name, game_state, metadata)
-                VALUES (?, ?, ?, ?, ?)
+                INSERT INTO game_saves (user_id, slot_id, save_name, game_state, state_hash, base_hash, metadata)
+                VALUES (?, ?, ?, '', ?, ?, ?)
                 ON CONFLICT(user_id, slot_id) DO UPDATE SET
-                    save_name = ?,
-                    game_state = ?,
-                    metadata = ?,
+                    save_name = excluded.save_name,
+                    game_state = excluded.game_state,
+                    state_hash = excluded.state_hash,
+                    base_hash = excluded.base_hash,
+                    metadata = excluded.metadata,
                     updated_at = CURRENT_TIMESTAMP
             """,
-                (
-                    user_id,
-                    slot_id,
-                    save_name,
-                    json.dumps(game_state, ensure_ascii=False),
-                    json.dumps(metadata, ensure_ascii=False),
-                    save_name,
-                    json.dumps(game_state, ensure_ascii=False),
-                    json.dumps(metadata, ensure_ascii=False),
-                ),
+                (user_id, slot_id, save_name, state_hash, base_hash, metadata_json),
             )
 
-            save_id = cursor.lastrowid
+            # 更新已有槽位时 lastrowid 不可靠，按槽位查询存档ID
+            cursor.execute(
+                "SELECT id FROM game_saves WHERE user_id = ? AND slot_id = ?", (user_id, slot_id)
+            )
+            row = cursor.fetchone()
+            save_id = row[0] if row else cursor.lastrowid
 
             # 如果不是自动保存，创建快照
             if not auto_save and save_id > 0:
                 cursor.execute(
                     """
-                    INSERT INTO save_snapshots (save_id, turn_number, snapshot_data)
-                    VALUES (?, ?, ?)
+                    INSERT INTO save_snapshots (save_id, turn_number, snapshot_data, state_hash, base_hash)
+                    VALUES (?, ?, '', ?, ?)
                 """,
-                    (save_id, metadata["turn_number"], json.dumps(game_state, ensure_ascii=False)),
+                    (save_id, metadata["turn_number"], state_hash, base_hash),
                 )
 
             # 如果是自动保存，也记录到auto_saves表
             if auto_save:
                 cursor.execute(
                     """
-                    INSERT INTO auto_saves (user_id, game_state, turn_number)
-                    VALUES (?, ?, ?)
+                    INSERT INTO auto_saves (user_id, game_state, state_hash, base_hash, turn_number)
+                    VALUES (?, '', ?, ?, ?)
                 """,
-                    (user_id, json.dumps(game_state, ensure_ascii=False), metadata["turn_number"]),
+                    (user_id, state_hash, base_hash, metadata["turn_number"]),
                 )
 
             conn.commit()
@@ -264,13 +441,13 @@ class GameStateManager:
 
     def load_game(self, save_id: int) -> Optional[Dict[str, Any]]:
         """加载存档"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
             cursor.execute(
                 """
-                SELECT game_state, metadata
+                SELECT game_state, metadata, state_hash, base_hash
                 FROM game_saves
                 WHERE id = ?
             """,
@@ -280,8 +457,8 @@ class GameStateManager:
             row = cursor.fetchone()
             if row:
                 return {
-                    "game_state": json.loads(row[0]),
-                    "metadata": json.loads(row[1]) if row[1] else {},
+                    "game_state": load_state(conn, row[2], row[0], row[3]),
+                    "metadata": json_codec.loads(row[1]) if row[1] else {},
                 }
             return None
 
@@ -290,7 +467,7 @@ class GameStateManager:
 
     def get_saves(self, user_id: str) -> List[Dict[str, Any]]:
         """获取用户所有存档"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
@@ -312,7 +489,7 @@ class GameStateManager:
                         "save_id": row[0],
                         "slot_id": row[1],
                         "save_name": row[2],
-                        "metadata": json.loads(row[3]) if row[3] else {},
+                        "metadata": json_codec.loads(row[3]) if row[3] else {},
                         "screenshot_url": row[4],
                         "created_at": row[5],
                         "updated_at": row[6],
@@ -326,28 +503,32 @@ class GameStateManager:
 
     def delete_save(self, save_id: int) -> bool:
         """删除存档"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
             cursor.execute("DELETE FROM game_saves WHERE id = ?", (save_id,))
+            deleted = cursor.rowcount > 0
+            if deleted:
+                collect_garbage(conn)
             conn.commit()
-            return cursor.rowcount > 0
+            return deleted
         finally:
             conn.close()
 
     def create_snapshot(self, save_id: int, turn_number: int, game_state: Dict[str, Any]) -> bool:
         """创建存档快照"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
+            state_hash, base_hash = put_game_state(conn, game_state)
             cursor.execute(
                 """
-                INSERT INTO save_snapshots (save_id, turn_number, snapshot_data)
-                VALUES (?, ?, ?)
+                INSERT INTO save_snapshots (save_id, turn_number, snapshot_data, state_hash, base_hash)
+                VALUES (?, ?, '', ?, ?)
             """,
-                (save_id, turn_number, json.dumps(game_state, ensure_ascii=False)),
+                (save_id, turn_number, state_hash, base_hash),
             )
 
             conn.commit()
@@ -361,7 +542,7 @@ class GameStateManager:
 
     def get_snapshots(self, save_id: int, limit: int = 10) -> List[Dict[str, Any]]:
         """获取存档的快照列表"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
@@ -389,20 +570,20 @@ class GameStateManager:
 
     def load_snapshot(self, snapshot_id: int) -> Optional[Dict[str, Any]]:
         """加载快照"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
             cursor.execute(
                 """
-                SELECT snapshot_data FROM save_snapshots WHERE id = ?
+                SELECT snapshot_data, state_hash, base_hash FROM save_snapshots WHERE id = ?
             """,
                 (snapshot_id,),
             )
 
             row = cursor.fetchone()
             if row:
-                return json.loads(row[0])
+                return load_state(conn, row[1], row[0], row[2])
             return None
 
         finally:
@@ -412,13 +593,13 @@ class GameStateManager:
 
     def get_latest_autosave(self, user_id: str) -> Optional[Dict[str, Any]]:
         """获取最新的自动保存"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
             cursor.execute(
                 """
-                SELECT id, game_state, turn_number, created_at
+                SELECT id, game_state, turn_number, created_at, state_hash, base_hash
                 FROM auto_saves
                 WHERE user_id = ?
                 ORDER BY created_at DESC
@@ -431,7 +612,7 @@ class GameStateManager:
             if row:
                 return {
                     "autosave_id": row[0],
-                    "game_state": json.loads(row[1]),
+                    "game_state": load_state(conn, row[4], row[1], row[5]),
                     "turn_number": row[2],
                     "created_at": row[3],
                 }
@@ -442,7 +623,7 @@ class GameStateManager:
 
     def clean_old_autosaves(self, user_id: str, keep_count: int = 5):
         """清理旧的自动保存（保留最新的N个）"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
@@ -458,9 +639,12 @@ class GameStateManager:
             """,
                 (user_id, user_id, keep_count),
             )
+            deleted = cursor.rowcount
+            if deleted:
+                collect_garbage(conn)
 
             conn.commit()
-            return cursor.rowcount
+            return deleted
 
         finally:
             conn.close()
@@ -470,41 +654,205 @@ class GameStateManager:
 
 
 class GameStateCache:
-    """游戏状态缓存 - 内存缓存 + 数据库持久化"""
-
-    def __init__(self, db_manager: GameStateManager):
+    """游戏状态缓存 - 有界 LRU/TTL 内存缓存 + 延迟批量写回
+
+    - save_state 只更新内存并标记为脏，由后台任务（start_flusher）
+      按 flush_interval 合并写回数据库，同一会话多次保存只写最后一次
+    - 缓存中的状态由调用方原地修改（get_state 返回同一个 dict），因此 save_state
+      记录一份快照，写回线程只读取快照，不会读到另一回合修改到一半的状态
+    - 超过 max_sessions 时淘汰最久未访问的会话，空闲超过 ttl 的会话定期淘汰；
+      被淘汰的脏会话先进入待写队列，写回前仍可从中读到最新状态
+    - 关闭时调用 stop() 写回全部脏会话
+    """
+
+    def __init__(
+        self,
+        db_manager: GameStateManager,
+        max_sessions: int = 100,
+        ttl: float = 3600,
+        flush_interval: float = 1.0,
+    ):
+        """
+        Args:
+            db_manager: 数据库管理器
+            max_sessions: 内存中保留的会话数上限
+            ttl: 会话空闲超时（秒）
+            flush_interval: 后台写回间隔（秒）
+        """
         self.db_manager = db_manager
-        self._cache: Dict[str, Dict[str, Any]] = {}
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._last_access: Dict[str, float] = {}
+        self._dirty: Dict[str, Dict[str, Any]] = {}  # 脏会话 -> 待写回的快照
+        self._pending: Dict[str, Dict[str, Any]] = {}  # 已淘汰、尚未写回的脏会话快照
+
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._flusher: Optional[asyncio.Task] = None
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "flushes": 0, "written": 0}
 
     def get_state(self, session_id: str) -> Optional[Dict[str, Any]]:
         """获取游戏状态（优先从内存）"""
-        # 1. 先查内存缓存
-        if session_id in self._cache:
-            return self._cache[session_id]
+        # 1. 先查内存缓存与待写队列
+        with self._lock:
+            state = self._cache.get(session_id)
+            if state is None and session_id in self._pending:
+                snapshot = self._pending.pop(session_id)
+                state = copy.deepcopy(snapshot)
+                self._put(session_id, state, snapshot)
+            if state is not None:
+                self._touch(session_id)
+                self._stats["hits"] += 1
+                return state
+            self._stats["misses"] += 1
 
         # 2. 从数据库加载
         state = self.db_manager.get_session_state(session_id)
         if state:
-            self._cache[session_id] = state
+            with self._lock:
+                # 加载期间可能已有新状态写入
+                current = self._cache.get(session_id)
+                if current is not None:
+                    return current
+                self._put(session_id, state)
             return state
 
         # 3. 返回None（由上层创建新状态）
         return None
 
     def save_state(self, session_id: str, state: Dict[str, Any]):
-        """保存游戏状态（内存 + 数据库）"""
-        # 1. 更新内存缓存
+        """保存游戏状态（更新内存并标记为脏，由后台任务写回此刻的快照）"""
+        snapshot = copy.deepcopy(state)
+        with self._lock:
+            self._pending.pop(session_id, None)
+            self._put(session_id, state, snapshot)
+
+    def _put(
+        self,
+        session_id: str,
+        state: Dict[str, Any],
+        snapshot: Optional[Dict[str, Any]] = None,
+    ):
+        """写入缓存并按容量淘汰，snapshot 不为 None 时标记为脏（调用方持有锁）"""
         self._cache[session_id] = state
+        self._touch(session_id)
+        if snapshot is not None:
+            self._dirty[session_id] = snapshot
+
+        while len(self._cache) > self.max_sessions:
+            oldest = next(iter(self._cache))
+            self._evict(oldest)
+
+    def _touch(self, session_id: str):
+        """记录访问时间并移到 LRU 末尾（调用方持有锁）"""
+        self._cache.move_to_end(session_id)
+        self._last_access[session_id] = time.monotonic()
+
+    def _evict(self, session_id: str):
+        """移出内存，脏会话转入待写队列（调用方持有锁）"""
+        self._cache.pop(session_id)
+        self._last_access.pop(session_id, None)
+        if session_id in self._dirty:
+            self._pending[session_id] = self._dirty.pop(session_id)
+        self._stats["evictions"] += 1
+
+    def evict_expired(self) -> int:
+        """淘汰空闲超过 ttl 的会话
 
-        # 2. 保存到数据库
-        self.db_manager.save_session_state(session_id, state)
+        Returns:
+            int: 淘汰的会话数
+        """
+        deadline = time.monotonic() - self.ttl
+        with self._lock:
+            expired = [sid for sid, at in self._last_access.items() if at < deadline]
+            for session_id in expired:
+                self._evict(session_id)
+        return len(expired)
+
+    def flush(self) -> int:
+        """将脏会话与待写队列批量写回数据库
+
+        Returns:
+            int: 写回的会话数
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch = dict(self._pending)
+                batch.update(self._dirty)
+                self._pending.clear()
+                self._dirty.clear()
+
+            if not batch:
+                return 0
+
+            try:
+                self.db_manager.save_session_states(batch)
+            except Exception:
+                # 写回失败：未被更新覆盖的会话重新排队
+                with self._lock:
+                    for session_id, state in batch.items():
+                        if session_id in self._dirty or session_id in self._pending:
+                            continue
+                        if session_id in self._cache:
+                            self._dirty[session_id] = state
+                        else:
+                            self._pending[session_id] = state
+                raise
+
+            self._stats["flushes"] += 1
+            self._stats["written"] += len(batch)
+            return len(batch)
+
+    def is_dirty(self, session_id: Optional[str] = None) -> bool:
+        """是否有未写回的状态"""
+        with self._lock:
+            if session_id is None:
+                return bool(self._dirty or self._pending)
+            return session_id in self._dirty or session_id in self._pending
+
+    # ==================== 后台写回 ====================
+
+    def start_flusher(self):
+        """在当前事件循环中启动后台写回任务"""
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        """定期写回脏会话并淘汰过期会话"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await run_in_db(self.flush)
+                await run_in_db(self.evict_expired)
+            except Exception as exc:
+                logger.error("❌ 会话状态写回失败: %s", exc)
+
+    async def stop(self):
+        """停止后台任务并写回全部脏会话"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await run_in_db(self.flush)
 
     def clear_cache(self, session_id: Optional[str] = None):
-        """清理缓存"""
-        if session_id:
-            self._cache.pop(session_id, None)
-        else:
-            self._cache.clear()
+        """清理缓存（先写回脏状态）
+
+        同步写库，只能在数据库线程中调用；事件循环中使用
+        await run_in_db(cache.clear_cache, session_id)。
+        """
+        with self._lock:
+            targets = [session_id] if session_id else list(self._cache)
+            for sid in targets:
+                if sid in self._cache:
+                    self._evict(sid)
+        self.flush()
 
     def get_or_create(self, session_id: str, default_factory) -> Dict[str, Any]:
         """获取或创建新状态"""
@@ -513,3 +861,13 @@ class GameStateCache:
             state = default_factory()
             self.save_state(session_id, state)
         return state
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取统计信息"""
+        with self._lock:
+            return {
+                **self._stats,
+                "cached": len(self._cache),
+                "dirty": len(self._dirty),
+                "pending": len(self._pending),
+            }
@@ -0,0 +1,105 @@
+"""
+JSON 编解码 - 持久化路径共用
+
+优先使用已安装的原生编码器（orjson，其次 msgspec），未安装时回退到标准库 json。
+各实现的输出格式一致：紧凑分隔符、不转义非 ASCII 字符。
+
+- dumps()：返回 UTF-8 bytes，写入 BLOB 或压缩时不经过中间 str
+- dumps_str()：返回 str，写入 TEXT 列
+- loads()：接受 bytes / str
+- sort_keys=True 时按键排序（用于内容哈希）
+- Pydantic 模型、NumPy 数组 / 标量、datetime 可直接序列化
+"""
+
+import json
+from datetime import date, datetime
+from typing import Any, Union
+
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+def _default(obj: Any) -> Any:
+    """原生编码器不支持的类型"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if hasattr(obj, "tolist"):
+        # NumPy 数组与标量
+        return obj.tolist()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    BACKEND = "orjson"
+
+    _OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def _encode(obj: Any, sort_keys: bool) -> bytes:
+        option = _OPTIONS | orjson.OPT_SORT_KEYS if sort_keys else _OPTIONS
+        return orjson.dumps(obj, default=_default, option=option)
+
+    def _encode_str(obj: Any, sort_keys: bool) -> str:
+        return _encode(obj, sort_keys).decode("utf-8")
+
+    loads = orjson.loads
+
+elif msgspec is not None:
+    BACKEND = "msgspec"
+
+    _encoder = msgspec.json.Encoder(enc_hook=_default)
+    _sorted_encoder = msgspec.json.Encoder(enc_hook=_default, order="sorted")
+
+    def _encode(obj: Any, sort_keys: bool) -> bytes:
+        return (_sorted_encoder if sort_keys else _encoder).encode(obj)
+
+    def _encode_str(obj: Any, sort_keys: bool) -> str:
+        return _encode(obj, sort_keys).decode("utf-8")
+
+    loads = msgspec.json.decode
+
+else:
+    BACKEND = "json"
+
+    def _encode_str(obj: Any, sort_keys: bool) -> str:
+        return json.dumps(
+            obj,
+            ensure_ascii=False,
+            separators=(",", ":"),
+            sort_keys=sort_keys,
+            default=_default,
+        )
+
+    def _encode(obj: Any, sort_keys: bool) -> bytes:
+        return _encode_str(obj, sort_keys).encode("utf-8")
+
+    def loads(data: Union[bytes, str]) -> Any:
+        """反序列化 JSON bytes / 字符串"""
+        return json.loads(data)
+
+
+def dumps(obj: Any, sort_keys: bool = False) -> bytes:
+    """序列化为 UTF-8 JSON bytes"""
+    if not sort_keys and isinstance(obj, BaseModel):
+        # Pydantic 模型直接由 pydantic-core 输出 bytes
+        return obj.__pydantic_serializer__.to_json(obj)
+    return _encode(obj, sort_keys)
+
+
+def dumps_str(obj: Any, sort_keys: bool = False) -> str:
+    """序列化为 JSON 字符串"""
+    if not sort_keys and isinstance(obj, BaseModel):
+        return obj.model_dump_json()
+    return _encode_str(obj, sort_keys)
@@ -0,0 +1,115 @@
+"""
+JSON Patch 工具：计算与应用 RFC 6902 格式的差异（add / remove / replace）。
+
+用于会话状态的增量持久化与世界包存档的覆盖层，针对游戏状态的特点做了取舍：
+- 字典逐键递归比较
+- 列表若只是在末尾追加（日志、任务等），生成 "/-" 追加操作
+- 等长列表逐元素递归，其他列表变化整体替换
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+Operation = Dict[str, Any]
+
+
+def _escape(key: str) -> str:
+    """转义 JSON Pointer 路径段"""
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(segment: str) -> str:
+    """还原 JSON Pointer 路径段"""
+    return segment.replace("~1", "/").replace("~0", "~")
+
+
+def make_patch(old: Any, new: Any) -> List[Operation]:
+    """计算从 old 到 new 的 JSON Patch
+
+    Args:
+        old: 旧文档
+        new: 新文档
+
+    Returns:
+        List[Operation]: 操作列表（old 与 new 相等时为空）
+    """
+    ops: List[Operation] = []
+    _diff(old, new, "", ops)
+    return ops
+
+
+def _diff(old: Any, new: Any, path: str, ops: List[Operation]):
+    if old is new:
+        return
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                _diff(old[key], value, child, ops)
+        return
+
+    if isinstance(old, list) and isinstance(new, list):
+        if len(new) >= len(old) and new[: len(old)] == old:
+            for value in new[len(old):]:
+                ops.append({"op": "add", "path": f"{path}/-", "value": value})
+            return
+        if len(new) == len(old):
+            for index, (a, b) in enumerate(zip(old, new)):
+                _diff(a, b, f"{path}/{index}", ops)
+            return
+
+    if type(old) is not type(new) or old != new:
+        ops.append({"op": "replace", "path": path, "value": new})
+
+
+def apply_patch(doc: Any, ops: List[Operation]) -> Any:
+    """原地应用 JSON Patch
+
+    操作中的值直接挂入文档，调用方需保证其不再被外部修改。
+
+    Args:
+        doc: 目标文档
+        ops: 操作列表
+
+    Returns:
+        应用后的文档（根路径被替换时为新对象）
+    """
+    for op in ops:
+        path = op["path"]
+        if path == "":
+            if op["op"] == "remove":
+                raise ValueError("不能删除根文档")
+            doc = op["value"]
+            continue
+
+        segments = [_unescape(s) for s in path.split("/")[1:]]
+        parent = doc
+        for segment in segments[:-1]:
+            parent = parent[int(segment)] if isinstance(parent, list) else parent[segment]
+
+        last = segments[-1]
+        kind = op["op"]
+        if isinstance(parent, list):
+            if kind == "add":
+                if last == "-":
+                    parent.append(op["value"])
+                else:
+                    parent.insert(int(last), op["value"])
+            elif kind == "remove":
+                del parent[int(last)]
+            else:
+                parent[int(last)] = op["value"]
+        else:
+            if kind == "remove":
+                del parent[last]
+            else:
+                parent[last] = op["value"]
+
+    return doc
@@ -0,0 +1,269 @@
+"""
+游戏状态 Blob 存储 - 按内容寻址的压缩状态
+
+存档（game_saves）、快照（save_snapshots）、自动保存（auto_saves）
+只保存 state_hash 引用，游戏状态本身以 zlib 压缩后存入 state_blobs：
+- 每次保存只序列化一次，同一次保存的存档 / 快照共用一个 Blob
+- 内容相同的状态只存一份（键为规范化 JSON 的 SHA-256）
+- 旧记录（state_hash 为空）仍从原 JSON 列读取
+
+世界包游戏的状态以“基准 + 覆盖”形式保存：
+- 开始游戏时把 WorldPack 转换出的初始状态登记为基准（state_baselines，
+  按世界ID与世界包内容版本区分），状态 metadata 记录 worldPackId / worldPackVersion
+- 保存时只存与基准的 JSON Patch（引用记录的 base_hash 指向基准 Blob），
+  读取时把补丁应用到缓存的基准上
+
+删除存档或清理自动保存后调用 collect_garbage() 回收不再被引用的 Blob。
+"""
+
+import copy
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from . import json_codec
+from .json_patch import apply_patch, make_patch
+
+# zlib 压缩级别（JSON 在低级别下已有很高的压缩率，写入优先）
+COMPRESSION_LEVEL = 3
+
+# 引用 Blob 的表
+REFERENCING_TABLES = ("game_saves", "save_snapshots", "auto_saves")
+
+# 内存中缓存的基准状态数
+BASELINE_CACHE_SIZE = 32
+
+# {base_hash: 基准状态}（Blob 按内容寻址，可跨数据库共享且无需失效）
+_baseline_lock = threading.Lock()
+_baseline_states: "OrderedDict[str, Any]" = OrderedDict()
+
+
+@dataclass(frozen=True)
+class EncodedState:
+    """序列化并压缩后的游戏状态"""
+    state_hash: str
+    data: bytes  # zlib 压缩后的 JSON
+    size: int  # 压缩前字节数
+
+
+def encode_state(game_state: Any) -> EncodedState:
+    """序列化、计算内容哈希并压缩游戏状态（或补丁）"""
+    raw = json_codec.dumps(game_state, sort_keys=True)
+    return EncodedState(
+        state_hash=hashlib.sha256(raw).hexdigest(),
+        data=zlib.compress(raw, COMPRESSION_LEVEL),
+        size=len(raw),
+    )
+
+
+def decode_state(data: bytes) -> Any:
+    """解压并反序列化游戏状态"""
+    return json_codec.loads(zlib.decompress(data))
+
+
+def ensure_state_blob_schema(conn) -> None:
+    """创建 state_blobs / state_baselines 表，并为已存在的引用表补充 state_hash / base_hash 列"""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS state_blobs (
+            hash TEXT PRIMARY KEY,
+            data BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+    )
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS state_baselines (
+            world_id TEXT NOT NULL,
+            pack_version TEXT NOT NULL,
+            state_hash TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (world_id, pack_version)
+        )
+    """
+    )
+
+    for table in _existing_tables(conn, REFERENCING_TABLES):
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for column in ("state_hash", "base_hash"):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} TEXT")
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_state_hash ON {table}(state_hash)"
+        )
+
+
+def put_state(conn, encoded: EncodedState) -> str:
+    """写入 Blob（已存在时跳过），返回 state_hash"""
+    conn.execute(
+        "INSERT OR IGNORE INTO state_blobs (hash, data, size) VALUES (?, ?, ?)",
+        (encoded.state_hash, encoded.data, encoded.size),
+    )
+    return encoded.state_hash
+
+
+def get_state(conn, state_hash: str) -> Optional[Any]:
+    """按哈希读取游戏状态，不存在时返回 None"""
+    row = conn.execute("SELECT data FROM state_blobs WHERE hash = ?", (state_hash,)).fetchone()
+    return decode_state(row[0]) if row else None
+
+
+def put_game_state(conn, game_state: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+    """写入游戏状态，有已登记的世界包基准时只写覆盖补丁
+
+    Returns:
+        (state_hash, base_hash)：base_hash 为 None 时 state_hash 指向完整状态，
+        否则指向相对基准的 JSON Patch
+    """
+    base_hash = find_baseline(conn, game_state)
+    if base_hash is not None:
+        baseline = get_baseline(conn, base_hash)
+        if baseline is not None:
+            return put_state(conn, encode_state(make_patch(baseline, game_state))), base_hash
+    return put_state(conn, encode_state(game_state)), None
+
+
+def load_state(
+    conn,
+    state_hash: Optional[str],
+    legacy_json: Optional[str],
+    base_hash: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """读取记录的游戏状态（优先 Blob 引用，其次旧 JSON 列）"""
+    if not state_hash:
+        return json_codec.loads(legacy_json) if legacy_json else None
+
+    stored = get_state(conn, state_hash)
+    if base_hash is None or stored is None:
+        return stored
+
+    baseline = get_baseline(conn, base_hash)
+    if baseline is None:
+        return None
+    return apply_patch(copy.deepcopy(baseline), stored)
+
+
+# ==================== 世界包基准 ====================
+
+
+def pack_version(pack_json: Union[bytes, str]) -> str:
+    """世界包内容版本（JSON 文本的哈希前缀）"""
+    if isinstance(pack_json, str):
+        pack_json = pack_json.encode("utf-8")
+    return hashlib.sha256(pack_json).hexdigest()[:16]
+
+
+def register_baseline(conn, world_id: str, version: str, game_state: Dict[str, Any]) -> str:
+    """登记世界包的初始状态为基准（已登记时直接返回）
+
+    Returns:
+        str: 基准状态的 Blob 哈希
+    """
+    ensure_state_blob_schema(conn)
+    base_hash = _lookup_baseline(conn, world_id, version)
+    if base_hash is not None:
+        return base_hash
+
+    encoded = encode_state(game_state)
+    put_state(conn, encoded)
+    conn.execute(
+        """
+        INSERT OR IGNORE INTO state_baselines (world_id, pack_version, state_hash)
+        VALUES (?, ?, ?)
+    """,
+        (world_id, version, encoded.state_hash),
+    )
+    _cache_baseline(encoded.state_hash, copy.deepcopy(game_state))
+    return _lookup_baseline(conn, world_id, version)
+
+
+def get_world_baseline(conn, world_id: str, version: str) -> Optional[Dict[str, Any]]:
+    """读取世界包版本已登记的基准状态（未登记时返回 None，调用方不得修改返回值）"""
+    if not _existing_tables(conn, ("state_baselines",)):
+        return None
+    base_hash = _lookup_baseline(conn, world_id, version)
+    return get_baseline(conn, base_hash) if base_hash is not None else None
+
+
+def find_baseline(conn, game_state: Dict[str, Any]) -> Optional[str]:
+    """按状态 metadata 中的世界包ID与版本查找基准哈希"""
+    metadata = game_state.get("metadata") if isinstance(game_state, dict) else None
+    if not isinstance(metadata, dict):
+        return None
+    world_id = metadata.get("worldPackId")
+    version = metadata.get("worldPackVersion")
+    if not world_id or not version:
+        return None
+    if not _existing_tables(conn, ("state_baselines",)):
+        return None
+    return _lookup_baseline(conn, world_id, version)
+
+
+def _lookup_baseline(conn, world_id: str, version: str) -> Optional[str]:
+    row = conn.execute(
+        "SELECT state_hash FROM state_baselines WHERE world_id = ? AND pack_version = ?",
+        (world_id, version),
+    ).fetchone()
+    return row[0] if row else None
+
+
+def get_baseline(conn, base_hash: str) -> Optional[Dict[str, Any]]:
+    """读取基准状态（LRU 缓存，调用方不得修改返回值）"""
+    with _baseline_lock:
+        baseline = _baseline_states.get(base_hash)
+        if baseline is not None:
+            _baseline_states.move_to_end(base_hash)
+            return baseline
+
+    baseline = get_state(conn, base_hash)
+    if baseline is not None:
+        _cache_baseline(base_hash, baseline)
+    return baseline
+
+
+def _cache_baseline(base_hash: str, baseline: Dict[str, Any]):
+    """缓存基准状态"""
+    with _baseline_lock:
+        _baseline_states[base_hash] = baseline
+        _baseline_states.move_to_end(base_hash)
+        while len(_baseline_states) > BASELINE_CACHE_SIZE:
+            _baseline_states.popitem(last=False)
+
+
+def collect_garbage(conn) -> int:
+    """删除不再被任何存档 / 快照 / 自动保存引用的 Blob
+
+    Returns:
+        int: 删除的 Blob 数
+    """
+    tables = _existing_tables(conn, REFERENCING_TABLES)
+    if not tables:
+        return 0
+
+    sources = [
+        f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL"
+        for table in tables
+        for column in ("state_hash", "base_hash")
+    ]
+    if _existing_tables(conn, ("state_baselines",)):
+        sources.append("SELECT state_hash FROM state_baselines")
+    referenced = " UNION ".join(sources)
+    cursor = conn.execute(f"DELETE FROM state_blobs WHERE hash NOT IN ({referenced})")
+    return cursor.rowcount
+
+
+def _existing_tables(conn, names) -> List[str]:
+    """筛选出数据库中已存在的表"""
+    placeholders = ",".join("?" * len(names))
+    rows = conn.execute(
+        f"SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ({placeholders})",
+        tuple(names),
+    ).fetchall()
+    existing = {row[0] for row in rows}
+    return [name for name in names if name in existing]
@@ -2,11 +2,14 @@
 世界脚手架数据库操作
 """
 
-import json
 import sqlite3
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Type
+
+from pydantic import BaseModel
 
 from models.world_models import (
     POI,
@@ -15,14 +18,57 @@ from models.world_models import (
     DetailLayer,
     Faction,
     Location,
+    LocationSummary,
+    POISummary,
     QuestHook,
     Region,
+    RegionSummary,
     StyleVocabulary,
     WorldEvent,
     WorldItem,
     WorldScaffold,
 )
 
+from . import json_codec
+from .connection import connect
+from .world_records import LazyLocation, LazyPOI, LazyRegion
+
+
+def _projection(model: Type[BaseModel], alias: str = "") -> str:
+    """摘要模型对应的查询列"""
+    prefix = f"{alias}." if alias else ""
+    return ", ".join(f"{prefix}{name}" for name in model.model_fields)
+
+
+@dataclass
+class WorldUnitOfWork:
+    """待写入的世界实体（提交时按依赖顺序在一个事务中批量写入）"""
+
+    worlds: List[WorldScaffold] = field(default_factory=list)
+    factions: List[Faction] = field(default_factory=list)
+    regions: List[Region] = field(default_factory=list)
+    locations: List[Location] = field(default_factory=list)
+    pois: List[POI] = field(default_factory=list)
+    detail_layers: List[DetailLayer] = field(default_factory=list)
+
+    def add(self, *entities: BaseModel):
+        """登记实体"""
+        for entity in entities:
+            bucket = _UNIT_OF_WORK_BUCKETS.get(type(entity))
+            if bucket is None:
+                raise TypeError(f"不支持批量写入的实体类型: {type(entity).__name__}")
+            getattr(self, bucket).append(entity)
+
+
+_UNIT_OF_WORK_BUCKETS = {
+    WorldScaffold: "worlds",
+    Faction: "factions",
+    Region: "regions",
+    Location: "locations",
+    POI: "pois",
+    DetailLayer: "detail_layers",
+}
+
 
 class WorldDatabase:
     """世界数据库管理"""
@@ -33,7 +79,7 @@ class WorldDatabase:
 
     def _ensure_schema(self):
         """确保Schema存在"""
-        with sqlite3.connect(self.db_path) as conn:
+        with connect(self.db_path) as conn:
             # 检查主表是否已存在
             cursor = conn.execute(
                 """
@@ -56,41 +102,78 @@ class WorldDatabase:
 
     def _get_conn(self) -> sqlite3.Connection:
         """获取数据库连接"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         conn.row_factory = sqlite3.Row
         return conn
 
+    @contextmanager
+    def unit_of_work(self) -> Iterator[WorldUnitOfWork]:
+        """工作单元：块内登记的实体在退出时一次性写入，块内抛出异常时全部丢弃
+
+        用法:
+            with world_db.unit_of_work() as uow:
+                uow.add(world, *regions, *factions)
+                uow.add(*locations)
+        """
+        uow = WorldUnitOfWork()
+        yield uow
+        self.commit_unit_of_work(uow)
+
+    def commit_unit_of_work(self, uow: WorldUnitOfWork) -> Dict[str, int]:
+        """在一个事务中写入工作单元登记的全部实体
+
+        Returns:
+            Dict[str, int]: 各类实体的写入数
+        """
+        with self._get_conn() as conn:
+            return {
+                "worlds": self._insert_worlds(conn, uow.worlds),
+                "factions": self._insert_factions(conn, uow.factions),
+                "regions": self._insert_regions(conn, uow.regions),
+                "locations": self._insert_locations(conn, uow.locations),
+                "pois": self._insert_pois(conn, uow.pois),
+                "detail_layers": self._insert_detail_layers(conn, uow.detail_layers),
+            }
+
     # ============ 世界脚手架 ============
 
     def create_world(self, world: WorldScaffold) -> str:
         """创建世界"""
         with self._get_conn() as conn:
-            conn.execute(
-                """
-                INSERT INTO world_scaffolds
-                (id, novel_id, name, theme, tone, timeline, tech_magic_level,
-                 geography_climate, core_conflicts, forbidden_rules, style_bible, status, version)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    world.id,
-                    world.novel_id,
-                    world.name,
-                    world.theme,
-                    world.tone,
-                    json.dumps(world.timeline) if world.timeline else None,
-                    json.dumps(world.tech_magic_level) if world.tech_magic_level else None,
-                    json.dumps(world.geography_climate) if world.geography_climate else None,
-                    json.dumps(world.core_conflicts) if world.core_conflicts else None,
-                    json.dumps(world.forbidden_rules) if world.forbidden_rules else None,
-                    json.dumps(world.style_bible.dict()),
-                    world.status,
-                    world.version,
-                ),
-            )
-            conn.commit()
+            self._insert_worlds(conn, [world])
         return world.id
 
+    def _insert_worlds(self, conn: sqlite3.Connection, worlds: Iterable[WorldScaffold]) -> int:
+        """在调用方的事务中写入世界"""
+        rows = [
+            (
+                world.id,
+                world.novel_id,
+                world.name,
+                world.theme,
+                world.tone,
+                json_codec.dumps_str(world.timeline) if world.timeline else None,
+                json_codec.dumps_str(world.tech_magic_level) if world.tech_magic_level else None,
+                json_codec.dumps_str(world.geography_climate) if world.geography_climate else None,
+                json_codec.dumps_str(world.core_conflicts) if world.core_conflicts else None,
+                json_codec.dumps_str(world.forbidden_rules) if world.forbidden_rules else None,
+                json_codec.dumps_str(world.style_bible),
+                world.status,
+                world.version,
+            )
+            for world in worlds
+        ]
+        conn.executemany(
+            """
+            INSERT INTO world_scaffolds
+            (id, novel_id, name, theme, tone, timeline, tech_magic_level,
+             geography_climate, core_conflicts, forbidden_rules, style_bible, status, version)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+            rows,
+        )
+        return len(rows)
+
     def get_world(self, world_id: str) -> Optional[WorldScaffold]:
         """获取世界"""
         with self._get_conn() as conn:
@@ -129,12 +212,12 @@ class WorldDatabase:
                     world.name,
                     world.theme,
                     world.tone,
-                    json.dumps(world.timeline) if world.timeline else None,
-                    json.dumps(world.tech_magic_level) if world.tech_magic_level else None,
-                    json.dumps(world.geography_climate) if world.geography_climate else None,
-                    json.dumps(world.core_conflicts) if world.core_conflicts else None,
-                    json.dumps(world.forbidden_rules) if world.forbidden_rules else None,
-                    json.dumps(world.style_bible.dict()),
+                    json_codec.dumps_str(world.timeline) if world.timeline else None,
+                    json_codec.dumps_str(world.tech_magic_level) if world.tech_magic_level else None,
+                    json_codec.dumps_str(world.geography_climate) if world.geography_climate else None,
+                    json_codec.dumps_str(world.core_conflicts) if world.core_conflicts else None,
+                    json_codec.dumps_str(world.forbidden_rules) if world.forbidden_rules else None,
+                    json_codec.dumps_str(world.style_bible),
                     world.status,
                     world.version,
                     world.id,
@@ -150,16 +233,16 @@ class WorldDatabase:
             name=row["name"],
             theme=row["theme"],
             tone=row["tone"],
-            timeline=json.loads(row["timeline"]) if row["timeline"] else None,
+            timeline=json_codec.loads(row["timeline"]) if row["timeline"] else None,
             tech_magic_level=(
-                json.loads(row["tech_magic_level"]) if row["tech_magic_level"] else None
+                json_codec.loads(row["tech_magic_level"]) if row["tech_magic_level"] else None
             ),
             geography_climate=(
-                json.loads(row["geography_climate"]) if row["geography_climate"] else None
+                json_codec.loads(row["geography_climate"]) if row["geography_climate"] else None
             ),
-            core_conflicts=json.loads(row["core_conflicts"]) if row["core_conflicts"] else None,
-            forbidden_rules=json.loads(row["forbidden_rules"]) if row["forbidden_rules"] else None,
-            style_bible=json.loads(row["style_bible"]),
+            core_conflicts=json_codec.loads(row["core_conflicts"]) if row["core_conflicts"] else None,
+            forbidden_rules=json_codec.loads(row["forbidden_rules"]) if row["forbidden_rules"] else None,
+            style_bible=json_codec.loads(row["style_bible"]),
             status=row["status"],
             version=row["version"],
             created_at=datetime.fromisoformat(row["created_at"]) if row["created_at"] else None,
@@ -170,35 +253,51 @@ class WorldDatabase:
 
     def create_region(self, region: Region) -> str:
         """创建区域"""
+        self.create_regions([region])
+        return region.id
+
+    def create_regions(self, regions: Iterable[Region]) -> int:
+        """批量创建区域（executemany，一个事务）
+
+        Returns:
+            int: 写入的区域数
+        """
         with self._get_conn() as conn:
-            conn.execute(
-                """
-                INSERT INTO regions
-                (id, world_id, name, biome, climate, geography, resources, factions,
-                 danger_level, travel_difficulty, travel_hints, special_rules, atmosphere,
-                 status, canon_locked)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    region.id,
-                    region.world_id,
-                    region.name,
-                    region.biome,
-                    region.climate,
-                    region.geography,
-                    json.dumps(region.resources) if region.resources else None,
-                    json.dumps(region.factions) if region.factions else None,
-                    region.danger_level,
-                    region.travel_difficulty,
-                    json.dumps(region.travel_hints) if region.travel_hints else None,
-                    json.dumps(region.special_rules) if region.special_rules else None,
-                    region.atmosphere,
-                    region.status,
-                    1 if region.canon_locked else 0,
-                ),
+            return self._insert_regions(conn, regions)
+
+    def _insert_regions(self, conn: sqlite3.Connection, regions: Iterable[Region]) -> int:
+        """在调用方的事务中写入区域"""
+        rows = [
+            (
+                region.id,
+                region.world_id,
+                region.name,
+                region.biome,
+                region.climate,
+                region.geography,
+                json_codec.dumps_str(region.resources) if region.resources else None,
+                json_codec.dumps_str(region.factions) if region.factions else None,
+                region.danger_level,
+                region.travel_difficulty,
+                json_codec.dumps_str(region.travel_hints) if region.travel_hints else None,
+                json_codec.dumps_str(region.special_rules) if region.special_rules else None,
+                region.atmosphere,
+                region.status,
+                1 if region.canon_locked else 0,
             )
-            conn.commit()
-        return region.id
+            for region in regions
+        ]
+        conn.executemany(
+            """
+            INSERT INTO regions
+            (id, world_id, name, biome, climate, geography, resources, factions,
+             danger_level, travel_difficulty, travel_hints, special_rules, atmosphere,
+             status, canon_locked)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+            rows,
+        )
+        return len(rows)
 
     def get_regions_by_world(self, world_id: str) -> List[Region]:
         """获取世界的所有区域"""
@@ -221,59 +320,77 @@ class WorldDatabase:
 
     def _row_to_region(self, row: sqlite3.Row) -> Region:
         """转换行到Region"""
-        return Region(
-            id=row["id"],
-            world_id=row["world_id"],
-            name=row["name"],
-            biome=row["biome"],
-            climate=row["climate"],
-            geography=row["geography"],
-            resources=json.loads(row["resources"]) if row["resources"] else None,
-            factions=json.loads(row["factions"]) if row["factions"] else None,
-            danger_level=row["danger_level"],
-            travel_difficulty=row["travel_difficulty"],
-            travel_hints=json.loads(row["travel_hints"]) if row["travel_hints"] else None,
-            special_rules=json.loads(row["special_rules"]) if row["special_rules"] else None,
-            atmosphere=row["atmosphere"],
-            status=row["status"],
-            canon_locked=bool(row["canon_locked"]),
-            created_at=datetime.fromisoformat(row["created_at"]) if row["created_at"] else None,
-            updated_at=datetime.fromisoformat(row["updated_at"]) if row["updated_at"] else None,
-        )
+        return LazyRegion(row).to_model()
+
+    def get_region_summaries(self, world_id: str) -> List[RegionSummary]:
+        """获取世界的区域摘要（只查询摘要列）"""
+        with self._get_conn() as conn:
+            rows = conn.execute(
+                f"SELECT {_projection(RegionSummary)} FROM regions "
+                "WHERE world_id = ? ORDER BY created_at",
+                (world_id,),
+            ).fetchall()
+
+            return [RegionSummary(**dict(row)) for row in rows]
+
+    def get_lazy_regions_by_world(self, world_id: str) -> List[LazyRegion]:
+        """获取世界的所有区域（JSON 列按需解码）"""
+        with self._get_conn() as conn:
+            rows = conn.execute(
+                "SELECT * FROM regions WHERE world_id = ? ORDER BY created_at", (world_id,)
+            ).fetchall()
+
+            return [LazyRegion(row) for row in rows]
 
     # ============ 地点 ============
 
     def create_location(self, location: Location) -> str:
         """创建地点"""
+        self.create_locations([location])
+        return location.id
+
+    def create_locations(self, locations: Iterable[Location]) -> int:
+        """批量创建地点（executemany，一个事务）
+
+        Returns:
+            int: 写入的地点数
+        """
         with self._get_conn() as conn:
-            conn.execute(
-                """
-                INSERT INTO locations
-                (id, region_id, name, type, macro_description, geometry, interactables,
-                 sensory, affordances, controlling_faction, key_npcs, status,
-                 canon_locked, detail_level, visit_count)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    location.id,
-                    location.region_id,
-                    location.name,
-                    location.type,
-                    location.macro_description,
-                    json.dumps(location.geometry) if location.geometry else None,
-                    json.dumps(location.interactables) if location.interactables else None,
-                    json.dumps(location.sensory) if location.sensory else None,
-                    json.dumps(location.affordances) if location.affordances else None,
-                    location.controlling_faction,
-                    json.dumps(location.key_npcs) if location.key_npcs else None,
-                    location.status,
-                    1 if location.canon_locked else 0,
-                    location.detail_level,
-                    location.visit_count,
-                ),
+            return self._insert_locations(conn, locations)
+
+    def _insert_locations(self, conn: sqlite3.Connection, locations: Iterable[Location]) -> int:
+        """在调用方的事务中写入地点"""
+        rows = [
+            (
+                location.id,
+                location.region_id,
+                location.name,
+                location.type,
+                location.macro_description,
+                json_codec.dumps_str(location.geometry) if location.geometry else None,
+                json_codec.dumps_str(location.interactables) if location.interactables else None,
+                json_codec.dumps_str(location.sensory) if location.sensory else None,
+                json_codec.dumps_str(location.affordances) if location.affordances else None,
+                location.controlling_faction,
+                json_codec.dumps_str(location.key_npcs) if location.key_npcs else None,
+                location.status,
+                1 if location.canon_locked else 0,
+                location.detail_level,
+                location.visit_count,
             )
-            conn.commit()
-        return location.id
+            for location in locations
+        ]
+        conn.executemany(
+            """
+            INSERT INTO locations
+            (id, region_id, name, type, macro_description, geometry, interactables,
+             sensory, affordances, controlling_faction, key_npcs, status,
+             canon_locked, detail_level, visit_count)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+            rows,
+        )
+        return len(rows)
 
     def get_locations_by_region(self, region_id: str) -> List[Location]:
         """获取区域的所有地点"""
@@ -312,12 +429,12 @@ class WorldDatabase:
                     location.name,
                     location.type,
                     location.macro_description,
-                    json.dumps(location.geometry) if location.geometry else None,
-                    json.dumps(location.interactables) if location.interactables else None,
-                    json.dumps(location.sensory) if location.sensory else None,
-                    json.dumps(location.affordances) if location.affordances else None,
+                    json_codec.dumps_str(location.geometry) if location.geometry else None,
+                    json_codec.dumps_str(location.interactables) if location.interactables else None,
+                    json_codec.dumps_str(location.sensory) if location.sensory else None,
+                    json_codec.dumps_str(location.affordances) if location.affordances else None,
                     location.controlling_faction,
-                    json.dumps(location.key_npcs) if location.key_npcs else None,
+                    json_codec.dumps_str(location.key_npcs) if location.key_npcs else None,
                     location.status,
                     1 if location.canon_locked else 0,
                     location.detail_level,
@@ -331,57 +448,89 @@ class WorldDatabase:
 
     def _row_to_location(self, row: sqlite3.Row) -> Location:
         """转换行到Location"""
-        return Location(
-            id=row["id"],
-            region_id=row["region_id"],
-            name=row["name"],
-            type=row["type"],
-            macro_description=row["macro_description"],
-            geometry=json.loads(row["geometry"]) if row["geometry"] else None,
-            interactables=json.loads(row["interactables"]) if row["interactables"] else None,
-            sensory=json.loads(row["sensory"]) if row["sensory"] else None,
-            affordances=json.loads(row["affordances"]) if row["affordances"] else None,
-            controlling_faction=row["controlling_faction"],
-            key_npcs=json.loads(row["key_npcs"]) if row["key_npcs"] else None,
-            status=row["status"],
-            canon_locked=bool(row["canon_locked"]),
-            detail_level=row["detail_level"],
-            visit_count=row["visit_count"],
-            first_visited_turn=row["first_visited_turn"],
-            last_visited_turn=row["last_visited_turn"],
-            created_at=datetime.fromisoformat(row["created_at"]) if row["created_at"] else None,
-            updated_at=datetime.fromisoformat(row["updated_at"]) if row["updated_at"] else None,
-        )
+        return LazyLocation(row).to_model()
+
+    def get_location_summaries(self, region_id: str) -> List[LocationSummary]:
+        """获取区域的地点摘要（只查询摘要列）"""
+        with self._get_conn() as conn:
+            rows = conn.execute(
+                f"SELECT {_projection(LocationSummary)} FROM locations "
+                "WHERE region_id = ? ORDER BY created_at",
+                (region_id,),
+            ).fetchall()
+
+            return [LocationSummary(**dict(row)) for row in rows]
+
+    def get_location_summaries_by_world(self, world_id: str) -> List[LocationSummary]:
+        """获取世界全部地点的摘要（地图视图）"""
+        with self._get_conn() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT {_projection(LocationSummary, "l")}
+                FROM locations l
+                JOIN regions r ON r.id = l.region_id
+                WHERE r.world_id = ?
+                ORDER BY r.created_at, l.created_at
+            """,
+                (world_id,),
+            ).fetchall()
+
+            return [LocationSummary(**dict(row)) for row in rows]
+
+    def get_lazy_locations_by_region(self, region_id: str) -> List[LazyLocation]:
+        """获取区域的所有地点（JSON 列按需解码）"""
+        with self._get_conn() as conn:
+            rows = conn.execute(
+                "SELECT * FROM locations WHERE region_id = ? ORDER BY created_at", (region_id,)
+            ).fetchall()
+
+            return [LazyLocation(row) for row in rows]
 
     # ============ POI ============
 
     def create_poi(self, poi: POI) -> str:
         """创建POI"""
+        self.create_pois([poi])
+        return poi.id
+
+    def create_pois(self, pois: Iterable[POI]) -> int:
+        """批量创建POI（executemany，一个事务）
+
+        Returns:
+            int: 写入的POI数
+        """
         with self._get_conn() as conn:
-            conn.execute(
-                """
-                INSERT INTO pois
-                (id, location_id, name, type, description, details, interaction_type,
-                 requirements, risks, expected_outcomes, state, interacted)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    poi.id,
-                    poi.location_id,
-                    poi.name,
-                    poi.type,
-                    poi.description,
-                    json.dumps(poi.details) if poi.details else None,
-                    poi.interaction_type,
-                    json.dumps(poi.requirements) if poi.requirements else None,
-                    json.dumps(poi.risks) if poi.risks else None,
-                    json.dumps(poi.expected_outcomes) if poi.expected_outcomes else None,
-                    poi.state,
-                    1 if poi.interacted else 0,
-                ),
+            return self._insert_pois(conn, pois)
+
+    def _insert_pois(self, conn: sqlite3.Connection, pois: Iterable[POI]) -> int:
+        """在调用方的事务中写入POI"""
+        rows = [
+            (
+                poi.id,
+                poi.location_id,
+                poi.name,
+                poi.type,
+                poi.description,
+                json_codec.dumps_str(poi.details) if poi.details else None,
+                poi.interaction_type,
+                json_codec.dumps_str(poi.requirements) if poi.requirements else None,
+                json_codec.dumps_str(poi.risks) if poi.risks else None,
+                json_codec.dumps_str(poi.expected_outcomes) if poi.expected_outcomes else None,
+                poi.state,
+                1 if poi.interacted else 0,
             )
-            conn.commit()
-        return poi.id
+            for poi in pois
+        ]
+        conn.executemany(
+            """
+            INSERT INTO pois
+            (id, location_id, name, type, description, details, interaction_type,
+             requirements, risks, expected_outcomes, state, interacted)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+            rows,
+        )
+        return len(rows)
 
     def get_pois_by_location(self, location_id: str) -> List[POI]:
         """获取地点的所有POI"""
@@ -394,51 +543,70 @@ class WorldDatabase:
 
     def _row_to_poi(self, row: sqlite3.Row) -> POI:
         """转换行到POI"""
-        return POI(
-            id=row["id"],
-            location_id=row["location_id"],
-            name=row["name"],
-            type=row["type"],
-            description=row["description"],
-            details=json.loads(row["details"]) if row["details"] else None,
-            interaction_type=row["interaction_type"],
-            requirements=json.loads(row["requirements"]) if row["requirements"] else None,
-            risks=json.loads(row["risks"]) if row["risks"] else None,
-            expected_outcomes=(
-                json.loads(row["expected_outcomes"]) if row["expected_outcomes"] else None
-            ),
-            state=row["state"],
-            interacted=bool(row["interacted"]),
-            created_at=datetime.fromisoformat(row["created_at"]) if row["created_at"] else None,
-            updated_at=datetime.fromisoformat(row["updated_at"]) if row["updated_at"] else None,
-        )
+        return LazyPOI(row).to_model()
+
+    def get_poi_summaries(self, location_id: str) -> List[POISummary]:
+        """获取地点的POI摘要（只查询摘要列）"""
+        with self._get_conn() as conn:
+            rows = conn.execute(
+                f"SELECT {_projection(POISummary)} FROM pois "
+                "WHERE location_id = ? ORDER BY created_at",
+                (location_id,),
+            ).fetchall()
+
+            return [POISummary(**dict(row)) for row in rows]
+
+    def get_lazy_pois_by_location(self, location_id: str) -> List[LazyPOI]:
+        """获取地点的所有POI（JSON 列按需解码）"""
+        with self._get_conn() as conn:
+            rows = conn.execute(
+                "SELECT * FROM pois WHERE location_id = ? ORDER BY created_at", (location_id,)
+            ).fetchall()
+
+            return [LazyPOI(row) for row in rows]
 
     # ============ 细化层 ============
 
     def save_detail_layer(self, layer: DetailLayer) -> str:
         """保存细化层"""
+        self.save_detail_layers([layer])
+        return layer.id
+
+    def save_detail_layers(self, layers: Iterable[DetailLayer]) -> int:
+        """批量保存细化层（executemany，一个事务）
+
+        Returns:
+            int: 写入的细化层数
+        """
         with self._get_conn() as conn:
-            conn.execute(
-                """
-                INSERT OR REPLACE INTO detail_layers
-                (id, target_type, target_id, layer_type, content, source,
-                 generated_by_turn, player_id, status)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    layer.id,
-                    layer.target_type,
-                    layer.target_id,
-                    layer.layer_type,
-                    json.dumps(layer.content),
-                    layer.source,
-                    layer.generated_by_turn,
-                    layer.player_id,
-                    layer.status,
-                ),
+            return self._insert_detail_layers(conn, layers)
+
+    def _insert_detail_layers(self, conn: sqlite3.Connection, layers: Iterable[DetailLayer]) -> int:
+        """在调用方的事务中写入细化层"""
+        rows = [
+            (
+                layer.id,
+                layer.target_type,
+                layer.target_id,
+                layer.layer_type,
+                json_codec.dumps_str(layer.content),
+                layer.source,
+                layer.generated_by_turn,
+                layer.player_id,
+                layer.status,
             )
-            conn.commit()
-        return layer.id
+            for layer in layers
+        ]
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO detail_layers
+            (id, target_type, target_id, layer_type, content, source,
+             generated_by_turn, player_id, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+            rows,
+        )
+        return len(rows)
 
     def get_detail_layers(
         self, target_type: str, target_id: str, layer_type: Optional[str] = None
@@ -469,7 +637,7 @@ class WorldDatabase:
             target_type=row["target_type"],
             target_id=row["target_id"],
             layer_type=row["layer_type"],
-            content=json.loads(row["content"]),
+            content=json_codec.loads(row["content"]),
             source=row["source"],
             generated_by_turn=row["generated_by_turn"],
             player_id=row["player_id"],
@@ -481,34 +649,50 @@ class WorldDatabase:
 
     def create_faction(self, faction: Faction) -> str:
         """创建派系"""
+        self.create_factions([faction])
+        return faction.id
+
+    def create_factions(self, factions: Iterable[Faction]) -> int:
+        """批量创建派系（executemany，一个事务）
+
+        Returns:
+            int: 写入的派系数
+        """
         with self._get_conn() as conn:
-            conn.execute(
-                """
-                INSERT INTO factions
-                (id, world_id, name, purpose, ideology, resources, territory,
-                 power_level, relationships, structure, key_members, voice_style,
-                 behavior_patterns, status)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    faction.id,
-                    faction.world_id,
-                    faction.name,
-                    faction.purpose,
-                    faction.ideology,
-                    json.dumps(faction.resources) if faction.resources else None,
-                    json.dumps(faction.territory) if faction.territory else None,
-                    faction.power_level,
-                    json.dumps(faction.relationships) if faction.relationships else None,
-                    faction.structure,
-                    json.dumps(faction.key_members) if faction.key_members else None,
-                    faction.voice_style,
-                    json.dumps(faction.behavior_patterns) if faction.behavior_patterns else None,
-                    faction.status,
-                ),
+            return self._insert_factions(conn, factions)
+
+    def _insert_factions(self, conn: sqlite3.Connection, factions: Iterable[Faction]) -> int:
+        """在调用方的事务中写入派系"""
+        rows = [
+            (
+                faction.id,
+                faction.world_id,
+                faction.name,
+                faction.purpose,
+                faction.ideology,
+                json_codec.dumps_str(faction.resources) if faction.resources else None,
+                json_codec.dumps_str(faction.territory) if faction.territory else None,
+                faction.power_level,
+                json_codec.dumps_str(faction.relationships) if faction.relationships else None,
+                faction.structure,
+                json_codec.dumps_str(faction.key_members) if faction.key_members else None,
+                faction.voice_style,
+                json_codec.dumps_str(faction.behavior_patterns) if faction.behavior_patterns else None,
+                faction.status,
             )
-            conn.commit()
-        return faction.id
+            for faction in factions
+        ]
+        conn.executemany(
+            """
+            INSERT INTO factions
+            (id, world_id, name, purpose, ideology, resources, territory,
+             power_level, relationships, structure, key_members, voice_style,
+             behavior_patterns, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+            rows,
+        )
+        return len(rows)
 
     def get_factions_by_world(self, world_id: str) -> List[Faction]:
         """获取世界的所有派系"""
@@ -527,15 +711,15 @@ class WorldDatabase:
             name=row["name"],
             purpose=row["purpose"],
             ideology=row["ideology"],
-            resources=json.loads(row["resources"]) if row["resources"] else None,
-            territory=json.loads(row["territory"]) if row["territory"] else None,
+            resources=json_codec.loads(row["resources"]) if row["resources"] else None,
+            territory=json_codec.loads(row["territory"]) if row["territory"] else None,
             power_level=row["power_level"],
-            relationships=json.loads(row["relationships"]) if row["relationships"] else None,
+            relationships=json_codec.loads(row["relationships"]) if row["relationships"] else None,
             structure=row["structure"],
-            key_members=json.loads(row["key_members"]) if row["key_members"] else None,
+            key_members=json_codec.loads(row["key_members"]) if row["key_members"] else None,
             voice_style=row["voice_style"],
             behavior_patterns=(
-                json.loads(row["behavior_patterns"]) if row["behavior_patterns"] else None
+                json_codec.loads(row["behavior_patterns"]) if row["behavior_patterns"] else None
             ),
             status=row["status"],
             created_at=datetime.fromisoformat(row["created_at"]) if row["created_at"] else None,
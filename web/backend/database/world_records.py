@@ -0,0 +1,120 @@
+"""
+世界数据的按需解码记录
+
+区域 / 地点 / POI 的详情存放在多个 JSON 列中（几何、感官、可供性等），
+列表与地图视图通常只用到名称和ID。LazyRecord 包装一行查询结果，
+属性在首次访问时才转换（JSON 解码、时间解析）并缓存，
+需要完整模型时调用 to_model()。
+"""
+
+from datetime import datetime
+from typing import Any, Callable, Dict, Mapping, Type
+
+from pydantic import BaseModel
+
+from models.world_models import POI, Location, Region
+
+from . import json_codec
+
+
+def load_json(value: Any) -> Any:
+    """解码 JSON 列（空值为 None）"""
+    return json_codec.loads(value) if value else None
+
+
+def load_datetime(value: Any) -> Any:
+    """解析时间列（空值为 None）"""
+    return datetime.fromisoformat(value) if value else None
+
+
+class LazyRecord:
+    """按需解码的只读行记录"""
+
+    __slots__ = ("_row", "_values")
+
+    # 完整模型
+    model: Type[BaseModel] = BaseModel
+    # {列名: 转换函数}（未列出的列原样返回）
+    converters: Dict[str, Callable[[Any], Any]] = {}
+
+    def __init__(self, row: Mapping[str, Any]):
+        self._row = dict(row)
+        self._values: Dict[str, Any] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        values = self._values
+        if name in values:
+            return values[name]
+        if name not in self._row:
+            raise AttributeError(f"{type(self).__name__} 没有字段 {name}")
+
+        value = self._row[name]
+        converter = self.converters.get(name)
+        if converter is not None:
+            value = converter(value)
+        values[name] = value
+        return value
+
+    def is_decoded(self, name: str) -> bool:
+        """字段是否已转换"""
+        return name in self._values
+
+    def to_model(self) -> BaseModel:
+        """转换为完整模型（解码全部字段）"""
+        return self.model(
+            **{name: getattr(self, name) for name in self.model.model_fields if name in self._row}
+        )
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(id={self._row.get('id')!r}, name={self._row.get('name')!r})"
+
+
+_TIMESTAMPS = {"created_at": load_datetime, "updated_at": load_datetime}
+
+
+class LazyRegion(LazyRecord):
+    """按需解码的区域"""
+
+    __slots__ = ()
+    model = Region
+    converters = {
+        "resources": load_json,
+        "factions": load_json,
+        "travel_hints": load_json,
+        "special_rules": load_json,
+        "canon_locked": bool,
+        **_TIMESTAMPS,
+    }
+
+
+class LazyLocation(LazyRecord):
+    """按需解码的地点"""
+
+    __slots__ = ()
+    model = Location
+    converters = {
+        "geometry": load_json,
+        "interactables": load_json,
+        "sensory": load_json,
+        "affordances": load_json,
+        "key_npcs": load_json,
+        "canon_locked": bool,
+        **_TIMESTAMPS,
+    }
+
+
+class LazyPOI(LazyRecord):
+    """按需解码的兴趣点"""
+
+    __slots__ = ()
+    model = POI
+    converters = {
+        "details": load_json,
+        "requirements": load_json,
+        "risks": load_json,
+        "expected_outcomes": load_json,
+        "interacted": bool,
+        **_TIMESTAMPS,
+    }
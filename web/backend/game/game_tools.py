@@ -8,10 +8,12 @@ from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
+from .state_tracking import SectionedModel, TrackedModel
+
 # ==================== 数据模型 ====================
 
 
-class InventoryItem(BaseModel):
+class InventoryItem(TrackedModel):
     id: str
     name: str
     description: str
@@ -20,7 +22,7 @@ class InventoryItem(BaseModel):
     properties: Dict[str, Any] = {}
 
 
-class PlayerState(BaseModel):
+class PlayerState(TrackedModel):
     hp: int = 100
     maxHp: int = 100
     stamina: int = 100
@@ -31,14 +33,14 @@ class PlayerState(BaseModel):
     money: int = 0
 
 
-class QuestObjective(BaseModel):
+class QuestObjective(TrackedModel):
     id: str
     description: str
     completed: bool = False
     required: bool = True
 
 
-class Quest(BaseModel):
+class Quest(TrackedModel):
     id: str
     quest_id: Optional[str] = None  # 可选的任务ID（用于兼容）
     title: str
@@ -49,7 +51,7 @@ class Quest(BaseModel):
     rewards: Dict[str, Any] = {}  # 任务奖励（exp, money, items等）
 
 
-class WorldState(BaseModel):
+class WorldState(TrackedModel):
     time: int = 0  # 回合数
     flags: Dict[str, Any] = {}
     discoveredLocations: List[str] = []
@@ -58,7 +60,7 @@ class WorldState(BaseModel):
     theme: Optional[str] = None  # 世界主题/基调
 
 
-class MapNode(BaseModel):
+class MapNode(TrackedModel):
     id: str
     name: str
     shortDesc: str
@@ -68,7 +70,7 @@ class MapNode(BaseModel):
     metadata: Dict[str, Any] = {}  # 节点元数据（生态、坐标、POI等）
 
 
-class MapEdge(BaseModel):
+class MapEdge(TrackedModel):
     fromNode: str = Field(alias="from")
     toNode: str = Field(alias="to")
     bidirectional: bool = True
@@ -77,20 +79,28 @@ class MapEdge(BaseModel):
         populate_by_name = True  # 允许使用原始字段名或别名
 
 
-class GameMap(BaseModel):
+class GameMap(TrackedModel):
     nodes: List[MapNode] = []
     edges: List[MapEdge] = []
     currentNodeId: str = "start"
 
 
-class GameLogEntry(BaseModel):
+class GameLogEntry(TrackedModel):
     turn: int
     actor: Literal["player", "system", "npc"]
     text: str
     timestamp: int
 
 
-class GameState(BaseModel):
+class GameState(SectionedModel):
+    """游戏状态
+
+    player / world / quests / map / log / metadata 各自缓存序列化片段，
+    to_json_bytes() 只重新序列化有修改的分区（见 state_tracking）。
+    """
+
+    sections = ("player", "world", "quests", "map", "log", "metadata")
+
     version: str = "1.0.0"
     session_id: Optional[str] = None  # 🔥 会话ID，用于Checkpoint记忆
     turn_number: int = 0  # 当前回合数
@@ -611,6 +621,7 @@ class GameTools:
 
             # 更新当前状态（注意：这会完全替换状态）
             self.state.__dict__.update(loaded_state.__dict__)
+            self.state._track_sections()
 
             return {
                 "success": True,
@@ -0,0 +1,450 @@
+"""
+游戏状态分区变更追踪与序列化缓存
+
+GameState 按分区（player / world / quests / map / log / metadata）缓存各自序列化后的
+JSON 片段，完整文档由缓存片段拼接而成，每回合只重新序列化发生变化的分区。
+
+- TrackedModel：分区内的模型，字段赋值时通知所属分区
+- TrackedList / TrackedDict：分区内的列表与字典，原地修改（append、[key] = value 等）时通知所属分区
+- SectionedModel：GameState 基类，维护分区脏标记与片段缓存
+- LiveModelCache：按会话跨请求保留 SectionedModel，客户端回传的未改动分区沿用已有模型与片段
+
+绕过上述接口的修改（直接写 __dict__、在外部持有并修改已替换掉的旧对象）不会被追踪，
+此时需调用 mark_dirty()。
+
+赋给分区的普通 list / dict 会被复制为 TrackedList / TrackedDict 后存入，调用方手中的原对象
+与状态不再关联：之后修改原对象不会反映到状态中。需要继续修改时应重新从状态读取，例如
+state.log = entries 之后使用 state.log.append(...)，而不是 entries.append(...)。
+"""
+
+import threading
+import types
+from collections import OrderedDict
+from functools import partial
+from typing import (
+    Any, Callable, ClassVar, Dict, Literal, Mapping, Optional, Tuple, Type, Union, get_args, get_origin
+)
+
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import from_json, to_json
+
+Notify = Callable[[], None]
+
+# 不可变的标量，无需追踪
+_SCALAR_TYPES = frozenset({str, int, float, bool, type(None)})
+
+# {(模型类, 分区名): 分区字段的 TypeAdapter}
+_section_adapters: Dict[Tuple[type, str], TypeAdapter] = {}
+
+# {模型类: 可能包含列表 / 字典 / 模型的字段名}（绑定时跳过标量字段）
+_container_fields: Dict[type, Tuple[str, ...]] = {}
+
+
+def _is_scalar_annotation(annotation: Any) -> bool:
+    origin = get_origin(annotation)
+    if origin is Literal:
+        return True
+    if origin is Union or origin is types.UnionType:
+        return all(_is_scalar_annotation(arg) for arg in get_args(annotation))
+    return annotation in _SCALAR_TYPES
+
+
+def container_fields(model: type) -> Tuple[str, ...]:
+    """模型中需要绑定追踪的字段"""
+    fields = _container_fields.get(model)
+    if fields is None:
+        fields = _container_fields[model] = tuple(
+            name
+            for name, field in model.model_fields.items()
+            if not _is_scalar_annotation(field.annotation)
+        )
+    return fields
+
+
+def track(value: Any, notify: Notify) -> Any:
+    """将分区内的值绑定到通知回调（普通列表 / 字典复制为可追踪的子类，模型递归绑定）"""
+    value_type = type(value)
+    if value_type in _SCALAR_TYPES:
+        return value
+    if value_type is list:
+        return TrackedList(value, notify)
+    if value_type is dict:
+        return TrackedDict(value, notify)
+    if isinstance(value, TrackedModel):
+        value._bind(notify)
+        return value
+    if isinstance(value, (TrackedList, TrackedDict)):
+        if value._notify is not notify:
+            value._bind(notify)
+        return value
+    if isinstance(value, list):
+        return TrackedList(value, notify)
+    if isinstance(value, dict):
+        return TrackedDict(value, notify)
+    return value
+
+
+class TrackedList(list):
+    """原地修改时通知所属分区的列表"""
+
+    __slots__ = ("_notify",)
+
+    def __init__(self, items=(), notify: Optional[Notify] = None):
+        super().__init__(items)
+        self._notify = None
+        if notify is not None:
+            self._bind(notify)
+
+    def _bind(self, notify: Notify):
+        self._notify = notify
+        for index, item in enumerate(self):
+            tracked = track(item, notify)
+            if tracked is not item:
+                list.__setitem__(self, index, tracked)
+
+    def _track(self, value: Any) -> Any:
+        return value if self._notify is None else track(value, self._notify)
+
+    def _changed(self):
+        if self._notify is not None:
+            self._notify()
+
+    def __reduce_ex__(self, protocol):
+        # 复制 / 序列化为普通列表，由新的所属状态重新绑定
+        return list, (list(self),)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = [self._track(item) for item in value]
+        else:
+            value = self._track(value)
+        super().__setitem__(index, value)
+        self._changed()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._changed()
+
+    def __iadd__(self, items):
+        super().__iadd__([self._track(item) for item in items])
+        self._changed()
+        return self
+
+    def __imul__(self, count):
+        super().__imul__(count)
+        self._changed()
+        return self
+
+    def append(self, item):
+        super().append(self._track(item))
+        self._changed()
+
+    def extend(self, items):
+        super().extend([self._track(item) for item in items])
+        self._changed()
+
+    def insert(self, index, item):
+        super().insert(index, self._track(item))
+        self._changed()
+
+    def remove(self, item):
+        super().remove(item)
+        self._changed()
+
+    def pop(self, index=-1):
+        item = super().pop(index)
+        self._changed()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._changed()
+
+    def reverse(self):
+        super().reverse()
+        self._changed()
+
+
+class TrackedDict(dict):
+    """原地修改时通知所属分区的字典"""
+
+    __slots__ = ("_notify",)
+
+    def __init__(self, items=(), notify: Optional[Notify] = None):
+        self._notify = notify
+        super().__init__(items)
+        if notify is not None:
+            self._bind(notify)
+
+    def _bind(self, notify: Notify):
+        self._notify = notify
+        for key, value in self.items():
+            tracked = track(value, notify)
+            if tracked is not value:
+                dict.__setitem__(self, key, tracked)
+
+    def _track(self, value: Any) -> Any:
+        return value if self._notify is None else track(value, self._notify)
+
+    def _changed(self):
+        if self._notify is not None:
+            self._notify()
+
+    def __reduce_ex__(self, protocol):
+        return dict, (dict(self),)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, self._track(value))
+        self._changed()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            super().__setitem__(key, self._track(value))
+        self._changed()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *default):
+        value = super().pop(key, *default)
+        self._changed()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._changed()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+
+class TrackedModel(BaseModel):
+    """字段赋值时通知所属分区的模型
+
+    通知回调保存在 __slots__ 中（不属于模型字段 / 私有属性，不参与比较和复制）。
+    """
+
+    __slots__ = ("_notify",)
+
+    def _bind(self, notify: Notify):
+        object.__setattr__(self, "_notify", notify)
+        values = self.__dict__
+        for name in container_fields(type(self)):
+            value = values.get(name)
+            tracked = track(value, notify)
+            if tracked is not value:
+                values[name] = tracked
+
+    def __setattr__(self, name: str, value: Any):
+        notify = getattr(self, "_notify", None)
+        if notify is None or name not in type(self).model_fields:
+            super().__setattr__(name, value)
+            return
+        super().__setattr__(name, track(value, notify))
+        notify()
+
+
+class SectionedModel(BaseModel):
+    """按分区缓存序列化片段的模型
+
+    sections 中的字段各自缓存 JSON 片段，分区被替换或内部被修改后标记为脏，
+    下次序列化时只重新生成脏分区；其余字段（版本号、回合数等标量）每次直接序列化。
+    """
+
+    __slots__ = ("_fragments", "_dirty", "_fragment_lock")
+
+    sections: ClassVar[Tuple[str, ...]] = ()
+
+    def model_post_init(self, __context: Any):
+        self._track_sections()
+
+    def _track_sections(self):
+        """绑定全部分区并清空片段缓存（构造、复制、整体替换 __dict__ 后调用）"""
+        object.__setattr__(self, "_fragments", {})
+        object.__setattr__(self, "_dirty", set(self.sections))
+        object.__setattr__(self, "_fragment_lock", threading.Lock())
+        for name in self.sections:
+            self._track_section(name)
+
+    def _track_section(self, name: str):
+        values = self.__dict__
+        value = values[name]
+        tracked = track(value, partial(self.mark_dirty, name))
+        if tracked is not value:
+            values[name] = tracked
+
+    def __setattr__(self, name: str, value: Any):
+        super().__setattr__(name, value)
+        if name in self.sections:
+            self._track_section(name)
+            self.mark_dirty(name)
+
+    def __copy__(self):
+        # 浅复制与原对象共享分区对象，变更只会通知最后绑定的一方，因此复制品不使用缓存
+        copied = super().__copy__()
+        object.__setattr__(copied, "_fragments", None)
+        return copied
+
+    def __deepcopy__(self, memo: Optional[Dict[int, Any]] = None):
+        copied = super().__deepcopy__(memo)
+        copied._track_sections()
+        return copied
+
+    def mark_dirty(self, *sections: str):
+        """标记分区已修改（不传参数时标记全部分区）"""
+        dirty = getattr(self, "_dirty", None)
+        if dirty is not None:
+            dirty.update(sections or self.sections)
+
+    def is_dirty(self, section: str) -> bool:
+        """分区的缓存片段是否需要重新生成"""
+        fragments = getattr(self, "_fragments", None)
+        return fragments is None or section in self._dirty or section not in fragments
+
+    @classmethod
+    def _section_adapter(cls, name: str) -> TypeAdapter:
+        key = (cls, name)
+        adapter = _section_adapters.get(key)
+        if adapter is None:
+            adapter = _section_adapters[key] = TypeAdapter(cls.model_fields[name].annotation)
+        return adapter
+
+    def section_json(self, name: str) -> bytes:
+        """分区的 JSON 片段（未修改时返回缓存）"""
+        fragments = getattr(self, "_fragments", None)
+        if fragments is None:
+            return self._section_adapter(name).dump_json(getattr(self, name))
+
+        with self._fragment_lock:
+            if name in self._dirty or name not in fragments:
+                # 先清除脏标记再序列化：序列化期间的并发修改会重新标记
+                self._dirty.discard(name)
+                fragments[name] = self._section_adapter(name).dump_json(getattr(self, name))
+            return fragments[name]
+
+    def to_json_bytes(self) -> bytes:
+        """完整的 JSON 文档（与 model_dump_json() 输出一致，分区片段来自缓存）"""
+        parts = []
+        for name in type(self).model_fields:
+            if name in self.sections:
+                fragment = self.section_json(name)
+            else:
+                fragment = to_json(getattr(self, name))
+            parts.append(b'"' + name.encode() + b'":' + fragment)
+        return b"{" + b",".join(parts) + b"}"
+
+
+class _LiveEntry:
+    """会话的常驻模型与上次响应中各字段的内容"""
+
+    __slots__ = ("state", "sent")
+
+    def __init__(self):
+        # 空闲的模型（被 acquire 取走时为 None）
+        self.state: Optional[SectionedModel] = None
+        # {字段名: (响应中的 JSON 片段, 片段解析后的值)}，非分区字段的片段为 None
+        self.sent: Dict[str, Tuple[Optional[bytes], Any]] = {}
+
+
+class LiveModelCache:
+    """按会话跨请求保留的分区模型（LRU）
+
+    客户端每回合回传上一次响应中的完整状态。acquire() 将回传内容按字段与上次响应逐一比较：
+    未改动的分区沿用常驻模型及其缓存片段，只有被客户端改动的字段重新校验并标记为脏；
+    release() 在响应后登记模型与各分区的响应内容（片段未变化的分区不重新解析）。
+
+    模型被取走期间同一会话的并发请求各自完整构建；acquire 与 release 之间出错时
+    模型不会放回，下一次请求完整构建。非分区字段须为标量（见 SectionedModel）。
+    """
+
+    def __init__(self, model: Type[SectionedModel], max_entries: int = 100, key_field: str = "session_id"):
+        """
+        Args:
+            model: 分区模型类
+            max_entries: 保留的会话数上限
+            key_field: 作为会话键的字段
+        """
+        self.model = model
+        self.max_entries = max(1, max_entries)
+        self.key_field = key_field
+
+        self._entries: "OrderedDict[Any, _LiveEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def acquire(self, data: Mapping[str, Any]) -> SectionedModel:
+        """由客户端回传的状态得到模型（可复用时沿用常驻模型）"""
+        key = data.get(self.key_field)
+        state = None
+        sent: Dict[str, Tuple[Optional[bytes], Any]] = {}
+        if key is not None:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry.state is not None:
+                    state, entry.state = entry.state, None
+                    sent = entry.sent
+
+        if state is None or any(name not in data for name in self.model.model_fields):
+            self.misses += 1
+            return self.model(**data)
+
+        for name in self.model.model_fields:
+            value = data[name]
+            if name in sent and value == sent[name][1]:
+                continue
+            setattr(state, name, self.model._section_adapter(name).validate_python(value))
+        self.hits += 1
+        return state
+
+    def release(self, state: SectionedModel):
+        """登记响应后的模型（调用方之后不再修改它）"""
+        key = getattr(state, self.key_field)
+        if key is None:
+            return
+
+        with self._lock:
+            entry = self._entries.get(key)
+            previous = entry.sent if entry is not None else {}
+
+        sent = {}
+        for name in type(state).model_fields:
+            if name in state.sections:
+                fragment = state.section_json(name)
+                cached = previous.get(name)
+                sent[name] = cached if cached is not None and cached[0] is fragment else (fragment, from_json(fragment))
+            else:
+                sent[name] = (None, getattr(state, name))
+
+        with self._lock:
+            entry = self._entries.pop(key, None) or _LiveEntry()
+            entry.state = state
+            entry.sent = sent
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: Any):
+        """移除会话的常驻模型"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取统计信息"""
+        return {"sessions": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -4,14 +4,15 @@
 用于持久化存储 Agent 的记忆数据
 """
 
-import json
 import logging
-import sqlite3
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 from langgraph.store.base import BaseStore, Item
 
+from database import json_codec
+from database.connection import connect
+
 logger = logging.getLogger(__name__)
 
 
@@ -48,7 +49,7 @@ class SqliteStore(BaseStore):
 
     def _init_db(self):
         """初始化数据库表"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         cursor.execute(
@@ -98,9 +99,9 @@ class SqliteStore(BaseStore):
             store.put(("users",), "user_123", {"name": "John", "age": 30})
         """
         namespace_str = self._namespace_to_str(namespace)
-        value_json = json.dumps(value, ensure_ascii=False)
+        value_json = json_codec.dumps_str(value)
 
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         cursor.execute(
@@ -136,7 +137,7 @@ class SqliteStore(BaseStore):
         """
         namespace_str = self._namespace_to_str(namespace)
 
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         cursor.execute(
@@ -152,7 +153,7 @@ class SqliteStore(BaseStore):
         conn.close()
 
         if row:
-            value = json.loads(row[0])
+            value = json_codec.loads(row[0])
             logger.debug(f"📖 Store.get: {namespace_str}/{key} -> found")
 
             return Item(
@@ -171,7 +172,7 @@ class SqliteStore(BaseStore):
         """
         namespace_str = self._namespace_to_str(namespace)
 
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         cursor.execute(
@@ -203,7 +204,7 @@ class SqliteStore(BaseStore):
         """
         namespace_str = self._namespace_to_str(namespace)
 
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         # 支持前缀匹配（如果 namespace 是 ("users",)，匹配 "users" 和 "users:*"）
@@ -225,7 +226,7 @@ class SqliteStore(BaseStore):
             items.append(
                 Item(
                     key=row[0],
-                    value=json.loads(row[1]),
+                    value=json_codec.loads(row[1]),
                     namespace=namespace,
                     created_at=row[2],
                     updated_at=row[3],
@@ -241,7 +242,7 @@ class SqliteStore(BaseStore):
         Returns:
             命名空间字符串列表
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         cursor.execute(
@@ -269,7 +270,7 @@ class SqliteStore(BaseStore):
         """
         namespace_str = self._namespace_to_str(namespace)
 
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         cursor.execute(
@@ -293,7 +294,7 @@ class SqliteStore(BaseStore):
         Returns:
             统计信息字典
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         # 总记录数
@@ -33,10 +33,14 @@ logger = get_logger(__name__)
 
 from api.dm_api import init_dm_agent
 from api.dm_api import router as dm_router
+from api import game_api
 from api.game_api import init_game_engine
 from api.game_api import router as game_router
 from api.worlds_api import router as worlds_router
+from database.async_db import AsyncDatabase, AsyncDBProxy, run_in_db, shutdown_db_executor
+from database.connection import connect, get_connection_manager
 from database.world_db import WorldDatabase
+from services.storage_maintenance import StorageMaintenanceWorker
 
 from llm import create_backend, get_available_backends
 from llm.config_loader import LLMConfigLoader
@@ -91,6 +95,7 @@ app.include_router(worlds_router)
 llm_backend = None
 db = None
 world_db = None
+storage_worker = None
 
 
 def _ensure_world_generation_schema(db_path: str):
@@ -98,10 +103,9 @@ def _ensure_world_generation_schema(db_path: str):
 
     在开发/一键启动场景下，避免因为未手动迁移而导致 /api/worlds/* 接口 500。
     """
-    import sqlite3
     from pathlib import Path
 
-    conn = sqlite3.connect(db_path)
+    conn = connect(db_path)
     try:
         cur = conn.cursor()
         # 若主表不存在，直接应用完整 schema
@@ -166,10 +170,26 @@ class GenerateChapterRequest(BaseModel):
     user_choice: Optional[str] = None
 
 
+def _get_state_cache():
+    """获取游戏工具的会话状态缓存（未初始化时返回 None）"""
+    try:
+        from agents import game_tools_langchain
+    except Exception:
+        return None
+    return game_tools_langchain.state_cache
+
+
+def _start_state_cache_flusher():
+    """启动会话状态的后台写回任务"""
+    state_cache = _get_state_cache()
+    if state_cache is not None:
+        state_cache.start_flusher()
+
+
 @app.on_event("startup")
 async def startup():
     """启动时初始化所有组件"""
-    global llm_backend, db, world_db
+    global llm_backend, db, world_db, storage_worker
 
     logger.info("========================================")
     logger.info("🚀 启动 AI 小说生成器后端服务")
@@ -194,21 +214,24 @@ async def startup():
         # 2. 初始化数据库
         logger.info("初始化数据库...")
         db_path = settings.database_path
-        db = Database(db_path=str(db_path))
-        db.connect()
+        db = AsyncDatabase(Database(db_path=str(db_path)))
+        await db.connect()
         logger.info(f"✅ 数据库已连接: {db_path}")
 
         # 2.1 确保世界生成相关表存在
-        _ensure_world_generation_schema(str(db_path))
+        await run_in_db(_ensure_world_generation_schema, str(db_path))
 
         # 3. 初始化世界数据库
         logger.info("初始化世界数据库...")
-        world_db = WorldDatabase(db_path=str(db_path))
+        world_db = AsyncDBProxy(await run_in_db(WorldDatabase, db_path=str(db_path)))
         logger.info("✅ 世界数据库已初始化")
 
         # 4. 初始化游戏引擎
         logger.info("初始化游戏引擎...")
         init_game_engine(llm_backend, db_path=str(db_path))
+        _start_state_cache_flusher()
+        if game_api.auto_save_queue is not None:
+            game_api.auto_save_queue.start()
         logger.info("✅ 游戏引擎已初始化")
 
         # 5. 初始化 DM Agent
@@ -216,6 +239,15 @@ async def startup():
         init_dm_agent()
         logger.info("✅ DM Agent 已初始化")
 
+        # 6. 启动存储维护任务
+        storage_worker = StorageMaintenanceWorker(
+            str(db_path),
+            interval=settings.storage_maintenance_interval,
+            autosave_keep_count=settings.auto_save_keep_count,
+        )
+        storage_worker.start()
+        logger.info(f"✅ 存储维护任务已启动（周期 {settings.storage_maintenance_interval}s）")
+
         logger.info("========================================")
         logger.info(f"✅ 后端服务已启动")
         logger.info(f"   - 地址: http://{settings.backend_host}:{settings.backend_port}")
@@ -235,10 +267,29 @@ async def shutdown():
     logger.info("========================================")
 
     try:
+        if storage_worker is not None:
+            await storage_worker.stop()
+            logger.info("✅ 存储维护任务已停止")
+
+        if game_api.auto_save_queue is not None:
+            await game_api.auto_save_queue.stop()
+            logger.info("✅ 自动保存已写入")
+
+        state_cache = _get_state_cache()
+        if state_cache is not None:
+            await state_cache.stop()
+            logger.info("✅ 会话状态已写回")
+
         if db:
-            db.close()
+            await db.close()
             logger.info("✅ 数据库已关闭")
 
+        shutdown_db_executor()
+        logger.info("✅ 数据库线程池已关闭")
+
+        get_connection_manager().close_all()
+        logger.info("✅ SQLite 连接池已关闭")
+
         logger.info("✅ 所有资源已清理")
 
     except Exception as e:
@@ -282,7 +333,7 @@ async def create_novel(request: NovelCreateRequest):
     novel_id = f"novel_{uuid.uuid4().hex[:8]}"
 
     # TODO: 保存到数据库
-    db.create_novel(
+    await db.create_novel(
         novel_id=novel_id,
         title=request.title,
         novel_type=request.novel_type,
@@ -327,7 +378,7 @@ async def websocket_generate(websocket: WebSocket, novel_id: str):
                 content = response.content
 
                 # 保存章节
-                db.save_chapter(novel_id=novel_id, chapter_num=chapter_num, content=content)
+                await db.save_chapter(novel_id=novel_id, chapter_num=chapter_num, content=content)
 
                 # 发送生成完成
                 await websocket.send_json(
@@ -350,12 +401,12 @@ async def websocket_generate(websocket: WebSocket, novel_id: str):
 @app.get("/api/novels/{novel_id}")
 async def get_novel(novel_id: str):
     """获取小说详情"""
-    novel = db.get_novel(novel_id)
+    novel = await db.get_novel(novel_id)
     if not novel:
         return {"error": "小说不存在"}
 
-    chapters = db.get_all_chapters(novel_id)
-    stats = db.get_stats(novel_id)
+    chapters = await db.get_all_chapters(novel_id)
+    stats = await db.get_stats(novel_id)
 
     return {"novel": novel, "chapters": chapters, "stats": stats}
 
@@ -363,15 +414,15 @@ async def get_novel(novel_id: str):
 @app.get("/api/novels/{novel_id}/chapters/{chapter_num}")
 async def get_chapter(novel_id: str, chapter_num: int):
     """获取指定章节"""
-    chapter = db.get_chapter(novel_id, chapter_num)
+    chapter = await db.get_chapter(novel_id, chapter_num)
     return chapter or {"error": "章节不存在"}
 
 
 @app.get("/api/novels/{novel_id}/export")
 async def export_novel(novel_id: str):
     """导出小说为 Markdown"""
-    novel = db.get_novel(novel_id)
-    chapters = db.get_all_chapters(novel_id)
+    novel = await db.get_novel(novel_id)
+    chapters = await db.get_all_chapters(novel_id)
 
     markdown = f"# {novel['title']}\\n\\n"
     for chapter in chapters:
@@ -201,6 +201,17 @@ class Region(BaseModel):
     updated_at: Optional[datetime] = None
 
 
+class RegionSummary(BaseModel):
+    """区域摘要（列表 / 地图视图，不含 JSON 详情列）"""
+
+    id: str
+    world_id: str
+    name: str
+    biome: str
+    danger_level: int = 1
+    status: Literal["draft", "published", "locked"] = "draft"
+
+
 # ============ 地点 ============
 
 
@@ -254,6 +265,19 @@ class Location(BaseModel):
     updated_at: Optional[datetime] = None
 
 
+class LocationSummary(BaseModel):
+    """地点摘要（列表 / 地图视图，不含 JSON 详情列）"""
+
+    id: str
+    region_id: str
+    name: str
+    type: Literal["landmark", "settlement", "dungeon", "wilderness"]
+    controlling_faction: Optional[str] = None
+    status: Literal["draft", "published", "locked"] = "draft"
+    detail_level: int = 0
+    visit_count: int = 0
+
+
 # ============ 兴趣点 ============
 
 
@@ -284,6 +308,18 @@ class POI(BaseModel):
     updated_at: Optional[datetime] = None
 
 
+class POISummary(BaseModel):
+    """兴趣点摘要（列表视图，不含 JSON 详情列）"""
+
+    id: str
+    location_id: str
+    name: str
+    type: Literal["object", "npc", "event", "hazard", "secret"]
+    interaction_type: Optional[str] = None
+    state: Literal["active", "depleted", "destroyed", "hidden"] = "active"
+    interacted: bool = False
+
+
 # ============ 派系 ============
 
 
@@ -0,0 +1,193 @@
+"""自动保存队列
+
+回合结束时只登记状态引用（O(1)，不序列化、不访问数据库），
+由后台任务合并写入 auto_saves：
+- 同一用户只保留最新一次提交的状态
+- 距上次写入累计 interval_turns 个回合，或玩家空闲 idle_delay 秒后写入
+- 序列化与写库在数据库线程池中执行，到期的多个用户在一个事务中批量写入
+- flush() 立即写入全部待保存状态（手动存档前与关闭服务时调用）
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+try:
+    from ..database import json_codec
+    from ..database.async_db import run_in_db
+except ImportError:
+    from database import json_codec
+    from database.async_db import run_in_db
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PendingAutoSave:
+    """待写入的自动保存"""
+    user_id: str
+    state: Any  # GameState、dict 或 JSON bytes（提交后调用方不再修改）
+    turn_number: int
+    turns: int  # 上次写入后提交的回合数
+    submitted_at: float
+
+
+def _to_dict(state: Any) -> Dict[str, Any]:
+    """GameState / JSON bytes 转为 dict（在数据库线程中执行）"""
+    if isinstance(state, (bytes, str)):
+        return json_codec.loads(state)
+    return state.model_dump() if hasattr(state, "model_dump") else state
+
+
+class AutoSaveQueue:
+    """防抖合并的自动保存队列
+
+    submit() 须在事件循环线程中调用；未调用 start() 时只有 flush() 会写入。
+    """
+
+    def __init__(self, save_service, interval_turns: int = 5, idle_delay: float = 10.0):
+        """
+        Args:
+            save_service: 存档服务（提供 auto_save_many）
+            interval_turns: 每累计多少个回合写入一次
+            idle_delay: 最后一次提交后空闲多少秒写入
+        """
+        self.save_service = save_service
+        self.interval_turns = max(1, interval_turns)
+        self.idle_delay = idle_delay
+
+        self._pending: Dict[str, PendingAutoSave] = {}
+        self._lock = threading.Lock()
+        self._write_lock = asyncio.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._written = 0
+
+    def submit(self, user_id: str, state: Any, turn_number: int):
+        """登记回合结束时的状态（覆盖该用户尚未写入的状态）"""
+        with self._lock:
+            previous = self._pending.get(user_id)
+            turns = previous.turns + 1 if previous else 1
+            self._pending[user_id] = PendingAutoSave(
+                user_id=user_id,
+                state=state,
+                turn_number=turn_number,
+                turns=turns,
+                submitted_at=time.monotonic(),
+            )
+
+        if self._wakeup is not None and (previous is None or turns >= self.interval_turns):
+            self._wakeup.set()
+
+    def pending_count(self) -> int:
+        """待写入的用户数"""
+        with self._lock:
+            return len(self._pending)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取队列统计"""
+        return {
+            "pending": self.pending_count(),
+            "written": self._written,
+            "interval_turns": self.interval_turns,
+            "idle_delay": self.idle_delay,
+        }
+
+    # ==================== 写入 ====================
+
+    def _take(self, now: Optional[float] = None) -> List[PendingAutoSave]:
+        """取出到期的待保存状态（now 为 None 时全部取出）"""
+        with self._lock:
+            if now is None:
+                due = list(self._pending.values())
+            else:
+                due = [
+                    entry
+                    for entry in self._pending.values()
+                    if entry.turns >= self.interval_turns
+                    or now - entry.submitted_at >= self.idle_delay
+                ]
+            for entry in due:
+                del self._pending[entry.user_id]
+            return due
+
+    def _requeue(self, entries: List[PendingAutoSave]):
+        """写入失败时放回队列（已有更新的提交时丢弃旧状态）"""
+        with self._lock:
+            for entry in entries:
+                self._pending.setdefault(entry.user_id, entry)
+
+    def _write(self, entries: List[PendingAutoSave]) -> List[int]:
+        """序列化并批量写入（在数据库线程中执行）"""
+        return self.save_service.auto_save_many(
+            [(entry.user_id, _to_dict(entry.state), entry.turn_number) for entry in entries]
+        )
+
+    async def _write_entries(self, entries: List[PendingAutoSave]) -> int:
+        if not entries:
+            return 0
+        try:
+            await run_in_db(self._write, entries)
+        except Exception:
+            self._requeue(entries)
+            raise
+        self._written += len(entries)
+        return len(entries)
+
+    async def flush(self) -> int:
+        """立即写入全部待保存状态
+
+        Returns:
+            int: 写入的自动保存数
+        """
+        async with self._write_lock:
+            return await self._write_entries(self._take())
+
+    async def flush_due(self) -> int:
+        """写入已到期的待保存状态"""
+        async with self._write_lock:
+            return await self._write_entries(self._take(time.monotonic()))
+
+    # ==================== 后台调度 ====================
+
+    def _next_deadline(self) -> Optional[float]:
+        """距最近一个空闲到期的秒数（无待保存状态时为 None）"""
+        with self._lock:
+            if not self._pending:
+                return None
+            earliest = min(entry.submitted_at for entry in self._pending.values())
+        return max(0.0, earliest + self.idle_delay - time.monotonic())
+
+    def start(self):
+        """在当前事件循环中启动后台写入任务"""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def _loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._next_deadline())
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush_due()
+            except Exception as e:
+                logger.error(f"自动保存失败: {e}", exc_info=True)
+                await asyncio.sleep(self.idle_delay)
+
+    async def stop(self):
+        """停止后台任务并写入剩余状态"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+        await self.flush()
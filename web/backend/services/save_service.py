@@ -4,11 +4,28 @@ Phase 2 - 存档系统实现
 实现游戏的保存、加载、删除、快照等功能
 """
 
-import json
-import sqlite3
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from ..database import json_codec
+    from ..database.connection import connect
+    from ..database.state_blobs import (
+        collect_garbage,
+        ensure_state_blob_schema,
+        load_state,
+        put_game_state,
+    )
+except ImportError:
+    from database import json_codec
+    from database.connection import connect
+    from database.state_blobs import (
+        collect_garbage,
+        ensure_state_blob_schema,
+        load_state,
+        put_game_state,
+    )
 
 
 class SaveService:
@@ -31,6 +48,7 @@ class SaveService:
         """
         self.db_path = db_path
         self._ensure_db_exists()
+        self._ensure_blob_schema()
 
     def _ensure_db_exists(self):
         """确保数据库文件存在"""
@@ -38,6 +56,11 @@ class SaveService:
         if not db_file.exists():
             raise FileNotFoundError(f"数据库文件不存在: {self.db_path}")
 
+    def _ensure_blob_schema(self):
+        """确保状态 Blob 表与引用列存在"""
+        with connect(self.db_path) as conn:
+            ensure_state_blob_schema(conn)
+
     def save_game(
         self,
         user_id: str,
@@ -65,7 +88,7 @@ class SaveService:
         if not 0 <= slot_id <= 10:
             raise ValueError(f"存档槽位必须在 0-10 之间（0为自动保存），当前: {slot_id}")
 
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
@@ -102,22 +125,24 @@ class SaveService:
                 "max_hp": player.get("maxHp", player.get("max_hp", 100)),  # 支持 maxHp 和 max_hp
             }
 
-            # 序列化游戏状态和元数据
-            game_state_json = json.dumps(game_state, ensure_ascii=False)
-            metadata_json = json.dumps(metadata, ensure_ascii=False)
+            # 序列化游戏状态（存档与快照共用同一个 Blob）和元数据
+            state_hash, base_hash = put_game_state(conn, game_state)
+            metadata_json = json_codec.dumps_str(metadata)
 
             # 插入或更新存档
             cursor.execute(
                 """
-                INSERT INTO game_saves (user_id, slot_id, save_name, game_state, metadata, updated_at)
-                VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                INSERT INTO game_saves (user_id, slot_id, save_name, game_state, state_hash, base_hash, metadata, updated_at)
+                VALUES (?, ?, ?, '', ?, ?, ?, CURRENT_TIMESTAMP)
                 ON CONFLICT(user_id, slot_id) DO UPDATE SET
                     save_name = excluded.save_name,
                     game_state = excluded.game_state,
+                    state_hash = excluded.state_hash,
+                    base_hash = excluded.base_hash,
                     metadata = excluded.metadata,
                     updated_at = CURRENT_TIMESTAMP
             """,
-                (user_id, slot_id, save_name, game_state_json, metadata_json),
+                (user_id, slot_id, save_name, state_hash, base_hash, metadata_json),
             )
 
             # 获取存档ID
@@ -130,14 +155,13 @@ class SaveService:
             # 如果不是自动保存，创建快照
             if not auto_save:
                 turn_number = game_state.get("turn_number", 0)
-                snapshot_json = json.dumps(game_state, ensure_ascii=False)
 
                 cursor.execute(
                     """
-                    INSERT INTO save_snapshots (save_id, turn_number, snapshot_data)
-                    VALUES (?, ?, ?)
+                    INSERT INTO save_snapshots (save_id, turn_number, snapshot_data, state_hash, base_hash)
+                    VALUES (?, ?, '', ?, ?)
                 """,
-                    (save_id, turn_number, snapshot_json),
+                    (save_id, turn_number, state_hash, base_hash),
                 )
 
             conn.commit()
@@ -160,14 +184,14 @@ class SaveService:
                 "save_info": {"save_id": int, "slot_id": int, "save_name": str, ...}
             }
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
             cursor.execute(
                 """
                 SELECT id, slot_id, save_name, game_state, metadata,
-                       screenshot_url, created_at, updated_at
+                       screenshot_url, created_at, updated_at, state_hash, base_hash
                 FROM game_saves
                 WHERE id = ?
             """,
@@ -178,8 +202,8 @@ class SaveService:
             if not row:
                 return None
 
-            game_state = json.loads(row[3])
-            metadata = json.loads(row[4]) if row[4] else {}
+            game_state = load_state(conn, row[8], row[3], row[9])
+            metadata = json_codec.loads(row[4]) if row[4] else {}
 
             return {
                 "game_state": game_state,
@@ -207,7 +231,7 @@ class SaveService:
             存档列表，按槽位排序
             每个元素包含: save_id, slot_id, save_name, metadata, screenshot_url, created_at, updated_at
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
@@ -224,7 +248,7 @@ class SaveService:
 
             saves = []
             for row in cursor.fetchall():
-                metadata = json.loads(row[3]) if row[3] else {}
+                metadata = json_codec.loads(row[3]) if row[3] else {}
 
                 saves.append(
                     {
@@ -252,15 +276,18 @@ class SaveService:
         Returns:
             是否删除成功
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
             cursor.execute("DELETE FROM game_saves WHERE id = ?", (save_id,))
+            deleted = cursor.rowcount > 0
+            if deleted:
+                collect_garbage(conn)
             conn.commit()
 
             # 检查是否删除了行
-            return cursor.rowcount > 0
+            return deleted
 
         finally:
             conn.close()
@@ -276,18 +303,18 @@ class SaveService:
         Returns:
             快照ID
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
-            snapshot_json = json.dumps(game_state, ensure_ascii=False)
+            state_hash, base_hash = put_game_state(conn, game_state)
 
             cursor.execute(
                 """
-                INSERT INTO save_snapshots (save_id, turn_number, snapshot_data)
-                VALUES (?, ?, ?)
+                INSERT INTO save_snapshots (save_id, turn_number, snapshot_data, state_hash, base_hash)
+                VALUES (?, ?, '', ?, ?)
             """,
-                (save_id, turn_number, snapshot_json),
+                (save_id, turn_number, state_hash, base_hash),
             )
 
             conn.commit()
@@ -305,7 +332,7 @@ class SaveService:
         Returns:
             快照列表，按回合数排序
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
@@ -339,13 +366,13 @@ class SaveService:
         Returns:
             游戏状态字典，如果不存在返回 None
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
             cursor.execute(
                 """
-                SELECT snapshot_data
+                SELECT snapshot_data, state_hash, base_hash
                 FROM save_snapshots
                 WHERE id = ?
             """,
@@ -356,7 +383,7 @@ class SaveService:
             if not row:
                 return None
 
-            return json.loads(row[0])
+            return load_state(conn, row[1], row[0], row[2])
 
         finally:
             conn.close()
@@ -374,22 +401,36 @@ class SaveService:
         Returns:
             自动保存ID
         """
-        conn = sqlite3.connect(self.db_path)
+        return self.auto_save_many([(user_id, game_state, turn_number)])[0]
+
+    def auto_save_many(self, entries: List[Tuple[str, Dict[str, Any], int]]) -> List[int]:
+        """在一个事务中批量写入自动保存
+
+        Args:
+            entries: (用户ID, 游戏状态, 回合数) 列表
+
+        Returns:
+            自动保存ID列表（与 entries 顺序一致）
+        """
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
-            game_state_json = json.dumps(game_state, ensure_ascii=False)
+            auto_save_ids = []
+            for user_id, game_state, turn_number in entries:
+                state_hash, base_hash = put_game_state(conn, game_state)
 
-            cursor.execute(
-                """
-                INSERT INTO auto_saves (user_id, game_state, turn_number)
-                VALUES (?, ?, ?)
-            """,
-                (user_id, game_state_json, turn_number),
-            )
+                cursor.execute(
+                    """
+                    INSERT INTO auto_saves (user_id, game_state, state_hash, base_hash, turn_number)
+                    VALUES (?, '', ?, ?, ?)
+                """,
+                    (user_id, state_hash, base_hash, turn_number),
+                )
+                auto_save_ids.append(cursor.lastrowid)
 
             conn.commit()
-            return cursor.lastrowid
+            return auto_save_ids
 
         finally:
             conn.close()
@@ -403,14 +444,14 @@ class SaveService:
         Returns:
             包含游戏状态和元数据的字典，如果不存在返回 None
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
             # 使用 ID 排序而不是 created_at，因为 ID 是自增的，更可靠
             cursor.execute(
                 """
-                SELECT id, game_state, turn_number, created_at
+                SELECT id, game_state, turn_number, created_at, state_hash, base_hash
                 FROM auto_saves
                 WHERE user_id = ?
                 ORDER BY id DESC
@@ -425,7 +466,7 @@ class SaveService:
 
             return {
                 "auto_save_id": row[0],
-                "game_state": json.loads(row[1]),
+                "game_state": load_state(conn, row[4], row[1], row[5]),
                 "turn_number": row[2],
                 "created_at": row[3],
             }
@@ -443,7 +484,7 @@ class SaveService:
         Returns:
             删除的记录数
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
@@ -472,9 +513,12 @@ class SaveService:
             """,
                 [user_id] + keep_ids,
             )
+            deleted = cursor.rowcount
+            if deleted:
+                collect_garbage(conn)
 
             conn.commit()
-            return cursor.rowcount
+            return deleted
 
         finally:
             conn.close()
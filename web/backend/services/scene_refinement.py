@@ -79,25 +79,24 @@ class SceneRefinement:
         if "structure" in request.passes:
             structure_layer = await self._structure_pass(location, world_style)
             layers.append(structure_layer)
-            self.db.save_detail_layer(structure_layer)
 
         # Pass 2: 感官增益
         if "sensory" in request.passes:
             sensory_layer = await self._sensory_pass(location, world_style)
             layers.append(sensory_layer)
-            self.db.save_detail_layer(sensory_layer)
 
         # Pass 3: 可供性提取
         if "affordance" in request.passes:
             affordance_layer = await self._affordance_pass(location, world_style)
             layers.append(affordance_layer)
-            self.db.save_detail_layer(affordance_layer)
 
         # Pass 4: 镜头语言
         if "cinematic" in request.passes:
             cinematic_layer = await self._cinematic_pass(location, world_style, layers)
             layers.append(cinematic_layer)
-            self.db.save_detail_layer(cinematic_layer)
+
+        # 一次写入本次生成的所有细化层
+        self.db.save_detail_layers(layers)
 
         # 更新location的detail_level
         location.detail_level = request.target_detail_level
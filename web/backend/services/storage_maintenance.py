@@ -0,0 +1,329 @@
+"""存储维护任务
+
+后端内定期运行的 SQLite 维护：
+- 按用户清理旧的自动保存（保留最近 N 个）
+- 按指数保留策略稀疏化存档快照：近期全部保留，之后每小时、每天、每周各保留最新一个
+- 回收不再被引用的状态 Blob
+- 增量 VACUUM 与逐表 ANALYZE，按时间片执行，避免长时间占用写锁
+
+每轮维护的结果通过 game_events 埋点记录（action = "storage_maintenance"）。
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from ..database.async_db import run_in_db
+    from ..database.connection import connect
+    from ..database.state_blobs import collect_garbage, ensure_state_blob_schema
+except ImportError:
+    from database.async_db import run_in_db
+    from database.connection import connect
+    from database.state_blobs import collect_garbage, ensure_state_blob_schema
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RetentionPolicy:
+    """快照保留策略"""
+    keep_all_for: timedelta = timedelta(hours=1)  # 此时间内的快照全部保留
+    hourly_for: timedelta = timedelta(days=1)  # 此时间内每小时保留一个
+    daily_for: timedelta = timedelta(days=30)  # 此时间内每天保留一个，更早的每周保留一个
+
+
+@dataclass
+class MaintenanceReport:
+    """一轮维护的结果"""
+    autosaves_pruned: int = 0
+    snapshots_pruned: int = 0
+    blobs_collected: int = 0
+    pages_vacuumed: int = 0
+    tables_analyzed: List[str] = field(default_factory=list)
+    duration_ms: int = 0
+
+
+def _parse_timestamp(value: str) -> datetime:
+    """解析 SQLite CURRENT_TIMESTAMP 文本"""
+    return datetime.fromisoformat(str(value))
+
+
+def _bucket(age: timedelta, created_at: datetime, policy: RetentionPolicy) -> Optional[Tuple]:
+    """快照所属的保留桶（None 表示全部保留）"""
+    if age < policy.keep_all_for:
+        return None
+    if age < policy.hourly_for:
+        return ("hour", created_at.strftime("%Y-%m-%d %H"))
+    if age < policy.daily_for:
+        return ("day", created_at.date())
+    return ("week",) + tuple(created_at.isocalendar()[:2])
+
+
+def select_snapshots_to_prune(
+    snapshots: Iterable[Tuple[int, str]],
+    now: datetime,
+    policy: Optional[RetentionPolicy] = None,
+) -> List[int]:
+    """按指数保留策略选出要删除的快照
+
+    Args:
+        snapshots: 同一存档的 (快照ID, created_at) 列表
+        now: 当前时间（与 created_at 同为 UTC）
+        policy: 保留策略
+
+    Returns:
+        List[int]: 要删除的快照ID（每个桶只保留最新的一个）
+    """
+    policy = policy or RetentionPolicy()
+    ordered = sorted(
+        ((_parse_timestamp(created_at), snapshot_id) for snapshot_id, created_at in snapshots),
+        reverse=True,
+    )
+
+    seen = set()
+    prune = []
+    for created_at, snapshot_id in ordered:
+        bucket = _bucket(now - created_at, created_at, policy)
+        if bucket is None:
+            continue
+        if bucket in seen:
+            prune.append(snapshot_id)
+        else:
+            seen.add(bucket)
+    return prune
+
+
+class StorageMaintenanceWorker:
+    """存储维护任务
+
+    run_cycle() 同步执行一轮维护；start() 在事件循环中按 interval 周期调度，
+    每轮在数据库线程池中执行。
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        interval: float = 3600,
+        autosave_keep_count: int = 5,
+        policy: Optional[RetentionPolicy] = None,
+        time_budget: float = 0.5,
+        vacuum_pages_per_slice: int = 256,
+        analysis_limit: int = 1000,
+    ):
+        """
+        Args:
+            db_path: 数据库文件路径
+            interval: 维护周期（秒）
+            autosave_keep_count: 每个用户保留的自动保存数
+            policy: 快照保留策略
+            time_budget: 每轮 VACUUM / ANALYZE 各自的时间预算（秒）
+            vacuum_pages_per_slice: 每个增量 VACUUM 时间片释放的页数
+            analysis_limit: ANALYZE 每个索引采样的行数上限（PRAGMA analysis_limit）
+        """
+        self.db_path = db_path
+        self.interval = interval
+        self.autosave_keep_count = autosave_keep_count
+        self.policy = policy or RetentionPolicy()
+        self.time_budget = time_budget
+        self.vacuum_pages_per_slice = vacuum_pages_per_slice
+        self.analysis_limit = analysis_limit
+
+        self.last_report: Optional[MaintenanceReport] = None
+        self._analyze_cursor = 0  # 下一轮从第几张表开始 ANALYZE
+        self._task: Optional[asyncio.Task] = None
+
+    # ==================== 单轮维护 ====================
+
+    def run_cycle(self, now: Optional[datetime] = None) -> MaintenanceReport:
+        """执行一轮维护"""
+        started = time.perf_counter()
+        report = MaintenanceReport()
+
+        report.autosaves_pruned = self.prune_autosaves()
+        report.snapshots_pruned = self.thin_snapshots(now)
+        if report.autosaves_pruned or report.snapshots_pruned:
+            with connect(self.db_path) as conn:
+                ensure_state_blob_schema(conn)
+                report.blobs_collected = collect_garbage(conn)
+
+        report.pages_vacuumed = self.incremental_vacuum()
+        report.tables_analyzed = self.analyze_tables()
+        report.duration_ms = int((time.perf_counter() - started) * 1000)
+
+        self.last_report = report
+        self._record(report)
+        return report
+
+    def prune_autosaves(self) -> int:
+        """按用户清理旧的自动保存（每个用户一个短事务）"""
+        if not self._table_exists("auto_saves"):
+            return 0
+
+        conn = connect(self.db_path)
+        try:
+            users = [row[0] for row in conn.execute("SELECT DISTINCT user_id FROM auto_saves")]
+        finally:
+            conn.close()
+
+        pruned = 0
+        for user_id in users:
+            with connect(self.db_path) as conn:
+                cursor = conn.execute(
+                    """
+                    DELETE FROM auto_saves
+                    WHERE user_id = ? AND id NOT IN (
+                        SELECT id FROM auto_saves
+                        WHERE user_id = ?
+                        ORDER BY id DESC
+                        LIMIT ?
+                    )
+                """,
+                    (user_id, user_id, self.autosave_keep_count),
+                )
+                pruned += cursor.rowcount
+        return pruned
+
+    def thin_snapshots(self, now: Optional[datetime] = None) -> int:
+        """按保留策略稀疏化每个存档的快照（每个存档一个短事务）"""
+        if not self._table_exists("save_snapshots"):
+            return 0
+
+        # CURRENT_TIMESTAMP 为 UTC
+        now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+        conn = connect(self.db_path)
+        try:
+            rows = conn.execute(
+                "SELECT save_id, id, created_at FROM save_snapshots ORDER BY save_id"
+            ).fetchall()
+        finally:
+            conn.close()
+
+        by_save: Dict[int, List[Tuple[int, str]]] = {}
+        for save_id, snapshot_id, created_at in rows:
+            by_save.setdefault(save_id, []).append((snapshot_id, created_at))
+
+        pruned = 0
+        for snapshots in by_save.values():
+            prune = select_snapshots_to_prune(snapshots, now, self.policy)
+            if not prune:
+                continue
+            with connect(self.db_path) as conn:
+                conn.executemany(
+                    "DELETE FROM save_snapshots WHERE id = ?", [(i,) for i in prune]
+                )
+            pruned += len(prune)
+        return pruned
+
+    def incremental_vacuum(self) -> int:
+        """在时间预算内分片执行增量 VACUUM（每轮至少执行一片）
+
+        仅当数据库为 auto_vacuum=INCREMENTAL 时有效（新建的数据库由连接池设置）。
+
+        Returns:
+            int: 释放的页数
+        """
+        conn = connect(self.db_path)
+        try:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                return 0
+
+            freed = 0
+            deadline = time.perf_counter() + self.time_budget
+            while True:
+                free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                if free_pages == 0:
+                    break
+                pages = min(free_pages, self.vacuum_pages_per_slice)
+                conn.execute(f"PRAGMA incremental_vacuum({pages})").fetchall()
+                freed += pages
+                if time.perf_counter() >= deadline:
+                    break
+            return freed
+        finally:
+            conn.close()
+
+    def analyze_tables(self) -> List[str]:
+        """在时间预算内逐表 ANALYZE，未完成的表留到下一轮"""
+        conn = connect(self.db_path)
+        try:
+            tables = [
+                row[0]
+                for row in conn.execute(
+                    "SELECT name FROM sqlite_master "
+                    "WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+                )
+            ]
+            if not tables:
+                return []
+
+            conn.execute(f"PRAGMA analysis_limit={int(self.analysis_limit)}")
+            analyzed = []
+            deadline = time.perf_counter() + self.time_budget
+            start = self._analyze_cursor % len(tables)
+            for offset in range(len(tables)):
+                if analyzed and time.perf_counter() >= deadline:
+                    break
+                table = tables[(start + offset) % len(tables)]
+                conn.execute(f'ANALYZE "{table}"')
+                analyzed.append(table)
+            conn.commit()
+
+            self._analyze_cursor = start + len(analyzed)
+            return analyzed
+        finally:
+            conn.close()
+
+    def _table_exists(self, name: str) -> bool:
+        conn = connect(self.db_path)
+        try:
+            return conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+            ).fetchone() is not None
+        finally:
+            conn.close()
+
+    def _record(self, report: MaintenanceReport):
+        """记录维护埋点（埋点失败不影响维护）"""
+        try:
+            from utils.metrics import record_game_event
+        except Exception:
+            return
+
+        summary = asdict(report)
+        record_game_event(
+            session_id="system",
+            turn=0,
+            action="storage_maintenance",
+            result=summary,
+            latency_ms=report.duration_ms,
+        )
+
+    # ==================== 后台调度 ====================
+
+    def start(self):
+        """在当前事件循环中启动周期维护"""
+        if self.interval > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await run_in_db(self.run_cycle)
+            except Exception as e:
+                # 单轮失败不终止调度，下一轮重试
+                logger.error(f"存储维护失败: {e}", exc_info=True)
+
+    async def stop(self):
+        """停止周期维护"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
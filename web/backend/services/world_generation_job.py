@@ -8,12 +8,13 @@ import gzip
 import json
 import re
 import random
-import sqlite3
 import uuid
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Callable, Dict, Optional
 
+from database import json_codec
+from database.connection import connect
 from llm.base import LLMMessage
 from utils.logger import get_logger
 
@@ -571,11 +572,10 @@ class WorldGenerationJob:
     async def _save_world_pack(self, world_pack: WorldPack):
         """保存 WorldPack 到数据库"""
         # 序列化并压缩
-        json_str = world_pack.model_dump_json(indent=2)
-        json_gz = gzip.compress(json_str.encode('utf-8'))
+        json_gz = gzip.compress(json_codec.dumps(world_pack))
 
         # 保存到数据库
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
@@ -607,7 +607,7 @@ class WorldGenerationJob:
         error_msg: Optional[str] = message if phase == "FAILED" else None
 
         # 更新数据库
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
@@ -5,11 +5,11 @@
 
 import json
 import pickle
-import sqlite3
 from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 
+from database.connection import connect
 from models.world_pack import NPC, WorldPack
 from utils.logger import get_logger
 from llm.embeddings import EmbeddingClient
@@ -161,7 +161,7 @@ class WorldIndexer:
         embedding: np.ndarray
     ):
         """保存嵌入到数据库"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
@@ -186,7 +186,7 @@ class WorldIndexer:
 
     def _clear_index(self, world_id: str):
         """清理指定世界的索引"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
@@ -220,7 +220,7 @@ class WorldIndexer:
         query_embedding = self._get_embedding_sync(query)
 
         # 从数据库加载所有嵌入
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
@@ -282,7 +282,7 @@ class WorldIndexer:
         Returns:
             str: NPC 上下文文本
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
@@ -343,7 +343,7 @@ class WorldIndexer:
 
     def get_stats(self, world_id: str) -> Dict[str, int]:
         """获取索引统计"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
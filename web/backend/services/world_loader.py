@@ -1,14 +1,19 @@
 """
 WorldPack加载器
 将预生成的WorldPack转换为GameState，用于开始游戏
+
+同一世界包版本的初始状态只转换一次：首次加载时登记为存档基准，
+之后直接从基准构建 GameState，不再解析整个世界包。
 """
 
 import gzip
-import json
-import sqlite3
+import logging
+import random
 from pathlib import Path
 from typing import Optional
 
+from database.connection import connect
+from database.state_blobs import encode_state, get_world_baseline, pack_version, register_baseline
 from game.game_tools import (
     GameMap,
     GameState,
@@ -25,16 +30,33 @@ from game.game_tools import (
 
 from models.world_pack import WorldPack
 
+logger = logging.getLogger(__name__)
+
 
 class WorldLoader:
     """WorldPack加载器"""
 
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, verify_sample_rate: float = 0.0):
+        """
+        Args:
+            db_path: 数据库文件路径
+            verify_sample_rate: 已登记基准的加载中，按此比例改为完整转换世界包并与基准比对
+        """
         self.db_path = db_path
+        self.verify_sample_rate = verify_sample_rate
 
     def load_world_pack(self, world_id: str) -> Optional[WorldPack]:
         """从数据库加载WorldPack"""
-        conn = sqlite3.connect(self.db_path)
+        pack_json = self._load_pack_json(world_id)
+        if pack_json is None:
+            return None
+
+        # 由 pydantic-core 直接从 JSON bytes 解析并校验（不经过中间 dict）
+        return WorldPack.model_validate_json(pack_json)
+
+    def _load_pack_json(self, world_id: str) -> Optional[bytes]:
+        """读取并解压WorldPack的JSON（UTF-8 bytes）"""
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         cursor.execute("SELECT json_gz FROM worlds WHERE id = ?", (world_id,))
@@ -47,14 +69,18 @@ class WorldLoader:
 
         # 解压缩
         json_gz = row[0]
-        json_str = gzip.decompress(json_gz).decode("utf-8")
-        data = json.loads(json_str)
+        return gzip.decompress(json_gz)
 
-        # 反序列化为WorldPack
-        return WorldPack(**data)
+    def world_pack_to_game_state(
+        self, world_pack: WorldPack, pack_version: Optional[str] = None
+    ) -> GameState:
+        """将WorldPack转换为GameState
 
-    def world_pack_to_game_state(self, world_pack: WorldPack) -> GameState:
-        """将WorldPack转换为GameState"""
+        Args:
+            world_pack: 世界包
+            pack_version: 世界包内容版本（可选，写入 metadata.worldPackVersion，
+                存档据此只保存相对初始状态的变化）
+        """
 
         # 1. 转换地图
         game_map = self._convert_map(world_pack)
@@ -85,6 +111,8 @@ class WorldLoader:
                 "worldPackTitle": world_pack.meta.title,
             },
         )
+        if pack_version:
+            state.metadata["worldPackVersion"] = pack_version
 
         return state
 
@@ -224,9 +252,43 @@ class WorldLoader:
         return game_quests
 
     def load_and_convert(self, world_id: str) -> Optional[GameState]:
-        """加载WorldPack并转换为GameState（一站式）"""
-        world_pack = self.load_world_pack(world_id)
-        if not world_pack:
+        """加载WorldPack并转换为GameState（一站式）
+
+        首次加载时把初始状态登记为该世界包版本的存档基准；基准已登记时
+        直接由基准构建 GameState（基准由本服务写入，schema 版本与当前一致才使用）。
+        """
+        pack_json = self._load_pack_json(world_id)
+        if pack_json is None:
             return None
 
-        return self.world_pack_to_game_state(world_pack)
+        version = pack_version(pack_json)
+        verify = self.verify_sample_rate > 0 and random.random() < self.verify_sample_rate
+        if not verify:
+            state = self._load_initial_state(world_id, version)
+            if state is not None:
+                return state
+
+        world_pack = WorldPack.model_validate_json(pack_json)
+        state = self.world_pack_to_game_state(world_pack, pack_version=version)
+        initial_state = state.model_dump()
+
+        with connect(self.db_path) as conn:
+            base_hash = register_baseline(conn, world_pack.meta.id, version, initial_state)
+
+        if verify and base_hash != encode_state(initial_state).state_hash:
+            logger.warning(f"世界包 {world_id}@{version} 的已登记基准与重新转换的初始状态不一致")
+
+        return state
+
+    def _load_initial_state(self, world_id: str, version: str) -> Optional[GameState]:
+        """由已登记的基准构建初始状态（未登记或 schema 版本不符时返回 None）"""
+        conn = connect(self.db_path)
+        try:
+            baseline = get_world_baseline(conn, world_id, version)
+        finally:
+            conn.close()
+
+        if baseline is None or baseline.get("version") != GameState.model_fields["version"].default:
+            return None
+        # 校验与变更追踪都会复制列表 / 字典，返回的状态与缓存的基准互不影响
+        return GameState.model_validate(baseline)
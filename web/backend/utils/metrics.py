@@ -7,12 +7,12 @@
 
 from __future__ import annotations
 
-import json
-import sqlite3
 import time
 from typing import Any, Dict, Optional
 
 from config.settings import settings
+from database import json_codec
+from database.connection import connect
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -29,7 +29,7 @@ def record_game_event(
     """记录游戏事件到 SQLite game_events 表。"""
     try:
         db_path = str(settings.database_path)
-        conn = sqlite3.connect(db_path)
+        conn = connect(db_path)
         cur = conn.cursor()
         cur.execute(
             """
@@ -40,8 +40,8 @@ def record_game_event(
                 session_id,
                 int(turn or 0),
                 action,
-                json.dumps(payload or {}, ensure_ascii=False),
-                json.dumps(result or {}, ensure_ascii=False),
+                json_codec.dumps_str(payload or {}),
+                json_codec.dumps_str(result or {}),
                 int(latency_ms) if latency_ms is not None else None,
             ),
         )